@@ -0,0 +1,145 @@
+"""
+Canvas Sync Benchmark
+Runs a hub and several headless Air Canvas instances on loopback, each
+drawing its own strokes at camera rate, and reports bandwidth, stroke
+latency, the cost of applying remote strokes and whether every board ends up
+identical. A last instance joins late to time the snapshot.
+
+Run with: python benchmarks/canvas_sync_bench.py --instances 4
+"""
+
+import argparse
+import hashlib
+import multiprocessing as mp
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add parent directory to path to import utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.canvas_sync import CanvasSyncClient, CanvasSyncHub
+from utils.canvas_tools import ToolEngine
+
+
+def board_hash(tools):
+    """Digest of a board's canvas and mask."""
+    return hashlib.sha1(tools.canvas.tobytes() + tools.mask.tobytes()).hexdigest()
+
+
+def instance(index, count, args, barrier, conn):
+    """One headless Air Canvas drawing in its own band of the board."""
+    tools = ToolEngine(args.width, args.height)
+    tools.color = ((60 * index) % 256, 255 - (40 * index) % 256, 200)
+    client = CanvasSyncClient('127.0.0.1', args.port, args.width, args.height,
+                              f"bench-{index}", args.batch_interval)
+    client.attach(tools)
+    client.start()
+    barrier.wait()
+    
+    band = args.height / count
+    frames = int(args.seconds * args.fps)
+    apply_ms = []
+    start = time.perf_counter()
+    for frame in range(frames):
+        now = start + frame / args.fps
+        time.sleep(max(0.0, now - time.perf_counter()))
+        
+        # Strokes of about a second with short lifts in between
+        if frame % args.fps < args.fps - 3:
+            x = args.width * (0.1 + 0.8 * ((frame * 7) % 300) / 300)
+            y = band * (index + 0.5 + 0.3 * np.sin(frame / 4))
+            tools.move((x, y), now)
+        else:
+            tools.lift()
+        
+        before = time.perf_counter()
+        client.apply_remote(tools)
+        apply_ms.append((time.perf_counter() - before) * 1000)
+    tools.lift()
+    
+    # Let the last batches go around
+    time.sleep(0.5)
+    client.apply_remote(tools)
+    barrier.wait()
+    time.sleep(0.2)
+    client.apply_remote(tools)
+    stats = client.stats()
+    stats['apply_ms'] = float(np.mean(apply_ms))
+    stats['hash'] = board_hash(tools)
+    client.close()
+    conn.send(stats)
+
+
+def late_join(args):
+    """Join after the session and time how long the board takes to arrive."""
+    tools = ToolEngine(args.width, args.height)
+    client = CanvasSyncClient('127.0.0.1', args.port, args.width, args.height,
+                              "bench-late", args.batch_interval)
+    client.attach(tools)
+    start = time.perf_counter()
+    client.start()
+    while not client.apply_remote(tools):
+        time.sleep(0.001)
+    elapsed = (time.perf_counter() - start) * 1000
+    received = client.received_bytes
+    digest = board_hash(tools)
+    client.close()
+    return elapsed, received, digest
+
+
+def main():
+    """
+    Entry point for the benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Canvas sync benchmark")
+    parser.add_argument('--instances', type=int, default=3, help="Drawing instances")
+    parser.add_argument('--seconds', type=float, default=5.0, help="Drawing time")
+    parser.add_argument('--fps', type=int, default=30, help="Frames per second per instance")
+    parser.add_argument('--width', type=int, default=1280, help="Board width")
+    parser.add_argument('--height', type=int, default=720, help="Board height")
+    parser.add_argument('--batch-interval', type=float, default=0.03,
+                        help="Seconds local strokes are batched")
+    parser.add_argument('--port', type=int, default=50729, help="Loopback port for the hub")
+    args = parser.parse_args()
+    
+    hub = CanvasSyncHub(args.width, args.height, '127.0.0.1', args.port)
+    hub.start()
+    
+    barrier = mp.Barrier(args.instances)
+    pipes = []
+    processes = []
+    for index in range(args.instances):
+        parent, child = mp.Pipe(duplex=False)
+        process = mp.Process(target=instance, args=(index, args.instances, args, barrier, child))
+        process.start()
+        pipes.append(parent)
+        processes.append(process)
+    results = [pipe.recv() for pipe in pipes]
+    for process in processes:
+        process.join()
+    
+    hub_hash = hashlib.sha1(hub.canvas.tobytes() + hub.mask.tobytes()).hexdigest()
+    frame_kb_s = args.width * args.height * 3 * args.fps / 1024
+    print(f"{args.instances} instances, {args.width}x{args.height} at {args.fps} FPS for "
+          f"{args.seconds:.0f} s, batches every {args.batch_interval * 1000:.0f} ms")
+    print(f"{'instance':<10}{'ops':>7}{'batches':>9}{'up kB/s':>10}{'down kB/s':>11}"
+          f"{'latency ms p50/p99':>21}{'apply ms':>10}{'board':>8}")
+    for index, result in enumerate(results):
+        print(f"{index:<10}{result['sent_ops']:>7}{result['sent_batches']:>9}"
+              f"{result['sent_bytes'] / 1024 / args.seconds:>10.2f}"
+              f"{result['received_bytes'] / 1024 / args.seconds:>11.2f}"
+              f"{result['latency_p50']:>10.1f} / {result['latency_p99']:<8.1f}"
+              f"{result['apply_ms']:>10.3f}"
+              f"{'same' if result['hash'] == hub_hash else 'DIFF':>8}")
+    print(f"Raw frames would take {frame_kb_s:,.0f} kB/s per instance")
+    
+    elapsed, received, digest = late_join(args)
+    print(f"Late join: board in {elapsed:.0f} ms, {received / 1024:.0f} kB snapshot, "
+          f"{'same' if digest == hub_hash else 'DIFF'} board")
+    hub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Detector Backends Benchmark
+Runs each hand landmark backend over the same recorded video and compares
+latency, throughput and how closely their landmarks agree.
+
+Frames are decoded up front and fed at the video's frame rate, like a camera;
+the first backend listed is the reference for landmark agreement.
+
+Run with: python benchmarks/detector_backends_bench.py recordings/session.mp4
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+
+# Add parent directory to path to import utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.detector_backends import BACKENDS, create_backend, set_cpu_threads
+
+
+def percentile(values, q):
+    """Percentile of a list, or NaN when it is empty."""
+    return float(np.percentile(values, q)) if values else float('nan')
+
+
+def load_frames(path, max_frames, width):
+    """
+    Decode a video into RGB frames scaled to the inference width.
+    
+    Returns:
+        Tuple (frames, fps)
+    """
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"Could not open video: {path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    frames = []
+    while len(frames) < max_frames:
+        success, img = cap.read()
+        if not success:
+            break
+        h, w = img.shape[:2]
+        if width and w > width:
+            img = cv2.resize(img, (width, width * h // w), interpolation=cv2.INTER_AREA)
+        frames.append(np.ascontiguousarray(cv2.cvtColor(img, cv2.COLOR_BGR2RGB)))
+    cap.release()
+    return frames, fps
+
+
+def run(name, frames, rate, args):
+    """
+    Feed every frame to one backend.
+    
+    Returns:
+        Dictionary of results, including 'hands': frame index -> list of (21, 3) arrays
+    """
+    backend = create_backend(name, args.model, args.max_hands)
+    start = time.perf_counter()
+    backend.load()
+    load_time = time.perf_counter() - start
+    
+    interval_ms = 1000.0 / rate if rate > 0 else 1.0
+    timestamps = [int(round((i + 1) * interval_ms)) for i in range(len(frames))]
+    frame_of = {ts: i for i, ts in enumerate(timestamps)}
+    submit_time = {}
+    hands = {}
+    latencies = []
+    lock = threading.Lock()
+    
+    # Asynchronous results are matched to their frame through the timestamp
+    def on_result(result, timestamp_ms):
+        now = time.perf_counter()
+        with lock:
+            index = frame_of.get(timestamp_ms)
+            if index is not None and index in submit_time:
+                hands[index] = result
+                latencies.append((now - submit_time[index]) * 1000)
+    
+    backend.on_result = on_result
+    
+    call_ms = []
+    next_frame = time.perf_counter()
+    start = time.perf_counter()
+    for index, img in enumerate(frames):
+        before = time.perf_counter()
+        with lock:
+            submit_time[index] = before
+        result = backend.process(img, timestamps[index])
+        after = time.perf_counter()
+        call_ms.append((after - before) * 1000)
+        if not backend.asynchronous:
+            hands[index] = result
+            latencies.append((after - before) * 1000)
+        if rate > 0:
+            next_frame += 1.0 / rate
+            time.sleep(max(0.0, next_frame - time.perf_counter()))
+    
+    # Let the last queued frames finish
+    if backend.asynchronous:
+        time.sleep(0.5)
+    elapsed = time.perf_counter() - start
+    backend.close()
+    
+    return {
+        'load_s': load_time,
+        'call_p50': percentile(call_ms, 50),
+        'latency_p50': percentile(latencies, 50),
+        'latency_p99': percentile(latencies, 99),
+        'results_per_s': len(hands) / elapsed,
+        'dropped': 1.0 - len(hands) / len(frames),
+        'hands': hands,
+    }
+
+
+def agreement(reference, other, aspect):
+    """
+    Compare landmarks on the frames both backends returned a result for.
+    
+    Returns:
+        Tuple (fraction of frames agreeing on hand presence, mean landmark
+        distance in palm sizes where both found a hand)
+    """
+    common = [index for index in reference if index in other]
+    if not common:
+        return float('nan'), float('nan')
+    same_presence = 0
+    distances = []
+    scale = np.array([aspect, 1.0], np.float32)
+    for index in common:
+        a, b = reference[index], other[index]
+        same_presence += (len(a) > 0) == (len(b) > 0)
+        if a and b:
+            ref = a[0][:, :2] * scale
+            # Match the hand nearest to the reference's first hand
+            candidate = min(b, key=lambda hand: np.linalg.norm(hand[0, :2] * scale - ref[0]))[:, :2] * scale
+            palm = np.linalg.norm(ref[9] - ref[0])
+            if palm > 0:
+                distances.append(float(np.linalg.norm(candidate - ref, axis=1).mean() / palm))
+    return same_presence / len(common), float(np.mean(distances)) if distances else float('nan')
+
+
+def main():
+    """
+    Entry point for the benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Hand landmark backend benchmark")
+    parser.add_argument('video', help="Recorded video, e.g. from the 'r' key in either app")
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS,
+                        default=[name for name in BACKENDS if name != 'synthetic'],
+                        help="Backends to compare; the first is the agreement reference")
+    parser.add_argument('--model', default='models/hand_landmarker.task',
+                        help="Hand landmarker model bundle for the tasks backends")
+    parser.add_argument('--frames', type=int, default=300, help="Frames to use from the video")
+    parser.add_argument('--width', type=int, default=640, help="Inference width (0 = as recorded)")
+    parser.add_argument('--rate', type=float, default=None,
+                        help="Frames fed per second (default: video rate; 0 = as fast as possible)")
+    parser.add_argument('--threads', type=int, default=0, help="CPU threads for OpenCV (0 = default)")
+    parser.add_argument('--max-hands', type=int, default=1, help="Maximum number of hands")
+    args = parser.parse_args()
+    
+    set_cpu_threads(args.threads)
+    frames, fps = load_frames(args.video, args.frames, args.width)
+    if not frames:
+        print("No frames decoded")
+        return
+    rate = fps if args.rate is None else args.rate
+    h, w = frames[0].shape[:2]
+    print(f"{len(frames)} frames at {w}x{h}, fed at {rate:.0f} frames/s" if rate > 0 else
+          f"{len(frames)} frames at {w}x{h}, fed as fast as possible")
+    
+    results = {}
+    for name in args.backends:
+        try:
+            results[name] = run(name, frames, rate, args)
+        except (FileNotFoundError, ImportError, RuntimeError) as e:
+            print(f"{name}: skipped ({e})")
+    if not results:
+        return
+    
+    reference = next(iter(results))
+    print(f"{'backend':<13}{'load s':>8}{'call ms':>9}{'latency ms p50/p99':>21}"
+          f"{'results/s':>11}{'dropped':>9}{'presence':>10}{'error':>8}")
+    for name, result in results.items():
+        presence, error = agreement(results[reference]['hands'], result['hands'], w / h)
+        print(f"{name:<13}{result['load_s']:>8.2f}{result['call_p50']:>9.2f}"
+              f"{result['latency_p50']:>10.2f} / {result['latency_p99']:<8.2f}"
+              f"{result['results_per_s']:>10.1f}{result['dropped']:>9.0%}"
+              f"{presence:>10.0%}{error:>8.3f}")
+    print(f"presence/error: agreement with {reference}; error is the mean landmark distance in palm sizes")
+
+
+if __name__ == "__main__":
+    main()
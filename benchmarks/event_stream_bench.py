@@ -0,0 +1,140 @@
+"""
+Event Stream Benchmark
+Measures publish cost and end-to-end latency of the gesture event stream over
+loopback, with several clients reading as fast as they can and one that
+barely reads at all.
+
+Run with: python benchmarks/event_stream_bench.py
+"""
+
+import argparse
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+# Add parent directory to path to import utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.event_stream import EventServer, EventClient, KIND_EVENT, KIND_LANDMARKS
+
+
+def percentile(values, q):
+    """Percentile of a list, or NaN when it is empty."""
+    return float(np.percentile(values, q)) if values else float('nan')
+
+
+def fast_reader(client, latencies, stop):
+    """Read every packet and record its latency in milliseconds."""
+    try:
+        while not stop.is_set():
+            packet = client.recv()
+            if packet['kind'] in (KIND_EVENT, KIND_LANDMARKS):
+                latencies.append((time.time() - packet['timestamp']) * 1000)
+    except (ConnectionError, OSError):
+        pass
+
+
+def slow_reader(client, stop, delay):
+    """Read one packet now and then, far slower than they are published."""
+    try:
+        while not stop.is_set():
+            client.recv()
+            time.sleep(delay)
+    except (ConnectionError, OSError):
+        pass
+
+
+def run(transport, rate, seconds, fast_clients, port):
+    """
+    Publish landmarks at a fixed rate plus an event every tenth frame.
+    
+    Returns:
+        Dictionary of results
+    """
+    unix_path = os.path.join(tempfile.gettempdir(), f"gm_events_bench_{os.getpid()}.sock")
+    server = EventServer(transport=transport, port=port, unix_path=unix_path)
+    server.start()
+    
+    stop = threading.Event()
+    clients, threads, latencies = [], [], []
+    for _ in range(fast_clients):
+        client = EventClient(transport, port=port, unix_path=unix_path)
+        samples = []
+        latencies.append(samples)
+        clients.append(client)
+        threads.append(threading.Thread(target=fast_reader, args=(client, samples, stop), daemon=True))
+    slow = EventClient(transport, port=port, unix_path=unix_path)
+    # A small receive window makes the slow client push back on the server quickly
+    slow.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    clients.append(slow)
+    threads.append(threading.Thread(target=slow_reader, args=(slow, stop, 0.5), daemon=True))
+    for thread in threads:
+        thread.start()
+    while server.client_count < len(clients):
+        time.sleep(0.01)
+    
+    hands = [np.random.rand(21, 3).astype(np.float32)]
+    publish_us = []
+    interval = 1.0 / rate
+    next_frame = time.perf_counter()
+    frames = int(rate * seconds)
+    for i in range(frames):
+        start = time.perf_counter()
+        server.publish_landmarks(hands)
+        if i % 10 == 0:
+            server.publish_event('palm_open', value=i)
+        publish_us.append((time.perf_counter() - start) * 1e6)
+        next_frame += interval
+        time.sleep(max(0.0, next_frame - time.perf_counter()))
+    
+    time.sleep(0.2)
+    stats = server.stats()
+    stop.set()
+    server.stop()
+    for client in clients:
+        client.close()
+    
+    received = [len(samples) for samples in latencies]
+    all_latencies = [value for samples in latencies for value in samples]
+    slow_stats = stats[-1] if stats else {}
+    return {
+        'publish_p50': percentile(publish_us, 50),
+        'publish_p99': percentile(publish_us, 99),
+        'latency_p50': percentile(all_latencies, 50),
+        'latency_p99': percentile(all_latencies, 99),
+        'delivered': min(received) / (frames + frames // 10) if received else 0.0,
+        'slow_dropped': slow_stats.get('dropped_events', 0),
+        'slow_coalesced': slow_stats.get('coalesced_landmarks', 0),
+    }
+
+
+def main():
+    """
+    Entry point for the benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Event stream benchmark")
+    parser.add_argument('--rate', type=float, default=120.0, help="Frames published per second")
+    parser.add_argument('--seconds', type=float, default=3.0, help="Duration of each run")
+    parser.add_argument('--clients', type=int, default=3, help="Clients reading at full speed")
+    parser.add_argument('--port', type=int, default=50798, help="TCP port for the runs")
+    args = parser.parse_args()
+    
+    transports = ['tcp'] + (['unix'] if hasattr(os, 'fork') else [])
+    print(f"{args.clients} fast clients + 1 slow client, {args.rate:.0f} frames/s")
+    print(f"{'transport':<10}{'publish us p50/p99':>20}{'latency ms p50/p99':>20}"
+          f"{'delivered':>11}{'slow: dropped/coalesced':>26}")
+    for transport in transports:
+        result = run(transport, args.rate, args.seconds, args.clients, args.port)
+        print(f"{transport:<10}"
+              f"{result['publish_p50']:>9.1f} / {result['publish_p99']:<8.1f}"
+              f"{result['latency_p50']:>9.2f} / {result['latency_p99']:<8.2f}"
+              f"{result['delivered']:>10.0%}"
+              f"{result['slow_dropped']:>13} / {result['slow_coalesced']:<10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Frame Transport Benchmark
+Compares moving BGR frames between processes through a shared-memory
+FrameRing against pickling them through a multiprocessing Pipe.
+
+Run with: python benchmarks/frame_transport_bench.py
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import sys
+import time
+from multiprocessing import resource_tracker
+
+import numpy as np
+
+# Add parent directory to path to import utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.frame_transport import FrameRing
+
+
+RESOLUTIONS = {'720p': (1280, 720), '1080p': (1920, 1080)}
+
+
+def pipe_writer(conn, width, height, frames):
+    """Send frames by pickling them through the pipe, waiting for an ack each time."""
+    img = np.random.randint(0, 255, (height, width, 3), np.uint8)
+    for _ in range(frames):
+        conn.send(img)
+        conn.recv()
+    conn.send(None)
+
+
+def ring_writer(conn, name, frames):
+    """Publish frames to the ring and send only the sequence number."""
+    ring = FrameRing(name)
+    img = np.random.randint(0, 255, (ring.height, ring.width, 3), np.uint8)
+    hand = np.random.rand(21, 3).astype(np.float32)
+    for _ in range(frames):
+        seq = ring.write(img, [hand])
+        conn.send(seq)
+        conn.recv()
+    conn.send(None)
+    ring.shm.close()
+
+
+def bench_pipe(width, height, frames):
+    """
+    Measure pickled pipe transport.
+    
+    Returns:
+        Frames per second
+    """
+    parent, child = mp.Pipe()
+    proc = mp.Process(target=pipe_writer, args=(child, width, height, frames))
+    proc.start()
+    start = time.perf_counter()
+    while True:
+        img = parent.recv()
+        if img is None:
+            break
+        img[0, 0, 0]
+        parent.send(True)
+    elapsed = time.perf_counter() - start
+    proc.join()
+    return frames / elapsed
+
+
+def bench_ring(width, height, frames, copy):
+    """
+    Measure shared-memory ring transport.
+    
+    Args:
+        copy: Copy each frame out of the ring instead of using the zero-copy view
+    
+    Returns:
+        Frames per second
+    """
+    name = f"gm_bench_{os.getpid()}"
+    ring = FrameRing(name, width, height, create=True)
+    out = np.empty((height, width, 3), np.uint8)
+    parent, child = mp.Pipe()
+    proc = mp.Process(target=ring_writer, args=(child, name, frames))
+    proc.start()
+    start = time.perf_counter()
+    while True:
+        seq = parent.recv()
+        if seq is None:
+            break
+        if copy:
+            ring.read(seq, out=out)
+        else:
+            view = ring.get(seq)
+            view.image[0, 0, 0]
+            view.is_valid()
+            view = None
+        parent.send(True)
+    elapsed = time.perf_counter() - start
+    proc.join()
+    # The forked writer shares our resource tracker and unregistered the block on attach
+    resource_tracker.register(ring.shm._name, 'shared_memory')
+    ring.close()
+    return frames / elapsed
+
+
+def main():
+    """
+    Entry point for the benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Frame transport benchmark")
+    parser.add_argument('--frames', type=int, default=300, help="Frames per run")
+    args = parser.parse_args()
+    
+    print(f"{'resolution':<12}{'transport':<22}{'fps':>10}{'MB/s':>10}")
+    for label, (width, height) in RESOLUTIONS.items():
+        frame_mb = width * height * 3 / 1e6
+        results = [
+            ('pipe + pickle', bench_pipe(width, height, args.frames)),
+            ('shm ring (view)', bench_ring(width, height, args.frames, copy=False)),
+            ('shm ring (copy)', bench_ring(width, height, args.frames, copy=True)),
+        ]
+        for name, fps in results:
+            print(f"{label:<12}{name:<22}{fps:>10.0f}{fps * frame_mb:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Landmark Renderer Benchmark
+Measures the per-frame cost of drawing hand skeletons with the batched
+LandmarkRenderer at each detail level, against one OpenCV call per bone and
+joint and, where this Mediapipe build still has it, mp.solutions drawing_utils.
+
+Run with: python benchmarks/landmark_renderer_bench.py
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+# Add parent directory to path to import utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.landmark_renderer import DETAIL_LEVELS, HAND_CONNECTIONS, LandmarkRenderer
+
+
+RESOLUTIONS = {'480p': (640, 480), '720p': (1280, 720)}
+
+# An open right hand, normalized, about a quarter of the frame tall
+OPEN_HAND = np.array([
+    (0.50, 0.80), (0.45, 0.76), (0.41, 0.70), (0.38, 0.65), (0.35, 0.61),
+    (0.46, 0.64), (0.45, 0.58), (0.44, 0.55), (0.43, 0.52),
+    (0.50, 0.63), (0.50, 0.57), (0.50, 0.53), (0.50, 0.50),
+    (0.54, 0.64), (0.55, 0.58), (0.55, 0.55), (0.56, 0.52),
+    (0.57, 0.66), (0.59, 0.62), (0.60, 0.59), (0.61, 0.57),
+], np.float32)
+
+
+def make_hands(count):
+    """Open hands side by side, as (21, 3) landmark arrays."""
+    hands = []
+    for i in range(count):
+        landmarks = np.zeros((21, 3), np.float32)
+        landmarks[:, :2] = OPEN_HAND + (0.25 * i - 0.125 * (count - 1), 0.0)
+        hands.append(landmarks)
+    return hands
+
+
+def draw_per_call(img, hands):
+    """One cv2.line per bone and one cv2.circle per joint, as before the renderer."""
+    h, w = img.shape[:2]
+    for landmarks in hands:
+        points = [(int(x * w), int(y * h)) for x, y, _ in landmarks]
+        for start, end in HAND_CONNECTIONS:
+            cv2.line(img, points[start], points[end], (224, 224, 224), 2)
+        for point in points:
+            cv2.circle(img, point, 4, (0, 0, 255), cv2.FILLED)
+
+
+def mediapipe_drawer(hands):
+    """
+    mp.solutions drawing_utils on protobuf landmarks, or None if unavailable.
+    
+    The protobufs are built once, as the legacy solution returned them.
+    """
+    try:
+        import mediapipe as mp
+        from mediapipe.framework.formats import landmark_pb2
+        drawing = mp.solutions.drawing_utils
+        connections = mp.solutions.hands.HAND_CONNECTIONS
+    except (ImportError, AttributeError):
+        return None
+    
+    protos = []
+    for landmarks in hands:
+        proto = landmark_pb2.NormalizedLandmarkList()
+        for x, y, z in landmarks:
+            proto.landmark.add(x=float(x), y=float(y), z=float(z))
+        protos.append(proto)
+    
+    def draw(img, _):
+        for proto in protos:
+            drawing.draw_landmarks(img, proto, connections)
+    return draw
+
+
+def bench(draw, img, hands, frames):
+    """Average microseconds per frame of one drawer."""
+    for _ in range(min(frames, 50)):
+        draw(img, hands)
+    start = time.perf_counter()
+    for _ in range(frames):
+        draw(img, hands)
+    return (time.perf_counter() - start) / frames * 1e6
+
+
+def main():
+    """
+    Entry point for the benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Landmark renderer benchmark")
+    parser.add_argument('--frames', type=int, default=2000, help="Frames per measurement")
+    parser.add_argument('--hands', type=int, nargs='+', default=[1, 2], help="Hand counts to test")
+    args = parser.parse_args()
+    
+    print(f"{'resolution':<12}{'hands':>6}  {'drawer':<24}{'us/frame':>10}{'of 33 ms':>10}")
+    for label, (width, height) in RESOLUTIONS.items():
+        img = np.zeros((height, width, 3), np.uint8)
+        for count in args.hands:
+            hands = make_hands(count)
+            drawers = [('per-call cv2 (old)', draw_per_call)]
+            mp_draw = mediapipe_drawer(hands)
+            if mp_draw is not None:
+                drawers.append(('mp drawing_utils', mp_draw))
+            for detail in DETAIL_LEVELS:
+                renderer = LandmarkRenderer(detail)
+                drawers.append((f"renderer '{detail}'", lambda img, hands, r=renderer: r.draw(img, hands)))
+            
+            for name, draw in drawers:
+                us = bench(draw, img, hands, args.frames)
+                print(f"{label:<12}{count:>6}  {name:<24}{us:>10.1f}{us / 33333:>10.2%}")
+
+
+if __name__ == "__main__":
+    main()
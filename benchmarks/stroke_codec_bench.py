@@ -0,0 +1,143 @@
+"""
+Stroke Codec Benchmark
+Compresses recorded stroke logs with the stroke codec at several
+simplification tolerances and reports the compression ratio against the
+JSON log and a PNG of the final drawing, encode and decode throughput, the
+cost of re-rasterizing the session and how far the replayed drawing strays
+from the original.
+
+Without arguments a scripted handwriting session is recorded first.
+
+Run with: python benchmarks/stroke_codec_bench.py [recordings/*.jsonl ...]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+# Add parent directory to path to import utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.canvas_tools import ToolEngine, apply_op
+from utils.recorder import load_stroke_log
+from utils.stroke_codec import StrokeLogWriter, read_stroke_file
+
+
+def record_session(path, minutes, fps=30, width=1280, height=720, seed=0):
+    """
+    Record a scripted handwriting session as a JSON stroke log.
+    
+    Strokes of one to two seconds wander in loops across the board, with
+    fingertip jitter, pauses between strokes and the odd color change or erase.
+    """
+    rng = np.random.default_rng(seed)
+    tools = ToolEngine(width, height)
+    file = open(path, 'w', encoding='utf-8')
+    file.write(json.dumps({'type': 'header', 'width': width, 'height': height}) + '\n')
+    clock = {'t': 0.0}
+    
+    def record(op):
+        entry = {'type': 'op', 't': round(clock['t'], 4)}
+        entry.update(op.to_dict())
+        file.write(json.dumps(entry) + '\n')
+    tools.listeners.append(record)
+    
+    frame = 0
+    while frame < minutes * 60 * fps:
+        tools.tool = 'eraser' if rng.random() < 0.05 else 'brush'
+        if rng.random() < 0.1:
+            tools.color = tuple(int(c) for c in rng.integers(0, 256, 3))
+        x, y = rng.uniform(0.15, 0.85) * width, rng.uniform(0.2, 0.8) * height
+        loops, size = rng.uniform(2, 5), rng.uniform(20, 60)
+        length = int(rng.uniform(1.0, 2.0) * fps)
+        for i in range(length):
+            clock['t'] = frame / fps
+            phase = i / length * loops * 2 * np.pi
+            point = (x + i * 4 + size * np.cos(phase) + rng.normal(0, 0.7),
+                     y + size * 0.8 * np.sin(1.5 * phase) + rng.normal(0, 0.7))
+            tools.move(point, clock['t'])
+            frame += 1
+        tools.lift()
+        frame += int(rng.uniform(0.3, 1.0) * fps)
+    file.close()
+
+
+def replay(ops, width, height):
+    """Rasterize operations onto an empty board; returns (mask, canvas, milliseconds)."""
+    canvas = np.zeros((height, width, 3), np.uint8)
+    mask = np.zeros((height, width), np.uint8)
+    start = time.perf_counter()
+    for op in ops:
+        apply_op(canvas, mask, op)
+    return mask, canvas, (time.perf_counter() - start) * 1000
+
+
+def bench_log(log_path, tolerances, work_dir):
+    """Print one table of results for a stroke log."""
+    header, times, ops = load_stroke_log(log_path)
+    width, height = header['width'], header['height']
+    reference, canvas, raster_ms = replay(ops, width, height)
+    json_size = os.path.getsize(log_path)
+    png_size = len(cv2.imencode('.png', canvas)[1])
+    points = sum(len(op.points) for op in ops)
+    duration = times[-1] if times else 0.0
+    
+    print(f"{os.path.basename(log_path)}: {len(ops)} operations, {points} points, "
+          f"{duration:.0f} s of drawing")
+    print(f"  JSON log {json_size / 1024:.1f} kB, final PNG {png_size / 1024:.1f} kB, "
+          f"re-rasterize {raster_ms:.0f} ms")
+    print(f"  {'tolerance':>9}{'points':>9}{'kB':>9}{'vs JSON':>9}{'vs PNG':>8}"
+          f"{'encode ops/s':>14}{'decode ops/s':>14}{'raster ms':>11}{'px off':>9}")
+    for tolerance in tolerances:
+        path = os.path.join(work_dir, f"bench_{tolerance}.strokes")
+        start = time.perf_counter()
+        writer = StrokeLogWriter(path, header, tolerance)
+        for op, timestamp in zip(ops, times):
+            writer.write(op, timestamp)
+        writer.close()
+        encode = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        _, _, decoded = read_stroke_file(path)
+        decode = time.perf_counter() - start
+        mask, _, replay_ms = replay(decoded, width, height)
+        
+        # Pixels whose ink coverage moved by more than a quarter
+        off = int((np.abs(mask.astype(np.int16) - reference) > 64).sum())
+        inked = max(1, int((reference > 0).sum()))
+        size = writer.bytes_written
+        print(f"  {tolerance:>9.2f}{writer.points_out / max(1, points):>9.0%}{size / 1024:>9.1f}"
+              f"{json_size / size:>8.0f}x{png_size / size:>7.1f}x"
+              f"{len(ops) / encode:>14,.0f}{len(ops) / decode:>14,.0f}{replay_ms:>11.0f}"
+              f"{off / inked:>9.2%}")
+
+
+def main():
+    """
+    Entry point for the benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Stroke codec benchmark")
+    parser.add_argument('logs', nargs='*', help="Recorded stroke logs (.jsonl or .strokes)")
+    parser.add_argument('--tolerances', type=float, nargs='+', default=[0.0, 0.25, 0.5, 1.0],
+                        help="Simplification tolerances in pixels")
+    parser.add_argument('--minutes', type=float, default=2.0,
+                        help="Length of the scripted session when no log is given")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as work_dir:
+        logs = args.logs
+        if not logs:
+            path = os.path.join(work_dir, 'scripted_session.jsonl')
+            record_session(path, args.minutes)
+            logs = [path]
+        for log_path in logs:
+            bench_log(log_path, args.tolerances, work_dir)
+
+
+if __name__ == "__main__":
+    main()
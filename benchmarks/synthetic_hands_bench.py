@@ -0,0 +1,195 @@
+"""
+Synthetic Hands Benchmark
+Drives the gesture and drawing pipelines with synthetic hand landmarks as fast
+as they can take them, and scores the recognizer against the script's
+ground truth.
+
+For each noise / dropout condition a random script is played through
+HandDetector on the 'synthetic' backend, then find_position, fingers_up and
+GestureRecognizer.recognize_gesture, the way the Music Controller calls them,
+with the recognizer's cooldowns on the script's clock. Reported per gesture:
+how many script steps it fired in, and the median delay to the first firing;
+per condition: frames per second and gestures fired that the script did not
+call for. The Air Canvas drawing path (fingers_up to ToolEngine.move) is
+timed on the same frames.
+
+Run with: python benchmarks/synthetic_hands_bench.py [--steps 300]
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import defaultdict
+
+import numpy as np
+
+# Add parent directory to path to import utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.canvas_tools import ToolEngine
+from utils.detector_backends import SyntheticBackend
+from utils.gesture_recognizer import GestureRecognizer
+from utils.hand_detector import HandDetector
+from utils.synthetic_hands import POSE_GESTURES, SyntheticHands, random_script
+
+# (label, noise, dropout rate)
+CONDITIONS = (
+    ('clean', 0.0, 0.0),
+    ('noise', 0.002, 0.0),
+    ('noise + dropouts', 0.002, 0.03),
+    ('heavy noise', 0.006, 0.03),
+)
+
+
+def bench_generation(script, fps, repeats=3):
+    """Frames per second of SyntheticHands.generate, best of a few runs."""
+    best = float('inf')
+    for seed in range(repeats):
+        hands = SyntheticHands(noise=0.002, dropout_rate=0.03, seed=seed)
+        start = time.perf_counter()
+        batch = hands.generate(script, fps)
+        best = min(best, time.perf_counter() - start)
+    return len(batch) / best
+
+
+def run_recognizer(script, fps, size, noise, dropout_rate, seed):
+    """
+    Play the script through the detector and recognizer.
+    
+    Returns:
+        Tuple (batch, fired, seconds): fired lists (frame, gesture) for every recognized gesture
+    """
+    backend = SyntheticBackend(script, fps, realtime=False, noise=noise,
+                               dropout_rate=dropout_rate, seed=seed)
+    detector = HandDetector(backend='synthetic')
+    detector.backend = backend
+    clock = {'t': 0.0}
+    recognizer = GestureRecognizer(cooldown_time=1.0, aspect=size[0] / size[1],
+                                   clock=lambda: clock['t'])
+    img = np.zeros((size[1], size[0], 3), np.uint8)
+    
+    # The script is generated on the first frame
+    detector.find_hands(img, draw=False)
+    batch = backend.batch
+    backend.frame = 0
+    
+    fired = []
+    start = time.perf_counter()
+    for index in range(len(batch)):
+        clock['t'] = index / fps
+        detector.find_hands(img, draw=False)
+        if len(detector.find_position(img, draw=False)) != 0:
+            fingers = detector.fingers_up()
+            gesture = recognizer.recognize_gesture(fingers, detector.hand_landmarks[0])
+            if gesture:
+                fired.append((index, gesture))
+    return batch, fired, time.perf_counter() - start
+
+
+def score(batch, fired):
+    """
+    Compare fired gestures with the script.
+    
+    Returns:
+        Tuple (per_gesture, unexpected): per_gesture maps a gesture to
+        [steps, steps it fired in, delays in ms]; unexpected counts firings
+        the step did not call for. A step repeating the previous step's
+        gesture is not counted, as it falls in that gesture's cooldown.
+    """
+    owner = np.empty(len(batch), np.intp)
+    for number, (first, end, _) in enumerate(batch.segments):
+        owner[first:end] = number
+    
+    per_gesture = defaultdict(lambda: [0, 0, []])
+    repeats = set()
+    for number, (_, _, motion) in enumerate(batch.segments):
+        if not motion.gesture:
+            continue
+        previous = batch.segments[number - 1][2] if number else None
+        if previous is not None and motion.gesture in (previous.gesture, POSE_GESTURES.get(previous.pose)):
+            repeats.add(number)
+        else:
+            per_gesture[motion.gesture][0] += 1
+    
+    hit = set()
+    unexpected = 0
+    for index, gesture in fired:
+        number = owner[index]
+        first, _, motion = batch.segments[number]
+        if gesture == motion.gesture:
+            if number not in hit and number not in repeats:
+                hit.add(number)
+                per_gesture[gesture][1] += 1
+                per_gesture[gesture][2].append((index - first) / batch.fps * 1000)
+        elif gesture != POSE_GESTURES.get(motion.pose):
+            # Holding palm_open while swiping may still fire palm_open
+            unexpected += 1
+    return per_gesture, unexpected
+
+
+def bench_drawing(batch, size):
+    """
+    Feed the index fingertip of every frame to a ToolEngine like Air Canvas does.
+    
+    Returns:
+        Tuple (frames per second, committed stroke operations)
+    """
+    width, height = size
+    tools = ToolEngine(width, height)
+    ops = []
+    tools.listeners.append(ops.append)
+    detector = HandDetector(backend='synthetic')
+    img = np.zeros((height, width, 3), np.uint8)
+    
+    start = time.perf_counter()
+    for index in range(len(batch)):
+        detector.hand_landmarks = batch.hands(index)
+        landmark_list = detector.find_position(img, draw=False)
+        if len(landmark_list) != 0:
+            fingers = detector.fingers_up()
+            if fingers[1] and not fingers[2]:
+                tools.move((landmark_list[8][1], landmark_list[8][2]), index / batch.fps)
+            else:
+                tools.lift()
+        else:
+            tools.lift()
+    tools.lift()
+    return len(batch) / (time.perf_counter() - start), len(ops)
+
+
+def main():
+    """
+    Entry point for the benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Synthetic hands benchmark")
+    parser.add_argument('--steps', type=int, default=300, help="Script steps per condition")
+    parser.add_argument('--fps', type=float, default=30.0, help="Frame rate of the script")
+    parser.add_argument('--size', type=int, nargs=2, default=[640, 360], metavar=('W', 'H'),
+                        help="Frame size passed through the detector")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    size = tuple(args.size)
+    
+    script = random_script(args.steps, args.seed, size[0] / size[1])
+    print(f"Script: {args.steps} steps at {args.fps:.0f} fps")
+    print(f"  generate: {bench_generation(script, args.fps):,.0f} frames/s")
+    
+    for label, noise, dropout_rate in CONDITIONS:
+        batch, fired, seconds = run_recognizer(script, args.fps, size, noise, dropout_rate, args.seed)
+        per_gesture, unexpected = score(batch, fired)
+        minutes = len(batch) / args.fps / 60
+        draw_fps, ops = bench_drawing(batch, size)
+        print(f"\n{label} (noise {noise}, dropouts {dropout_rate:.0%}): {len(batch)} frames, "
+              f"{minutes:.1f} min of script")
+        print(f"  recognizer pipeline {len(batch) / seconds:,.0f} frames/s, "
+              f"drawing pipeline {draw_fps:,.0f} frames/s ({ops} stroke ops)")
+        print(f"  {'gesture':<20}{'steps':>7}{'fired':>8}{'delay ms p50':>14}")
+        for gesture in sorted(per_gesture):
+            steps, hits, delays = per_gesture[gesture]
+            delay = f"{np.median(delays):.0f}" if delays else '-'
+            print(f"  {gesture:<20}{steps:>7}{hits / steps:>8.0%}{delay:>14}")
+        print(f"  unexpected gestures: {unexpected} ({unexpected / minutes:.1f} per minute)")
+
+
+if __name__ == "__main__":
+    main()
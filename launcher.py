@@ -3,11 +3,24 @@ Modern Launcher for Hand Gesture Applications
 Professional UI to select between Air Canvas and Music Controller
 """
 
-import tkinter as tk
-from tkinter import ttk
-import subprocess
 import sys
 import os
+import threading
+
+from utils.startup_profiler import startup_profiler
+if '--profile-startup' in sys.argv:
+    startup_profiler.enable()
+
+import tkinter as tk
+from tkinter import ttk
+
+from utils.config import load_config
+from utils.process_supervisor import ProcessSupervisor
+
+# Names the supervisor knows the processes by
+AIR_CANVAS = "Air Canvas"
+MUSIC_CONTROLLER = "Music Controller"
+DETECTOR_SERVICE = "Detector Service"
 
 
 class ModernLauncher:
@@ -19,7 +32,7 @@ class ModernLauncher:
         """Initialize the launcher."""
         self.root = tk.Tk()
         self.root.title("Hand Gesture Applications Launcher")
-        self.root.geometry("800x600")
+        self.root.geometry("800x660")
         self.root.resizable(False, False)
         
         # Set colors - Modern dark theme
@@ -34,6 +47,26 @@ class ModernLauncher:
         # Get project root directory
         self.project_root = os.path.dirname(os.path.abspath(__file__))
         
+        # Apps and the shared detector service (prewarmed while the UI is shown)
+        # run under a supervisor that samples and restarts them off the UI thread
+        self.config = load_config()
+        launcher = self.config.launcher
+        log_path = (os.path.join(self.project_root, launcher.telemetry_log)
+                    if launcher.telemetry_log else None)
+        self.supervisor = ProcessSupervisor(
+            sample_interval=launcher.sample_interval,
+            max_restarts=launcher.max_restarts,
+            restart_backoff=launcher.restart_backoff,
+            max_backoff=launcher.max_backoff,
+            log_path=log_path,
+            cwd=self.project_root
+        )
+        self.service_lock = threading.Lock()
+        self.status_labels = {}
+        
+        # Forward startup profiling to the apps
+        self.app_flags = ["--profile-startup"] if startup_profiler.enabled else []
+        
         self.create_ui()
         
     def create_ui(self):
@@ -76,7 +109,8 @@ class ModernLauncher:
                 "✓ Multiple colors available"
             ],
             self.launch_air_canvas,
-            column=0
+            column=0,
+            app_name=AIR_CANVAS
         )
         
         # Music Controller Card
@@ -91,13 +125,16 @@ class ModernLauncher:
                 "✓ Works with any music app"
             ],
             self.launch_music_controller,
-            column=1
+            column=1,
+            app_name=MUSIC_CONTROLLER
         )
         
         # Footer
         footer_frame = tk.Frame(self.root, bg=self.bg_color)
         footer_frame.pack(side=tk.BOTTOM, pady=20)
         
+        self.status_labels[DETECTOR_SERVICE] = self.create_status_label(footer_frame, self.bg_color)
+        
         footer_label = tk.Label(
             footer_frame,
             text="Powered by OpenCV & Mediapipe | Press ESC or close window to exit apps",
@@ -107,7 +144,7 @@ class ModernLauncher:
         )
         footer_label.pack()
         
-    def create_app_card(self, parent, title, subtitle, features, command, column):
+    def create_app_card(self, parent, title, subtitle, features, command, column, app_name):
         """
         Create a modern card for each application.
         
@@ -118,6 +155,7 @@ class ModernLauncher:
             features: List of features
             command: Function to call on launch
             column: Grid column position
+            app_name: Supervisor name of the app, for its status line
         """
         # Card Frame
         card = tk.Frame(
@@ -183,6 +221,9 @@ class ModernLauncher:
         )
         launch_btn.pack(pady=(20, 0))
         
+        # Live process status
+        self.status_labels[app_name] = self.create_status_label(content_frame, self.card_color)
+        
         # Hover effects
         def on_enter(e):
             launch_btn.config(bg="#00b8e6")
@@ -193,29 +234,133 @@ class ModernLauncher:
         launch_btn.bind("<Enter>", on_enter)
         launch_btn.bind("<Leave>", on_leave)
         
+    def create_status_label(self, parent, bg):
+        """
+        Create a process status line.
+        
+        Args:
+            parent: Parent frame
+            bg: Background color
+        
+        Returns:
+            The label
+        """
+        label = tk.Label(
+            parent,
+            text="○ Not running",
+            font=("Segoe UI", 9),
+            bg=bg,
+            fg=self.subtitle_color
+        )
+        label.pack(pady=(10, 0))
+        return label
+    
+    def refresh_status(self):
+        """Show the supervisor's latest telemetry on the cards."""
+        for name, label in self.status_labels.items():
+            status = self.supervisor.status(name)
+            state, stats, wait = status if status is not None else ('stopped', None, 0.0)
+            if state == 'running':
+                text = (f"● Running · CPU {stats.cpu_percent:.0f}% · {stats.rss_mb:.0f} MB · "
+                        f"{stats.threads} threads")
+                color = "#50fa7b"
+            elif state == 'restarting':
+                text, color = f"⟳ Crashed, restarting in {wait:.0f}s", "#ffb86c"
+            elif state == 'failed':
+                text, color = "✖ Crashed, not restarting", "#ff5555"
+            else:
+                text, color = "○ Not running", self.subtitle_color
+            if name == DETECTOR_SERVICE:
+                text = f"{name}: {text}"
+            label.config(text=text, fg=color)
+        
+        self.root.after(max(100, int(self.config.launcher.sample_interval * 1000)),
+                        self.refresh_status)
+    
+    def ensure_detector_service(self):
+        """
+        Start the shared detector service if it is not running yet.
+        
+        Returns:
+            Boolean indicating if apps should attach to the service
+        """
+        # Deferred: pulls in OpenCV/NumPy, which the launcher UI itself never needs
+        from utils.detector_service import is_service_running, DEFAULT_PORT
+        
+        with self.service_lock:
+            status = self.supervisor.status(DETECTOR_SERVICE)
+            if status is not None and status[0] in ('running', 'restarting'):
+                return True
+            if is_service_running(DEFAULT_PORT):
+                return True
+            
+            # The service owns the camera; apps attached to it open none
+            if not self.supervisor.launch(
+                    DETECTOR_SERVICE,
+                    [sys.executable, "-m", "utils.detector_service", "--port", str(DEFAULT_PORT)],
+                    camera=self.config.camera.camera_index):
+                return False
+            print("✅ Detector service started")
+            return True
+    
+    def prewarm(self):
+        """
+        Start the detector service in the background while the UI is shown.
+        
+        The service opens the camera and builds the Mediapipe graph right away,
+        so the first LAUNCH only has to attach to it.
+        """
+        threading.Thread(target=self.ensure_detector_service, daemon=True).start()
+    
+    def launch_app(self, name, script):
+        """
+        Launch an application under the supervisor.
+        
+        A second LAUNCH of a running app, or of an app needing a camera that
+        another app holds, is refused.
+        
+        Args:
+            name: Supervisor name of the app
+            script: Path of the app's script relative to the project root
+        """
+        # Launch in a new process attached to the shared detector
+        args = [sys.executable, os.path.join(self.project_root, script)] + self.app_flags
+        camera = self.config.camera.camera_index
+        if self.ensure_detector_service():
+            args.append("--service")
+            camera = None
+        if self.supervisor.launch(name, args, camera=camera):
+            print(f"✅ {name} launched successfully!")
+    
     def launch_air_canvas(self):
         """Launch the Air Canvas application."""
         print("🎨 Launching Air Canvas...")
-        canvas_path = os.path.join(self.project_root, "src", "air_canvas.py")
-        
-        try:
-            # Launch in a new process
-            subprocess.Popen([sys.executable, canvas_path])
-            print("✅ Air Canvas launched successfully!")
-        except Exception as e:
-            print(f"❌ Error launching Air Canvas: {e}")
+        self.launch_app(AIR_CANVAS, os.path.join("src", "air_canvas.py"))
     
     def launch_music_controller(self):
         """Launch the Music Controller application."""
         print("🎵 Launching Music Controller...")
-        controller_path = os.path.join(self.project_root, "src", "music_controller.py")
-        
-        try:
-            # Launch in a new process
-            subprocess.Popen([sys.executable, controller_path])
-            print("✅ Music Controller launched successfully!")
-        except Exception as e:
-            print(f"❌ Error launching Music Controller: {e}")
+        self.launch_app(MUSIC_CONTROLLER, os.path.join("src", "music_controller.py"))
+    
+    def on_close(self):
+        """
+        Close the launcher; apps keep running.
+        
+        Apps launched with --service get their frames from the detector
+        service, so it is not stopped here: it is asked to stop by itself once
+        the last app detaches, right away if none is attached. Only a service
+        that cannot be reached is stopped directly.
+        """
+        with self.service_lock:
+            status = self.supervisor.status(DETECTOR_SERVICE)
+            if status is not None and status[0] in ('running', 'restarting'):
+                from utils.detector_service import request_exit_when_idle, DEFAULT_PORT
+                if request_exit_when_idle(DEFAULT_PORT):
+                    print("Detector service will stop when the last app closes")
+                else:
+                    self.supervisor.stop(DETECTOR_SERVICE, timeout=1.0)
+        self.supervisor.close()
+        self.root.destroy()
     
     def run(self):
         """Run the launcher."""
@@ -232,12 +377,20 @@ class ModernLauncher:
         y = (self.root.winfo_screenheight() // 2) - (height // 2)
         self.root.geometry(f'{width}x{height}+{x}+{y}')
         
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        startup_profiler.mark('launcher UI shown')
+        startup_profiler.report()
+        self.root.after(50, self.prewarm)
+        self.root.after(100, self.refresh_status)
+        
         self.root.mainloop()
 
 
 def main():
     """Entry point for the launcher."""
-    launcher = ModernLauncher()
+    with startup_profiler.stage('launcher UI'):
+        launcher = ModernLauncher()
     launcher.run()
 
 
@@ -3,16 +3,39 @@ Air Canvas - Draw in the air using hand gestures
 Main application file
 """
 
-import cv2
-import numpy as np
 import time
 import os
 from datetime import datetime
 import sys
+import argparse
 
 # Add parent directory to path to import utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.startup_profiler import startup_profiler
+if '--profile-startup' in sys.argv:
+    startup_profiler.enable()
+
+import cv2
+import numpy as np
+
 from utils.hand_detector import HandDetector
+from utils.camera import CameraSource
+from utils.detector_service import ServiceClient, DEFAULT_PORT
+from utils.frame_transport import FrameRing
+from utils.config import AppConfig, ConfigWatcher, load_config, DEFAULT_CONFIG_PATH
+from utils.instrumentation import StageTimer
+from utils.quality_governor import QualityGovernor
+from utils.frame_buffers import FramePool, AllocationTracker
+from utils.sampling_profiler import SamplingProfiler
+from utils.recorder import start_recording
+from utils.presence_gate import apply_presence_config
+from utils.widgets import Button, WidgetLayer
+from utils.canvas_tools import ToolEngine, TOOLS
+from utils.canvas_store import open_canvas_store
+from utils.canvas_sync import open_canvas_sync
+from utils.analog_control import AnalogControl
+from utils.gesture_recognizer import GestureRecognizer
+from utils.calibration import load_calibration, apply_calibration
 
 
 class AirCanvas:
@@ -20,7 +43,9 @@ class AirCanvas:
     Air Canvas application that allows drawing using hand gestures.
     """
     
-    def __init__(self, camera_index=0, canvas_width=1280, canvas_height=720):
+    def __init__(self, camera_index=0, canvas_width=1280, canvas_height=720,
+                 use_service=False, service_port=DEFAULT_PORT, publish_name=None,
+                 config=None, config_path=None, profile=False):
         """
         Initialize the Air Canvas application.
         
@@ -28,29 +53,83 @@ class AirCanvas:
             camera_index: Webcam index (usually 0 for default camera)
             canvas_width: Width of the canvas
             canvas_height: Height of the canvas
+            use_service: Attach to the shared detector service if it is running
+            service_port: Local port of the detector service
+            publish_name: Shared memory name to publish rendered frames to (None = off)
+            config: AppConfig with the remaining settings (defaults if None)
+            config_path: Config file to watch for live changes (None = no reload)
+            profile: Sample the frame loop from the start (toggled with 'f' either way)
         """
         self.camera_index = camera_index
         self.canvas_width = canvas_width
         self.canvas_height = canvas_height
+        self.config = config if config is not None else AppConfig()
+        # Relative paths in the config are resolved against the project root
+        self.project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        detection = self.config.detection
+        performance = self.config.performance
         
-        # Initialize webcam
-        self.cap = cv2.VideoCapture(self.camera_index)
-        self.cap.set(3, self.canvas_width)
-        self.cap.set(4, self.canvas_height)
+        # Attach to the shared detector service, or own the camera and model
+        self.cap = None
+        if use_service:
+            try:
+                with startup_profiler.stage('attach detector service'):
+                    self.cap = ServiceClient(port=service_port, timeout=10.0)
+                self.detector = self.cap.detector
+                print("Attached to detector service")
+            except ConnectionError as e:
+                print(f"{e} - using the local camera instead")
+        
+        if self.cap is None:
+            # Build the hand model in the background while the camera opens
+            self.detector = HandDetector(max_hands=detection.max_hands,
+                                         detection_confidence=detection.detection_confidence,
+                                         tracking_confidence=detection.tracking_confidence,
+                                         background_init=True,
+                                         backend=detection.backend, model_path=detection.model_path,
+                                         num_threads=detection.num_threads)
+            
+            # Skip inference while nobody is in front of the camera
+            apply_presence_config(self.detector, self.config.presence)
+            
+            # Initialize webcam
+            with startup_profiler.stage('open camera'):
+                self.cap = CameraSource(self.camera_index, self.canvas_width, self.canvas_height,
+                                        mirror=performance.mirror_mode,
+                                        threaded=performance.threading_mode == 'threaded')
         
-        # Initialize hand detector
-        self.detector = HandDetector(max_hands=1, detection_confidence=0.8)
+        # How much of the hand skeleton to draw over the feed
+        self.detector.renderer.detail = performance.landmark_detail
         
-        # Drawing settings
-        self.draw_color = (255, 0, 255)  # Default color (Magenta)
-        self.brush_thickness = 15
-        self.eraser_thickness = 50
+        # Canvas, stroke mask and drawing tools; with autosave they live in a
+        # memory-mapped file that brings the last drawing back on restart
+        drawing = self.config.drawing
+        self.canvas_store = open_canvas_store(self.config.files, self.canvas_width,
+                                              self.canvas_height, self.project_root)
+        store = self.canvas_store
+        self.tools = ToolEngine(self.canvas_width, self.canvas_height,
+                                drawing.brush_thickness, drawing.eraser_thickness,
+                                drawing.stroke_smoothing, drawing.fast_stroke_width,
+                                canvas=store.canvas if store is not None else None,
+                                mask=store.mask if store is not None else None)
+        if store is not None:
+            store.attach(self.tools)
+            store.start()
+            if store.recovered and store.ink_bbox is not None:
+                print("Restored the drawing from the last session (CLEAR starts over)")
+        self.tools.color = drawing.default_color  # Default color (Magenta)
+        self.img_canvas = self.tools.canvas
         
-        # Canvas for drawing
-        self.img_canvas = np.zeros((self.canvas_height, self.canvas_width, 3), np.uint8)
+        # Shared board with other Air Canvas stations, as stroke operations
+        self.canvas_sync = open_canvas_sync(self.config.sync, self.tools)
         
-        # Previous position for smooth drawing
-        self.xp, self.yp = 0, 0
+        # Brush size follows the thumb-index pinch distance in sizing mode
+        self.recognizer = GestureRecognizer(aspect=self.canvas_width / self.canvas_height,
+                                            gestures=self.config.gestures)
+        self.calibration = load_calibration(self.config.gestures.calibration_file, self.project_root)
+        apply_calibration(self.calibration, self.recognizer, self.detector)
+        self.brush_size = AnalogControl(input_min=0.25, input_max=1.6, smoothing=0.5,
+                                        min_interval=0.0, min_delta=0.01)
         
         # Color palette
         self.colors = {
@@ -63,18 +142,157 @@ class AirCanvas:
             'white': (255, 255, 255)
         }
         
-        # Header section height
-        self.header_height = 120
+        # Header layout
+        self.apply_ui_config(self.config.ui)
         
         # Create header with color options
+        self.header_widgets = self.build_header_widgets()
         self.header = self.create_header()
         
         # FPS calculation
         self.prev_time = 0
+        self.first_frame_shown = False
+        
+        # Per-stage timing and frame pacing
+        self.timer = StageTimer(enabled=performance.instrumentation or self.config.governor.enabled,
+                                visible=performance.instrumentation)
+        self.frame_interval = 1.0 / performance.target_fps if performance.target_fps > 0 else 0
+        
+        # Reused per-stage image buffers
+        self.buffers = FramePool()
+        self.allocation_tracker = AllocationTracker(enabled=performance.debug_allocations)
+        
+        # Sampling profiler of the frame loop, toggled with 'f'
+        self.profiler = SamplingProfiler(performance.profile_interval, performance.profile_max_overhead,
+                                         performance.profile_directory, 'air_canvas')
+        if profile:
+            self.profiler.start()
+        
+        # Adaptive quality to hold the target FPS (detector settings only when it runs here)
+        self.governor = QualityGovernor(self.detector, performance, self.config.governor,
+                                        (self.canvas_width, self.canvas_height),
+                                        tune_detector=isinstance(self.cap, CameraSource))
+        
+        # Session recording, toggled with 'r'
+        self.recorder = None
+        
+        # Live reload of config.ini
+        self.config_watcher = ConfigWatcher(self.config, config_path) if config_path else None
         
         # Drawing mode
-        self.mode = 'drawing'  # 'drawing' or 'selection'
+        self.mode = 'drawing'  # 'drawing', 'selection' or 'sizing'
+        
+        # When the sizing pose was first seen, and when it was lost while sizing
+        self.sizing_since = None
+        self.sizing_lost = None
+        
+        # Rendered frames and landmarks for other processes (e.g. recorders, mirrors)
+        self.output_frames = None
+        if publish_name:
+            try:
+                self.output_frames = FrameRing(publish_name, self.canvas_width, self.canvas_height,
+                                               create=True)
+                print(f"Publishing frames to shared memory '{publish_name}'")
+            except FileExistsError as e:
+                print(f"Not publishing frames: {e}")
+        
+    def apply_ui_config(self, ui):
+        """
+        Take the header layout from the [UI Settings] section.
+        
+        Args:
+            ui: UIConfig instance
+        """
+        self.header_height = ui.header_height
+        self.button_width = ui.button_width
+        self.button_height = ui.button_height
+        self.button_margin = ui.button_margin
+        self.button_top = ui.button_top
+        self.buttons_start_x = ui.buttons_start_x
+    
+    def apply_config(self, config, changed):
+        """
+        Apply a reloaded configuration without reopening the camera or model.
+        
+        Args:
+            config: New AppConfig
+            changed: Set of changed 'section.key' names
+        """
+        self.config = config
+        performance = config.performance
+        
+        if any(key.startswith('drawing.') for key in changed):
+            if 'drawing.brush_thickness' in changed:
+                self.tools.brush_thickness = config.drawing.brush_thickness
+            self.tools.eraser_thickness = config.drawing.eraser_thickness
+            self.tools.stroke.smoothing = config.drawing.stroke_smoothing
+            self.tools.stroke.min_width_scale = config.drawing.fast_stroke_width
+            if 'drawing.default_color_b' in changed or 'drawing.default_color_g' in changed \
+                    or 'drawing.default_color_r' in changed:
+                self.tools.color = config.drawing.default_color
+        
+        if any(key.startswith('ui.') for key in changed):
+            self.apply_ui_config(config.ui)
+            self.header_widgets = self.build_header_widgets()
+            self.header = self.create_header()
+        
+        self.governor.reconfigure(performance, config.governor)
+        self.detector.renderer.detail = performance.landmark_detail
+        if isinstance(self.cap, CameraSource):
+            self.cap.mirror = performance.mirror_mode
+            self.cap.set_threaded(performance.threading_mode == 'threaded')
+            apply_presence_config(self.detector, config.presence)
+        self.recognizer.configure(config.gestures)
+        if self.canvas_sync is not None:
+            self.canvas_sync.batch_interval = config.sync.batch_interval
+        if 'gestures.calibration_file' in changed:
+            self.calibration = load_calibration(config.gestures.calibration_file, self.project_root)
+        apply_calibration(self.calibration, self.recognizer, self.detector)
+        self.timer.enabled = performance.instrumentation or config.governor.enabled
+        self.timer.visible = performance.instrumentation
+        self.frame_interval = 1.0 / performance.target_fps if performance.target_fps > 0 else 0
+        self.profiler.interval = performance.profile_interval
+        self.profiler.max_overhead = performance.profile_max_overhead
+        self.profiler.directory = performance.profile_directory
+    
+    def build_header_widgets(self):
+        """
+        Lay out the header buttons; rendering and hit testing both use this layout.
+        
+        Returns:
+            WidgetLayer covering the header
+        """
+        widgets = WidgetLayer(self.canvas_width, self.header_height, self.config.ui.button_dwell,
+                              self.config.ui.button_activation)
+        button_width = self.button_width
+        button_height = self.button_height
+        y1 = self.button_top
+        y2 = y1 + button_height
+        
+        # Tool row above the palette
+        tool_y1 = max(5, y1 - button_height - 10)
+        tool_width = button_width * 3 // 4
+        for i, tool in enumerate(TOOLS):
+            x1 = self.buttons_start_x + i * (tool_width + self.button_margin)
+            widgets.add(Button(tool, (x1, tool_y1, x1 + tool_width, y1 - 10), tool.upper(),
+                               lambda tool=tool: self.select_tool(tool), style='action',
+                               active=tool == self.tools.tool))
+        
+        # Modern color palette
+        color_names = ['red', 'green', 'blue', 'yellow', 'magenta', 'cyan']
+        for i, color_name in enumerate(color_names):
+            x1 = self.buttons_start_x + i * (button_width + self.button_margin)
+            widgets.add(Button(color_name, (x1, y1, x1 + button_width, y2),
+                               color_name.upper()[:3],
+                               lambda color_name=color_name: self.select_color(color_name),
+                               color=self.colors[color_name]))
         
+        # Clear button at the right edge
+        clear_x2 = self.canvas_width - 30
+        widgets.add(Button('clear', (clear_x2 - button_width, y1, clear_x2, y2), "CLEAR",
+                           self.clear_canvas, style='action'))
+        return widgets
+    
     def create_header(self):
         """
         Create a modern header with color selection buttons and clear button.
@@ -96,102 +314,109 @@ class AirCanvas:
         cv2.putText(header, "Draw in the air with your hand", (20, 65), 
                     cv2.FONT_HERSHEY_SIMPLEX, 0.5, (180, 180, 180), 1)
         
-        # Modern color palette
-        button_width = 130
-        button_height = 50
-        margin = 15
-        y_offset = 70
-        start_x = 250
+        return self.header_widgets.render(header)
+    
+    def select_color(self, color_name):
+        """
+        Switch the brush color.
         
-        color_names = ['red', 'green', 'blue', 'yellow', 'magenta', 'cyan']
+        Args:
+            color_name: Key in the color palette
+        """
+        self.tools.color = self.colors[color_name]
+        if self.tools.tool == 'eraser':
+            self.select_tool('brush')
+        print(f"Color changed to: {color_name}")
+    
+    def select_tool(self, tool):
+        """
+        Switch the drawing tool and highlight it in the header.
         
-        for i, color_name in enumerate(color_names):
-            x1 = start_x + i * (button_width + margin)
-            x2 = x1 + button_width
-            y1 = y_offset
-            y2 = y1 + button_height
-            
-            # Glass-morphism effect for color buttons
-            overlay = header.copy()
-            cv2.rectangle(overlay, (x1, y1), (x2, y2), self.colors[color_name], -1)
-            cv2.addWeighted(overlay, 0.85, header, 0.15, 0, header)
-            
-            # Modern border with glow
-            border_color = tuple([min(255, c + 80) for c in self.colors[color_name]])
-            cv2.rectangle(header, (x1, y1), (x2, y2), border_color, 3)
-            
-            # Add color name
-            text_color = (255, 255, 255) if color_name not in ['yellow', 'cyan'] else (50, 50, 50)
-            cv2.putText(header, color_name.upper()[:3], (x1 + 40, y1 + 33), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, text_color, 2)
+        Args:
+            tool: Tool name from canvas_tools.TOOLS
+        """
+        self.tools.set_tool(tool)
+        for button in self.header_widgets.buttons:
+            if button.name in TOOLS:
+                button.active = button.name == tool
+        self.header = self.create_header()
+        print(f"Tool changed to: {tool}")
+    
+    def update_sizing(self, fingers, now):
+        """
+        Decide whether sizing mode is on, debouncing its pose.
         
-        # Modern Clear button with gradient
-        clear_x1 = self.canvas_width - button_width - 30
-        clear_x2 = self.canvas_width - 30
-        clear_y1 = y_offset
-        clear_y2 = y_offset + button_height
+        The thumb test of fingers_up flickers, so the selection pose (index and
+        middle up) must not turn into sizing on one frame: the thumb has to be
+        up for sizing_hold seconds to enter sizing mode, and down as long to
+        leave it. Dropping the index or middle finger leaves it at once.
+        
+        Args:
+            fingers: Finger states [Thumb, Index, Middle, Ring, Pinky]
+            now: Current time in seconds
         
-        # Gradient background for clear button
-        for i in range(clear_y2 - clear_y1):
-            alpha = i / (clear_y2 - clear_y1)
-            color_val = int(40 + alpha * 20)
-            cv2.line(header, (clear_x1, clear_y1 + i), (clear_x2, clear_y1 + i), 
-                    (color_val, color_val, color_val), 1)
+        Returns:
+            Boolean indicating if the frame is in sizing mode
+        """
+        hold = self.config.drawing.sizing_hold
+        two_fingers = fingers[1] and fingers[2] and not fingers[3] and not fingers[4]
+        if not two_fingers:
+            self.sizing_since = None
+            self.sizing_lost = None
+            return False
         
-        cv2.rectangle(header, (clear_x1, clear_y1), (clear_x2, clear_y2), (200, 200, 200), 3)
-        cv2.putText(header, "CLEAR", (clear_x1 + 25, clear_y1 + 33), 
-                    cv2.FONT_HERSHEY_DUPLEX, 0.7, (255, 255, 255), 2)
+        if self.mode == 'sizing':
+            if fingers[0]:
+                self.sizing_lost = None
+                return True
+            if self.sizing_lost is None:
+                self.sizing_lost = now
+            if now - self.sizing_lost < hold:
+                return True
+            self.sizing_since = None
+            self.sizing_lost = None
+            return False
         
-        return header
+        if not fingers[0]:
+            self.sizing_since = None
+            return False
+        if self.sizing_since is None:
+            self.sizing_since = now
+        return now - self.sizing_since >= hold
     
-    def check_header_click(self, x, y):
+    def update_brush_size(self, hand):
         """
-        Check if a header button was clicked and update settings accordingly.
+        Set the brush size from the thumb-index pinch distance.
         
         Args:
-            x, y: Click coordinates
+            hand: Normalized (21, 3) landmarks of the tracked hand
         """
-        if y > self.header_height:
+        ratio = self.recognizer.get_pinch_ratio(hand)
+        if ratio is None:
             return
-        
-        button_width = 130
-        button_height = 50
-        margin = 15
-        y_offset = 70
-        start_x = 250
-        
-        # Check color buttons
-        color_names = ['red', 'green', 'blue', 'yellow', 'magenta', 'cyan']
-        for i, color_name in enumerate(color_names):
-            x1 = start_x + i * (button_width + margin)
-            x2 = x1 + button_width
-            y1 = y_offset
-            y2 = y1 + button_height
-            
-            if x1 <= x <= x2 and y1 <= y <= y2:
-                self.draw_color = self.colors[color_name]
-                print(f"Color changed to: {color_name}")
-                return
-        
-        # Check clear button
-        clear_x1 = self.canvas_width - button_width - 30
-        clear_x2 = self.canvas_width - 30
-        if clear_x1 <= x <= clear_x2 and y_offset <= y <= y_offset + button_height:
-            self.img_canvas = np.zeros((self.canvas_height, self.canvas_width, 3), np.uint8)
-            self.xp, self.yp = 0, 0
-            print("Canvas cleared")
+        level = self.brush_size.update(ratio)
+        if level is not None:
+            drawing = self.config.drawing
+            self.tools.brush_thickness = int(round(
+                drawing.min_brush_thickness
+                + level * (drawing.max_brush_thickness - drawing.min_brush_thickness)))
+    
+    def clear_canvas(self):
+        """Erase the drawing, reusing the canvas buffer."""
+        self.tools.clear()
+        print("Canvas cleared")
     
     def save_drawing(self):
         """
         Save the current drawing to a file.
         """
         # Create saved_drawings folder if it doesn't exist
-        save_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'saved_drawings')
+        save_dir = os.path.join(self.project_root, self.config.files.save_directory)
         os.makedirs(save_dir, exist_ok=True)
         
         # Generate filename with timestamp
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"air_canvas_{timestamp}.png"
+        filename = f"air_canvas_{timestamp}.{self.config.files.save_format}"
         filepath = os.path.join(save_dir, filename)
         
         # Save the canvas
@@ -199,6 +424,34 @@ class AirCanvas:
         print(f"Drawing saved as: {filename}")
         return filepath
     
+    def toggle_recording(self):
+        """
+        Start or stop recording the session as set in the [Recording] section.
+        """
+        if self.recorder is None:
+            try:
+                self.recorder = start_recording(self.config.recording, (self.canvas_width, self.canvas_height),
+                                                'air_canvas', self.tools)
+                print(f"Recording to: {self.recorder.path}")
+            except IOError as e:
+                print(f"Could not start recording: {e}")
+        else:
+            self.recorder.stop()
+            self.recorder = None
+    
+    def report_startup(self):
+        """
+        Record startup milestones and print the startup profile once tracking is live.
+        """
+        if not self.first_frame_shown:
+            self.first_frame_shown = True
+            startup_profiler.mark('first frame shown')
+        
+        ready = getattr(self.detector, 'ready', None)
+        if ready is None or (ready.is_set() and self.detector.load_error is None):
+            startup_profiler.mark('first tracked frame')
+            startup_profiler.report()
+    
     def run(self):
         """
         Main application loop.
@@ -209,29 +462,53 @@ class AirCanvas:
         print("\nInstructions:")
         print("  • Index finger UP only → Drawing mode")
         print("  • Index + Middle fingers UP → Selection mode (move cursor)")
-        print("  • Click header buttons to change colors or clear canvas")
+        print("  • Thumb + Index + Middle UP → Sizing mode (pinch to set brush size)")
+        if self.config.ui.button_activation == 'tap':
+            print("  • Point the selection cursor at a header button and push the index finger "
+                  "towards the camera to pick a tool, change colors or clear canvas")
+        else:
+            print("  • Rest the selection cursor on a header button to pick a tool, change colors or clear canvas")
+        print("  • Line/Rect/Circle tools: draw to stretch the shape, lower the finger to place it")
         print("  • Press 's' to save your drawing")
+        print("  • Press 'r' to start/stop recording the session")
+        print("  • Press 'f' to start/stop the sampling profiler")
         print("  • Press 'q' to quit")
         print("\nStarting application...\n")
         
         while True:
+            frame_start = time.perf_counter()
+            self.timer.begin()
+            self.allocation_tracker.begin_frame()
+            
+            # Apply config.ini changes between frames
+            if self.config_watcher is not None:
+                update = self.config_watcher.poll()
+                if update is not None:
+                    self.apply_config(*update)
+            
             # Read frame from webcam
             success, img = self.cap.read()
             if not success:
                 print("Failed to read from camera")
                 break
             
-            # Flip image for mirror effect
-            img = cv2.flip(img, 1)
-            
-            # Resize to canvas size
-            img = cv2.resize(img, (self.canvas_width, self.canvas_height))
+            # Resize to canvas size (frames arrive mirrored from the source)
+            img = self.buffers.flip_resize(img, (self.canvas_width, self.canvas_height), False, 'resize')
+            self.timer.lap('capture')
             
             # Find hands
-            img = self.detector.find_hands(img, draw=True)
+            img = self.detector.find_hands(img, draw=self.governor.draw_landmarks)
             landmark_list = self.detector.find_position(img, draw=False)
+            self.timer.lap('detect')
+            if self.detector.presence_gate is not None:
+                self.timer.note('gated', f"{self.detector.presence_gate.recent_gated_percent:.0f}%")
             
+            selection_point = (None, None)
+            tapped = False
             if len(landmark_list) != 0:
+                # Depth history is kept in every mode so a tap can start before selecting
+                tapped = self.recognizer.detect_tap(self.detector.hand_landmarks[0])
+                
                 # Get index finger tip position (landmark 8)
                 x1, y1 = landmark_list[8][1], landmark_list[8][2]
                 
@@ -241,57 +518,75 @@ class AirCanvas:
                 # Check which fingers are up
                 fingers = self.detector.fingers_up()
                 
+                # Sizing Mode - Thumb, Index and Middle up, held: pinch sets the brush size
+                if self.update_sizing(fingers, frame_start):
+                    self.mode = 'sizing'
+                    self.tools.lift()
+                    self.update_brush_size(self.detector.hand_landmarks[0])
+                    
+                    # Show the brush at its new size between the two fingertips
+                    thumb_x, thumb_y = landmark_list[4][1], landmark_list[4][2]
+                    center = ((x1 + thumb_x) // 2, (y1 + thumb_y) // 2)
+                    cv2.circle(img, center, max(1, self.tools.brush_thickness // 2), self.tools.color, 2)
+                    cv2.putText(img, f"Size {self.tools.brush_thickness}", (x1 + 20, y1 - 10), 
+                               cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 200, 100), 2)
+                
                 # Selection Mode - Index and Middle fingers up
-                if fingers[1] and fingers[2]:
+                elif fingers[1] and fingers[2]:
                     self.mode = 'selection'
-                    self.xp, self.yp = 0, 0
+                    self.tools.lift()
                     
                     # Draw selection cursor
                     cv2.circle(img, (x1, y1), 15, (0, 255, 0), cv2.FILLED)
                     cv2.putText(img, "Selection Mode", (x1 + 20, y1 - 10), 
                                cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
                     
-                    # Check if clicking on header
-                    self.check_header_click(x1, y1)
+                    # Header buttons are pressed by tapping (or resting) this cursor on them
+                    selection_point = (x1, y1)
                 
                 # Drawing Mode - Only index finger up
                 elif fingers[1] and not fingers[2]:
                     self.mode = 'drawing'
                     
-                    # Draw drawing cursor
-                    cv2.circle(img, (x1, y1), 15, self.draw_color, cv2.FILLED)
+                    # Draw drawing cursor (outlined at the eraser's size)
+                    if self.tools.tool == 'eraser':
+                        cv2.circle(img, (x1, y1), self.tools.eraser_thickness // 2, (255, 255, 255), 2)
+                    else:
+                        cv2.circle(img, (x1, y1), 15, self.tools.color, cv2.FILLED)
                     
                     # Don't draw on header area
                     if y1 > self.header_height:
-                        if self.xp == 0 and self.yp == 0:
-                            self.xp, self.yp = x1, y1
-                        
-                        # Draw line on canvas
-                        cv2.line(img, (self.xp, self.yp), (x1, y1), self.draw_color, self.brush_thickness)
-                        cv2.line(self.img_canvas, (self.xp, self.yp), (x1, y1), self.draw_color, self.brush_thickness)
-                        
-                        self.xp, self.yp = x1, y1
+                        self.tools.move((x1, y1))
                     else:
-                        self.xp, self.yp = 0, 0
+                        self.tools.lift()
                 else:
-                    self.xp, self.yp = 0, 0
+                    self.tools.lift()
+            else:
+                self.tools.lift()
+            
+            # Only the selection cursor can hover buttons
+            self.header_widgets.update(*selection_point, tap=tapped)
+            self.timer.lap('draw')
             
-            # Merge canvas with camera image
-            img_gray = cv2.cvtColor(self.img_canvas, cv2.COLOR_BGR2GRAY)
-            _, img_inv = cv2.threshold(img_gray, 50, 255, cv2.THRESH_BINARY_INV)
-            img_inv = cv2.cvtColor(img_inv, cv2.COLOR_GRAY2BGR)
-            img = cv2.bitwise_and(img, img_inv)
-            img = cv2.bitwise_or(img, self.img_canvas)
+            # Strokes from other stations, then merge canvas with camera image in
+            # place through the stroke mask, plus the rubber-band preview of a shape
+            if self.canvas_sync is not None:
+                self.canvas_sync.apply_remote(self.tools)
+            self.tools.composite(img)
             
             # Add header to the image
             img[0:self.header_height, 0:self.canvas_width] = self.header
+            self.header_widgets.draw_feedback(img)
+            self.timer.lap('composite')
             
-            # Modern status bar at bottom
-            overlay = img.copy()
+            # Modern status bar at bottom (solid when the governor drops UI effects)
             status_bar_height = 50
-            cv2.rectangle(overlay, (0, self.canvas_height - status_bar_height), 
-                         (self.canvas_width, self.canvas_height), (30, 30, 35), -1)
-            cv2.addWeighted(overlay, 0.85, img, 0.15, 0, img)
+            if self.governor.ui_effects:
+                self.buffers.blend_rect(img, (0, self.canvas_height - status_bar_height),
+                                        (self.canvas_width, self.canvas_height), (30, 30, 35), 0.85)
+            else:
+                cv2.rectangle(img, (0, self.canvas_height - status_bar_height), 
+                             (self.canvas_width, self.canvas_height), (30, 30, 35), -1)
             
             # Calculate and display FPS with modern styling
             curr_time = time.time()
@@ -299,27 +594,49 @@ class AirCanvas:
             self.prev_time = curr_time
             
             # FPS indicator
-            cv2.putText(img, f'FPS: {int(fps)}', (15, self.canvas_height - 18), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (100, 255, 100), 2)
+            if self.config.performance.show_fps:
+                cv2.putText(img, f'FPS: {int(fps)}', (15, self.canvas_height - 18), 
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.6, (100, 255, 100), 2)
             
             # Current color indicator
             color_indicator_x = 150
-            cv2.circle(img, (color_indicator_x, self.canvas_height - 25), 15, self.draw_color, -1)
+            cv2.circle(img, (color_indicator_x, self.canvas_height - 25), 15, self.tools.color, -1)
             cv2.circle(img, (color_indicator_x, self.canvas_height - 25), 15, (255, 255, 255), 2)
-            cv2.putText(img, "Current Color", (color_indicator_x + 25, self.canvas_height - 18), 
+            cv2.putText(img, f"{self.tools.tool.capitalize()} | Size {self.tools.current_thickness()}",
+                       (color_indicator_x + 25, self.canvas_height - 18), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1)
             
             # Display mode with modern badge
             mode_x = self.canvas_width - 250
             mode_color = (100, 255, 100) if self.mode == 'drawing' else (255, 200, 100)
-            mode_icon = "[DRAW]" if self.mode == 'drawing' else "[SELECT]"
+            mode_icon = {'drawing': "[DRAW]", 'selection': "[SELECT]", 'sizing': "[SIZE]"}[self.mode]
             mode_text = f"{mode_icon} {self.mode.upper()}"
             cv2.putText(img, mode_text, (mode_x, self.canvas_height - 18), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, mode_color, 2)
             
+            # Hand the composited frame to the recorder, then mark it on screen only
+            if self.recorder is not None:
+                self.recorder.submit(img)
+                self.recorder.draw_stats(img, 20, self.header_height + 30)
+            self.profiler.draw(img, 20, self.header_height + 80)
+            self.detector.draw_status(img, 20, self.header_height + 130)
+            
+            # Per-stage timings below the header
+            self.timer.draw(img, self.canvas_width - 200, self.header_height + 25)
+            self.timer.lap('ui')
+            self.timer.end()
+            self.governor.update(self.timer)
+            self.allocation_tracker.end_frame()
+            
+            # Publish the rendered frame without pickling it
+            if self.output_frames is not None:
+                self.output_frames.write(img, self.detector.hand_landmarks)
+            
             # Show the final image
             try:
                 cv2.imshow("Air Canvas", img)
+                if startup_profiler.enabled and not startup_profiler.reported:
+                    self.report_startup()
                 
                 # Check if window was closed
                 if cv2.getWindowProperty("Air Canvas", cv2.WND_PROP_VISIBLE) < 1:
@@ -329,20 +646,36 @@ class AirCanvas:
                 print("\nWindow closed. Exiting Air Canvas...")
                 break
             
-            # Handle key presses
-            key = cv2.waitKey(1) & 0xFF
+            # Handle key presses, waiting out the rest of the frame budget
+            remaining = self.frame_interval - (time.perf_counter() - frame_start)
+            key = cv2.waitKey(max(1, int(remaining * 1000))) & 0xFF
             if key == ord('q'):
                 print("\nExiting Air Canvas...")
                 break
             elif key == ord('s'):
                 filepath = self.save_drawing()
                 print(f"Saved to: {filepath}")
+            elif key == ord('r'):
+                self.toggle_recording()
+            elif key == ord('f'):
+                self.profiler.toggle()
             elif key == 27:  # ESC key
                 print("\nExiting Air Canvas...")
                 break
         
         # Cleanup
+        self.profiler.stop()
+        if self.recorder is not None:
+            self.recorder.stop()
+        if self.canvas_sync is not None:
+            self.canvas_sync.close()
+        if self.canvas_store is not None:
+            self.canvas_store.close()
         self.cap.release()
+        if self.config_watcher is not None:
+            self.config_watcher.stop()
+        if self.output_frames is not None:
+            self.output_frames.close()
         cv2.destroyAllWindows()
 
 
@@ -350,8 +683,30 @@ def main():
     """
     Entry point for the application.
     """
+    parser = argparse.ArgumentParser(description="Air Canvas - draw in the air")
+    parser.add_argument('--service', action='store_true',
+                        help="Attach to the shared detector service instead of opening the camera")
+    parser.add_argument('--service-port', type=int, default=DEFAULT_PORT,
+                        help="Local port of the detector service")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="Report import and initialization times up to the first frame")
+    parser.add_argument('--profile', action='store_true',
+                        help="Sample the frame loop from the start ('f' stops and reports)")
+    parser.add_argument('--publish-frames', metavar='NAME', default=None,
+                        help="Publish rendered frames to a shared-memory frame ring")
+    parser.add_argument('--config', default=DEFAULT_CONFIG_PATH,
+                        help="Path to the configuration file (reloaded live)")
+    args = parser.parse_args()
+    
+    config = load_config(args.config)
+    
     # Create and run the Air Canvas application
-    app = AirCanvas(camera_index=0, canvas_width=1280, canvas_height=720)
+    app = AirCanvas(camera_index=config.camera.camera_index,
+                    canvas_width=config.camera.canvas_width,
+                    canvas_height=config.camera.canvas_height,
+                    use_service=args.service, service_port=args.service_port,
+                    publish_name=args.publish_frames,
+                    config=config, config_path=args.config, profile=args.profile)
     app.run()
 
 
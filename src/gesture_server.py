@@ -0,0 +1,225 @@
+"""
+Gesture Server
+Headless hand tracking that streams recognized gestures and landmarks to
+other local programs (presentation software, kiosks, ...).
+
+Run with: python src/gesture_server.py
+Watch the stream with: python -m utils.event_stream
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add parent directory to path to import utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.hand_detector import HandDetector, READY_TIMEOUT
+from utils.camera import CameraSource
+from utils.detector_service import ServiceClient, DEFAULT_PORT
+from utils.gesture_recognizer import GestureRecognizer
+from utils.event_stream import EventServer
+from utils.presence_gate import apply_presence_config
+from utils.calibration import load_calibration, apply_calibration
+from utils.config import AppConfig, ConfigWatcher, load_config, DEFAULT_CONFIG_PATH
+
+
+class GestureServer:
+    """
+    Runs HandDetector and GestureRecognizer without a window and publishes the results.
+    """
+    
+    def __init__(self, camera_index=0, width=1280, height=720, use_service=False,
+                 service_port=DEFAULT_PORT, config=None, config_path=None):
+        """
+        Initialize the Gesture Server.
+        
+        Args:
+            camera_index: Webcam index
+            width: Frame width
+            height: Frame height
+            use_service: Attach to the shared detector service if it is running
+            service_port: Local port of the detector service
+            config: AppConfig with the remaining settings (defaults if None)
+            config_path: Config file to watch for live changes (None = no reload)
+        """
+        self.width = width
+        self.height = height
+        self.config = config if config is not None else AppConfig()
+        # Relative paths in the config are resolved against the project root
+        self.project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        detection = self.config.detection
+        performance = self.config.performance
+        events = self.config.events
+        
+        # Attach to the shared detector service, or own the camera and model
+        self.cap = None
+        if use_service:
+            try:
+                self.cap = ServiceClient(port=service_port, timeout=10.0)
+                self.detector = self.cap.detector
+                print("Attached to detector service")
+            except ConnectionError as e:
+                print(f"{e} - using the local camera instead")
+        
+        if self.cap is None:
+            self.detector = HandDetector(max_hands=detection.max_hands,
+                                         detection_confidence=detection.detection_confidence,
+                                         tracking_confidence=detection.tracking_confidence,
+                                         background_init=True,
+                                         backend=detection.backend, model_path=detection.model_path,
+                                         num_threads=detection.num_threads)
+            self.detector.configure(performance.inference_size, performance.frame_skip)
+            apply_presence_config(self.detector, self.config.presence)
+            self.cap = CameraSource(camera_index, width, height, mirror=performance.mirror_mode,
+                                    threaded=performance.threading_mode == 'threaded')
+        
+        self.recognizer = GestureRecognizer(cooldown_time=1.0, aspect=width / height,
+                                            gestures=self.config.gestures)
+        self.calibration = load_calibration(self.config.gestures.calibration_file, self.project_root)
+        apply_calibration(self.calibration, self.recognizer, self.detector)
+        self.events = EventServer(transport=events.transport, host=events.host, port=events.port,
+                                  unix_path=events.unix_path, max_events=events.max_queued_events,
+                                  landmark_fps=events.landmark_fps,
+                                  info={'width': width, 'height': height,
+                                        'landmarks': events.landmarks})
+        self.stream_landmarks = events.landmarks
+        
+        # Live reload of config.ini
+        self.config_watcher = ConfigWatcher(self.config, config_path) if config_path else None
+        
+        # Hand presence, reported as hand_found / hand_lost events
+        self.hand_present = False
+    
+    def apply_config(self, config, changed):
+        """
+        Apply a reloaded configuration.
+        
+        Args:
+            config: New AppConfig
+            changed: Set of changed 'section.key' names
+        """
+        self.config = config
+        events = config.events
+        self.stream_landmarks = events.landmarks
+        self.events.landmark_interval = 1.0 / events.landmark_fps if events.landmark_fps > 0 else 0.0
+        self.events.max_events = events.max_queued_events
+        self.recognizer.configure(config.gestures)
+        if 'gestures.calibration_file' in changed:
+            self.calibration = load_calibration(config.gestures.calibration_file, self.project_root)
+        apply_calibration(self.calibration, self.recognizer, self.detector)
+        if isinstance(self.cap, CameraSource):
+            performance = config.performance
+            self.detector.configure(performance.inference_size, performance.frame_skip)
+            apply_presence_config(self.detector, config.presence)
+            self.cap.set_threaded(performance.threading_mode == 'threaded')
+    
+    def process_frame(self, img, timestamp):
+        """
+        Detect and recognize one frame and publish what was found.
+        
+        Args:
+            img: Camera frame
+            timestamp: Capture time (time.time())
+        """
+        self.detector.find_hands(img, draw=False)
+        landmark_list = self.detector.find_position(img, draw=False)
+        
+        present = len(landmark_list) != 0
+        if present != self.hand_present:
+            self.hand_present = present
+            self.events.publish_event('hand_found' if present else 'hand_lost', timestamp=timestamp)
+        
+        if present:
+            fingers = self.detector.fingers_up()
+            gesture = self.recognizer.recognize_gesture(fingers, self.detector.hand_landmarks[0])
+            if gesture:
+                self.events.publish_event(gesture, timestamp=timestamp)
+        
+        if self.stream_landmarks:
+            self.events.publish_landmarks(self.detector.hand_landmarks, timestamp=timestamp)
+    
+    def run(self):
+        """
+        Main loop; runs until interrupted with Ctrl+C.
+        """
+        self.events.start()
+        frames = 0
+        last_report = time.time()
+        try:
+            if not self.detector.wait_until_ready(READY_TIMEOUT):
+                error = self.detector.load_error or f"not loaded after {READY_TIMEOUT:.0f} s"
+                print(f"Hand tracking unavailable: {error}")
+                return
+            print("Gesture server running. Press Ctrl+C to stop.")
+            
+            while True:
+                if self.config_watcher is not None:
+                    update = self.config_watcher.poll()
+                    if update is not None:
+                        self.apply_config(*update)
+                
+                success, img = self.cap.read()
+                if not success:
+                    print("Failed to read from camera")
+                    break
+                self.process_frame(img, time.time())
+                
+                # Periodic status line
+                frames += 1
+                now = time.time()
+                if now - last_report >= 10.0:
+                    gate = self.detector.presence_gate
+                    gated = f", {gate.gated_percent:.0f}% frames gated" if gate is not None else ""
+                    print(f"{frames / (now - last_report):.1f} FPS{gated}, "
+                          f"{self.events.client_count} client(s) connected")
+                    if gate is not None:
+                        gate.reset_stats()
+                    for stats in self.events.stats():
+                        if stats['dropped_events'] or stats['queued']:
+                            print(f"  client {stats['client']}: {stats['queued']} events queued, "
+                                  f"{stats['dropped_events']} dropped")
+                    frames = 0
+                    last_report = now
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.events.stop()
+            self.cap.release()
+            if self.config_watcher is not None:
+                self.config_watcher.stop()
+            print("Gesture server stopped.")
+
+
+def main():
+    """
+    Entry point for the gesture server.
+    """
+    parser = argparse.ArgumentParser(description="Headless gesture event server")
+    parser.add_argument('--service', action='store_true',
+                        help="Attach to the shared detector service instead of opening the camera")
+    parser.add_argument('--service-port', type=int, default=DEFAULT_PORT,
+                        help="Local port of the detector service")
+    parser.add_argument('--config', default=DEFAULT_CONFIG_PATH,
+                        help="Path to the configuration file (reloaded live)")
+    parser.add_argument('--transport', choices=('tcp', 'unix', 'websocket'), default=None,
+                        help="Override the [Event Stream] transport")
+    parser.add_argument('--port', type=int, default=None, help="Override the [Event Stream] port")
+    args = parser.parse_args()
+    
+    # Command-line values override config.ini
+    config = load_config(args.config)
+    if args.transport is not None:
+        config.events.transport = args.transport
+    if args.port is not None:
+        config.events.port = args.port
+    
+    server = GestureServer(camera_index=config.camera.camera_index,
+                           width=config.camera.canvas_width, height=config.camera.canvas_height,
+                           use_service=args.service, service_port=args.service_port,
+                           config=config, config_path=args.config)
+    server.run()
+
+
+if __name__ == "__main__":
+    main()
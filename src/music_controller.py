@@ -3,20 +3,39 @@ Gesture Music Controller
 Control your music playback with hand gestures!
 """
 
-import cv2
-import numpy as np
 import time
 import sys
 import os
-import pyautogui
-from ctypes import cast, POINTER
-from comtypes import CLSCTX_ALL
-from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
+import argparse
+import queue
+import threading
 
 # Add parent directory to path to import utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.startup_profiler import startup_profiler, lazy_import
+if '--profile-startup' in sys.argv:
+    startup_profiler.enable()
+
+import cv2
+import numpy as np
+
+# Loaded on first use, off the path to the first frame
+pyautogui = lazy_import('pyautogui')
+
 from utils.hand_detector import HandDetector
+from utils.camera import CameraSource
+from utils.detector_service import ServiceClient, DEFAULT_PORT
 from utils.gesture_recognizer import GestureRecognizer
+from utils.analog_control import AnalogControl
+from utils.config import AppConfig, ConfigWatcher, load_config, DEFAULT_CONFIG_PATH
+from utils.instrumentation import StageTimer
+from utils.quality_governor import QualityGovernor
+from utils.frame_buffers import FramePool, AllocationTracker
+from utils.sampling_profiler import SamplingProfiler
+from utils.recorder import start_recording
+from utils.presence_gate import apply_presence_config
+from utils.gesture_bindings import BindingEngine
+from utils.calibration import Calibrator, load_calibration, apply_calibration, describe_profile
 
 
 class MusicController:
@@ -27,7 +46,9 @@ class MusicController:
     # Class variable to track window close
     window_closed = False
     
-    def __init__(self, camera_index=0, screen_width=1280, screen_height=720):
+    def __init__(self, camera_index=0, screen_width=1280, screen_height=720,
+                 use_service=False, service_port=DEFAULT_PORT, config=None, config_path=None,
+                 profile=False):
         """
         Initialize the Music Controller.
         
@@ -35,43 +56,266 @@ class MusicController:
             camera_index: Webcam index
             screen_width: Width of the display
             screen_height: Height of the display
+            use_service: Attach to the shared detector service if it is running
+            service_port: Local port of the detector service
+            config: AppConfig with the remaining settings (defaults if None)
+            config_path: Config file to watch for live changes (None = no reload)
+            profile: Sample the frame loop from the start (toggled with 'f' either way)
         """
         self.camera_index = camera_index
         self.screen_width = screen_width
         self.screen_height = screen_height
+        self.config = config if config is not None else AppConfig()
+        # Relative paths in the config are resolved against the project root
+        self.project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        detection = self.config.detection
+        performance = self.config.performance
+        
+        # Volume and media-key backends are created and used only on the controls
+        # thread, so neither PyAutoGUI's pause nor COM ever touches a frame (see run_controls)
+        self.volume = None
+        self.volume_available = False
+        self.com_initialized = False
+        self.control_queue = queue.Queue()
+        
+        # Slider levels waiting for the controls thread, merged while it is busy
+        self.control_lock = threading.Lock()
+        self.pending_level = None
+        self.pending_base = None
+        self.key_level = None
+        threading.Thread(target=self.run_controls, daemon=True).start()
+        
+        # Attach to the shared detector service, or own the camera and model
+        self.cap = None
+        if use_service:
+            try:
+                with startup_profiler.stage('attach detector service'):
+                    self.cap = ServiceClient(port=service_port, timeout=10.0)
+                self.detector = self.cap.detector
+                print("Attached to detector service")
+            except ConnectionError as e:
+                print(f"{e} - using the local camera instead")
+        
+        if self.cap is None:
+            # Build the hand model in the background while the camera opens
+            self.detector = HandDetector(max_hands=detection.max_hands,
+                                         detection_confidence=detection.detection_confidence,
+                                         tracking_confidence=detection.tracking_confidence,
+                                         background_init=True,
+                                         backend=detection.backend, model_path=detection.model_path,
+                                         num_threads=detection.num_threads)
+            
+            # Skip inference while nobody is in front of the camera
+            apply_presence_config(self.detector, self.config.presence)
+            
+            # Initialize webcam
+            with startup_profiler.stage('open camera'):
+                self.cap = CameraSource(self.camera_index, self.screen_width, self.screen_height,
+                                        mirror=performance.mirror_mode,
+                                        threaded=performance.threading_mode == 'threaded')
         
-        # Initialize webcam
-        self.cap = cv2.VideoCapture(self.camera_index)
-        self.cap.set(3, self.screen_width)
-        self.cap.set(4, self.screen_height)
-        
-        # Initialize hand detector
-        self.detector = HandDetector(max_hands=1, detection_confidence=0.8)
+        # How much of the hand skeleton to draw over the feed
+        self.detector.renderer.detail = performance.landmark_detail
         
         # Initialize gesture recognizer
-        self.recognizer = GestureRecognizer(cooldown_time=1.5)
+        self.recognizer = GestureRecognizer(cooldown_time=1.5,
+                                            aspect=self.screen_width / self.screen_height,
+                                            gestures=self.config.gestures)
         
-        # Initialize Windows volume control
-        try:
-            devices = AudioUtilities.GetSpeakers()
-            interface = devices.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
-            self.volume = cast(interface, POINTER(IAudioEndpointVolume))
-            self.volume_available = True
-        except:
-            print("Warning: Could not access system volume control")
-            self.volume_available = False
+        # Per-user thresholds learned by calibration ('c' recalibrates)
+        self.calibration = load_calibration(self.config.gestures.calibration_file, self.project_root)
+        apply_calibration(self.calibration, self.recognizer, self.detector)
+        self.calibrator = Calibrator(aspect=self.screen_width / self.screen_height,
+                                     max_cooldown=self.recognizer.cooldown_time)
+        
+        # Gesture -> action profiles from config.ini ('p' switches)
+        self.bindings = self.build_bindings(self.config)
         
         # FPS calculation
         self.prev_time = 0
+        self.first_frame_shown = False
+        
+        # Per-stage timing and frame pacing
+        self.timer = StageTimer(enabled=performance.instrumentation or self.config.governor.enabled,
+                                visible=performance.instrumentation)
+        self.frame_interval = 1.0 / performance.target_fps if performance.target_fps > 0 else 0
+        
+        # Reused per-stage image buffers
+        self.buffers = FramePool()
+        self.allocation_tracker = AllocationTracker(enabled=performance.debug_allocations)
+        
+        # Sampling profiler of the frame loop, toggled with 'f'
+        self.profiler = SamplingProfiler(performance.profile_interval, performance.profile_max_overhead,
+                                         performance.profile_directory, 'music_controller')
+        if profile:
+            self.profiler.start()
+        
+        # Adaptive quality to hold the target FPS (detector settings only when it runs here)
+        self.governor = QualityGovernor(self.detector, performance, self.config.governor,
+                                        (self.screen_width, self.screen_height),
+                                        tune_detector=isinstance(self.cap, CameraSource))
+        
+        # Session recording, toggled with 'r'
+        self.recorder = None
+        
+        # Live reload of config.ini
+        self.config_watcher = ConfigWatcher(self.config, config_path) if config_path else None
         
         # Current gesture display
         self.current_gesture = None
         self.gesture_display_time = 0
         self.gesture_display_duration = 2.0  # seconds
         
-        # PyAutoGUI settings
-        pyautogui.PAUSE = 0.1
+        # Continuous volume control from thumb-index pinch distance
+        self.analog_mode = True
+        self.analog_active = False
+        self.analog_level = None
+        self.analog_volume = AnalogControl(input_min=0.25, input_max=1.6, smoothing=0.5,
+                                           min_interval=0.05, min_delta=0.02)
+        
+    def apply_config(self, config, changed):
+        """
+        Apply a reloaded configuration without reopening the camera or model.
         
+        Args:
+            config: New AppConfig
+            changed: Set of changed 'section.key' names
+        """
+        self.config = config
+        performance = config.performance
+        
+        self.governor.reconfigure(performance, config.governor)
+        self.detector.renderer.detail = performance.landmark_detail
+        if isinstance(self.cap, CameraSource):
+            self.cap.mirror = performance.mirror_mode
+            self.cap.set_threaded(performance.threading_mode == 'threaded')
+            apply_presence_config(self.detector, config.presence)
+        self.recognizer.configure(config.gestures)
+        if 'gestures.calibration_file' in changed:
+            self.calibration = load_calibration(config.gestures.calibration_file, self.project_root)
+        apply_calibration(self.calibration, self.recognizer, self.detector)
+        self.timer.enabled = performance.instrumentation or config.governor.enabled
+        self.timer.visible = performance.instrumentation
+        self.frame_interval = 1.0 / performance.target_fps if performance.target_fps > 0 else 0
+        
+        # Recompile the bindings, staying on the same profile if it still exists
+        if any(key.startswith(('profiles.', 'bindings.')) for key in changed):
+            active = self.bindings.profile.name
+            self.bindings = self.build_bindings(config)
+            self.bindings.switch_profile(active)
+        self.profiler.interval = performance.profile_interval
+        self.profiler.max_overhead = performance.profile_max_overhead
+        self.profiler.directory = performance.profile_directory
+    
+    def build_bindings(self, config):
+        """
+        Compile the gesture binding profiles listed for this app.
+        
+        Args:
+            config: AppConfig with the [Gesture Bindings] section and profiles
+        
+        Returns:
+            BindingEngine
+        """
+        actions = {
+            'play_pause': ("Play/Pause", lambda: self.control_playback('play_pause')),
+            'next_track': ("Next Track", lambda: self.control_playback('next')),
+            'previous_track': ("Previous", lambda: self.control_playback('previous')),
+            'volume_up': ("Vol +", lambda: self.adjust_volume('up')),
+            'volume_down': ("Vol -", lambda: self.adjust_volume('down')),
+            'volume_fine_up': ("Vol + (fine)", lambda: self.adjust_volume('fine_up')),
+            'volume_fine_down': ("Vol - (fine)", lambda: self.adjust_volume('fine_down')),
+            'mute': ("Mute", lambda: self.adjust_volume('mute')),
+        }
+        return BindingEngine(actions, config.profiles,
+                             profile_names=config.bindings.profile_names('music_controller'),
+                             sequence_timeout=config.bindings.sequence_timeout,
+                             key_action=self.key_action, on_match=self.show_binding)
+    
+    def key_action(self, key):
+        """
+        Action pressing a key, for 'key:<name>' bindings.
+        
+        Args:
+            key: PyAutoGUI key name
+        
+        Returns:
+            Tuple (label, callback)
+        """
+        def press():
+            self.press_key(key)
+            print(f"⌨️ Key: {key}")
+        return f"Key {key.upper()}", press
+    
+    def show_binding(self, binding):
+        """Show the gestures of a binding that just fired."""
+        self.current_gesture = ' > '.join(binding.pattern)
+        self.gesture_display_time = time.time()
+    
+    def init_controls(self):
+        """
+        Load PyAutoGUI and the Windows volume control (controls thread).
+        
+        Both imports are slow and are not needed until the first gesture. The
+        volume interface is a COM object, which belongs to the apartment of
+        the thread that created it, so it is created here after initializing
+        COM and only ever used from this thread.
+        """
+        with startup_profiler.stage('media keys + volume (bg)'):
+            # PyAutoGUI settings
+            pyautogui.PAUSE = 0.1
+            
+            # Initialize Windows volume control
+            try:
+                from ctypes import cast, POINTER
+                import comtypes
+                from comtypes import CLSCTX_ALL
+                from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
+                
+                comtypes.CoInitialize()
+                self.com_initialized = True
+                devices = AudioUtilities.GetSpeakers()
+                interface = devices.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
+                self.volume = cast(interface, POINTER(IAudioEndpointVolume))
+                self.volume_available = True
+            except:
+                print("Warning: Could not access system volume control")
+                self.volume_available = False
+    
+    def run_controls(self):
+        """
+        Controls thread: load the backends, then run queued actions in order.
+        
+        Key presses block for PyAutoGUI's pause (0.1 s) and the volume
+        interface may only be used from the thread that created it, so every
+        media key and volume change is queued here instead of being sent from
+        the frame loop.
+        """
+        self.init_controls()
+        while True:
+            action = self.control_queue.get()
+            if action is None:
+                break
+            try:
+                action()
+            except Exception as e:
+                print(f"Control error: {e}")
+        
+        # Release the COM interface on its own thread
+        self.volume = None
+        if self.com_initialized:
+            import comtypes
+            comtypes.CoUninitialize()
+    
+    def press_key(self, key):
+        """
+        Queue a key press for the controls thread.
+        
+        Args:
+            key: PyAutoGUI key name
+        """
+        self.control_queue.put(lambda: pyautogui.press(key))
+    
     def control_playback(self, action):
         """
         Control music playback using keyboard shortcuts.
@@ -80,18 +324,27 @@ class MusicController:
             action: 'play_pause', 'next', 'previous'
         """
         if action == 'play_pause':
-            pyautogui.press('playpause')
+            self.press_key('playpause')
             print("🎵 Play/Pause")
         elif action == 'next':
-            pyautogui.press('nexttrack')
+            self.press_key('nexttrack')
             print("⏭️ Next Track")
         elif action == 'previous':
-            pyautogui.press('prevtrack')
+            self.press_key('prevtrack')
             print("⏮️ Previous Track")
     
     def adjust_volume(self, action):
         """
-        Adjust system volume.
+        Adjust system volume on the controls thread.
+        
+        Args:
+            action: 'up', 'down', 'mute', 'fine_up', 'fine_down'
+        """
+        self.control_queue.put(lambda: self.apply_volume_action(action))
+    
+    def apply_volume_action(self, action):
+        """
+        Adjust system volume (controls thread).
         
         Args:
             action: 'up', 'down', 'mute', 'fine_up', 'fine_down'
@@ -135,6 +388,92 @@ class MusicController:
         except Exception as e:
             print(f"Volume control error: {e}")
     
+    def set_volume_level(self, level, previous_level=None):
+        """
+        Set the system volume to an absolute level on the controls thread.
+        
+        Args:
+            level: Target volume between 0.0 and 1.0
+            previous_level: Level sent before this one (None when the slider was just grabbed)
+        """
+        with self.control_lock:
+            if previous_level is None:
+                # A new slider grab starts from wherever the volume is now
+                self.pending_base = level
+            queued = self.pending_level is not None
+            self.pending_level = level
+        if not queued:
+            self.control_queue.put(self.send_volume_level)
+    
+    def send_volume_level(self):
+        """
+        Move the volume to the latest slider level (controls thread).
+        
+        Levels arriving while the previous one is being applied are merged,
+        so a slow backend lags behind the slider instead of queueing every
+        frame's update.
+        """
+        with self.control_lock:
+            level, base = self.pending_level, self.pending_base
+            self.pending_level = self.pending_base = None
+        if base is not None:
+            self.key_level = base
+        if level is None:
+            return
+        
+        if self.volume_available:
+            try:
+                self.volume.SetMasterVolumeLevelScalar(level, None)
+            except Exception as e:
+                print(f"Volume control error: {e}")
+            return
+        
+        # Media keys only step the volume, 2% per press on Windows
+        if self.key_level is None:
+            return
+        presses = int(round((level - self.key_level) / 0.02))
+        if presses != 0:
+            pyautogui.press('volumeup' if presses > 0 else 'volumedown',
+                            presses=abs(presses), interval=0)
+            self.key_level += presses * 0.02
+    
+    def process_analog_volume(self, fingers, hand):
+        """
+        Drive the volume continuously while the thumb-index pose is held.
+        
+        Args:
+            fingers: List of finger states
+            hand: Normalized (21, 3) landmarks of the tracked hand
+            
+        Returns:
+            Boolean indicating if the frame was consumed by analog control
+        """
+        if not self.analog_mode or not self.recognizer.detect_analog_pose(fingers):
+            if self.analog_active:
+                self.analog_active = False
+                self.analog_volume.reset()
+                if self.analog_level is not None:
+                    print(f"🎚️ Volume: {int(self.analog_level * 100)}%")
+            return False
+        
+        ratio = self.recognizer.get_pinch_ratio(hand)
+        if ratio is None:
+            return False
+        
+        if not self.analog_active:
+            self.analog_active = True
+            self.current_gesture = 'volume_slider'
+            self.gesture_display_time = time.time()
+            # Swipes should not fire when the hand leaves the pose
+            self.recognizer.previous_hand_position = None
+        
+        previous_level = self.analog_volume.last_sent_level
+        level = self.analog_volume.update(ratio)
+        if level is not None:
+            self.set_volume_level(level, previous_level)
+            self.analog_level = level
+        return True
+    
     def process_gesture(self, gesture):
         """
         Process recognized gesture and execute corresponding action.
@@ -145,26 +484,29 @@ class MusicController:
         if gesture is None:
             return
         
-        self.current_gesture = gesture
-        self.gesture_display_time = time.time()
+        # Actions run through the active profile; a started sequence is shown until it completes
+        if self.bindings.dispatch(gesture) and self.bindings.pending:
+            self.current_gesture = ' > '.join(self.bindings.pending) + ' > ...'
+            self.gesture_display_time = time.time()
+    
+    def get_header_gradient(self, width, height):
+        """
+        Get the header background gradient, rendered once per size.
         
-        # Map gestures to actions
-        if gesture == 'palm_open':
-            self.control_playback('play_pause')
-        elif gesture == 'swipe_right':
-            self.control_playback('next')
-        elif gesture == 'swipe_left':
-            self.control_playback('previous')
-        elif gesture == 'volume_up':
-            self.adjust_volume('up')
-        elif gesture == 'volume_down':
-            self.adjust_volume('down')
-        elif gesture == 'pinch_volume_up':
-            self.adjust_volume('fine_up')
-        elif gesture == 'pinch_volume_down':
-            self.adjust_volume('fine_down')
-        elif gesture == 'peace_sign':
-            self.adjust_volume('mute')
+        Args:
+            width: Header width in pixels
+            height: Header height in pixels
+            
+        Returns:
+            BGR image of shape (height, width, 3)
+        """
+        gradient = self.buffers.buffers.get('header_gradient')
+        if gradient is None or gradient.shape[:2] != (height, width):
+            gradient = self.buffers.get('header_gradient', (height, width, 3))
+            for i in range(height):
+                color_intensity = int(30 + (i / height) * 20)
+                gradient[i] = (color_intensity, color_intensity, color_intensity + 10)
+        return gradient
     
     def draw_ui(self, img):
         """
@@ -176,16 +518,20 @@ class MusicController:
         Returns:
             Image with UI elements
         """
-        overlay = img.copy()
         h, w = img.shape[:2]
         
+        # Translucent effects are dropped by the quality governor under load:
+        # shapes are then drawn straight onto the frame. Blends only touch the
+        # pixels under each shape.
+        effects = self.governor.ui_effects
+        
         # Modern gradient header
         header_height = 140
-        for i in range(header_height):
-            alpha = 0.85 - (i / header_height) * 0.3
-            color_intensity = int(30 + (i / header_height) * 20)
-            cv2.line(overlay, (0, i), (w, i), (color_intensity, color_intensity, color_intensity + 10), 1)
-        cv2.addWeighted(overlay, 0.9, img, 0.1, 0, img)
+        if effects:
+            header = img[:header_height]
+            cv2.addWeighted(self.get_header_gradient(w, header_height), 0.9, header, 0.1, 0, dst=header)
+        else:
+            cv2.rectangle(img, (0, 0), (w, header_height), (40, 40, 50), -1)
         
         # Modern title with shadow
         title = "GESTURE MUSIC CONTROLLER"
@@ -203,52 +549,47 @@ class MusicController:
         cv2.putText(img, instructions, (20, 85), cv2.FONT_HERSHEY_SIMPLEX, 0.65, (200, 200, 200), 2)
         
         # Status bar
-        status_text = "READY | Press Q/ESC to quit"
+        status_text = f"READY | Profile: {self.bindings.profile.name.upper()} (P to switch) | Press Q/ESC to quit"
         cv2.putText(img, status_text, (20, 120), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (180, 180, 180), 1)
         
-        # Modern gesture control panel (right side)
+        # Modern gesture control panel (right side), text rendered once per profile
         panel_x = w - 420
         panel_y = 160
         panel_width = 400
-        panel_height = 240
+        extra_rows = [("Thumb+Index", "Vol Slider")] if self.analog_mode else []
+        panel_text, panel_mask = self.bindings.panel(panel_width, extra_rows=extra_rows)
+        panel_height = panel_text.shape[0] - 10
         
         # Glass-morphism effect for control panel
-        cv2.rectangle(overlay, (panel_x, panel_y - 10), 
-                     (panel_x + panel_width, panel_y + panel_height), 
-                     (30, 30, 40), -1)
-        cv2.addWeighted(overlay, 0.75, img, 0.25, 0, img)
+        if effects:
+            self.buffers.blend_rect(img, (panel_x, panel_y - 10),
+                                    (panel_x + panel_width, panel_y + panel_height),
+                                    (30, 30, 40), 0.75)
+        else:
+            cv2.rectangle(img, (panel_x, panel_y - 10), 
+                         (panel_x + panel_width, panel_y + panel_height), 
+                         (30, 30, 40), -1)
         
         # Panel border
         cv2.rectangle(img, (panel_x, panel_y - 10), 
                      (panel_x + panel_width, panel_y + panel_height), 
                      (0, 220, 255), 2)
         
-        # Panel title
-        cv2.putText(img, "GESTURE CONTROLS", (panel_x + 20, panel_y + 20), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 220, 255), 2)
-        
-        # Simplified gesture list - just gesture names and actions
-        gestures = [
-            ("Palm Open", "Play/Pause"),
-            ("Swipe Right", "Next Track"),
-            ("Swipe Left", "Previous"),
-            ("Index Up", "Vol +"),
-            ("3 Fingers", "Vol -"),
-            ("Peace Sign", "Mute"),
-        ]
-        
-        y_offset = panel_y + 55
-        for gesture, action in gestures:
-            # Gesture name
-            cv2.putText(img, gesture, (panel_x + 20, y_offset), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.55, (220, 220, 220), 1)
-            # Arrow
-            cv2.putText(img, "->", (panel_x + 200, y_offset), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 220, 255), 1)
-            # Action
-            cv2.putText(img, action, (panel_x + 235, y_offset), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.55, (100, 255, 100), 2)
-            y_offset += 35
+        # Panel title and bindings
+        panel_roi = img[panel_y - 10:panel_y - 10 + panel_text.shape[0], panel_x:panel_x + panel_width]
+        cv2.copyTo(panel_text[:panel_roi.shape[0], :panel_roi.shape[1]],
+                   panel_mask[:panel_roi.shape[0], :panel_roi.shape[1]], panel_roi)
+        
+        # Continuous volume bar while the slider pose is held
+        if self.analog_active and self.analog_level is not None:
+            bar_x1, bar_y1 = 40, 180
+            bar_x2, bar_y2 = 80, h - 180
+            fill_y = int(bar_y2 - (bar_y2 - bar_y1) * self.analog_level)
+            cv2.rectangle(img, (bar_x1, bar_y1), (bar_x2, bar_y2), (60, 60, 70), -1)
+            cv2.rectangle(img, (bar_x1, fill_y), (bar_x2, bar_y2), (0, 220, 255), -1)
+            cv2.rectangle(img, (bar_x1, bar_y1), (bar_x2, bar_y2), (200, 200, 200), 2)
+            cv2.putText(img, f"{int(self.analog_level * 100)}%", (bar_x1 - 5, bar_y1 - 15), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
         
         # Modern gesture feedback display
         if self.current_gesture and (time.time() - self.gesture_display_time < self.gesture_display_duration):
@@ -259,10 +600,14 @@ class MusicController:
             
             # Animated background with glow effect
             padding = 30
-            cv2.rectangle(overlay, (text_x - padding, text_y - 70), 
-                         (text_x + text_size[0] + padding, text_y + 25), 
-                         (0, 200, 0), -1)
-            cv2.addWeighted(overlay, 0.8, img, 0.2, 0, img)
+            if effects:
+                self.buffers.blend_rect(img, (text_x - padding, text_y - 70),
+                                        (text_x + text_size[0] + padding, text_y + 25),
+                                        (0, 200, 0), 0.8)
+            else:
+                cv2.rectangle(img, (text_x - padding, text_y - 70), 
+                             (text_x + text_size[0] + padding, text_y + 25), 
+                             (0, 200, 0), -1)
             
             # Border glow
             cv2.rectangle(img, (text_x - padding, text_y - 70), 
@@ -283,6 +628,68 @@ class MusicController:
         """Callback when window is closed."""
         MusicController.window_closed = True
     
+    def toggle_recording(self):
+        """
+        Start or stop recording the session as set in the [Recording] section.
+        """
+        if self.recorder is None:
+            try:
+                self.recorder = start_recording(self.config.recording, (self.screen_width, self.screen_height),
+                                                'music_controller', None)
+                print(f"Recording to: {self.recorder.path}")
+            except IOError as e:
+                print(f"Could not start recording: {e}")
+        else:
+            self.recorder.stop()
+            self.recorder = None
+    
+    def toggle_calibration(self):
+        """
+        Start calibration, or cancel it and keep the current thresholds.
+        """
+        if self.calibrator.active:
+            self.calibrator.cancel()
+            print("🎯 Calibration cancelled")
+            return
+        
+        # Nothing fires while the user performs the calibration poses
+        self.bindings.reset()
+        self.process_analog_volume([], [])
+        self.calibrator.start()
+        print("🎯 Calibration started - follow the prompts on screen")
+    
+    def finish_calibration(self):
+        """
+        Turn the calibration samples into a profile, apply it and save it.
+        """
+        profile = self.calibrator.finish()
+        self.calibration = profile
+        self.recognizer.configure(self.config.gestures)
+        apply_calibration(profile, self.recognizer, self.detector)
+        print(f"🎯 Calibrated: {describe_profile(profile)}")
+        
+        path = self.config.gestures.calibration_file
+        if path:
+            path = os.path.join(self.project_root, path)
+            try:
+                profile.save(path)
+                print(f"   Saved to: {path}")
+            except OSError as e:
+                print(f"   Could not save calibration: {e}")
+    
+    def report_startup(self):
+        """
+        Record startup milestones and print the startup profile once tracking is live.
+        """
+        if not self.first_frame_shown:
+            self.first_frame_shown = True
+            startup_profiler.mark('first frame shown')
+        
+        ready = getattr(self.detector, 'ready', None)
+        if ready is None or (ready.is_set() and self.detector.load_error is None):
+            startup_profiler.mark('first tracked frame')
+            startup_profiler.report()
+    
     def run(self):
         """
         Main application loop.
@@ -290,14 +697,14 @@ class MusicController:
         print("=" * 70)
         print("🎵 GESTURE MUSIC CONTROLLER")
         print("=" * 70)
-        print("\n🎮 Gesture Controls:")
-        print("  ✋ Palm Open          → Play/Pause")
-        print("  👉 Swipe Right       → Next Track")
-        print("  👈 Swipe Left        → Previous Track")
-        print("  ☝️  Index Finger Up   → Volume Up")
-        print("  🖖 3 Fingers Up      → Volume Down")
-        print("  ✌️  Peace Sign        → Mute/Unmute")
-        print("\n⌨️  Press 'q' or 'ESC' to quit | Click X to close")
+        print(f"\n🎮 Gesture Controls (profile: {self.bindings.profile.name}):")
+        for gesture, action in self.bindings.profile.rows():
+            print(f"  {gesture:<22}→ {action}")
+        print(f"  {'Thumb + Index':<22}→ Volume slider (pinch distance)")
+        print("\n⌨️  Press 'p' to switch profile | 'v' to toggle the volume slider | 'r' to record | "
+              "'c' to calibrate | 'f' to run the profiler | 'q' or 'ESC' to quit | Click X to close")
+        if self.calibration is not None:
+            print(f"🎯 Calibration: {describe_profile(self.calibration)}")
         print("=" * 70)
         print("\n🎬 Starting camera...\n")
         
@@ -306,52 +713,95 @@ class MusicController:
         cv2.resizeWindow("Gesture Music Controller", self.screen_width, self.screen_height)
         
         while True:
+            frame_start = time.perf_counter()
+            self.timer.begin()
+            self.allocation_tracker.begin_frame()
+            
             # Check if window was closed
             if MusicController.window_closed:
                 print("\n🛑 Window closed. Exiting...")
                 break
             
+            # Apply config.ini changes between frames
+            if self.config_watcher is not None:
+                update = self.config_watcher.poll()
+                if update is not None:
+                    self.apply_config(*update)
+            
             # Read frame from webcam
             success, img = self.cap.read()
             if not success:
                 print("Failed to read from camera")
                 break
             
-            # Flip image for mirror effect
-            img = cv2.flip(img, 1)
-            
-            # Resize to screen size
-            img = cv2.resize(img, (self.screen_width, self.screen_height))
+            # Resize to screen size (frames arrive mirrored from the source)
+            img = self.buffers.flip_resize(img, (self.screen_width, self.screen_height), False, 'resize')
+            self.timer.lap('capture')
             
             # Find hands
-            img = self.detector.find_hands(img, draw=True)
+            img = self.detector.find_hands(img, draw=self.governor.draw_landmarks)
             landmark_list = self.detector.find_position(img, draw=False)
+            self.timer.lap('detect')
+            if self.detector.presence_gate is not None:
+                self.timer.note('gated', f"{self.detector.presence_gate.recent_gated_percent:.0f}%")
             
-            if len(landmark_list) != 0:
+            if self.calibrator.active:
+                # Calibration samples the hand instead of acting on gestures
+                hand = self.detector.hand_landmarks[0] if len(landmark_list) != 0 else None
+                if self.calibrator.update(hand):
+                    self.finish_calibration()
+            elif len(landmark_list) != 0:
                 # Get finger states
                 fingers = self.detector.fingers_up()
                 
-                # Recognize gesture
-                gesture = self.recognizer.recognize_gesture(
-                    fingers, landmark_list, self.screen_height
-                )
+                # Gestures are measured on the normalized landmarks; pixels are only for drawing
+                hand = self.detector.hand_landmarks[0]
                 
-                # Process gesture
-                if gesture:
-                    self.process_gesture(gesture)
+                # Continuous volume takes precedence over discrete gestures
+                if not self.process_analog_volume(fingers, hand):
+                    # Recognize gesture
+                    gesture = self.recognizer.recognize_gesture(fingers, hand)
+                    
+                    # Process gesture
+                    if gesture:
+                        self.process_gesture(gesture)
+            elif self.analog_active:
+                self.process_analog_volume([], [])
+            
+            # Run the first step of a sequence whose follow-up never came
+            self.bindings.poll()
+            self.timer.lap('gestures')
             
             # Draw UI
             img = self.draw_ui(img)
+            self.calibrator.draw(img)
             
             # Calculate and display FPS
             curr_time = time.time()
             fps = 1 / (curr_time - self.prev_time) if self.prev_time > 0 else 0
             self.prev_time = curr_time
-            cv2.putText(img, f'FPS: {int(fps)}', (20, self.screen_height - 20), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+            if self.config.performance.show_fps:
+                cv2.putText(img, f'FPS: {int(fps)}', (20, self.screen_height - 20), 
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+            
+            # Hand the composited frame to the recorder, then mark it on screen only
+            if self.recorder is not None:
+                self.recorder.submit(img)
+                self.recorder.draw_stats(img, 180, self.screen_height - 45)
+            self.profiler.draw(img, 180, self.screen_height - 95)
+            self.detector.draw_status(img, 20, 125)
+            
+            # Per-stage timings below the header
+            self.timer.draw(img, 20, 170)
+            self.timer.lap('ui')
+            self.timer.end()
+            self.governor.update(self.timer)
+            self.allocation_tracker.end_frame()
             
             # Show the final image
             cv2.imshow("Gesture Music Controller", img)
+            if startup_profiler.enabled and not startup_profiler.reported:
+                self.report_startup()
             
             # Check if window was closed
             try:
@@ -363,17 +813,36 @@ class MusicController:
                 print("\n🛑 Window closed. Exiting...")
                 break
             
-            # Handle key presses
-            key = cv2.waitKey(1) & 0xFF
+            # Handle key presses, waiting out the rest of the frame budget
+            remaining = self.frame_interval - (time.perf_counter() - frame_start)
+            key = cv2.waitKey(max(1, int(remaining * 1000))) & 0xFF
             if key == ord('q'):
                 print("\n🛑 Exiting Gesture Music Controller...")
                 break
             elif key == 27:  # ESC key
                 print("\n🛑 Exiting Gesture Music Controller...")
                 break
+            elif key == ord('v'):
+                self.analog_mode = not self.analog_mode
+                print(f"🎚️ Volume slider {'enabled' if self.analog_mode else 'disabled'}")
+            elif key == ord('r'):
+                self.toggle_recording()
+            elif key == ord('f'):
+                self.profiler.toggle()
+            elif key == ord('p'):
+                profile = self.bindings.switch_profile()
+                print(f"🎮 Profile: {profile.name}")
+            elif key == ord('c'):
+                self.toggle_calibration()
         
         # Cleanup
+        self.profiler.stop()
+        self.control_queue.put(None)
+        if self.recorder is not None:
+            self.recorder.stop()
         self.cap.release()
+        if self.config_watcher is not None:
+            self.config_watcher.stop()
         cv2.destroyAllWindows()
 
 
@@ -381,7 +850,26 @@ def main():
     """
     Entry point for the application.
     """
-    controller = MusicController(camera_index=0, screen_width=1280, screen_height=720)
+    parser = argparse.ArgumentParser(description="Gesture Music Controller")
+    parser.add_argument('--service', action='store_true',
+                        help="Attach to the shared detector service instead of opening the camera")
+    parser.add_argument('--service-port', type=int, default=DEFAULT_PORT,
+                        help="Local port of the detector service")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="Report import and initialization times up to the first frame")
+    parser.add_argument('--profile', action='store_true',
+                        help="Sample the frame loop from the start ('f' stops and reports)")
+    parser.add_argument('--config', default=DEFAULT_CONFIG_PATH,
+                        help="Path to the configuration file (reloaded live)")
+    args = parser.parse_args()
+    
+    config = load_config(args.config)
+    
+    controller = MusicController(camera_index=config.camera.camera_index,
+                                 screen_width=config.camera.canvas_width,
+                                 screen_height=config.camera.canvas_height,
+                                 use_service=args.service, service_port=args.service_port,
+                                 config=config, config_path=args.config, profile=args.profile)
     controller.run()
 
 
@@ -0,0 +1,131 @@
+"""
+Resolution Replay Tests
+Plays the same synthetic hand through HandDetector and GestureRecognizer at
+several camera resolutions and checks that fingers_up and recognize_gesture
+give identical results frame for frame.
+
+The trace is generated in the narrowest frame (9:16) and mapped into the
+others as the same hand seen through a wider frame, so every resolution sees
+the same physical motion; frames of the same shape get identical normalized
+landmarks.
+
+Run with: python -m pytest tests
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add parent directory to path to import utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.gesture_recognizer import GestureRecognizer
+from utils.hand_detector import HandDetector
+from utils.synthetic_hands import SyntheticHands, demo_script, hold, random_script, swipe
+
+RESOLUTIONS = ((640, 480), (1280, 720), (1920, 1080), (720, 1280))
+TRACE_ASPECT = 9 / 16
+FPS = 30.0
+
+# Calibrated finger extensions [Thumb, Index, Middle, Ring, Pinky], in palm sizes
+FINGER_THRESHOLDS = [1.1, 1.4, 1.5, 1.4, 1.2]
+
+
+def swipe_script(aspect):
+    """Swipes long and quick enough to fire, 0.45 frame heights across the frame center."""
+    # Swipe thresholds are in palm sizes, which follow the frame height
+    distance = min(0.45 / aspect, 0.8)
+    start, end = 0.5 - distance / 2, 0.5 + distance / 2
+    return [
+        hold('palm_open', 1.0, (start, 0.6)),
+        swipe('right', (start, 0.6), distance=distance, duration=0.15),
+        hold('palm_open', 1.5, (end, 0.6)),
+        swipe('left', (end, 0.6), distance=distance, duration=0.15),
+        hold('fist', 1.0),
+    ]
+
+
+SCRIPTS = {
+    'demo': demo_script,
+    'swipes': swipe_script,
+    'random': lambda aspect: random_script(60, 7, aspect),
+}
+
+# Distance-based gestures each script must fire, so the comparison covers them
+EXPECTED_GESTURES = {
+    'demo': {'tap', 'pinch_volume_up', 'pinch_volume_down'},
+    'swipes': {'swipe_right', 'swipe_left'},
+    'random': {'tap', 'pinch_volume_up', 'pinch_volume_down'},
+}
+
+
+def to_frame(hand, aspect):
+    """
+    Map normalized landmarks from the trace's frame into a frame of another shape.
+    
+    Args:
+        hand: Normalized (21, 3) landmarks in a TRACE_ASPECT frame
+        aspect: Frame width divided by height
+    
+    Returns:
+        Normalized (21, 3) landmarks of the same hand, centered in the new frame
+    """
+    hand = np.array(hand, copy=True)
+    # x and z are fractions of the frame width
+    hand[:, 0] = 0.5 + (hand[:, 0] - 0.5) * TRACE_ASPECT / aspect
+    hand[:, 2] *= TRACE_ASPECT / aspect
+    return hand
+
+
+def replay(batch, size, finger_thresholds=None):
+    """
+    Play a trace through the detector and recognizer the way the Music Controller does.
+    
+    Returns:
+        List with (fingers, gesture) per frame, or None where no hand was found
+    """
+    width, height = size
+    aspect = width / height
+    detector = HandDetector(backend='synthetic')
+    detector.finger_thresholds = finger_thresholds
+    clock = {'t': 0.0}
+    recognizer = GestureRecognizer(cooldown_time=1.0, aspect=aspect, clock=lambda: clock['t'])
+    img = np.zeros((height, width, 3), np.uint8)
+    
+    results = []
+    for index in range(len(batch)):
+        clock['t'] = index / batch.fps
+        detector.hand_landmarks = [to_frame(hand, aspect) for hand in batch.hands(index)]
+        if len(detector.find_position(img, draw=False)) != 0:
+            fingers = detector.fingers_up()
+            gesture = recognizer.recognize_gesture(fingers, detector.hand_landmarks[0])
+            results.append((tuple(fingers), gesture))
+        else:
+            results.append(None)
+    return results
+
+
+@pytest.fixture(scope='module', params=sorted(SCRIPTS))
+def batch(request):
+    hands = SyntheticHands(aspect=TRACE_ASPECT, noise=0.0, dropout_rate=0.02, seed=0)
+    return request.param, hands.generate(SCRIPTS[request.param](TRACE_ASPECT), FPS)
+
+
+@pytest.mark.parametrize('finger_thresholds', [None, FINGER_THRESHOLDS], ids=['default', 'calibrated'])
+def test_same_results_at_every_resolution(batch, finger_thresholds):
+    name, batch = batch
+    reference = replay(batch, RESOLUTIONS[0], finger_thresholds)
+    
+    # Guard against a trace that exercises nothing
+    seen = [result for result in reference if result is not None]
+    assert len({fingers for fingers, _ in seen}) > 1
+    assert EXPECTED_GESTURES[name] <= {gesture for _, gesture in seen}
+    
+    for size in RESOLUTIONS[1:]:
+        results = replay(batch, size, finger_thresholds)
+        mismatches = [index for index, (expected, actual) in enumerate(zip(reference, results))
+                      if expected != actual]
+        assert not mismatches, (f"{size[0]}x{size[1]} differs from {RESOLUTIONS[0][0]}x{RESOLUTIONS[0][1]} "
+                                f"at frames {mismatches[:10]}")
+
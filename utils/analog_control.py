@@ -0,0 +1,99 @@
+"""
+Analog Control Module
+Maps a continuous hand measurement (such as pinch distance) to a smoothed level.
+"""
+
+import time
+
+
+class AnalogControl:
+    """
+    Continuous control that turns a normalized hand measurement into a level in [0, 1].
+    
+    The raw input is clamped to an input range, shaped by a smoothstep curve,
+    smoothed over time and rate-limited so that only meaningful changes are
+    reported to the backend.
+    """
+    
+    def __init__(self, input_min=0.25, input_max=1.6, smoothing=0.5,
+                 min_interval=0.05, min_delta=0.02):
+        """
+        Initialize the AnalogControl.
+        
+        Args:
+            input_min: Input value mapped to level 0.0
+            input_max: Input value mapped to level 1.0
+            smoothing: Exponential smoothing factor (0 = none, closer to 1 = smoother)
+            min_interval: Minimum time in seconds between two reported updates
+            min_delta: Minimum level change worth reporting
+        """
+        self.input_min = input_min
+        self.input_max = input_max
+        self.smoothing = smoothing
+        self.min_interval = min_interval
+        self.min_delta = min_delta
+        
+        self.smoothed_level = None
+        self.last_sent_level = None
+        self.last_sent_time = 0
+    
+    def map_input(self, value):
+        """
+        Map a raw input value to a target level through a smoothstep curve.
+        
+        Args:
+            value: Raw input value (e.g. pinch distance / hand size)
+        
+        Returns:
+            Target level between 0.0 and 1.0
+        """
+        t = (value - self.input_min) / (self.input_max - self.input_min)
+        t = min(1.0, max(0.0, t))
+        # Smoothstep flattens both ends so 0% and 100% are easy to hit
+        return t * t * (3 - 2 * t)
+    
+    def update(self, value, current_time=None):
+        """
+        Feed a new input sample.
+        
+        Args:
+            value: Raw input value
+            current_time: Timestamp of the sample (defaults to time.time())
+        
+        Returns:
+            New level to send to the backend, or None if no update is due
+        """
+        if current_time is None:
+            current_time = time.time()
+        
+        target = self.map_input(value)
+        if self.smoothed_level is None:
+            self.smoothed_level = target
+        else:
+            self.smoothed_level += (1 - self.smoothing) * (target - self.smoothed_level)
+        
+        # Snap to the ends so full/zero level is reachable despite smoothing
+        level = self.smoothed_level
+        if target in (0.0, 1.0) and abs(target - level) < self.min_delta:
+            level = target
+        
+        if current_time - self.last_sent_time < self.min_interval:
+            return None
+        if self.last_sent_level is not None:
+            change = abs(level - self.last_sent_level)
+            if change < self.min_delta and not (level in (0.0, 1.0) and change > 0):
+                return None
+        
+        self.last_sent_level = level
+        self.last_sent_time = current_time
+        return level
+    
+    def reset(self, level=None):
+        """
+        Reset the smoothing state, e.g. when the control gesture is released.
+        
+        Args:
+            level: Level currently applied by the backend (None if unknown)
+        """
+        self.smoothed_level = None
+        self.last_sent_level = level
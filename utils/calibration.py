@@ -0,0 +1,392 @@
+"""
+Calibration Module
+Learns per-user gesture thresholds from a short guided session and stores
+them in a small profile file that the apps load at startup.
+"""
+
+import json
+import os
+import time
+from dataclasses import dataclass, asdict, field
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from utils.hand_detector import finger_extensions
+
+
+# Static poses held during calibration, each performed once per round
+CALIBRATION_POSES = (
+    ('palm_open', "Open your hand, fingers spread"),
+    ('fist', "Make a fist"),
+    ('pinch', "Touch thumb and index tips"),
+)
+
+# Smallest gap between open and closed measurements that gives a usable threshold
+MIN_SEPARATION = 0.1
+
+# Profile file format version
+PROFILE_VERSION = 1
+
+
+@dataclass
+class CalibrationProfile:
+    """
+    Thresholds learned for one user, all in palm-size units.
+    
+    A field left at None was not learned reliably and keeps the [Gestures]
+    setting or the default pose geometry.
+    """
+    pinch_threshold: float = None
+    swipe_threshold: float = None
+    swipe_cooldown: float = None
+    finger_thresholds: list = None
+    
+    # Median finger extensions measured for each pose [Thumb, Index, Middle, Ring, Pinky]
+    templates: dict = field(default_factory=dict)
+    created: str = ''
+    
+    def to_dict(self):
+        """Plain-data form of the profile, for the profile file."""
+        return dict(asdict(self), version=PROFILE_VERSION)
+    
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Rebuild a profile from to_dict() output.
+        
+        Args:
+            data: Dictionary with CalibrationProfile fields
+        
+        Returns:
+            CalibrationProfile instance
+        """
+        return cls(pinch_threshold=data.get('pinch_threshold'),
+                   swipe_threshold=data.get('swipe_threshold'),
+                   swipe_cooldown=data.get('swipe_cooldown'),
+                   finger_thresholds=data.get('finger_thresholds'),
+                   templates=data.get('templates', {}),
+                   created=data.get('created', ''))
+    
+    def save(self, path):
+        """
+        Write the profile as JSON.
+        
+        Args:
+            path: Profile file path
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+def load_calibration(path, base_directory=''):
+    """
+    Load a calibration profile.
+    
+    Args:
+        path: Profile file path ('' = calibration disabled)
+        base_directory: Directory relative paths are resolved against
+    
+    Returns:
+        CalibrationProfile, or None if there is no usable profile
+    """
+    if not path:
+        return None
+    path = os.path.join(base_directory, path)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Calibration: could not read {path}: {e}")
+        return None
+    if data.get('version') != PROFILE_VERSION:
+        print(f"Calibration: {path} has an unsupported version, recalibrate with 'c'")
+        return None
+    return CalibrationProfile.from_dict(data)
+
+
+def apply_calibration(profile, recognizer, detector):
+    """
+    Overlay a calibration profile on the recognizer and detector settings.
+    
+    Call after GestureRecognizer.configure(), which resets the thresholds to
+    the [Gestures] section.
+    
+    Args:
+        profile: CalibrationProfile, or None to use the configured settings only
+        recognizer: GestureRecognizer
+        detector: HandDetector (or RemoteHandDetector)
+    """
+    recognizer.gesture_cooldowns = {}
+    detector.finger_thresholds = None
+    if profile is None:
+        return
+    
+    if profile.pinch_threshold is not None:
+        recognizer.pinch_threshold = profile.pinch_threshold
+    if profile.swipe_threshold is not None:
+        recognizer.swipe_threshold = profile.swipe_threshold
+    if profile.swipe_cooldown is not None:
+        # Held poses keep the long cooldown; a swipe ends on its own
+        recognizer.gesture_cooldowns = {'swipe_left': profile.swipe_cooldown,
+                                        'swipe_right': profile.swipe_cooldown}
+    if profile.finger_thresholds is not None:
+        detector.finger_thresholds = list(profile.finger_thresholds)
+
+
+def midpoint(low_values, high_values, low_q=90, high_q=10):
+    """
+    Threshold halfway between two groups of measurements.
+    
+    Args:
+        low_values: Measurements that should fall below the threshold
+        high_values: Measurements that should fall above it
+        low_q: Percentile of low_values taken as its upper edge
+        high_q: Percentile of high_values taken as its lower edge
+    
+    Returns:
+        Threshold, or None if the groups overlap or are missing
+    """
+    if len(low_values) == 0 or len(high_values) == 0:
+        return None
+    low = float(np.percentile(low_values, low_q))
+    high = float(np.percentile(high_values, high_q))
+    if high - low < MIN_SEPARATION:
+        return None
+    return (low + high) / 2
+
+
+class Calibrator:
+    """
+    Guides the user through the calibration poses and a round of swipes.
+    
+    Feed it every frame with update(); each step shows its prompt for
+    prepare_time before samples are taken, so the user has time to change
+    pose. When the last step ends, finish() turns the samples into a profile.
+    """
+    
+    def __init__(self, aspect=16 / 9, rounds=3, prepare_time=1.2, sample_time=1.0,
+                 swipe_time=6.0, max_cooldown=1.5):
+        """
+        Initialize the Calibrator.
+        
+        Args:
+            aspect: Frame width divided by height
+            rounds: Times each pose is performed
+            prepare_time: Seconds given to get into each pose before sampling
+            sample_time: Seconds each pose is sampled
+            swipe_time: Seconds allowed for the swipes
+            max_cooldown: Longest swipe cooldown the profile may set
+        """
+        self.aspect = aspect
+        self.prepare_time = prepare_time
+        self.max_cooldown = max_cooldown
+        self.steps = [(name, prompt, sample_time) for _ in range(rounds)
+                      for name, prompt in CALIBRATION_POSES]
+        self.steps.append(('swipe', f"Swipe left and right, {rounds} times each", swipe_time))
+        
+        self.active = False
+        self.step_start = 0.0
+        self.reset()
+    
+    def reset(self):
+        """Discard the collected samples and go back to the first step."""
+        self.step_index = 0
+        
+        # Samples per step name
+        self.extensions = {name: [] for name, _ in CALIBRATION_POSES}
+        self.pinch_ratios = {name: [] for name, _ in CALIBRATION_POSES}
+        self.still_motion = []
+        self.swipe_motion = []
+        self.previous_wrist = None
+    
+    def start(self, now=None):
+        """
+        Begin calibration from the first step, discarding earlier samples.
+        
+        Args:
+            now: Current time (defaults to time.time())
+        """
+        self.reset()
+        self.active = True
+        self.step_start = time.time() if now is None else now
+    
+    def cancel(self):
+        """Stop calibrating without producing a profile."""
+        self.active = False
+    
+    @property
+    def step(self):
+        """(name, prompt, sample time) of the current step."""
+        return self.steps[min(self.step_index, len(self.steps) - 1)]
+    
+    def update(self, hand, now=None):
+        """
+        Record one frame.
+        
+        Args:
+            hand: Normalized (21, 3) landmarks of the tracked hand, or None
+            now: Current time (defaults to time.time())
+        
+        Returns:
+            Boolean indicating if the last step just ended
+        """
+        if not self.active:
+            return False
+        now = time.time() if now is None else now
+        name, _, duration = self.step
+        elapsed = now - self.step_start
+        
+        if elapsed >= self.prepare_time + duration:
+            self.step_index += 1
+            self.step_start = now
+            self.previous_wrist = None
+            if self.step_index >= len(self.steps):
+                self.active = False
+                return True
+            return False
+        
+        if elapsed < self.prepare_time or hand is None:
+            self.previous_wrist = None
+            return False
+        
+        extensions = finger_extensions(hand, self.aspect)
+        if extensions is None:
+            return False
+        points = hand[:, :2] * (self.aspect, 1.0)
+        palm = float(np.hypot(*(points[9] - points[0])))
+        
+        # Frame-to-frame wrist movement in palm sizes, the quantity swipes are detected on
+        wrist = float(points[0][0])
+        if self.previous_wrist is not None:
+            dx = (wrist - self.previous_wrist) / palm
+            if name == 'swipe':
+                self.swipe_motion.append((now, dx))
+            else:
+                self.still_motion.append(abs(dx))
+        self.previous_wrist = wrist
+        
+        if name != 'swipe':
+            self.extensions[name].append(extensions)
+            self.pinch_ratios[name].append(float(np.hypot(*(points[4] - points[8]))) / palm)
+        return False
+    
+    def finish(self):
+        """
+        Compute the profile from the collected samples.
+        
+        Returns:
+            CalibrationProfile (fields that could not be learned are None)
+        """
+        profile = CalibrationProfile(created=datetime.now().isoformat(timespec='seconds'))
+        
+        # A finger is up past the midpoint of its open and fist extensions
+        open_ext = np.array(self.extensions['palm_open']).reshape(-1, 5)
+        fist_ext = np.array(self.extensions['fist']).reshape(-1, 5)
+        thresholds = [midpoint(fist_ext[:, finger], open_ext[:, finger]) for finger in range(5)]
+        if all(threshold is not None for threshold in thresholds):
+            profile.finger_thresholds = [round(threshold, 3) for threshold in thresholds]
+        for name, samples in (('palm_open', open_ext), ('fist', fist_ext)):
+            if len(samples):
+                profile.templates[name] = [round(float(value), 3)
+                                           for value in np.median(samples, axis=0)]
+        
+        # Pinch sits between the pinched and the open thumb-index distance
+        pinch = midpoint(self.pinch_ratios['pinch'], self.pinch_ratios['palm_open'])
+        if pinch is not None:
+            profile.pinch_threshold = round(pinch, 3)
+        
+        # Swipes: movement well above the jitter of a still hand
+        noise = float(np.percentile(self.still_motion, 99)) if self.still_motion else 0.0
+        floor = max(2 * noise, MIN_SEPARATION)
+        peaks, durations = self.swipe_segments(floor)
+        if len(peaks) >= 2:
+            profile.swipe_threshold = round(max(floor, 0.5 * float(np.median(peaks))), 3)
+            
+            # One swipe must not fire twice, so the cooldown covers the longest one
+            profile.swipe_cooldown = round(float(np.clip(1.5 * max(durations), 0.3, self.max_cooldown)), 2)
+        return profile
+    
+    def swipe_segments(self, floor):
+        """
+        Split the swipe samples into movements faster than floor.
+        
+        Args:
+            floor: Smallest per-frame movement counted as swiping
+        
+        Returns:
+            Tuple (peaks, durations): peak movement and length in seconds of each swipe
+        """
+        peaks, durations = [], []
+        start = previous_time = None
+        peak = 0.0
+        direction = 0
+        for timestamp, dx in self.swipe_motion:
+            moving = abs(dx) > floor
+            # A reversal starts a new swipe even without a pause in between
+            if start is not None and (not moving or np.sign(dx) != direction):
+                peaks.append(peak)
+                durations.append(previous_time - start)
+                start = None
+            if moving and start is None:
+                start, peak, direction = timestamp, 0.0, np.sign(dx)
+            if moving:
+                peak = max(peak, abs(dx))
+            previous_time = timestamp
+        if start is not None:
+            peaks.append(peak)
+            durations.append(previous_time - start)
+        
+        # A swipe spans at least one frame interval
+        frame_time = float(np.median(np.diff([t for t, _ in self.swipe_motion]))) \
+            if len(self.swipe_motion) > 1 else 0.0
+        return peaks, [duration + frame_time for duration in durations]
+    
+    def draw(self, img, now=None):
+        """
+        Draw the current prompt and progress.
+        
+        Args:
+            img: Image to draw on (BGR format)
+            now: Current time (defaults to time.time())
+        """
+        if not self.active:
+            return
+        now = time.time() if now is None else now
+        h, w = img.shape[:2]
+        name, prompt, duration = self.step
+        elapsed = now - self.step_start
+        
+        x1, y1, x2, y2 = w // 2 - 320, h // 2 - 90, w // 2 + 320, h // 2 + 70
+        cv2.rectangle(img, (x1, y1), (x2, y2), (30, 30, 40), -1)
+        cv2.rectangle(img, (x1, y1), (x2, y2), (0, 220, 255), 2)
+        cv2.putText(img, f"CALIBRATION {self.step_index + 1}/{len(self.steps)}  (C to cancel)",
+                    (x1 + 20, y1 + 35), cv2.FONT_HERSHEY_SIMPLEX, 0.65, (0, 220, 255), 2)
+        cv2.putText(img, prompt, (x1 + 20, y1 + 85), cv2.FONT_HERSHEY_DUPLEX, 0.9, (255, 255, 255), 2)
+        
+        # Progress bar: grey while getting ready, green while sampling
+        sampling = elapsed >= self.prepare_time
+        fraction = ((elapsed - self.prepare_time) / duration if sampling
+                    else elapsed / self.prepare_time)
+        fill = x1 + 20 + int((x2 - x1 - 40) * min(1.0, max(0.0, fraction)))
+        cv2.rectangle(img, (x1 + 20, y2 - 40), (x2 - 20, y2 - 20), (60, 60, 70), -1)
+        cv2.rectangle(img, (x1 + 20, y2 - 40), (fill, y2 - 20),
+                      (100, 255, 100) if sampling else (150, 150, 150), -1)
+
+
+def describe_profile(profile):
+    """One-line summary of the learned thresholds, for the console."""
+    parts = []
+    if profile.pinch_threshold is not None:
+        parts.append(f"pinch < {profile.pinch_threshold:.2f}")
+    if profile.swipe_threshold is not None:
+        parts.append(f"swipe > {profile.swipe_threshold:.2f} (cooldown {profile.swipe_cooldown:.2f}s)")
+    if profile.finger_thresholds is not None:
+        parts.append("fingers " + "/".join(f"{value:.2f}" for value in profile.finger_thresholds))
+    return ", ".join(parts) if parts else "nothing learned"
@@ -0,0 +1,130 @@
+"""
+Camera Module
+Webcam frame source shared by the applications and the detector service.
+"""
+
+import threading
+
+import cv2
+
+from utils.frame_buffers import FramePool
+
+
+class CameraSource:
+    """
+    Reads frames from a local webcam, mirrored and sized for display.
+    """
+    
+    def __init__(self, camera_index=0, width=1280, height=720, mirror=True, threaded=False):
+        """
+        Open the webcam.
+        
+        Args:
+            camera_index: Webcam index (usually 0 for default camera)
+            width: Width of the frames returned by read()
+            height: Height of the frames returned by read()
+            mirror: Whether to flip frames horizontally for a mirror effect
+            threaded: Capture on a background thread so read() never waits on the driver
+        """
+        self.camera_index = camera_index
+        self.width = width
+        self.height = height
+        self.mirror = mirror
+        
+        self.cap = cv2.VideoCapture(self.camera_index)
+        self.cap.set(3, self.width)
+        self.cap.set(4, self.height)
+        
+        # Captured frames are read into recycled buffers instead of new arrays
+        self.buffers = FramePool()
+        self.raw_frame = None
+        self.free_frames = []
+        self.frame_in_use = None
+        
+        # Background capture state
+        self.threaded = False
+        self.capture_thread = None
+        self.frame_ready = threading.Condition()
+        self.latest_frame = None
+        self.latest_success = True
+        self.set_threaded(threaded)
+    
+    def set_threaded(self, threaded):
+        """
+        Switch between synchronous and background capture.
+        
+        Args:
+            threaded: True to capture on a background thread
+        """
+        if threaded == self.threaded:
+            return
+        self.threaded = threaded
+        if threaded:
+            self.capture_thread = threading.Thread(target=self.capture_loop, daemon=True)
+            self.capture_thread.start()
+        elif self.capture_thread is not None:
+            self.capture_thread.join()
+            self.capture_thread = None
+            self.latest_frame = None
+    
+    def capture_loop(self):
+        """Keep the newest camera frame available for read()."""
+        while self.threaded:
+            with self.frame_ready:
+                buffer = self.free_frames.pop() if self.free_frames else None
+            success, img = self.cap.read(buffer)
+            with self.frame_ready:
+                # A frame nobody picked up goes straight back to the free list
+                if self.latest_frame is not None:
+                    self.free_frames.append(self.latest_frame)
+                self.latest_success = success
+                self.latest_frame = img if success else None
+                self.frame_ready.notify()
+            if not success:
+                break
+    
+    def grab(self):
+        """
+        Get the next raw camera frame.
+        
+        Returns:
+            Tuple (success, image)
+        """
+        if not self.threaded:
+            success, img = self.cap.read(self.raw_frame)
+            if success:
+                self.raw_frame = img
+            return success, img
+        
+        with self.frame_ready:
+            while self.latest_frame is None and self.latest_success and self.threaded:
+                self.frame_ready.wait(timeout=1.0)
+            img, self.latest_frame = self.latest_frame, None
+            
+            # The caller is done with the previous frame once it asks for the next one
+            if self.frame_in_use is not None:
+                self.free_frames.append(self.frame_in_use)
+            self.frame_in_use = img
+        return img is not None, img
+    
+    def read(self):
+        """
+        Read the next frame.
+        
+        The returned image is reused by a later read(), so copy it to keep it.
+        
+        Returns:
+            Tuple (success, image) like cv2.VideoCapture.read
+        """
+        success, img = self.grab()
+        if not success:
+            return False, None
+        
+        # Resize if the camera did not honour the requested size, and mirror,
+        # in one reused buffer
+        return True, self.buffers.flip_resize(img, (self.width, self.height), self.mirror)
+    
+    def release(self):
+        """Release the webcam."""
+        self.set_threaded(False)
+        self.cap.release()
@@ -0,0 +1,307 @@
+"""
+Canvas Store Module
+Keeps the Air Canvas drawing in a memory-mapped file so it survives a crash
+or a closed window, and is back instantly on the next start.
+"""
+
+import mmap
+import os
+import struct
+import threading
+import time
+
+import numpy as np
+
+from utils.canvas_tools import mask_bbox
+
+
+# File header: magic, version, width, height, ink bounding box (-1 = no ink)
+HEADER = struct.Struct('<4sHHII4i')
+MAGIC = b'GMCV'
+VERSION = 1
+
+# The image data starts on a page boundary so dirty rows map to whole pages
+HEADER_SIZE = mmap.PAGESIZE
+
+
+def lock_store(path):
+    """
+    Take an exclusive lock on the lock file next to a canvas file.
+    
+    The operating system releases the lock when the process exits, so a
+    crashed Air Canvas never leaves a stale lock behind.
+    
+    Args:
+        path: Canvas file path
+    
+    Returns:
+        Open lock file, holding the lock until it is closed
+    
+    Raises:
+        FileExistsError: Another process has the canvas file open
+    """
+    lock = open(path + '.lock', 'a+b')
+    try:
+        if os.name == 'nt':
+            import msvcrt
+            lock.seek(0)
+            msvcrt.locking(lock.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock.close()
+        raise FileExistsError(f"{path} is in use by another Air Canvas") from None
+    return lock
+
+
+def rejection_reason(path, size, width, height):
+    """
+    Explain why an existing canvas file cannot be recovered.
+    
+    Args:
+        path: Canvas file path
+        size: Expected file size in bytes
+        width: Canvas width
+        height: Canvas height
+    
+    Returns:
+        Reason string, or None if the file can be reused
+    """
+    with open(path, 'rb') as f:
+        header = f.read(HEADER.size)
+    if len(header) < HEADER.size:
+        return "is too short to hold a canvas"
+    magic, version, _, file_width, file_height, *_ = HEADER.unpack(header)
+    if magic != MAGIC:
+        return "is not an Air Canvas autosave file"
+    if version != VERSION:
+        return f"has format version {version}, expected {VERSION}"
+    if (file_width, file_height) != (width, height):
+        return f"is from a {file_width}x{file_height} canvas, this one is {width}x{height}"
+    file_size = os.path.getsize(path)
+    if file_size != size:
+        return f"is {file_size} bytes, expected {size} (truncated or damaged)"
+    return None
+
+
+class CanvasStore:
+    """
+    A canvas and stroke mask living in a memory-mapped file.
+    
+    ToolEngine draws straight into the mapped pages, so there is no copy per
+    frame: the operating system holds every stroke as soon as it is drawn and
+    keeps it if the process dies. A background thread additionally flushes
+    the rows touched since the last flush to disk, together with the ink
+    bounding box, so little is lost even if the machine goes down. Reopening
+    the file maps it again without reading or decoding anything; pages load
+    on first access. A lock file next to it keeps a second Air Canvas from
+    mapping the same file; that one runs without autosave.
+    """
+    
+    def __init__(self, path, width, height, flush_interval=1.0):
+        """
+        Open the store, recovering a previous session of the same size.
+        
+        Args:
+            path: File backing the canvas
+            width: Canvas width
+            height: Canvas height
+            flush_interval: Seconds between background flushes of dirty rows
+        
+        Raises:
+            FileExistsError: Another Air Canvas has the file open
+        """
+        self.path = path
+        self.width = width
+        self.height = height
+        self.flush_interval = flush_interval
+        self.canvas_offset = HEADER_SIZE
+        self.mask_offset = HEADER_SIZE + width * height * 3
+        size = self.mask_offset + width * height
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        # Two instances mapping one file would draw over and truncate each other's canvas
+        self.lock_file = lock_store(path)
+        
+        # Anything but a complete file of this canvas size and format starts over
+        self.recovered = False
+        self.ink_bbox = None
+        self.file = None
+        try:
+            if os.path.exists(path):
+                reason = rejection_reason(path, size, width, height)
+                self.recovered = reason is None
+                if not self.recovered:
+                    print(f"Autosave: {path} {reason}, starting a new canvas")
+            
+            mode = 'r+b' if self.recovered else 'w+b'
+            self.file = open(path, mode)
+            if not self.recovered:
+                self.file.truncate(size)
+            self.map = mmap.mmap(self.file.fileno(), size)
+        except (OSError, ValueError):
+            if self.file is not None:
+                self.file.close()
+            self.lock_file.close()
+            raise
+        if not self.recovered:
+            self.write_header()
+        
+        self.canvas = np.ndarray((height, width, 3), np.uint8, buffer=self.map,
+                                 offset=self.canvas_offset)
+        self.mask = np.ndarray((height, width), np.uint8, buffer=self.map,
+                               offset=self.mask_offset)
+        
+        # Strokes drawn after the last flush survive a crash in the page cache,
+        # but the header's ink box does not include them; the mask does
+        if self.recovered:
+            self.ink_bbox = mask_bbox(self.mask)
+        
+        # Rows changed since the last flush, [start, end), and the engine reporting them
+        self.lock = threading.Lock()
+        self.dirty = None
+        self.tools = None
+        
+        self.running = False
+        self.wake = threading.Event()
+        self.thread = None
+        
+        # Statistics
+        self.flushes = 0
+        self.flushed_bytes = 0
+        self.last_flush_ms = 0.0
+    
+    def attach(self, tools):
+        """
+        Track the operations committed by a ToolEngine drawing into this store.
+        
+        Args:
+            tools: ToolEngine created with canvas=store.canvas and mask=store.mask
+        """
+        self.tools = tools
+        tools.ink_bbox = self.ink_bbox
+        tools.listeners.append(self.on_op)
+    
+    def on_op(self, op):
+        """ToolEngine listener: mark the operation's rows dirty and track the ink."""
+        bbox = op.bbox(self.width, self.height)
+        if bbox is None:
+            return
+        with self.lock:
+            if self.dirty is None:
+                self.dirty = (bbox[1], bbox[3])
+            else:
+                self.dirty = (min(self.dirty[0], bbox[1]), max(self.dirty[1], bbox[3]))
+            
+            # Mirrors ToolEngine.ink_bbox, which is only updated after the listeners run
+            if op.kind == 'clear':
+                self.ink_bbox = None
+            elif op.kind == 'snapshot':
+                self.ink_bbox = mask_bbox(self.mask)
+            elif not op.erase:
+                if self.ink_bbox is None:
+                    self.ink_bbox = bbox
+                else:
+                    x1, y1, x2, y2 = self.ink_bbox
+                    self.ink_bbox = (min(x1, bbox[0]), min(y1, bbox[1]),
+                                     max(x2, bbox[2]), max(y2, bbox[3]))
+    
+    def write_header(self, ink_bbox=None):
+        """Write the header with an ink bounding box (None = no ink)."""
+        bbox = ink_bbox if ink_bbox is not None else (-1, -1, -1, -1)
+        self.map[:HEADER.size] = HEADER.pack(MAGIC, VERSION, 0, self.width, self.height, *bbox)
+    
+    def flush_range(self, offset, length):
+        """Flush a byte range, widened to whole pages as mmap requires."""
+        start = offset - offset % mmap.PAGESIZE
+        self.map.flush(start, offset + length - start)
+        self.flushed_bytes += offset + length - start
+    
+    def flush(self):
+        """
+        Write the dirty rows and the header to disk.
+        
+        Returns:
+            Boolean indicating if anything was flushed
+        """
+        with self.lock:
+            dirty, self.dirty = self.dirty, None
+            ink_bbox = self.ink_bbox
+        if dirty is None:
+            return False
+        
+        start = time.perf_counter()
+        y1, y2 = dirty
+        self.flush_range(self.canvas_offset + y1 * self.width * 3, (y2 - y1) * self.width * 3)
+        self.flush_range(self.mask_offset + y1 * self.width, (y2 - y1) * self.width)
+        self.write_header(ink_bbox)
+        self.map.flush(0, HEADER_SIZE)
+        self.flushes += 1
+        self.last_flush_ms = (time.perf_counter() - start) * 1000
+        return True
+    
+    def start(self):
+        """Start flushing in the background."""
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+    
+    def run(self):
+        """Background flush loop."""
+        while self.running:
+            self.wake.wait(self.flush_interval)
+            self.wake.clear()
+            try:
+                self.flush()
+            except (OSError, ValueError) as e:
+                print(f"Autosave error: {e}")
+    
+    def close(self):
+        """Flush what is left and release the mapping."""
+        self.running = False
+        self.wake.set()
+        if self.thread is not None:
+            self.thread.join(timeout=2.0)
+            self.thread = None
+        self.flush()
+        
+        if self.tools is not None:
+            self.tools.listeners.remove(self.on_op)
+            self.tools = None
+        self.file.close()
+        
+        # Arrays still viewing the pages keep the mapping open until they go away
+        try:
+            self.map.close()
+        except BufferError:
+            pass
+        self.lock_file.close()
+
+
+def open_canvas_store(files, width, height, base_directory):
+    """
+    Open the autosave store described by the [File Settings] section.
+    
+    Args:
+        files: FileConfig
+        width: Canvas width
+        height: Canvas height
+        base_directory: Directory relative paths are resolved against
+    
+    Returns:
+        CanvasStore, or None when autosave is disabled or the file cannot be opened
+    """
+    if not files.autosave or not files.autosave_path:
+        return None
+    path = os.path.join(base_directory, files.autosave_path)
+    try:
+        return CanvasStore(path, width, height, flush_interval=files.autosave_interval)
+    except (OSError, ValueError) as e:
+        print(f"Autosave disabled: {e}")
+        return None
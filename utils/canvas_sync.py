@@ -0,0 +1,767 @@
+"""
+Canvas Sync Module
+Shares one board between several Air Canvas instances by exchanging the
+committed stroke operations instead of frames.
+
+One instance (or a standalone process) runs the hub; every instance joins it
+as a client. Messages are small binary packets:
+
+    header    magic b'GS', version, kind, sequence number, origin, timestamp, payload length
+    hello     JSON text (client: canvas size and name; hub: origin ID and whether it has ink)
+    ops       operation count, then per operation: kind, erase flag, BGR color,
+              thickness, point count, points as int16 quarter pixels and, for
+              polylines, one float32 width per point
+    snapshot  PNG of the board (premultiplied BGR plus the stroke mask as alpha)
+
+The hub gives every batch it accepts the next sequence number, applies it to
+its own copy of the board and forwards it to the other clients, so all
+instances apply remote strokes in the same order. A client joining late
+gets a snapshot of the board at some sequence number and then every batch
+after it. Run a standalone hub with:
+
+    python -m utils.canvas_sync --port 50719
+"""
+
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import json
+import socket
+import struct
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from utils.canvas_tools import OP_KINDS, StrokeOp, apply_op
+
+
+# magic, version, kind, seq, origin, timestamp, payload length
+SYNC_HEADER = struct.Struct('<2sBBIHdI')
+SYNC_MAGIC = b'GS'
+SYNC_VERSION = 1
+
+KIND_HELLO = 0
+KIND_OPS = 1
+KIND_SNAPSHOT = 2
+
+DEFAULT_SYNC_PORT = 50719
+
+# Per-operation header (kind by its index in OP_KINDS):
+# kind, erase, blue, green, red, thickness, point count
+OP_HEADER = struct.Struct('<BB3BBH')
+
+# Points travel in quarter pixels, the precision draw_op rasterizes at; widths
+# stay float32, since rounding them would change the rounded segment widths
+POINT_SCALE = 4
+
+
+def encode_packet(kind, seq, origin, payload, timestamp=None):
+    """
+    Frame a payload with the sync header.
+    
+    Args:
+        kind: KIND_HELLO, KIND_OPS or KIND_SNAPSHOT
+        seq: Hub sequence number (0 from clients)
+        origin: Origin ID of the instance that drew the content (0 = hub)
+        payload: Payload bytes
+        timestamp: Wall-clock time the content was drawn (defaults to time.time())
+    
+    Returns:
+        Packet bytes
+    """
+    timestamp = time.time() if timestamp is None else timestamp
+    return SYNC_HEADER.pack(SYNC_MAGIC, SYNC_VERSION, kind, seq & 0xFFFFFFFF, origin,
+                            timestamp, len(payload)) + payload
+
+
+def encode_ops(ops):
+    """
+    Payload of an ops packet.
+    
+    Args:
+        ops: List of StrokeOp
+    
+    Returns:
+        Payload bytes
+    """
+    parts = [struct.pack('<H', len(ops))]
+    for op in ops:
+        b, g, r = (min(255, max(0, int(c))) for c in op.color)
+        parts.append(OP_HEADER.pack(OP_KINDS.index(op.kind), op.erase, b, g, r,
+                                    min(255, int(op.thickness)), len(op.points)))
+        if op.points:
+            points = np.round(np.asarray(op.points, np.float64) * POINT_SCALE)
+            parts.append(np.clip(points, -32768, 32767).astype('<i2').tobytes())
+        if op.kind == 'polyline':
+            parts.append(np.asarray(op.widths, '<f4').tobytes())
+    return b''.join(parts)
+
+
+def decode_ops(payload):
+    """
+    Rebuild the operations of an ops packet.
+    
+    Args:
+        payload: Payload bytes from encode_ops()
+    
+    Returns:
+        List of StrokeOp
+    """
+    count = struct.unpack_from('<H', payload)[0]
+    offset = 2
+    ops = []
+    for _ in range(count):
+        kind, erase, b, g, r, thickness, point_count = OP_HEADER.unpack_from(payload, offset)
+        offset += OP_HEADER.size
+        points = np.frombuffer(payload, '<i2', point_count * 2, offset) / POINT_SCALE
+        offset += point_count * 4
+        widths = ()
+        if OP_KINDS[kind] == 'polyline':
+            widths = tuple(np.frombuffer(payload, '<f4', point_count, offset).tolist())
+            offset += point_count * 4
+        ops.append(StrokeOp(OP_KINDS[kind], tuple(map(tuple, points.reshape(-1, 2).tolist())),
+                            (b, g, r), thickness, bool(erase), widths))
+    return ops
+
+
+def encode_snapshot(canvas, mask):
+    """
+    Payload of a snapshot packet.
+    
+    Args:
+        canvas: Premultiplied BGR canvas
+        mask: Stroke mask
+    
+    Returns:
+        PNG bytes
+    """
+    bgra = cv2.cvtColor(canvas, cv2.COLOR_BGR2BGRA)
+    bgra[:, :, 3] = mask
+    success, png = cv2.imencode('.png', bgra, [cv2.IMWRITE_PNG_COMPRESSION, 1])
+    if not success:
+        raise ValueError("Could not encode the canvas snapshot")
+    return png.tobytes()
+
+
+def decode_snapshot(payload):
+    """
+    Split a snapshot payload back into canvas and mask.
+    
+    Returns:
+        Tuple (canvas, mask)
+    
+    Raises:
+        ValueError: If the payload is not a BGRA PNG
+    """
+    bgra = cv2.imdecode(np.frombuffer(payload, np.uint8), cv2.IMREAD_UNCHANGED)
+    if bgra is None or bgra.ndim != 3 or bgra.shape[2] != 4:
+        raise ValueError("Invalid canvas snapshot")
+    return np.ascontiguousarray(bgra[:, :, :3]), np.ascontiguousarray(bgra[:, :, 3])
+
+
+def decode_packets(buffer):
+    """
+    Split complete packets off the front of a byte buffer.
+    
+    Args:
+        buffer: Received bytes (a bytearray is consumed in place)
+    
+    Returns:
+        List of packet dictionaries with 'kind', 'seq', 'origin', 'timestamp',
+        the raw 'payload' and the decoded fields of that kind
+    
+    Raises:
+        ValueError: If the stream is not a canvas sync stream
+    """
+    packets = []
+    offset = 0
+    while len(buffer) - offset >= SYNC_HEADER.size:
+        magic, version, kind, seq, origin, timestamp, length = SYNC_HEADER.unpack_from(buffer, offset)
+        if magic != SYNC_MAGIC or version != SYNC_VERSION:
+            raise ValueError("Not a GestureMe canvas sync stream")
+        start = offset + SYNC_HEADER.size
+        if len(buffer) - start < length:
+            break
+        payload = bytes(buffer[start:start + length])
+        offset = start + length
+        
+        packet = {'kind': kind, 'seq': seq, 'origin': origin, 'timestamp': timestamp,
+                  'payload': payload}
+        if kind == KIND_HELLO:
+            packet.update(json.loads(payload.decode('utf-8')))
+        elif kind == KIND_OPS:
+            packet['ops'] = decode_ops(payload)
+        elif kind == KIND_SNAPSHOT:
+            packet['canvas'], packet['mask'] = decode_snapshot(payload)
+        packets.append(packet)
+    
+    if isinstance(buffer, bytearray):
+        del buffer[:offset]
+    return packets
+
+
+async def read_packets(reader, buffer):
+    """
+    Wait for at least one complete packet.
+    
+    Returns:
+        List of packets, empty when the connection closed
+    """
+    while True:
+        data = await reader.read(65536)
+        if not data:
+            return []
+        buffer += data
+        packets = decode_packets(buffer)
+        if packets:
+            return packets
+
+
+class SyncPeer:
+    """
+    One client connected to the hub.
+    
+    While its snapshot is being encoded, packets for it are held in pending
+    so they reach it after the snapshot they follow.
+    """
+    
+    def __init__(self, origin, writer, name=''):
+        """
+        Initialize the SyncPeer.
+        
+        Args:
+            origin: Origin ID assigned by the hub
+            writer: asyncio StreamWriter of the connection
+            name: Name the client sent in its hello
+        """
+        self.origin = origin
+        self.writer = writer
+        self.name = name
+        self.pending = None
+        self.sent_bytes = 0
+
+
+class CanvasSyncHub:
+    """
+    Orders, applies and forwards stroke batches from a background asyncio loop.
+    
+    The hub keeps its own board up to date by applying every batch, so a late
+    joiner gets one snapshot however long the session has run. A client that
+    stops reading is disconnected once max_buffer bytes are waiting for it;
+    it can join again and catch up from a snapshot.
+    """
+    
+    def __init__(self, width, height, host='127.0.0.1', port=DEFAULT_SYNC_PORT,
+                 max_buffer=8 * 1024 * 1024):
+        """
+        Initialize the CanvasSyncHub.
+        
+        Args:
+            width: Board width (every client must use the same canvas size)
+            height: Board height
+            host: Interface to listen on ('0.0.0.0' to accept other machines)
+            port: TCP port
+            max_buffer: Bytes queued for one client before it is dropped
+        """
+        self.width = width
+        self.height = height
+        self.host = host
+        self.port = port
+        self.max_buffer = max_buffer
+        
+        self.canvas = np.zeros((height, width, 3), np.uint8)
+        self.mask = np.zeros((height, width), np.uint8)
+        self.ink = False
+        
+        self.seq = 0
+        self.peers = {}
+        self.next_origin = 1
+        self.loop = None
+        self.server = None
+        self.thread = None
+        self.ready = threading.Event()
+        self.error = None
+        
+        # Statistics
+        self.received_bytes = 0
+        self.batches = 0
+    
+    @property
+    def address(self):
+        """Human-readable address clients connect to."""
+        return f"tcp://{self.host}:{self.port}"
+    
+    def start(self):
+        """
+        Start listening on a background thread.
+        
+        Raises:
+            OSError: If the address cannot be bound
+        """
+        self.thread = threading.Thread(target=self.run_loop, daemon=True)
+        self.thread.start()
+        self.ready.wait()
+        if self.error is not None:
+            raise self.error
+        print(f"Canvas sync hub listening on {self.address}")
+    
+    def run_loop(self):
+        """Body of the loop thread."""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.server = self.loop.run_until_complete(
+                asyncio.start_server(self.handle_peer, self.host, self.port))
+        except OSError as e:
+            self.error = e
+            self.ready.set()
+            return
+        for sock in self.server.sockets:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.ready.set()
+        self.loop.run_forever()
+        
+        # Shut down: close the listener and every client
+        self.server.close()
+        tasks = asyncio.all_tasks(self.loop)
+        for task in tasks:
+            task.cancel()
+        self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        self.loop.close()
+    
+    def hello_packet(self, origin=0, error=None):
+        """Hello sent in reply to a client's hello."""
+        info = {'width': self.width, 'height': self.height, 'origin': origin,
+                'ink': self.ink, 'peers': len(self.peers)}
+        if error is not None:
+            info['error'] = error
+        return encode_packet(KIND_HELLO, self.seq, 0, json.dumps(info).encode('utf-8'))
+    
+    async def handle_peer(self, reader, writer):
+        """Serve one client: hello, snapshot, then its batches until it leaves."""
+        buffer = bytearray()
+        peer = None
+        try:
+            packets = await read_packets(reader, buffer)
+            if not packets or packets[0]['kind'] != KIND_HELLO:
+                return
+            hello = packets[0]
+            if (hello.get('width'), hello.get('height')) != (self.width, self.height):
+                writer.write(self.hello_packet(error=f"the board is {self.width}x{self.height}"))
+                await writer.drain()
+                return
+            
+            peer = SyncPeer(self.next_origin, writer, hello.get('name', ''))
+            self.next_origin += 1
+            self.peers[peer.origin] = peer
+            writer.write(self.hello_packet(peer.origin))
+            print(f"Canvas sync: {peer.name or 'client'} joined as #{peer.origin} "
+                  f"({len(self.peers)} connected)")
+            
+            # The snapshot is taken at the current sequence number; batches
+            # accepted while it is encoded are held back until it is sent
+            if self.ink:
+                peer.pending = []
+                canvas, mask = self.canvas.copy(), self.mask.copy()
+                snapshot_seq = self.seq
+                payload = await self.loop.run_in_executor(None, encode_snapshot, canvas, mask)
+                writer.write(encode_packet(KIND_SNAPSHOT, snapshot_seq, 0, payload))
+                peer.sent_bytes += SYNC_HEADER.size + len(payload)
+                pending, peer.pending = peer.pending, None
+                for packet in pending:
+                    self.send(peer, packet)
+            
+            for packet in packets[1:]:
+                self.handle_packet(peer, packet)
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                self.received_bytes += len(data)
+                buffer += data
+                for packet in decode_packets(buffer):
+                    self.handle_packet(peer, packet)
+        except (ConnectionError, OSError, ValueError, asyncio.CancelledError):
+            # Client went away, sent garbage, or the hub is shutting down
+            pass
+        finally:
+            if peer is not None:
+                self.peers.pop(peer.origin, None)
+                print(f"Canvas sync: #{peer.origin} left ({len(self.peers)} connected)")
+            writer.close()
+    
+    def handle_packet(self, peer, packet):
+        """Apply a client's batch or snapshot to the board and forward it in order."""
+        kind = packet['kind']
+        if kind == KIND_OPS:
+            for op in packet['ops']:
+                apply_op(self.canvas, self.mask, op)
+                if op.kind == 'clear':
+                    self.ink = False
+                elif not op.erase:
+                    self.ink = True
+        elif kind == KIND_SNAPSHOT:
+            if packet['mask'].shape != self.mask.shape:
+                return
+            np.copyto(self.canvas, packet['canvas'])
+            np.copyto(self.mask, packet['mask'])
+            self.ink = True
+        else:
+            return
+        
+        self.seq += 1
+        self.batches += 1
+        forwarded = encode_packet(kind, self.seq, peer.origin, packet['payload'],
+                                  packet['timestamp'])
+        for other in list(self.peers.values()):
+            if other is not peer:
+                self.send(other, forwarded)
+    
+    def send(self, peer, packet):
+        """Queue a packet for a client, dropping clients that stopped reading."""
+        if peer.pending is not None:
+            peer.pending.append(packet)
+            return
+        if peer.writer.transport.get_write_buffer_size() > self.max_buffer:
+            print(f"Canvas sync: #{peer.origin} is not keeping up, disconnecting it")
+            peer.writer.close()
+            self.peers.pop(peer.origin, None)
+            return
+        peer.writer.write(packet)
+        peer.sent_bytes += len(packet)
+    
+    def stop(self):
+        """Disconnect all clients and stop the loop thread."""
+        if self.loop is None or not self.loop.is_running():
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=2.0)
+
+
+class CanvasSyncClient:
+    """
+    Connects a ToolEngine to a hub.
+    
+    Committed local operations are collected by a ToolEngine listener and
+    sent as one batch every batch_interval seconds from a background asyncio
+    loop. Remote batches are decoded on that loop and queued; the app applies
+    them on its own thread with apply_remote(), so the canvas is only ever
+    written from one thread. Local strokes show at once, remote ones in the
+    hub's order.
+    """
+    
+    def __init__(self, host='127.0.0.1', port=DEFAULT_SYNC_PORT, width=1280, height=720,
+                 name='', batch_interval=0.03):
+        """
+        Initialize the CanvasSyncClient.
+        
+        Args:
+            host: Hub address
+            port: Hub port
+            width: Canvas width
+            height: Canvas height
+            name: Name shown in the hub's log
+            batch_interval: Seconds local operations are collected before sending
+        """
+        self.host = host
+        self.port = port
+        self.width = width
+        self.height = height
+        self.name = name
+        self.batch_interval = batch_interval
+        
+        self.origin = None
+        self.online = False
+        self.last_seq = 0
+        
+        # Local operations waiting for the next batch, and when the oldest was drawn
+        self.lock = threading.Lock()
+        self.pending = []
+        self.pending_since = 0.0
+        self.flush_handle = None
+        
+        # Remote content waiting for the app thread; True while applying it
+        self.inbox = collections.deque()
+        self.applying = False
+        
+        self.tools = None
+        self.loop = None
+        self.thread = None
+        self.reader = None
+        self.writer = None
+        
+        # Hub run by this instance when hosting, stopped with the client
+        self.hub = None
+        
+        # Statistics
+        self.sent_bytes = 0
+        self.sent_ops = 0
+        self.sent_batches = 0
+        self.received_bytes = 0
+        self.received_ops = 0
+        self.latencies = collections.deque(maxlen=1000)
+    
+    def attach(self, tools):
+        """
+        Send the operations a ToolEngine commits.
+        
+        Args:
+            tools: ToolEngine of this instance
+        """
+        self.tools = tools
+        tools.listeners.append(self.on_op)
+    
+    def start(self, timeout=5.0):
+        """
+        Connect to the hub.
+        
+        Args:
+            timeout: Seconds to wait for the hub's hello
+        
+        Raises:
+            ConnectionError: If the hub cannot be reached or refuses the canvas
+        """
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.run_loop, daemon=True)
+        self.thread.start()
+        future = asyncio.run_coroutine_threadsafe(self.connect(), self.loop)
+        try:
+            future.result(timeout)
+        except (OSError, ValueError, concurrent.futures.TimeoutError) as e:
+            self.close()
+            raise ConnectionError(f"Could not join the canvas sync hub at "
+                                  f"{self.host}:{self.port}: {e or 'timed out'}") from e
+        print(f"Canvas sync: joined {self.host}:{self.port} as #{self.origin}")
+    
+    def run_loop(self):
+        """Body of the loop thread."""
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+        
+        # Shut down: stop reading and release the connection
+        tasks = asyncio.all_tasks(self.loop)
+        for task in tasks:
+            task.cancel()
+        self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        self.loop.close()
+    
+    async def connect(self):
+        """Exchange hellos with the hub and start reading from it."""
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.get_extra_info('socket').setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        hello = {'width': self.width, 'height': self.height, 'name': self.name}
+        self.writer.write(encode_packet(KIND_HELLO, 0, 0, json.dumps(hello).encode('utf-8')))
+        
+        buffer = bytearray()
+        packets = await read_packets(self.reader, buffer)
+        if not packets or packets[0]['kind'] != KIND_HELLO:
+            raise ConnectionError("the hub closed the connection")
+        reply = packets[0]
+        if 'error' in reply:
+            raise ValueError(reply['error'])
+        self.origin = reply['origin']
+        self.last_seq = reply['seq']
+        
+        # An empty board is seeded with this instance's drawing, if it has one.
+        # start() holds the app thread until the hello is done, so the board
+        # cannot change while it is encoded and nothing is batched before it
+        tools = self.tools
+        if not reply['ink'] and tools is not None and tools.ink_bbox is not None:
+            payload = encode_snapshot(tools.canvas, tools.mask)
+            packet = encode_packet(KIND_SNAPSHOT, 0, self.origin, payload)
+            self.writer.write(packet)
+            self.sent_bytes += len(packet)
+        self.online = True
+        for packet in packets[1:]:
+            self.receive(packet)
+        asyncio.ensure_future(self.read_loop(buffer))
+    
+    async def read_loop(self, buffer):
+        """Queue everything the hub sends until it goes away."""
+        try:
+            while True:
+                data = await self.reader.read(65536)
+                if not data:
+                    break
+                self.received_bytes += len(data)
+                buffer += data
+                for packet in decode_packets(buffer):
+                    self.receive(packet)
+        except (ConnectionError, OSError, ValueError, asyncio.CancelledError):
+            pass
+        finally:
+            if self.online:
+                print("Canvas sync: lost the connection to the hub, drawing locally")
+            self.online = False
+            self.writer.close()
+    
+    def receive(self, packet):
+        """Queue a packet from the hub for the app thread (runs on the loop thread)."""
+        # Content already covered by a snapshot, or out of order; the join
+        # snapshot carries the sequence number the hello announced
+        if packet['seq'] < self.last_seq or (packet['seq'] == self.last_seq
+                                             and packet['kind'] != KIND_SNAPSHOT):
+            return
+        self.last_seq = packet['seq']
+        if packet['kind'] == KIND_OPS:
+            self.received_ops += len(packet['ops'])
+            self.latencies.append(time.time() - packet['timestamp'])
+            self.inbox.append(('ops', packet['ops']))
+        elif packet['kind'] == KIND_SNAPSHOT:
+            self.inbox.append(('snapshot', packet['canvas'], packet['mask']))
+    
+    def on_op(self, op):
+        """ToolEngine listener: queue a local operation for the next batch."""
+        if self.applying or not self.online:
+            return
+        with self.lock:
+            first = not self.pending
+            if first:
+                self.pending_since = time.time()
+            self.pending.append(op)
+        if first:
+            self.loop.call_soon_threadsafe(self.schedule_flush)
+    
+    def schedule_flush(self):
+        """Send the pending batch after batch_interval (runs on the loop thread)."""
+        if self.flush_handle is None:
+            self.flush_handle = self.loop.call_later(self.batch_interval, self.flush)
+    
+    def flush(self):
+        """Send all pending operations as one batch (runs on the loop thread)."""
+        self.flush_handle = None
+        with self.lock:
+            ops, self.pending = self.pending, []
+            since = self.pending_since
+        if not ops or not self.online:
+            return
+        packet = encode_packet(KIND_OPS, 0, self.origin, encode_ops(ops), since)
+        self.writer.write(packet)
+        self.sent_bytes += len(packet)
+        self.sent_ops += len(ops)
+        self.sent_batches += 1
+    
+    def apply_remote(self, tools):
+        """
+        Apply what arrived from the hub since the last call.
+        
+        Call once per frame from the thread that draws. Remote operations go
+        through ToolEngine.apply, so other listeners (autosave, stroke logs)
+        see them too; this client does not send them back.
+        
+        Args:
+            tools: ToolEngine of this instance
+        
+        Returns:
+            Number of operations and snapshots applied
+        """
+        applied = 0
+        self.applying = True
+        try:
+            while self.inbox:
+                item = self.inbox.popleft()
+                if item[0] == 'ops':
+                    for op in item[1]:
+                        tools.apply(op)
+                    applied += len(item[1])
+                elif item[0] == 'snapshot':
+                    tools.load_snapshot(item[1], item[2])
+                    applied += 1
+        finally:
+            self.applying = False
+        return applied
+    
+    def stats(self):
+        """
+        Traffic and latency statistics.
+        
+        Returns:
+            Dictionary with byte and operation counts and latency percentiles in ms
+        """
+        latencies = np.array(self.latencies) * 1000
+        return {'sent_bytes': self.sent_bytes, 'sent_ops': self.sent_ops,
+                'sent_batches': self.sent_batches, 'received_bytes': self.received_bytes,
+                'received_ops': self.received_ops,
+                'latency_p50': float(np.percentile(latencies, 50)) if len(latencies) else float('nan'),
+                'latency_p99': float(np.percentile(latencies, 99)) if len(latencies) else float('nan')}
+    
+    def close(self):
+        """Send what is pending, disconnect and stop the hub if this instance hosts it."""
+        if self.loop is not None and self.loop.is_running():
+            def shutdown():
+                self.flush()
+                self.online = False
+                if self.writer is not None:
+                    self.writer.close()
+                self.loop.stop()
+            self.loop.call_soon_threadsafe(shutdown)
+            self.thread.join(timeout=2.0)
+        if self.hub is not None:
+            self.hub.stop()
+            self.hub = None
+
+
+def open_canvas_sync(sync, tools):
+    """
+    Join (or host and join) the board described by the [Canvas Sync] section.
+    
+    Args:
+        sync: SyncConfig
+        tools: ToolEngine whose operations are shared
+    
+    Returns:
+        Connected CanvasSyncClient, or None when sync is off or the hub cannot be reached
+    """
+    if sync.mode not in ('host', 'join'):
+        return None
+    
+    hub = None
+    host = sync.host
+    if sync.mode == 'host':
+        hub = CanvasSyncHub(tools.width, tools.height, sync.host, sync.port)
+        try:
+            hub.start()
+        except OSError as e:
+            print(f"Canvas sync disabled: cannot listen on {hub.address}: {e}")
+            return None
+        if host in ('0.0.0.0', ''):
+            host = '127.0.0.1'
+    
+    client = CanvasSyncClient(host, sync.port, tools.width, tools.height,
+                              sync.name or socket.gethostname(), sync.batch_interval)
+    client.hub = hub
+    client.attach(tools)
+    try:
+        client.start()
+    except ConnectionError as e:
+        print(f"Canvas sync disabled: {e}")
+        tools.listeners.remove(client.on_op)
+        return None
+    return client
+
+
+def main():
+    """Run a standalone hub."""
+    parser = argparse.ArgumentParser(description="Canvas sync hub for Air Canvas")
+    parser.add_argument('--host', default='0.0.0.0', help="Interface to listen on")
+    parser.add_argument('--port', type=int, default=DEFAULT_SYNC_PORT, help="TCP port")
+    parser.add_argument('--width', type=int, default=1280, help="Board width")
+    parser.add_argument('--height', type=int, default=720, help="Board height")
+    args = parser.parse_args()
+    
+    hub = CanvasSyncHub(args.width, args.height, args.host, args.port)
+    hub.start()
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        hub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,399 @@
+"""
+Canvas Tools Module
+Drawing tools for Air Canvas with incremental canvas and stroke mask updates.
+"""
+
+import math
+from dataclasses import asdict, dataclass
+
+import cv2
+import numpy as np
+
+from utils.frame_buffers import FramePool
+from utils.stroke_builder import StrokeBuilder
+
+
+TOOLS = ('brush', 'eraser', 'line', 'rect', 'circle')
+SHAPE_TOOLS = ('line', 'rect', 'circle')
+
+# Every StrokeOp kind, in the order binary formats number them
+OP_KINDS = ('segment', 'polyline', 'line', 'rect', 'circle', 'clear', 'snapshot')
+
+
+@dataclass
+class StrokeOp:
+    """
+    One committed drawing operation.
+    
+    kind is 'segment' (straight freehand piece), 'polyline' (interpolated
+    freehand piece), 'line', 'rect', 'circle', 'clear' or 'snapshot' (the
+    whole canvas was replaced, see ToolEngine.load_snapshot; it carries no
+    pixels, listeners read them from the canvas). points holds the
+    segment/line ends, rectangle corners, circle center and a point on its edge,
+    or every polyline point. A polyline has one width per point in widths.
+    """
+    kind: str
+    points: tuple = ()
+    color: tuple = (255, 0, 255)
+    thickness: int = 15
+    erase: bool = False
+    widths: tuple = ()
+    
+    def bbox(self, width, height):
+        """
+        Pixel region the operation can touch.
+        
+        Args:
+            width: Canvas width
+            height: Canvas height
+        
+        Returns:
+            (x1, y1, x2, y2) clipped to the canvas (exclusive end), or None if empty
+        """
+        if self.kind in ('clear', 'snapshot'):
+            return (0, 0, width, height)
+        pad = int(max(self.widths, default=self.thickness)) // 2 + 2
+        if self.kind == 'circle':
+            (ax, ay), _ = self.points
+            radius = circle_radius(self.points)
+            x1, y1, x2, y2 = ax - radius, ay - radius, ax + radius, ay + radius
+        else:
+            xs = [point[0] for point in self.points]
+            ys = [point[1] for point in self.points]
+            x1, x2 = int(min(xs)), int(math.ceil(max(xs)))
+            y1, y2 = int(min(ys)), int(math.ceil(max(ys)))
+        x1, y1 = max(0, x1 - pad), max(0, y1 - pad)
+        x2, y2 = min(width, x2 + pad + 1), min(height, y2 + pad + 1)
+        if x1 >= x2 or y1 >= y2:
+            return None
+        return (x1, y1, x2, y2)
+    
+    def to_dict(self):
+        """Plain-data form of the operation, for logs and the network."""
+        return asdict(self)
+    
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Rebuild an operation from to_dict() output (lists are turned back into tuples).
+        
+        Args:
+            data: Dictionary with StrokeOp fields
+        
+        Returns:
+            StrokeOp instance
+        """
+        return cls(kind=data['kind'],
+                   points=tuple(tuple(point) for point in data.get('points', ())),
+                   color=tuple(data.get('color', (255, 0, 255))),
+                   thickness=data.get('thickness', 15),
+                   erase=data.get('erase', False),
+                   widths=tuple(data.get('widths', ())))
+
+
+def circle_radius(points):
+    """Radius of a circle given its center and a point on its edge."""
+    (ax, ay), (bx, by) = points
+    return int(round(np.hypot(bx - ax, by - ay)))
+
+
+# Fractional bits for sub-pixel anti-aliased drawing
+SHIFT = 2
+
+
+def draw_op(img, op, color, offset=(0, 0)):
+    """
+    Rasterize an operation with the given color, anti-aliased.
+    
+    Args:
+        img: Target image (canvas, mask or a preview layer)
+        op: StrokeOp to draw
+        color: Color or mask value to draw with
+        offset: (x, y) subtracted from the points, for drawing into a region
+    """
+    scale = 1 << SHIFT
+    ox, oy = offset
+    points = [(int(round((x - ox) * scale)), int(round((y - oy) * scale))) for x, y in op.points]
+    if op.kind == 'polyline':
+        for i in range(len(points) - 1):
+            width = max(1, int(round((op.widths[i] + op.widths[i + 1]) / 2)))
+            cv2.line(img, points[i], points[i + 1], color, width, cv2.LINE_AA, SHIFT)
+    elif op.kind in ('segment', 'line'):
+        cv2.line(img, points[0], points[1], color, op.thickness, cv2.LINE_AA, SHIFT)
+    elif op.kind == 'rect':
+        cv2.rectangle(img, points[0], points[1], color, op.thickness, cv2.LINE_AA, SHIFT)
+    elif op.kind == 'circle':
+        cv2.circle(img, points[0], circle_radius(op.points) * scale, color, op.thickness,
+                   cv2.LINE_AA, SHIFT)
+
+
+def mask_bbox(mask):
+    """
+    Bounding box of the inked pixels of a stroke mask.
+    
+    Args:
+        mask: Single-channel stroke mask
+    
+    Returns:
+        (x1, y1, x2, y2) with exclusive end, or None if the mask is empty
+    """
+    rows = np.flatnonzero(mask.any(axis=1))
+    if len(rows) == 0:
+        return None
+    cols = np.flatnonzero(mask[rows[0]:rows[-1] + 1].any(axis=0))
+    return (int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1)
+
+
+def apply_op(canvas, mask, op):
+    """
+    Commit an operation to the canvas and its stroke mask.
+    
+    Drawing happens on views of the operation's bounding box, so the cost follows
+    its footprint rather than the canvas size. The mask is the ink coverage
+    (alpha) and the canvas holds the color premultiplied by it, which is what
+    anti-aliased drawing onto black produces.
+    
+    Args:
+        canvas: BGR canvas image
+        mask: Single-channel stroke mask (255 where the canvas has ink)
+        op: StrokeOp to apply
+    
+    Returns:
+        Bounding box (x1, y1, x2, y2) of the changed region, or None
+    """
+    if op.kind == 'clear':
+        canvas[:] = 0
+        mask[:] = 0
+        return (0, 0, canvas.shape[1], canvas.shape[0])
+    if op.kind == 'snapshot':
+        # The pixels were loaded before the operation was committed
+        return (0, 0, canvas.shape[1], canvas.shape[0])
+    
+    bbox = op.bbox(canvas.shape[1], canvas.shape[0])
+    if bbox is None:
+        return None
+    x1, y1, x2, y2 = bbox
+    canvas_roi = canvas[y1:y2, x1:x2]
+    mask_roi = mask[y1:y2, x1:x2]
+    if op.erase:
+        draw_op(canvas_roi, op, (0, 0, 0), offset=(x1, y1))
+        draw_op(mask_roi, op, 0, offset=(x1, y1))
+    else:
+        draw_op(canvas_roi, op, op.color, offset=(x1, y1))
+        draw_op(mask_roi, op, 255, offset=(x1, y1))
+    return bbox
+
+
+class ToolEngine:
+    """
+    Holds the canvas, its stroke mask and the active tool.
+    
+    Brush and eraser commit an interpolated piece of stroke on every move;
+    shape tools show a rubber-band preview until the pen lifts and then commit
+    once.
+    """
+    
+    def __init__(self, width, height, brush_thickness=15, eraser_thickness=50,
+                 stroke_smoothing=0.3, min_width_scale=0.5, canvas=None, mask=None):
+        """
+        Initialize the ToolEngine with an empty canvas.
+        
+        Args:
+            width: Canvas width
+            height: Canvas height
+            brush_thickness: Initial brush and shape thickness
+            eraser_thickness: Eraser thickness
+            stroke_smoothing: Smoothing of freehand fingertip samples (0 = raw)
+            min_width_scale: Brush width factor when drawing fast (1.0 = constant)
+            canvas: Existing (height, width, 3) canvas to draw into (e.g. a CanvasStore's)
+            mask: Existing (height, width) stroke mask belonging to canvas
+        """
+        self.width = width
+        self.height = height
+        self.canvas = canvas if canvas is not None else np.zeros((height, width, 3), np.uint8)
+        self.mask = mask if mask is not None else np.zeros((height, width), np.uint8)
+        
+        self.tool = 'brush'
+        self.color = (255, 0, 255)
+        self.brush_thickness = brush_thickness
+        self.eraser_thickness = eraser_thickness
+        
+        # Pen state: stroke interpolation for freehand tools, anchor and end for shapes
+        self.stroke = StrokeBuilder(smoothing=stroke_smoothing, min_width_scale=min_width_scale)
+        self.anchor = None
+        self.preview_end = None
+        
+        # Region of the canvas that may hold ink, so compositing can skip the rest
+        self.ink_bbox = None
+        
+        # Callables receiving every committed StrokeOp (e.g. stroke recorders)
+        self.listeners = []
+        
+        # Scratch layer for previews, used only over the preview's bounding box
+        self.buffers = FramePool()
+    
+    def set_tool(self, tool):
+        """
+        Switch tools, dropping any unfinished shape.
+        
+        Args:
+            tool: One of TOOLS
+        """
+        if tool not in TOOLS:
+            raise ValueError(f"Unknown tool: {tool}")
+        self.lift(commit=False)
+        self.tool = tool
+    
+    def current_thickness(self):
+        """Thickness the active tool draws with."""
+        return self.eraser_thickness if self.tool == 'eraser' else self.brush_thickness
+    
+    def make_op(self, kind, start, end):
+        """Build a StrokeOp for the active tool, color and thickness."""
+        return StrokeOp(kind, (tuple(start), tuple(end)), self.color,
+                        self.current_thickness(), erase=self.tool == 'eraser')
+    
+    def apply(self, op):
+        """
+        Commit an operation.
+        
+        Args:
+            op: StrokeOp
+        
+        Returns:
+            Bounding box of the changed region, or None
+        """
+        bbox = apply_op(self.canvas, self.mask, op)
+        for listener in self.listeners:
+            listener(op)
+        if op.kind == 'clear':
+            self.ink_bbox = None
+        elif op.kind == 'snapshot':
+            self.ink_bbox = mask_bbox(self.mask)
+        elif bbox is not None and not op.erase:
+            if self.ink_bbox is None:
+                self.ink_bbox = bbox
+            else:
+                x1, y1, x2, y2 = self.ink_bbox
+                self.ink_bbox = (min(x1, bbox[0]), min(y1, bbox[1]),
+                                 max(x2, bbox[2]), max(y2, bbox[3]))
+        return bbox
+    
+    def apply_piece(self, piece):
+        """Commit a (points, widths) piece from the stroke builder as a polyline."""
+        if piece is None:
+            return None
+        points, widths = piece
+        op = StrokeOp('polyline', points, self.color, self.current_thickness(),
+                      erase=self.tool == 'eraser', widths=widths)
+        return self.apply(op)
+    
+    def move(self, point, timestamp=None):
+        """
+        Move the pen while it is down.
+        
+        Args:
+            point: (x, y) canvas position
+            timestamp: Time of the sample, for speed-dependent brush width
+        
+        Returns:
+            Bounding box changed on the canvas, or None
+        """
+        if self.tool in SHAPE_TOOLS:
+            if self.anchor is None:
+                self.anchor = point
+            self.preview_end = point
+            return None
+        
+        # The eraser keeps a constant width whatever the speed
+        piece = self.stroke.add_point(point, self.current_thickness(), timestamp,
+                                      dynamic_width=self.tool != 'eraser')
+        return self.apply_piece(piece)
+    
+    def lift(self, commit=True):
+        """
+        Lift the pen, committing a shape in progress.
+        
+        Args:
+            commit: False to discard an unfinished shape
+        
+        Returns:
+            Bounding box changed on the canvas, or None
+        """
+        bbox = None
+        if commit and self.anchor is not None and self.preview_end != self.anchor:
+            bbox = self.apply(self.make_op(self.tool, self.anchor, self.preview_end))
+        piece = self.stroke.finish()
+        if commit:
+            bbox = self.apply_piece(piece) or bbox
+        self.anchor = None
+        self.preview_end = None
+        return bbox
+    
+    def clear(self):
+        """Erase the whole canvas in place."""
+        self.lift(commit=False)
+        self.apply(StrokeOp('clear'))
+    
+    def load_snapshot(self, canvas, mask):
+        """
+        Replace the whole canvas, e.g. with a shared board's current state.
+        
+        The pixels are copied in place and a 'snapshot' operation is
+        committed, so listeners (autosave, stroke logs) pick up the new content.
+        
+        Args:
+            canvas: (height, width, 3) canvas to copy
+            mask: (height, width) stroke mask belonging to canvas
+        """
+        self.lift(commit=False)
+        np.copyto(self.canvas, canvas)
+        np.copyto(self.mask, mask)
+        self.apply(StrokeOp('snapshot'))
+    
+    def composite(self, img):
+        """
+        Overlay the canvas and any shape preview onto a frame.
+        
+        The canvas is alpha-blended through the mask (frame * (1 - alpha) +
+        premultiplied canvas), only over the region that has held ink.
+        
+        Args:
+            img: Camera frame the same size as the canvas (modified in place)
+        
+        Returns:
+            The frame
+        """
+        if self.ink_bbox is not None:
+            x1, y1, x2, y2 = self.ink_bbox
+            roi = img[y1:y2, x1:x2]
+            inverse_alpha = self.buffers.like('alpha', img)[:y2 - y1, :x2 - x1]
+            cv2.cvtColor(self.mask[y1:y2, x1:x2], cv2.COLOR_GRAY2BGR, dst=inverse_alpha)
+            cv2.bitwise_not(inverse_alpha, dst=inverse_alpha)
+            cv2.multiply(roi, inverse_alpha, dst=roi, scale=1 / 255)
+            cv2.add(roi, self.canvas[y1:y2, x1:x2], dst=roi)
+        self.draw_preview(img)
+        return img
+    
+    def draw_preview(self, img):
+        """
+        Blend the rubber-band shape into the frame.
+        
+        The shape is drawn into a scratch layer the size of its bounding box and
+        blended back over just that region.
+        
+        Args:
+            img: Frame to draw on
+        """
+        if self.anchor is None or self.preview_end is None:
+            return
+        op = self.make_op(self.tool, self.anchor, self.preview_end)
+        bbox = op.bbox(self.width, self.height)
+        if bbox is None:
+            return
+        x1, y1, x2, y2 = bbox
+        roi = img[y1:y2, x1:x2]
+        layer = self.buffers.like('preview', img)[:y2 - y1, :x2 - x1]
+        layer[:] = roi
+        draw_op(layer, op, op.color, offset=(x1, y1))
+        cv2.addWeighted(layer, 0.6, roi, 0.4, 0, dst=roi)
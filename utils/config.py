@@ -0,0 +1,435 @@
+"""
+Config Module
+Typed access to config.ini with file-watch based live reload.
+"""
+
+import configparser
+import os
+import threading
+import time
+from dataclasses import dataclass, field, fields, replace
+
+
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                   'config.ini')
+
+
+@dataclass
+class CameraConfig:
+    """[Camera Settings] section."""
+    camera_index: int = 0
+    canvas_width: int = 1280
+    canvas_height: int = 720
+
+
+@dataclass
+class DetectionConfig:
+    """[Hand Detection] section."""
+    max_hands: int = 1
+    detection_confidence: float = 0.8
+    tracking_confidence: float = 0.7
+    backend: str = 'solution'
+    model_path: str = 'models/hand_landmarker.task'
+    num_threads: int = 0
+
+
+@dataclass
+class DrawingConfig:
+    """[Drawing Settings] section."""
+    brush_thickness: int = 15
+    eraser_thickness: int = 50
+    min_brush_thickness: int = 4
+    max_brush_thickness: int = 60
+    sizing_hold: float = 0.3
+    stroke_smoothing: float = 0.3
+    fast_stroke_width: float = 0.5
+    default_color_b: int = 255
+    default_color_g: int = 0
+    default_color_r: int = 255
+    
+    @property
+    def default_color(self):
+        """Default brush color as a BGR tuple."""
+        return (self.default_color_b, self.default_color_g, self.default_color_r)
+
+
+@dataclass
+class UIConfig:
+    """[UI Settings] section."""
+    header_height: int = 120
+    button_width: int = 130
+    button_height: int = 50
+    button_margin: int = 15
+    button_top: int = 70
+    buttons_start_x: int = 250
+    button_dwell: float = 0.2
+    button_activation: str = 'tap'
+
+
+@dataclass
+class PerformanceConfig:
+    """[Performance] section."""
+    show_fps: bool = True
+    mirror_mode: bool = True
+    inference_width: int = 0
+    inference_height: int = 0
+    target_fps: int = 30
+    frame_skip: int = 0
+    threading_mode: str = 'sync'
+    instrumentation: bool = False
+    debug_allocations: bool = False
+    landmark_detail: str = 'full'
+    profile_interval: float = 0.01
+    profile_max_overhead: float = 0.02
+    profile_directory: str = 'profiles'
+    
+    @property
+    def inference_size(self):
+        """(width, height) used for hand inference, or None for the full frame."""
+        if self.inference_width > 0 and self.inference_height > 0:
+            return (self.inference_width, self.inference_height)
+        return None
+
+
+@dataclass
+class GovernorConfig:
+    """[Adaptive Quality] section."""
+    enabled: bool = True
+    min_inference_width: int = 320
+    max_frame_skip: int = 2
+    max_smoothing: float = 0.6
+    degrade_load: float = 0.9
+    recover_load: float = 0.6
+    hold_frames: int = 15
+    cooldown: float = 2.0
+
+
+@dataclass
+class PresenceConfig:
+    """[Presence Gate] section."""
+    enabled: bool = True
+    width: int = 160
+    motion_threshold: float = 0.002
+    full_check_interval: float = 1.0
+    hold_time: float = 2.0
+
+
+@dataclass
+class RecordingConfig:
+    """[Recording] section."""
+    directory: str = 'recordings'
+    mode: str = 'video'
+    fps: float = 15.0
+    playback_fps: float = 0.0
+    scale: float = 0.5
+    queue_size: int = 8
+    codec: str = 'mp4v'
+    container: str = 'mp4'
+    stroke_format: str = 'binary'
+    stroke_tolerance: float = 0.25
+
+
+@dataclass
+class EventStreamConfig:
+    """[Event Stream] section."""
+    transport: str = 'tcp'
+    host: str = '127.0.0.1'
+    port: int = 50718
+    unix_path: str = '/tmp/gestureme_events.sock'
+    landmarks: bool = True
+    landmark_fps: float = 0.0
+    max_queued_events: int = 64
+
+
+@dataclass
+class GestureConfig:
+    """[Gestures] section."""
+    swipe_threshold: float = 1.1
+    pinch_threshold: float = 0.3
+    top_zone: float = 0.33
+    bottom_zone: float = 0.67
+    calibration_file: str = 'calibration/gesture_profile.json'
+    tap_speed: float = 2.0
+    tap_travel: float = 0.2
+
+
+@dataclass
+class BindingsConfig:
+    """[Gesture Bindings] section."""
+    music_controller: str = 'media'
+    sequence_timeout: float = 1.5
+    
+    def profile_names(self, app):
+        """Profiles listed for an app, in switching order."""
+        return [name.strip() for name in getattr(self, app, '').split(',') if name.strip()]
+
+
+@dataclass
+class FileConfig:
+    """[File Settings] section."""
+    save_directory: str = 'saved_drawings'
+    save_format: str = 'png'
+    autosave: bool = True
+    autosave_path: str = 'saved_drawings/.autosave.canvas'
+    autosave_interval: float = 1.0
+
+
+@dataclass
+class LauncherConfig:
+    """[Launcher] section."""
+    sample_interval: float = 1.0
+    max_restarts: int = 3
+    restart_backoff: float = 2.0
+    max_backoff: float = 30.0
+    telemetry_log: str = 'logs/telemetry.csv'
+
+
+@dataclass
+class SyncConfig:
+    """[Canvas Sync] section."""
+    mode: str = 'off'
+    host: str = '127.0.0.1'
+    port: int = 50719
+    name: str = ''
+    batch_interval: float = 0.03
+
+
+@dataclass
+class AppConfig:
+    """Complete application configuration."""
+    camera: CameraConfig = field(default_factory=CameraConfig)
+    detection: DetectionConfig = field(default_factory=DetectionConfig)
+    drawing: DrawingConfig = field(default_factory=DrawingConfig)
+    ui: UIConfig = field(default_factory=UIConfig)
+    performance: PerformanceConfig = field(default_factory=PerformanceConfig)
+    governor: GovernorConfig = field(default_factory=GovernorConfig)
+    presence: PresenceConfig = field(default_factory=PresenceConfig)
+    recording: RecordingConfig = field(default_factory=RecordingConfig)
+    events: EventStreamConfig = field(default_factory=EventStreamConfig)
+    gestures: GestureConfig = field(default_factory=GestureConfig)
+    bindings: BindingsConfig = field(default_factory=BindingsConfig)
+    files: FileConfig = field(default_factory=FileConfig)
+    launcher: LauncherConfig = field(default_factory=LauncherConfig)
+    sync: SyncConfig = field(default_factory=SyncConfig)
+    
+    # Gesture binding profiles: name -> {gesture pattern: action}, from [Profile: name]
+    profiles: dict = field(default_factory=dict)
+
+
+# Attribute name on AppConfig -> section name in config.ini
+SECTIONS = {
+    'camera': 'Camera Settings',
+    'detection': 'Hand Detection',
+    'drawing': 'Drawing Settings',
+    'ui': 'UI Settings',
+    'performance': 'Performance',
+    'governor': 'Adaptive Quality',
+    'presence': 'Presence Gate',
+    'recording': 'Recording',
+    'events': 'Event Stream',
+    'gestures': 'Gestures',
+    'bindings': 'Gesture Bindings',
+    'files': 'File Settings',
+    'launcher': 'Launcher',
+    'sync': 'Canvas Sync',
+}
+
+# Sections holding gesture binding profiles, e.g. [Profile: media]
+PROFILE_PREFIX = 'Profile:'
+
+# Settings that need the camera or the hand model to be recreated
+RESTART_REQUIRED = {
+    'camera.camera_index', 'camera.canvas_width', 'camera.canvas_height',
+    'detection.max_hands', 'detection.detection_confidence', 'detection.tracking_confidence',
+    'detection.backend', 'detection.model_path', 'detection.num_threads',
+    'files.autosave', 'files.autosave_path',
+    'sync.mode', 'sync.host', 'sync.port', 'sync.name',
+    'events.transport', 'events.host', 'events.port', 'events.unix_path',
+}
+
+
+def parse_section(parser, section_name, section):
+    """
+    Read one ini section into a section dataclass.
+    
+    Args:
+        parser: ConfigParser with the file loaded
+        section_name: Name of the ini section
+        section: Dataclass instance holding the defaults
+    
+    Returns:
+        New dataclass instance with values from the file
+    """
+    if not parser.has_section(section_name):
+        return section
+    
+    values = {}
+    for item in fields(section):
+        if not parser.has_option(section_name, item.name):
+            continue
+        try:
+            if item.type in (bool, 'bool'):
+                values[item.name] = parser.getboolean(section_name, item.name)
+            elif item.type in (int, 'int'):
+                values[item.name] = parser.getint(section_name, item.name)
+            elif item.type in (float, 'float'):
+                values[item.name] = parser.getfloat(section_name, item.name)
+            else:
+                values[item.name] = parser.get(section_name, item.name).strip()
+        except ValueError as e:
+            print(f"Config: ignoring invalid [{section_name}] {item.name}: {e}")
+    return replace(section, **values)
+
+
+def load_config(path=DEFAULT_CONFIG_PATH):
+    """
+    Load the configuration file.
+    
+    Missing files, sections or keys fall back to the defaults above, and so
+    does a file that cannot be parsed at all (with a warning).
+    
+    Args:
+        path: Path to the ini file
+    
+    Returns:
+        AppConfig instance
+    """
+    try:
+        return read_config(path)
+    except (configparser.Error, ValueError) as e:
+        print(f"Config: cannot read {path}, using the defaults: {e}")
+        return AppConfig()
+
+
+def read_config(path=DEFAULT_CONFIG_PATH):
+    """
+    Load the configuration file, raising on a malformed one.
+    
+    Args:
+        path: Path to the ini file
+    
+    Returns:
+        AppConfig instance
+    
+    Raises:
+        configparser.Error: If the file is not valid ini (e.g. a repeated key)
+        ValueError: If the file is not valid UTF-8
+    """
+    config = AppConfig()
+    # No interpolation, so a literal '%' (e.g. in a path) is just a character
+    parser = configparser.ConfigParser(interpolation=None)
+    if not parser.read(path, encoding='utf-8'):
+        return config
+    
+    for attr, section_name in SECTIONS.items():
+        setattr(config, attr, parse_section(parser, section_name, getattr(config, attr)))
+    
+    # Binding profiles keep the order of the file, which is also their display order
+    for section_name in parser.sections():
+        if section_name.startswith(PROFILE_PREFIX):
+            name = section_name[len(PROFILE_PREFIX):].strip()
+            config.profiles[name] = dict(parser.items(section_name))
+    return config
+
+
+def diff_configs(old, new):
+    """
+    List the settings that differ between two configurations.
+    
+    Args:
+        old: Previous AppConfig
+        new: New AppConfig
+    
+    Returns:
+        Set of 'section.key' names
+    """
+    changed = set()
+    for attr in SECTIONS:
+        old_section, new_section = getattr(old, attr), getattr(new, attr)
+        for item in fields(old_section):
+            if getattr(old_section, item.name) != getattr(new_section, item.name):
+                changed.add(f"{attr}.{item.name}")
+    for name in set(old.profiles) | set(new.profiles):
+        if old.profiles.get(name) != new.profiles.get(name):
+            changed.add(f"profiles.{name}")
+    return changed
+
+
+class ConfigWatcher:
+    """
+    Watches the configuration file and hands reloaded configs to the main loop.
+    
+    The file is polled on a background thread; the main loop calls poll() once
+    per frame, so changes are applied on the thread that owns the camera and UI.
+    """
+    
+    def __init__(self, config, path=DEFAULT_CONFIG_PATH, interval=1.0):
+        """
+        Initialize the ConfigWatcher.
+        
+        Args:
+            config: Currently applied AppConfig
+            path: Path to the ini file
+            interval: Seconds between file checks
+        """
+        self.config = config
+        self.path = path
+        self.interval = interval
+        self.pending = None
+        self.lock = threading.Lock()
+        self.running = True
+        self.last_mtime = self.get_mtime()
+        threading.Thread(target=self.watch, daemon=True).start()
+    
+    def get_mtime(self):
+        """Modification time of the config file (None if missing)."""
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return None
+    
+    def watch(self):
+        """Reload the file whenever its modification time changes."""
+        while self.running:
+            time.sleep(self.interval)
+            mtime = self.get_mtime()
+            if mtime is None or mtime == self.last_mtime:
+                continue
+            self.last_mtime = mtime
+            try:
+                new_config = read_config(self.path)
+            except (configparser.Error, ValueError) as e:
+                # Keep watching: the next save may fix the file
+                print(f"Config: ignoring the edit of {self.path}, keeping the previous settings: {e}")
+                continue
+            with self.lock:
+                self.pending = new_config
+    
+    def poll(self):
+        """
+        Take a reloaded configuration if one is waiting.
+        
+        Returns:
+            Tuple (new_config, changed_keys) or None if nothing changed
+        """
+        if self.pending is None:
+            return None
+        with self.lock:
+            new_config, self.pending = self.pending, None
+        
+        changed = diff_configs(self.config, new_config)
+        self.config = new_config
+        if not changed:
+            return None
+        
+        needs_restart = sorted(changed & RESTART_REQUIRED)
+        if needs_restart:
+            print(f"Config: restart required to apply {', '.join(needs_restart)}")
+        live = sorted(changed - RESTART_REQUIRED)
+        if live:
+            print(f"Config reloaded: {', '.join(live)}")
+        return new_config, changed
+    
+    def stop(self):
+        """Stop watching the file."""
+        self.running = False
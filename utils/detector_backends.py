@@ -0,0 +1,326 @@
+"""
+Detector Backends Module
+Hand landmark inference engines behind one interface, so HandDetector can run
+either the legacy Mediapipe solution or the Mediapipe Tasks HandLandmarker, or
+play synthetic hands for load tests without a camera or a model.
+
+The Tasks backends need the hand landmarker model bundle:
+
+    https://storage.googleapis.com/mediapipe-models/hand_landmarker/hand_landmarker/float16/latest/hand_landmarker.task
+"""
+
+import os
+import threading
+
+import cv2
+import numpy as np
+
+
+# Backend names accepted by create_backend() and [Hand Detection] backend
+BACKENDS = ('solution', 'tasks_video', 'tasks_live', 'synthetic')
+
+MODEL_URL = ('https://storage.googleapis.com/mediapipe-models/hand_landmarker/'
+             'hand_landmarker/float16/latest/hand_landmarker.task')
+
+# Relative model paths are resolved against the project root, not the working directory
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class DetectorBackend:
+    """
+    Turns RGB frames into normalized (21, 3) landmark arrays, one per hand.
+    
+    Subclasses import their runtime and build the model in load(), so
+    creating a backend is cheap and can happen on the caller's thread.
+    """
+    
+    name = 'base'
+    
+    # True when process() returns the latest finished result, which may
+    # belong to an earlier frame, instead of the result for this frame
+    asynchronous = False
+    
+    def load(self):
+        """Import the runtime, build the model and run a warm-up inference."""
+        raise NotImplementedError
+    
+    def process(self, img_rgb, timestamp_ms):
+        """
+        Run inference on one frame.
+        
+        Args:
+            img_rgb: RGB image (uint8, contiguous)
+            timestamp_ms: Frame time in milliseconds, increasing from call to call
+        
+        Returns:
+            List of (21, 3) float32 arrays, or None if no result is available yet
+        """
+        raise NotImplementedError
+    
+    def close(self):
+        """Release the model."""
+
+
+class SolutionBackend(DetectorBackend):
+    """
+    The legacy mp.solutions.hands graph: synchronous, one frame at a time.
+    """
+    
+    name = 'solution'
+    
+    def __init__(self, max_hands=1, detection_confidence=0.7, tracking_confidence=0.7,
+                 static_image_mode=False):
+        """
+        Initialize the SolutionBackend.
+        
+        Args:
+            max_hands: Maximum number of hands to detect
+            detection_confidence: Minimum confidence for hand detection
+            tracking_confidence: Minimum confidence for hand tracking
+            static_image_mode: Detect on every frame instead of tracking
+        """
+        self.max_hands = max_hands
+        self.detection_confidence = detection_confidence
+        self.tracking_confidence = tracking_confidence
+        self.static_image_mode = static_image_mode
+        self.hands = None
+    
+    def load(self):
+        """Build the Hands graph; the model itself loads on the first process() call."""
+        import mediapipe as mp
+        
+        if not hasattr(mp, 'solutions'):
+            raise ImportError("this Mediapipe build has no legacy solutions API; "
+                              "use a tasks backend")
+        self.hands = mp.solutions.hands.Hands(
+            static_image_mode=self.static_image_mode,
+            max_num_hands=self.max_hands,
+            min_detection_confidence=self.detection_confidence,
+            min_tracking_confidence=self.tracking_confidence
+        )
+        self.hands.process(np.zeros((240, 320, 3), np.uint8))
+    
+    def process(self, img_rgb, timestamp_ms):
+        """Run the graph on one frame (timestamps are tracked by the graph itself)."""
+        results = self.hands.process(img_rgb)
+        if not results.multi_hand_landmarks:
+            return []
+        return [
+            np.array([(lm.x, lm.y, lm.z) for lm in hand.landmark], np.float32)
+            for hand in results.multi_hand_landmarks
+        ]
+    
+    def close(self):
+        """Release the graph."""
+        if self.hands is not None:
+            self.hands.close()
+            self.hands = None
+
+
+class TasksBackend(DetectorBackend):
+    """
+    The Mediapipe Tasks HandLandmarker on the CPU delegate.
+    
+    In VIDEO mode process() blocks until the frame's landmarks are ready. In
+    LIVE_STREAM mode it only queues the frame: the landmarker runs on its own
+    thread, drops frames it cannot keep up with, and hands results to a
+    callback; process() returns the most recent one. This takes inference off
+    the render loop at the cost of up to a frame of latency.
+    """
+    
+    def __init__(self, model_path, live_stream=False, max_hands=1, detection_confidence=0.7,
+                 tracking_confidence=0.7):
+        """
+        Initialize the TasksBackend.
+        
+        Args:
+            model_path: Path of the hand_landmarker.task model bundle, absolute or
+                relative to the project root
+            live_stream: Use LIVE_STREAM mode with asynchronous results instead of VIDEO mode
+            max_hands: Maximum number of hands to detect
+            detection_confidence: Minimum confidence for hand detection and presence
+            tracking_confidence: Minimum confidence for hand tracking
+        """
+        self.model_path = os.path.join(PROJECT_ROOT, model_path) if model_path else ''
+        self.live_stream = live_stream
+        self.asynchronous = live_stream
+        self.name = 'tasks_live' if live_stream else 'tasks_video'
+        self.max_hands = max_hands
+        self.detection_confidence = detection_confidence
+        self.tracking_confidence = tracking_confidence
+        self.mp = None
+        self.landmarker = None
+        self.last_timestamp = -1
+        
+        # Latest asynchronous result
+        self.lock = threading.Lock()
+        self.latest = None
+        self.result_ready = threading.Event()
+        
+        # Optional callable(hands, timestamp_ms) run on the landmarker's thread for each result
+        self.on_result = None
+    
+    def load(self):
+        """Create the landmarker and wait for a warm-up result."""
+        import mediapipe as mp
+        from mediapipe.tasks.python import BaseOptions
+        from mediapipe.tasks.python.vision import HandLandmarker, HandLandmarkerOptions, RunningMode
+        
+        if not self.model_path or not os.path.exists(self.model_path):
+            raise FileNotFoundError(f"Hand landmarker model not found at '{self.model_path}'. "
+                                    f"Download it from {MODEL_URL}")
+        
+        self.mp = mp
+        options = HandLandmarkerOptions(
+            base_options=BaseOptions(model_asset_path=self.model_path,
+                                     delegate=BaseOptions.Delegate.CPU),
+            running_mode=RunningMode.LIVE_STREAM if self.live_stream else RunningMode.VIDEO,
+            num_hands=self.max_hands,
+            min_hand_detection_confidence=self.detection_confidence,
+            min_hand_presence_confidence=self.detection_confidence,
+            min_tracking_confidence=self.tracking_confidence,
+            result_callback=self.handle_result if self.live_stream else None
+        )
+        self.landmarker = HandLandmarker.create_from_options(options)
+        
+        self.process(np.zeros((240, 320, 3), np.uint8), 0)
+        if self.live_stream:
+            self.result_ready.wait(timeout=10.0)
+    
+    @staticmethod
+    def to_hands(result):
+        """Convert a HandLandmarkerResult into (21, 3) arrays."""
+        return [np.array([(lm.x, lm.y, lm.z) for lm in hand], np.float32)
+                for hand in result.hand_landmarks]
+    
+    def handle_result(self, result, image, timestamp_ms):
+        """LIVE_STREAM callback, run on the landmarker's thread."""
+        hands = self.to_hands(result)
+        with self.lock:
+            self.latest = hands
+        self.result_ready.set()
+        if self.on_result is not None:
+            self.on_result(hands, timestamp_ms)
+    
+    def process(self, img_rgb, timestamp_ms):
+        """Run (VIDEO) or queue (LIVE_STREAM) inference on one frame."""
+        # The landmarker rejects timestamps that do not increase
+        timestamp_ms = max(int(timestamp_ms), self.last_timestamp + 1)
+        self.last_timestamp = timestamp_ms
+        
+        image = self.mp.Image(image_format=self.mp.ImageFormat.SRGB, data=img_rgb)
+        if not self.live_stream:
+            return self.to_hands(self.landmarker.detect_for_video(image, timestamp_ms))
+        
+        self.landmarker.detect_async(image, timestamp_ms)
+        with self.lock:
+            return self.latest
+    
+    def close(self):
+        """Release the landmarker."""
+        if self.landmarker is not None:
+            self.landmarker.close()
+            self.landmarker = None
+
+
+class SyntheticBackend(DetectorBackend):
+    """
+    Plays a scripted synthetic hand instead of running inference.
+    
+    The frame content is ignored. In real time the script is looked up by
+    the frame timestamp, so it plays at its own pace whatever the app's
+    frame rate; otherwise every call advances one script frame, which lets a
+    load test push frames as fast as the consumer takes them. The script is
+    generated on the first frame, once the frame aspect ratio is known, and
+    loops.
+    """
+    
+    name = 'synthetic'
+    
+    def __init__(self, script=None, fps=30.0, realtime=True, max_hands=1, **generator):
+        """
+        Initialize the SyntheticBackend.
+        
+        Args:
+            script: List of HandMotion (None = synthetic_hands.demo_script())
+            fps: Frame rate the script is generated at
+            realtime: Index the script by timestamp instead of by call
+            max_hands: Maximum number of hands to report (only one is generated)
+            **generator: SyntheticHands settings (noise, dropout_rate, seed, ...)
+        """
+        self.script = script
+        self.fps = fps
+        self.realtime = realtime
+        self.max_hands = max_hands
+        self.generator = generator
+        self.batch = None
+        self.aspect = None
+        self.start_ms = None
+        self.frame = 0
+    
+    def load(self):
+        """Nothing to load."""
+    
+    def process(self, img_rgb, timestamp_ms):
+        """Return the script's hand for this frame."""
+        from utils.synthetic_hands import SyntheticHands, demo_script
+        
+        if self.max_hands < 1:
+            return []
+        aspect = img_rgb.shape[1] / img_rgb.shape[0]
+        if self.batch is None or aspect != self.aspect:
+            self.aspect = aspect
+            script = self.script if self.script is not None else demo_script(aspect)
+            self.batch = SyntheticHands(aspect, **self.generator).generate(script, self.fps)
+            self.start_ms = timestamp_ms
+        
+        if self.realtime:
+            index = int((timestamp_ms - self.start_ms) * self.fps / 1000)
+        else:
+            index = self.frame
+            self.frame += 1
+        return self.batch.hands(index % len(self.batch))
+
+
+def create_backend(name='solution', model_path='', max_hands=1, detection_confidence=0.7,
+                   tracking_confidence=0.7, static_image_mode=False):
+    """
+    Create an (unloaded) detector backend by name.
+    
+    Args:
+        name: One of BACKENDS
+        model_path: Model bundle for the Tasks backends
+        max_hands: Maximum number of hands to detect
+        detection_confidence: Minimum confidence for hand detection
+        tracking_confidence: Minimum confidence for hand tracking
+        static_image_mode: Detect on every frame (solution backend only)
+    
+    Returns:
+        DetectorBackend
+    """
+    if name == 'solution':
+        return SolutionBackend(max_hands, detection_confidence, tracking_confidence,
+                               static_image_mode)
+    if name in ('tasks_video', 'tasks_live'):
+        return TasksBackend(model_path, live_stream=name == 'tasks_live', max_hands=max_hands,
+                            detection_confidence=detection_confidence,
+                            tracking_confidence=tracking_confidence)
+    if name == 'synthetic':
+        return SyntheticBackend(max_hands=max_hands)
+    raise ValueError(f"Unknown detector backend '{name}' (expected one of {', '.join(BACKENDS)})")
+
+
+def set_cpu_threads(num_threads):
+    """
+    Limit the CPU threads used around inference.
+    
+    Mediapipe does not expose its inference thread count in Python, so this
+    only bounds OpenCV's pool, which runs the resize and color conversion
+    feeding the model; the model itself still uses as many threads as
+    Mediapipe picks. 0 keeps the library default.
+    
+    Args:
+        num_threads: Thread count (0 = default)
+    """
+    if num_threads > 0:
+        cv2.setNumThreads(num_threads)
@@ -0,0 +1,510 @@
+"""
+Detector Service Module
+Long-lived process that owns the camera and HandDetector and shares results
+with any number of client applications.
+
+Frames and landmarks are published through a shared-memory FrameRing and
+frame notifications over a local socket, so clients attach in milliseconds
+without loading Mediapipe or opening the camera themselves.
+
+Run with: python -m utils.detector_service
+"""
+
+import argparse
+import os
+import queue
+import sys
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+
+import numpy as np
+
+# Allow running as a script as well as with -m
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.hand_detector import HandDetector, READY_TIMEOUT
+from utils.frame_transport import FrameRing
+from utils.presence_gate import apply_presence_config
+from utils.config import AppConfig, ConfigWatcher, load_config, DEFAULT_CONFIG_PATH
+
+
+DEFAULT_PORT = 50717
+AUTHKEY = b'gestureme-detector'
+
+# Longest pause of the accept loop after repeated listener errors, in seconds
+MAX_ACCEPT_BACKOFF = 2.0
+
+
+def frame_shm_name(port):
+    """
+    Name of the shared-memory frame ring of the service on a port.
+    
+    Args:
+        port: Local TCP port of the service
+    
+    Returns:
+        Shared memory block name, distinct for every port
+    """
+    return f'gestureme_frames_{port}'
+
+
+class DetectorService:
+    """
+    Owns the camera and HandDetector and publishes results to attached clients.
+    """
+    
+    def __init__(self, camera_index=0, width=1280, height=720, port=DEFAULT_PORT,
+                 max_hands=1, detection_confidence=0.8, tracking_confidence=0.7,
+                 mirror=True, idle_exit=None, config=None, config_path=None):
+        """
+        Initialize the DetectorService.
+        
+        Args:
+            camera_index: Webcam index
+            width: Width of published frames
+            height: Height of published frames
+            port: Local TCP port for landmark packets
+            max_hands: Maximum number of hands to detect
+            detection_confidence: Minimum confidence for hand detection
+            tracking_confidence: Minimum confidence for hand tracking
+            mirror: Whether to publish mirrored frames
+            idle_exit: Exit after this many seconds without clients (None = never)
+            config: AppConfig providing performance settings (defaults if None)
+            config_path: Config file to watch for live changes (None = no reload)
+        """
+        self.camera_index = camera_index
+        self.width = width
+        self.height = height
+        self.port = port
+        self.max_hands = max_hands
+        self.detection_confidence = detection_confidence
+        self.tracking_confidence = tracking_confidence
+        self.mirror = mirror
+        self.idle_exit = idle_exit
+        self.config = config if config is not None else AppConfig()
+        self.config_path = config_path
+        
+        self.frame_shm = frame_shm_name(port)
+        
+        self.clients = {}
+        self.clients_lock = threading.Lock()
+        self.next_client_id = 0
+        self.running = False
+        self.listener = None
+    
+    def accept_clients(self):
+        """Accept client connections until the service stops."""
+        backoff = 0.0
+        while self.running:
+            try:
+                conn = self.listener.accept()
+            except (EOFError, ConnectionError) as e:
+                # A client that went away during authentication
+                print(f"Rejected detector client: {e!r}")
+                continue
+            except OSError as e:
+                if not self.running:
+                    break
+                # A failing listener would otherwise spin; wait longer after each error
+                backoff = min(max(backoff * 2, 0.05), MAX_ACCEPT_BACKOFF)
+                print(f"Detector service: accept failed ({e}), retrying in {backoff:.2f}s")
+                time.sleep(backoff)
+                continue
+            except Exception as e:
+                # Failed authentication or a half-open connection
+                print(f"Rejected detector client: {e}")
+                continue
+            backoff = 0.0
+            
+            # A client that leaves during the handshake must not end the accept loop
+            try:
+                conn.send({'type': 'hello', 'frame_shm': self.frame_shm,
+                           'width': self.width, 'height': self.height,
+                           'mirror': self.mirror})
+            except (OSError, EOFError) as e:
+                print(f"Detector client left during the handshake: {e}")
+                conn.close()
+                continue
+            
+            # Latest-wins queue so a slow client never stalls inference
+            packets = queue.Queue(maxsize=1)
+            with self.clients_lock:
+                client_id = self.next_client_id
+                self.next_client_id += 1
+                self.clients[client_id] = packets
+            threading.Thread(target=self.serve_client, args=(client_id, conn, packets),
+                             daemon=True).start()
+            print(f"Client {client_id} attached ({len(self.clients)} connected)")
+    
+    def serve_client(self, client_id, conn, packets):
+        """
+        Forward packets to one client until it detaches.
+        
+        Args:
+            client_id: Client identifier
+            conn: Connection to the client
+            packets: Queue of packets for this client
+        """
+        try:
+            while self.running:
+                while conn.poll():
+                    self.handle_request(conn, conn.recv())
+                try:
+                    packet = packets.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                conn.send(packet)
+        except (OSError, EOFError):
+            pass
+        finally:
+            with self.clients_lock:
+                self.clients.pop(client_id, None)
+            conn.close()
+            print(f"Client {client_id} detached ({len(self.clients)} connected)")
+    
+    def handle_request(self, conn, message):
+        """
+        Act on a message sent by a client.
+        
+        'exit_when_idle' makes the service stop once its last client detaches,
+        so whoever started it can leave without cutting off attached apps.
+        
+        Args:
+            conn: Connection the message came from
+            message: Message dictionary
+        """
+        if message.get('type') == 'exit_when_idle':
+            self.idle_exit = 0.0
+            print("Detector service will stop when the last client detaches")
+            conn.send({'type': 'ack'})
+    
+    def publish(self, packet):
+        """
+        Hand a packet to every attached client, replacing any unsent one.
+        
+        Args:
+            packet: Landmark packet dictionary
+        """
+        with self.clients_lock:
+            targets = list(self.clients.values())
+        for packets in targets:
+            try:
+                packets.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                packets.put_nowait(packet)
+            except queue.Full:
+                pass
+    
+    def run(self):
+        """
+        Main service loop.
+        
+        Returns:
+            Boolean, False if the service could not start (frame ring or port
+            taken, or no hand model)
+        """
+        from utils.camera import CameraSource
+        
+        print(f"Starting detector service on port {self.port}...")
+        # Claim the frame ring first: a service already running here keeps it
+        try:
+            frames = FrameRing(self.frame_shm, self.width, self.height,
+                               max_hands=self.max_hands, create=True)
+        except FileExistsError as e:
+            print(f"Detector service not started: {e}")
+            return False
+        
+        camera = None
+        watcher = None
+        try:
+            # Build the hand model in the background while the camera opens
+            detector = HandDetector(max_hands=self.max_hands,
+                                    detection_confidence=self.detection_confidence,
+                                    tracking_confidence=self.tracking_confidence,
+                                    background_init=True, backend=self.config.detection.backend,
+                                    model_path=self.config.detection.model_path,
+                                    num_threads=self.config.detection.num_threads)
+            performance = self.config.performance
+            detector.configure(performance.inference_size, performance.frame_skip)
+            apply_presence_config(detector, self.config.presence)
+            camera = CameraSource(self.camera_index, self.width, self.height, mirror=self.mirror,
+                                  threaded=performance.threading_mode == 'threaded')
+            
+            # Clients would only time out attaching to a service without a model
+            if not detector.wait_until_ready(READY_TIMEOUT):
+                error = detector.load_error or f"not loaded after {READY_TIMEOUT:.0f} s"
+                print(f"Detector service not started: no hand model ({error})")
+                return False
+            
+            watcher = ConfigWatcher(self.config, self.config_path) if self.config_path else None
+            try:
+                self.listener = Listener(('127.0.0.1', self.port), authkey=AUTHKEY)
+            except OSError as e:
+                print(f"Detector service not started: cannot listen on port {self.port} ({e})")
+                return False
+            
+            self.running = True
+            threading.Thread(target=self.accept_clients, daemon=True).start()
+            print("Detector service ready.")
+            
+            last_client_time = time.time()
+            while self.running:
+                # Performance settings apply live; mirroring is fixed for attached clients
+                if watcher is not None:
+                    update = watcher.poll()
+                    if update is not None:
+                        performance = update[0].performance
+                        detector.configure(performance.inference_size, performance.frame_skip)
+                        apply_presence_config(detector, update[0].presence)
+                        camera.set_threaded(performance.threading_mode == 'threaded')
+                
+                success, img = camera.read()
+                if not success:
+                    print("Failed to read from camera")
+                    break
+                
+                now = time.time()
+                if not self.clients:
+                    # Keep the camera and graph warm but skip inference while idle
+                    if self.idle_exit is not None and now - last_client_time > self.idle_exit:
+                        print("No clients attached. Stopping detector service...")
+                        break
+                    time.sleep(0.05)
+                    continue
+                last_client_time = now
+                
+                # Write straight into the next ring slot; landmarks go alongside
+                seq, slot_image, slot_landmarks = frames.begin_write()
+                slot_image[:] = img
+                detector.find_hands(img, draw=False)
+                hand_count = min(len(detector.hand_landmarks), self.max_hands)
+                for i in range(hand_count):
+                    slot_landmarks[i] = detector.hand_landmarks[i]
+                frames.end_write(seq, hand_count, now)
+                self.publish({'type': 'frame', 'seq': seq})
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.running = False
+            if self.listener is not None:
+                self.listener.close()
+            if watcher is not None:
+                watcher.stop()
+            if camera is not None:
+                camera.release()
+            frames.close()
+            print("Detector service stopped.")
+        return True
+
+
+class RemoteHandDetector(HandDetector):
+    """
+    HandDetector that takes its landmarks from a DetectorService packet.
+    """
+    
+    def __init__(self, client):
+        """
+        Initialize the RemoteHandDetector.
+        
+        Args:
+            client: ServiceClient delivering landmark packets
+        """
+        self.client = client
+        self.init_state()
+        
+        # The model lives in the service; gating happens there too
+        self.ready = threading.Event()
+        self.ready.set()
+    
+    def find_hands(self, img, draw=True):
+        """
+        Use the landmarks published for the frame most recently read.
+        
+        Args:
+            img: Input image (BGR format)
+            draw: Whether to draw hand landmarks on the image
+        
+        Returns:
+            Image with or without drawn landmarks
+        """
+        self.hand_landmarks = self.client.hand_landmarks
+        if draw:
+            self.renderer.draw(img, self.hand_landmarks)
+        return img
+
+
+class ServiceClient:
+    """
+    Client of a running DetectorService, usable in place of a camera.
+    """
+    
+    def __init__(self, port=DEFAULT_PORT, timeout=0.0):
+        """
+        Attach to the detector service.
+        
+        Args:
+            port: Local TCP port of the service
+            timeout: Seconds to keep retrying while the service starts up
+        
+        Raises:
+            ConnectionError: If the service is not reachable
+        """
+        deadline = time.time() + timeout
+        while True:
+            try:
+                self.conn = Client(('127.0.0.1', port), authkey=AUTHKEY)
+                break
+            except OSError:
+                if time.time() >= deadline:
+                    raise ConnectionError(f"Detector service not reachable on port {port}")
+                time.sleep(0.1)
+        
+        hello = self.conn.recv()
+        self.width = hello['width']
+        self.height = hello['height']
+        self.mirror = hello['mirror']
+        self.frames = FrameRing(hello['frame_shm'])
+        self.buffer = None
+        
+        self.packets = queue.Queue(maxsize=1)
+        self.hand_landmarks = []
+        self.connected = True
+        self.detector = RemoteHandDetector(self)
+        threading.Thread(target=self.receive_packets, daemon=True).start()
+    
+    def receive_packets(self):
+        """Receive landmark packets, keeping only the newest one."""
+        try:
+            while self.connected:
+                packet = self.conn.recv()
+                try:
+                    self.packets.get_nowait()
+                except queue.Empty:
+                    pass
+                self.packets.put(packet)
+        except Exception:
+            # Service went away or release() closed the connection under us
+            self.connected = False
+    
+    def read(self, timeout=1.0):
+        """
+        Wait for the next processed frame.
+        
+        Args:
+            timeout: Seconds to wait for the service
+        
+        Returns:
+            Tuple (success, image) like cv2.VideoCapture.read
+        """
+        try:
+            packet = self.packets.get(timeout=timeout)
+        except queue.Empty:
+            return False, None
+        
+        # Copy out of the ring: apps draw on the frame and the slot is shared
+        if self.buffer is None:
+            self.buffer = np.empty((self.frames.height, self.frames.width, 3), np.uint8)
+        seq, img, hands = self.frames.read(packet['seq'], out=self.buffer)
+        if img is None:
+            # Fell behind by a whole ring; take the newest frame instead
+            seq, img, hands = self.frames.read(out=self.buffer)
+            if img is None:
+                return False, None
+        
+        self.hand_landmarks = hands
+        return True, img
+    
+    def release(self):
+        """Detach from the service."""
+        self.connected = False
+        try:
+            self.conn.close()
+        except OSError:
+            pass
+        self.frames.close()
+
+
+def is_service_running(port=DEFAULT_PORT):
+    """
+    Check whether a detector service is listening.
+    
+    Args:
+        port: Local TCP port of the service
+    
+    Returns:
+        Boolean
+    """
+    import socket
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.settimeout(0.2)
+        return sock.connect_ex(('127.0.0.1', port)) == 0
+
+
+def request_exit_when_idle(port=DEFAULT_PORT, timeout=2.0):
+    """
+    Ask a running service to stop once its last client detaches.
+    
+    Args:
+        port: Local TCP port of the service
+        timeout: Seconds to wait for the service to confirm
+    
+    Returns:
+        Boolean indicating if the service confirmed
+    """
+    try:
+        conn = Client(('127.0.0.1', port), authkey=AUTHKEY)
+    except OSError:
+        return False
+    try:
+        conn.send({'type': 'exit_when_idle'})
+        # Frame packets may arrive before the confirmation
+        deadline = time.time() + timeout
+        while conn.poll(max(0.0, deadline - time.time())):
+            if conn.recv().get('type') == 'ack':
+                return True
+        return False
+    except (OSError, EOFError):
+        return False
+    finally:
+        conn.close()
+
+
+def main():
+    """
+    Entry point for the detector service.
+    """
+    parser = argparse.ArgumentParser(description="Shared hand detector service")
+    parser.add_argument('--config', default=DEFAULT_CONFIG_PATH,
+                        help="Path to the configuration file (reloaded live)")
+    parser.add_argument('--camera', type=int, default=None, help="Webcam index")
+    parser.add_argument('--width', type=int, default=None, help="Frame width")
+    parser.add_argument('--height', type=int, default=None, help="Frame height")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="Local port")
+    parser.add_argument('--idle-exit', type=float, default=None,
+                        help="Exit after this many seconds without clients")
+    args = parser.parse_args()
+    
+    # Command-line values override config.ini
+    config = load_config(args.config)
+    camera = config.camera
+    detection = config.detection
+    service = DetectorService(
+        camera_index=camera.camera_index if args.camera is None else args.camera,
+        width=camera.canvas_width if args.width is None else args.width,
+        height=camera.canvas_height if args.height is None else args.height,
+        port=args.port,
+        max_hands=detection.max_hands,
+        detection_confidence=detection.detection_confidence,
+        tracking_confidence=detection.tracking_confidence,
+        mirror=config.performance.mirror_mode,
+        idle_exit=args.idle_exit,
+        config=config,
+        config_path=args.config
+    )
+    sys.exit(0 if service.run() else 1)
+
+
+if __name__ == "__main__":
+    main()
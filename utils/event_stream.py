@@ -0,0 +1,613 @@
+"""
+Event Stream Module
+Publishes recognized gestures and hand landmarks to local programs over a
+TCP or UNIX socket, or a WebSocket, from an asyncio loop on its own thread.
+
+Every message is a small binary packet:
+
+    header   magic b'GE', version, kind, sequence number, timestamp, payload length
+    hello    JSON text describing the stream (sent once on connect)
+    event    name length, UTF-8 name, float32 value (NaN when the event has none)
+    landmarks  hand count, then 21 x (x, y, z) float16 per hand, normalized like Mediapipe
+
+On TCP and UNIX sockets packets follow each other back to back; on a WebSocket
+each binary message holds one batch of packets. A loopback client prints the
+stream:
+
+    python -m utils.event_stream --transport tcp --port 50718
+"""
+
+import argparse
+import asyncio
+import base64
+import collections
+import hashlib
+import json
+import math
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+
+import numpy as np
+
+
+# magic, version, kind, seq, timestamp, payload length
+PACKET_HEADER = struct.Struct('<2sBBIdH')
+PACKET_MAGIC = b'GE'
+PROTOCOL_VERSION = 1
+
+KIND_HELLO = 0
+KIND_EVENT = 1
+KIND_LANDMARKS = 2
+
+LANDMARK_SHAPE = (21, 3)
+DEFAULT_EVENT_PORT = 50718
+DEFAULT_UNIX_PATH = '/tmp/gestureme_events.sock'
+WEBSOCKET_GUID = b'258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+
+def encode_packet(kind, seq, payload, timestamp=None):
+    """
+    Frame a payload with the packet header.
+    
+    Args:
+        kind: KIND_HELLO, KIND_EVENT or KIND_LANDMARKS
+        seq: Sequence number (wraps at 2**32)
+        payload: Payload bytes
+        timestamp: Wall-clock time of the data (defaults to time.time())
+    
+    Returns:
+        Packet bytes
+    """
+    timestamp = time.time() if timestamp is None else timestamp
+    return PACKET_HEADER.pack(PACKET_MAGIC, PROTOCOL_VERSION, kind, seq & 0xFFFFFFFF,
+                              timestamp, len(payload)) + payload
+
+
+def encode_event(name, value=None):
+    """Payload of an event packet."""
+    name_bytes = name.encode('utf-8')[:255]
+    return (struct.pack('<B', len(name_bytes)) + name_bytes
+            + struct.pack('<f', math.nan if value is None else value))
+
+
+def encode_landmarks(hands):
+    """
+    Payload of a landmark packet.
+    
+    Args:
+        hands: List of (21, 3) normalized landmark arrays
+    
+    Returns:
+        Payload bytes
+    """
+    hands = hands[:255]
+    return struct.pack('<B', len(hands)) + b''.join(
+        np.asarray(hand, np.float16).tobytes() for hand in hands)
+
+
+def decode_packets(buffer):
+    """
+    Split complete packets off the front of a byte buffer.
+    
+    Args:
+        buffer: Received bytes (a bytearray is consumed in place)
+    
+    Returns:
+        List of packet dictionaries with 'kind', 'seq', 'timestamp' and the
+        decoded fields of that kind; incomplete trailing bytes stay in buffer
+    
+    Raises:
+        ValueError: If the stream is not an event stream
+    """
+    packets = []
+    offset = 0
+    while len(buffer) - offset >= PACKET_HEADER.size:
+        magic, version, kind, seq, timestamp, length = PACKET_HEADER.unpack_from(buffer, offset)
+        if magic != PACKET_MAGIC:
+            raise ValueError("Not a GestureMe event stream")
+        start = offset + PACKET_HEADER.size
+        if len(buffer) - start < length:
+            break
+        payload = bytes(buffer[start:start + length])
+        offset = start + length
+        
+        packet = {'kind': kind, 'seq': seq, 'timestamp': timestamp}
+        if kind == KIND_HELLO:
+            packet.update(json.loads(payload.decode('utf-8')))
+        elif kind == KIND_EVENT:
+            name_length = payload[0]
+            packet['name'] = payload[1:1 + name_length].decode('utf-8')
+            value = struct.unpack_from('<f', payload, 1 + name_length)[0]
+            packet['value'] = None if math.isnan(value) else value
+        elif kind == KIND_LANDMARKS:
+            hands = np.frombuffer(payload, np.float16, offset=1).astype(np.float32)
+            packet['hands'] = list(hands.reshape((payload[0],) + LANDMARK_SHAPE))
+        packets.append(packet)
+    
+    if isinstance(buffer, bytearray):
+        del buffer[:offset]
+    return packets
+
+
+class ClientChannel:
+    """
+    Outgoing state of one connected client.
+    
+    Events queue up to a limit (the oldest is dropped beyond it) while landmark
+    packets coalesce to the newest, so a client that reads slowly only ever
+    falls behind on its own channel and never holds up the publisher.
+    """
+    
+    def __init__(self, client_id, send, max_events=64):
+        """
+        Initialize the ClientChannel.
+        
+        Args:
+            client_id: Client identifier
+            send: Coroutine function writing one batch of bytes to the client
+            max_events: Events kept for a client that is not reading
+        """
+        self.client_id = client_id
+        self.send = send
+        self.events = collections.deque()
+        self.max_events = max_events
+        self.landmarks = None
+        self.wake = asyncio.Event()
+        
+        # Statistics
+        self.sent_batches = 0
+        self.sent_bytes = 0
+        self.dropped_events = 0
+        self.coalesced_landmarks = 0
+    
+    def push(self, kind, packet):
+        """Queue or coalesce a packet and wake the writer."""
+        if kind == KIND_LANDMARKS:
+            if self.landmarks is not None:
+                self.coalesced_landmarks += 1
+            self.landmarks = packet
+        else:
+            if len(self.events) >= self.max_events:
+                self.events.popleft()
+                self.dropped_events += 1
+            self.events.append(packet)
+        self.wake.set()
+    
+    async def write_loop(self):
+        """Send everything pending as one batch per wake-up until the client goes away."""
+        while True:
+            await self.wake.wait()
+            self.wake.clear()
+            parts = list(self.events)
+            self.events.clear()
+            if self.landmarks is not None:
+                parts.append(self.landmarks)
+                self.landmarks = None
+            if not parts:
+                continue
+            batch = b''.join(parts)
+            await self.send(batch)
+            self.sent_batches += 1
+            self.sent_bytes += len(batch)
+
+
+class EventServer:
+    """
+    Serves the event stream from a background asyncio loop.
+    
+    publish_event() and publish_landmarks() are called from the inference
+    thread; they encode the packet and hand it to the loop without waiting on
+    any client.
+    """
+    
+    def __init__(self, transport='tcp', host='127.0.0.1', port=DEFAULT_EVENT_PORT,
+                 unix_path=DEFAULT_UNIX_PATH, max_events=64, landmark_fps=0.0, info=None):
+        """
+        Initialize the EventServer.
+        
+        Args:
+            transport: 'tcp', 'unix' or 'websocket'
+            host: Interface to listen on for TCP and WebSocket
+            port: Port for TCP and WebSocket
+            unix_path: Socket path for the UNIX transport
+            max_events: Events kept per client that is not reading
+            landmark_fps: Landmark packets published per second at most (0 = every frame)
+            info: Extra fields for the hello packet (e.g. frame size)
+        """
+        if transport not in ('tcp', 'unix', 'websocket'):
+            raise ValueError(f"Unknown event transport: {transport}")
+        self.transport = transport
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.max_events = max_events
+        self.landmark_interval = 1.0 / landmark_fps if landmark_fps > 0 else 0.0
+        self.info = info or {}
+        
+        self.channels = {}
+        self.next_client_id = 0
+        self.seq = 0
+        self.last_landmarks = 0.0
+        self.loop = None
+        self.server = None
+        self.thread = None
+        self.ready = threading.Event()
+    
+    @property
+    def address(self):
+        """Human-readable address clients connect to."""
+        if self.transport == 'unix':
+            return self.unix_path
+        scheme = 'ws' if self.transport == 'websocket' else 'tcp'
+        return f"{scheme}://{self.host}:{self.port}"
+    
+    @property
+    def client_count(self):
+        """Number of connected clients."""
+        return len(self.channels)
+    
+    def start(self):
+        """
+        Start listening on a background thread.
+        
+        Raises:
+            OSError: If the address cannot be bound
+        """
+        self.error = None
+        self.thread = threading.Thread(target=self.run_loop, daemon=True)
+        self.thread.start()
+        self.ready.wait()
+        if self.error is not None:
+            raise self.error
+        print(f"Event stream listening on {self.address}")
+    
+    def run_loop(self):
+        """Body of the loop thread."""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self.open_server())
+        except OSError as e:
+            self.error = e
+            self.ready.set()
+            return
+        self.ready.set()
+        self.loop.run_forever()
+        
+        # Shut down: close the listener and every client
+        self.server.close()
+        tasks = asyncio.all_tasks(self.loop)
+        for task in tasks:
+            task.cancel()
+        self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        self.loop.close()
+    
+    async def open_server(self):
+        """Bind the listening socket for the configured transport."""
+        if self.transport == 'unix':
+            if os.path.exists(self.unix_path):
+                os.unlink(self.unix_path)
+            self.server = await asyncio.start_unix_server(self.handle_stream, self.unix_path)
+        elif self.transport == 'websocket':
+            self.server = await asyncio.start_server(self.handle_websocket, self.host, self.port)
+        else:
+            self.server = await asyncio.start_server(self.handle_stream, self.host, self.port)
+            for sock in self.server.sockets:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    
+    def hello_packet(self):
+        """Packet sent to each client when it connects."""
+        info = dict(self.info, version=PROTOCOL_VERSION, transport=self.transport,
+                    landmark_fps=1.0 / self.landmark_interval if self.landmark_interval else 0.0)
+        return encode_packet(KIND_HELLO, 0, json.dumps(info).encode('utf-8'))
+    
+    async def serve_channel(self, send, wait_closed):
+        """
+        Register a client, write to it until it disconnects, then forget it.
+        
+        Args:
+            send: Coroutine function writing bytes to the client
+            wait_closed: Coroutine that returns when the client disconnects
+        """
+        client_id = self.next_client_id
+        self.next_client_id += 1
+        channel = ClientChannel(client_id, send, self.max_events)
+        self.channels[client_id] = channel
+        print(f"Event client {client_id} connected ({len(self.channels)} connected)")
+        
+        writer_task = closed_task = None
+        try:
+            await send(self.hello_packet())
+            writer_task = asyncio.ensure_future(channel.write_loop())
+            closed_task = asyncio.ensure_future(wait_closed)
+            await asyncio.wait((writer_task, closed_task), return_when=asyncio.FIRST_COMPLETED)
+        except (ConnectionError, OSError, asyncio.CancelledError):
+            # Client went away, or the server is shutting down
+            pass
+        finally:
+            for task in (writer_task, closed_task):
+                if task is not None:
+                    task.cancel()
+            self.channels.pop(client_id, None)
+            print(f"Event client {client_id} disconnected ({len(self.channels)} connected; "
+                  f"{channel.dropped_events} events dropped, "
+                  f"{channel.coalesced_landmarks} landmark packets coalesced)")
+    
+    async def handle_stream(self, reader, writer):
+        """Serve a TCP or UNIX socket client."""
+        async def send(data):
+            writer.write(data)
+            await writer.drain()
+        
+        async def wait_closed():
+            # Clients do not send anything; EOF means they went away
+            while await reader.read(1024):
+                pass
+        
+        try:
+            await self.serve_channel(send, wait_closed())
+        finally:
+            writer.close()
+    
+    async def handle_websocket(self, reader, writer):
+        """Serve a WebSocket client (binary messages, server to client only)."""
+        try:
+            request = await reader.readuntil(b'\r\n\r\n')
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            writer.close()
+            return
+        headers = {}
+        for line in request.decode('latin-1').split('\r\n')[1:]:
+            if ':' in line:
+                key, value = line.split(':', 1)
+                headers[key.strip().lower()] = value.strip()
+        key = headers.get('sec-websocket-key')
+        if key is None:
+            writer.write(b'HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n')
+            writer.close()
+            return
+        accept = base64.b64encode(hashlib.sha1(key.encode('ascii') + WEBSOCKET_GUID).digest())
+        writer.write(b'HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n'
+                     b'Connection: Upgrade\r\nSec-WebSocket-Accept: ' + accept + b'\r\n\r\n')
+        
+        async def send(data):
+            writer.write(websocket_frame(0x2, data))
+            await writer.drain()
+        
+        async def wait_closed():
+            # Answer pings and stop on a close frame or EOF
+            while True:
+                opcode, payload = await read_websocket_frame(reader)
+                if opcode is None:
+                    break
+                if opcode == 0x8:
+                    writer.write(websocket_frame(0x8, payload[:2]))
+                    break
+                if opcode == 0x9:
+                    writer.write(websocket_frame(0xA, payload))
+        
+        try:
+            await self.serve_channel(send, wait_closed())
+        finally:
+            writer.close()
+    
+    def publish_event(self, name, value=None, timestamp=None):
+        """
+        Publish a recognized gesture or other named event.
+        
+        Args:
+            name: Event name (e.g. 'palm_open')
+            value: Optional number carried with the event (e.g. a volume level)
+            timestamp: Time the event was detected (defaults to now)
+        """
+        if self.channels:
+            self.dispatch(KIND_EVENT, encode_event(name, value), timestamp)
+    
+    def publish_landmarks(self, hands, timestamp=None):
+        """
+        Publish the landmarks of the current frame, at most landmark_fps times a second.
+        
+        Args:
+            hands: List of (21, 3) normalized landmark arrays (may be empty)
+            timestamp: Capture time of the frame (defaults to now)
+        """
+        if not self.channels:
+            return
+        now = time.perf_counter()
+        if self.landmark_interval and now - self.last_landmarks < self.landmark_interval:
+            return
+        self.last_landmarks = now
+        self.dispatch(KIND_LANDMARKS, encode_landmarks(hands), timestamp)
+    
+    def dispatch(self, kind, payload, timestamp):
+        """Frame a payload here and hand it to the loop thread."""
+        self.seq += 1
+        packet = encode_packet(kind, self.seq, payload, timestamp)
+        try:
+            self.loop.call_soon_threadsafe(self.fan_out, kind, packet)
+        except RuntimeError:
+            # Loop already stopped
+            pass
+    
+    def fan_out(self, kind, packet):
+        """Give a packet to every client channel (runs on the loop thread)."""
+        for channel in self.channels.values():
+            channel.push(kind, packet)
+    
+    def stats(self):
+        """
+        Per-client delivery statistics.
+        
+        Returns:
+            List of dictionaries, one per connected client
+        """
+        return [{'client': channel.client_id, 'batches': channel.sent_batches,
+                 'bytes': channel.sent_bytes, 'queued': len(channel.events),
+                 'dropped_events': channel.dropped_events,
+                 'coalesced_landmarks': channel.coalesced_landmarks}
+                for channel in list(self.channels.values())]
+    
+    def stop(self):
+        """Disconnect all clients and stop the loop thread."""
+        if self.loop is None or not self.loop.is_running():
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=2.0)
+        if self.transport == 'unix' and os.path.exists(self.unix_path):
+            os.unlink(self.unix_path)
+
+
+def websocket_frame(opcode, payload):
+    """
+    Build an unmasked, unfragmented WebSocket frame.
+    
+    Args:
+        opcode: Frame opcode (0x2 binary, 0xA pong)
+        payload: Frame payload bytes
+    
+    Returns:
+        Frame bytes
+    """
+    length = len(payload)
+    if length < 126:
+        header = struct.pack('!BB', 0x80 | opcode, length)
+    elif length < 1 << 16:
+        header = struct.pack('!BBH', 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack('!BBQ', 0x80 | opcode, 127, length)
+    return header + payload
+
+
+async def read_websocket_frame(reader):
+    """
+    Read one (masked) frame sent by a WebSocket client.
+    
+    Args:
+        reader: asyncio StreamReader
+    
+    Returns:
+        Tuple (opcode, payload), or (None, b'') at end of stream
+    """
+    try:
+        first, second = await reader.readexactly(2)
+        length = second & 0x7F
+        if length == 126:
+            length = struct.unpack('!H', await reader.readexactly(2))[0]
+        elif length == 127:
+            length = struct.unpack('!Q', await reader.readexactly(8))[0]
+        mask = await reader.readexactly(4) if second & 0x80 else b'\0\0\0\0'
+        data = await reader.readexactly(length)
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return None, b''
+    payload = bytes(b ^ mask[i % 4] for i, b in enumerate(data))
+    return first & 0x0F, payload
+
+
+class EventClient:
+    """
+    Blocking client for the TCP and UNIX transports, for tests and tools.
+    """
+    
+    def __init__(self, transport='tcp', host='127.0.0.1', port=DEFAULT_EVENT_PORT,
+                 unix_path=DEFAULT_UNIX_PATH, timeout=5.0):
+        """
+        Connect to an EventServer and read its hello packet.
+        
+        Args:
+            transport: 'tcp' or 'unix'
+            host: Server host for TCP
+            port: Server port for TCP
+            unix_path: Socket path for UNIX
+            timeout: Socket timeout in seconds
+        
+        Raises:
+            ConnectionError: If the server is not reachable
+        """
+        try:
+            if transport == 'unix':
+                self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                self.sock.settimeout(timeout)
+                self.sock.connect(unix_path)
+            else:
+                self.sock = socket.create_connection((host, port), timeout=timeout)
+                self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError as e:
+            raise ConnectionError(f"Event stream not reachable: {e}")
+        self.buffer = bytearray()
+        self.pending = collections.deque()
+        self.hello = self.recv()
+    
+    def recv(self):
+        """
+        Wait for the next packet.
+        
+        Returns:
+            Packet dictionary (see decode_packets)
+        
+        Raises:
+            ConnectionError: If the server closed the stream
+        """
+        while not self.pending:
+            data = self.sock.recv(65536)
+            if not data:
+                raise ConnectionError("Event stream closed")
+            self.buffer += data
+            self.pending.extend(decode_packets(self.buffer))
+        return self.pending.popleft()
+    
+    def close(self):
+        """Disconnect from the server."""
+        self.sock.close()
+
+
+def main():
+    """
+    Loopback test client: print the stream of a running gesture server.
+    """
+    parser = argparse.ArgumentParser(description="Print a GestureMe event stream")
+    parser.add_argument('--transport', choices=('tcp', 'unix'), default='tcp')
+    parser.add_argument('--host', default='127.0.0.1', help="Server host")
+    parser.add_argument('--port', type=int, default=DEFAULT_EVENT_PORT, help="Server port")
+    parser.add_argument('--path', default=DEFAULT_UNIX_PATH, help="UNIX socket path")
+    parser.add_argument('--landmarks', action='store_true', help="Print every landmark packet")
+    args = parser.parse_args()
+    
+    try:
+        client = EventClient(args.transport, args.host, args.port, args.path)
+    except ConnectionError as e:
+        print(e)
+        sys.exit(1)
+    print(f"Connected: {client.hello}")
+    
+    landmark_count = 0
+    last_report = time.time()
+    try:
+        while True:
+            packet = client.recv()
+            latency_ms = (time.time() - packet['timestamp']) * 1000
+            if packet['kind'] == KIND_EVENT:
+                value = '' if packet['value'] is None else f" {packet['value']:.2f}"
+                print(f"#{packet['seq']} {packet['name']}{value} ({latency_ms:.1f} ms)")
+            elif packet['kind'] == KIND_LANDMARKS:
+                landmark_count += 1
+                if args.landmarks:
+                    tips = [f"({hand[8][0]:.3f}, {hand[8][1]:.3f})" for hand in packet['hands']]
+                    print(f"#{packet['seq']} landmarks: index tips {' '.join(tips) or '-'} "
+                          f"({latency_ms:.1f} ms)")
+            if time.time() - last_report >= 5.0 and landmark_count and not args.landmarks:
+                print(f"  {landmark_count / (time.time() - last_report):.1f} landmark packets/s")
+                landmark_count = 0
+                last_report = time.time()
+    except (KeyboardInterrupt, ConnectionError) as e:
+        if isinstance(e, ConnectionError):
+            print(e)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Frame Buffers Module
+Reusable per-stage image buffers so the frame loops do not allocate every frame.
+"""
+
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+
+class FramePool:
+    """
+    Named output buffers, allocated once per shape and reused through OpenCV dst=.
+    """
+    
+    # Buffers allocated by all pools, for the debug allocation report
+    allocations = 0
+    
+    def __init__(self):
+        """Initialize an empty pool."""
+        self.buffers = {}
+    
+    def get(self, name, shape, dtype=np.uint8):
+        """
+        Get the buffer for a stage, allocating it only when the shape changes.
+        
+        Args:
+            name: Stage name (e.g. 'resize', 'mask')
+            shape: Required array shape
+            dtype: Required data type
+        
+        Returns:
+            NumPy array with undefined contents
+        """
+        buffer = self.buffers.get(name)
+        if buffer is None or buffer.shape != tuple(shape) or buffer.dtype != dtype:
+            buffer = np.empty(shape, dtype)
+            self.buffers[name] = buffer
+            FramePool.allocations += 1
+        return buffer
+    
+    def like(self, name, img):
+        """Get a buffer with the same shape and type as img."""
+        return self.get(name, img.shape, img.dtype)
+    
+    def flip_resize(self, img, size, mirror, name='frame'):
+        """
+        Resize and mirror a frame in a single output buffer.
+        
+        The resize writes straight into the pooled buffer and the flip then runs
+        in place, so no intermediate image is created. A frame that already has
+        the right size is flipped in place, since the caller owns it.
+        
+        Args:
+            img: Input BGR frame (may be modified when only mirroring)
+            size: Target (width, height)
+            mirror: Whether to flip horizontally
+            name: Buffer name
+        
+        Returns:
+            Resized and mirrored frame
+        """
+        if img.shape[1] != size[0] or img.shape[0] != size[1]:
+            out = self.get(name, (size[1], size[0]) + img.shape[2:], img.dtype)
+            cv2.resize(img, size, dst=out)
+            img = out
+        if mirror:
+            cv2.flip(img, 1, dst=img)
+        return img
+    
+    def blend_rect(self, img, pt1, pt2, color, alpha):
+        """
+        Draw a translucent rectangle by blending only the pixels it covers.
+        
+        Args:
+            img: Image to draw on
+            pt1, pt2: Opposite corners of the rectangle
+            color: BGR fill color
+            alpha: Opacity of the fill (0-1)
+        """
+        h, w = img.shape[:2]
+        x1, x2 = sorted((max(0, min(w, pt1[0])), max(0, min(w, pt2[0]))))
+        y1, y2 = sorted((max(0, min(h, pt1[1])), max(0, min(h, pt2[1]))))
+        if x1 == x2 or y1 == y2:
+            return
+        roi = img[y1:y2, x1:x2]
+        
+        # One full-frame scratch buffer serves every rectangle size
+        solid = self.like('blend', img)[:y2 - y1, :x2 - x1]
+        solid[:] = color
+        cv2.addWeighted(solid, alpha, roi, 1 - alpha, 0, dst=roi)
+
+
+class AllocationTracker:
+    """
+    Debug report of memory allocated per frame.
+    
+    Uses tracemalloc, which also sees NumPy and OpenCV array allocations, and
+    the FramePool counter. Enabling it slows the loop down noticeably.
+    """
+    
+    def __init__(self, enabled=False, interval=2.0):
+        """
+        Initialize the AllocationTracker.
+        
+        Args:
+            enabled: Whether to measure allocations
+            interval: Seconds between printed reports
+        """
+        self.enabled = enabled
+        self.interval = interval
+        self.frames = 0
+        self.peak_bytes = 0
+        self.last_report = time.perf_counter()
+        self.last_pool_count = FramePool.allocations
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+    
+    def begin_frame(self):
+        """Mark the start of a frame."""
+        if self.enabled:
+            tracemalloc.reset_peak()
+            self.frame_start_bytes = tracemalloc.get_traced_memory()[0]
+    
+    def end_frame(self):
+        """Mark the end of a frame and print a report every interval."""
+        if not self.enabled:
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        self.peak_bytes += peak - self.frame_start_bytes
+        self.frames += 1
+        
+        now = time.perf_counter()
+        if now - self.last_report >= self.interval:
+            pool_count = FramePool.allocations - self.last_pool_count
+            print(f"Allocations: {self.peak_bytes / self.frames / 1024:.0f} KB transient per frame, "
+                  f"{pool_count} pool buffers allocated in the last {self.frames} frames")
+            self.frames = 0
+            self.peak_bytes = 0
+            self.last_report = now
+            self.last_pool_count = FramePool.allocations
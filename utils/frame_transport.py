@@ -0,0 +1,343 @@
+"""
+Frame Transport Module
+Zero-copy transport of frames and hand landmarks between processes using a
+ring of preallocated slots in shared memory.
+
+There is a single writer. Each slot carries a begin and an end sequence
+number: the writer bumps the begin number, fills the slot, then sets the end
+number and finally advertises the slot as the latest. A reader that sees
+matching numbers before and after using a slot knows the data was not
+overwritten in between, so no locks are needed on either side.
+"""
+
+import os
+import struct
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+# magic, slot count, height, width, channels, max hands, latest seq
+RING_HEADER = struct.Struct('<4siiiiiQ')
+# begin seq, end seq, timestamp, hand count
+SLOT_HEADER = struct.Struct('<QQdi4x')
+# Process ID of the writer, stored after the ring header
+WRITER_PID = struct.Struct('<q')
+RING_MAGIC = b'GMFR'
+LANDMARK_SHAPE = (21, 3)
+
+
+def attach_shared_memory(name):
+    """
+    Attach to an existing shared memory block without taking ownership of it.
+    
+    Args:
+        name: Name of the shared memory block
+    
+    Returns:
+        SharedMemory instance
+    """
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        # Stop this process's resource tracker from unlinking the writer's block
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    except Exception:
+        pass
+    return shm
+
+
+def process_alive(pid):
+    """
+    Check whether a process is still running.
+    
+    Args:
+        pid: Process ID (0 or less when unknown)
+    
+    Returns:
+        Boolean, True when it cannot be ruled out
+    """
+    if pid <= 0 or os.name == 'nt':
+        # Windows frees named shared memory with its last handle, so a block
+        # that still exists there always has a live owner
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def remove_stale_ring(name):
+    """
+    Unlink a frame ring left behind by a writer that no longer runs.
+    
+    Args:
+        name: Name of the shared memory block
+    
+    Raises:
+        FileExistsError: If the block belongs to a running writer, or is not a frame ring
+    """
+    try:
+        existing = attach_shared_memory(name)
+    except FileNotFoundError:
+        return
+    try:
+        if existing.size < RING_HEADER.size + WRITER_PID.size:
+            raise FileExistsError(f"Shared memory '{name}' exists and is not a frame ring")
+        magic = RING_HEADER.unpack_from(existing.buf, 0)[0]
+        pid = WRITER_PID.unpack_from(existing.buf, RING_HEADER.size)[0]
+    finally:
+        existing.close()
+    if magic != RING_MAGIC:
+        raise FileExistsError(f"Shared memory '{name}' exists and is not a frame ring")
+    if process_alive(pid):
+        raise FileExistsError(f"Frame ring '{name}' is in use by process {pid}")
+    
+    stale = shared_memory.SharedMemory(name=name)
+    stale.close()
+    stale.unlink()
+    print(f"Removed frame ring '{name}' left behind by process {pid}")
+
+
+class FrameView:
+    """
+    A frame read from a FrameRing, backed directly by shared memory.
+    """
+    
+    def __init__(self, ring, slot, seq, timestamp, image, hands):
+        """
+        Initialize the FrameView.
+        
+        Args:
+            ring: FrameRing the view belongs to
+            slot: Slot index
+            seq: Sequence number of the frame
+            timestamp: Timestamp given by the writer
+            image: Zero-copy image view
+            hands: List of zero-copy landmark views of shape (21, 3)
+        """
+        self.ring = ring
+        self.slot = slot
+        self.seq = seq
+        self.timestamp = timestamp
+        self.image = image
+        self.hands = hands
+    
+    def is_valid(self):
+        """
+        Check that the writer has not reused the slot since this view was taken.
+        
+        Call after using the data; a False result means it may be torn.
+        
+        Returns:
+            Boolean
+        """
+        begin, end, _, _ = self.ring.slot_header(self.slot)
+        return begin == end == self.seq
+
+
+class FrameRing:
+    """
+    Ring of preallocated frame slots in shared memory with a single writer.
+    """
+    
+    def __init__(self, name, width=None, height=None, channels=3, slots=4,
+                 max_hands=2, create=False):
+        """
+        Create or attach to a frame ring.
+        
+        Args:
+            name: Name of the shared memory block
+            width: Frame width in pixels (required when creating)
+            height: Frame height in pixels (required when creating)
+            channels: Number of image channels
+            slots: Number of frame slots in the ring
+            max_hands: Maximum number of hands stored per frame
+            create: True for the writer, False for readers
+        
+        Raises:
+            FileExistsError: When creating a ring whose name a running writer already uses
+        """
+        self.name = name
+        self.owner = False
+        
+        if create:
+            # Only a block whose writer is gone is removed; a live one is left alone
+            remove_stale_ring(name)
+            self.slots, self.height, self.width = slots, height, width
+            self.channels, self.max_hands = channels, max_hands
+            self.shm = shared_memory.SharedMemory(name=name, create=True,
+                                                  size=self.compute_size())
+            self.owner = True
+            RING_HEADER.pack_into(self.shm.buf, 0, RING_MAGIC, slots, height, width,
+                                  channels, max_hands, 0)
+            WRITER_PID.pack_into(self.shm.buf, RING_HEADER.size, os.getpid())
+        else:
+            self.shm = attach_shared_memory(name)
+            magic, self.slots, self.height, self.width, self.channels, self.max_hands, _ = \
+                RING_HEADER.unpack_from(self.shm.buf, 0)
+            if magic != RING_MAGIC:
+                self.shm.close()
+                raise ValueError(f"Shared memory '{name}' is not a frame ring")
+        
+        self.images = []
+        self.landmarks = []
+        for slot in range(self.slots):
+            offset = self.slot_offset(slot) + SLOT_HEADER.size
+            self.landmarks.append(np.ndarray((self.max_hands,) + LANDMARK_SHAPE, np.float32,
+                                             buffer=self.shm.buf, offset=offset))
+            offset += self.landmark_bytes()
+            self.images.append(np.ndarray((self.height, self.width, self.channels), np.uint8,
+                                          buffer=self.shm.buf, offset=offset))
+        
+        self.seq = self.latest_seq()
+    
+    def landmark_bytes(self):
+        """Size of the landmark block of one slot in bytes."""
+        return self.max_hands * LANDMARK_SHAPE[0] * LANDMARK_SHAPE[1] * 4
+    
+    def slot_size(self):
+        """Size of one slot in bytes, rounded up to 64 bytes."""
+        size = SLOT_HEADER.size + self.landmark_bytes() + self.height * self.width * self.channels
+        return (size + 63) // 64 * 64
+    
+    def slot_offset(self, slot):
+        """Byte offset of a slot in the shared memory block."""
+        return 64 + slot * self.slot_size()
+    
+    def compute_size(self):
+        """Total size of the shared memory block in bytes."""
+        return 64 + self.slots * self.slot_size()
+    
+    def slot_header(self, slot):
+        """
+        Read a slot header.
+        
+        Returns:
+            Tuple (begin_seq, end_seq, timestamp, hand_count)
+        """
+        return SLOT_HEADER.unpack_from(self.shm.buf, self.slot_offset(slot))
+    
+    def latest_seq(self):
+        """Sequence number of the newest complete frame (0 if none)."""
+        return RING_HEADER.unpack_from(self.shm.buf, 0)[-1]
+    
+    def begin_write(self):
+        """
+        Claim the next slot for writing in place.
+        
+        Returns:
+            Tuple (seq, image, landmarks) where image and landmarks are writable views
+        """
+        self.seq += 1
+        slot = self.seq % self.slots
+        offset = self.slot_offset(slot)
+        _, end, _, _ = SLOT_HEADER.unpack_from(self.shm.buf, offset)
+        # Mark the slot as being written: begin != end
+        SLOT_HEADER.pack_into(self.shm.buf, offset, self.seq, end, 0.0, 0)
+        return self.seq, self.images[slot], self.landmarks[slot]
+    
+    def end_write(self, seq, hand_count=0, timestamp=None):
+        """
+        Publish a slot claimed with begin_write.
+        
+        Args:
+            seq: Sequence number returned by begin_write
+            hand_count: Number of valid hands in the landmark block
+            timestamp: Frame timestamp (defaults to time.time())
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        slot = seq % self.slots
+        SLOT_HEADER.pack_into(self.shm.buf, self.slot_offset(slot), seq, seq,
+                              timestamp, hand_count)
+        struct.pack_into('<Q', self.shm.buf, RING_HEADER.size - 8, seq)
+    
+    def write(self, img, hands=(), timestamp=None):
+        """
+        Copy a frame and its hand landmarks into the next slot and publish it.
+        
+        Args:
+            img: Image matching the ring's shape
+            hands: Sequence of landmark arrays of shape (21, 3)
+            timestamp: Frame timestamp (defaults to time.time())
+        
+        Returns:
+            Sequence number of the published frame
+        """
+        seq, image, landmarks = self.begin_write()
+        np.copyto(image, img)
+        hand_count = min(len(hands), self.max_hands)
+        for i in range(hand_count):
+            landmarks[i] = hands[i]
+        self.end_write(seq, hand_count, timestamp)
+        return seq
+    
+    def get(self, seq):
+        """
+        Get a zero-copy view of a specific frame.
+        
+        Args:
+            seq: Sequence number of the frame
+        
+        Returns:
+            FrameView, or None if the frame is not (or no longer) in the ring
+        """
+        if seq <= 0:
+            return None
+        slot = seq % self.slots
+        begin, end, timestamp, hand_count = self.slot_header(slot)
+        if begin != seq or end != seq:
+            return None
+        hands = [self.landmarks[slot][i] for i in range(hand_count)]
+        return FrameView(self, slot, seq, timestamp, self.images[slot], hands)
+    
+    def latest(self):
+        """
+        Get a zero-copy view of the newest complete frame.
+        
+        Returns:
+            FrameView, or None if nothing has been published
+        """
+        return self.get(self.latest_seq())
+    
+    def read(self, seq=None, out=None):
+        """
+        Copy a frame and its landmarks out of the ring.
+        
+        Args:
+            seq: Sequence number to read (None for the newest frame)
+            out: Optional preallocated image to copy into
+        
+        Returns:
+            Tuple (seq, image, hands) or (None, None, []) if the frame was overwritten
+        """
+        view = self.latest() if seq is None else self.get(seq)
+        if view is None:
+            return None, None, []
+        if out is None:
+            out = np.empty_like(view.image)
+        np.copyto(out, view.image)
+        hands = [hand.copy() for hand in view.hands]
+        if not view.is_valid():
+            return None, None, []
+        return view.seq, out, hands
+    
+    def close(self):
+        """Detach from (and, for the writer, destroy) the shared memory."""
+        self.images = []
+        self.landmarks = []
+        try:
+            self.shm.close()
+        except BufferError:
+            # A caller still holds a FrameView; the mapping goes away with it
+            pass
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
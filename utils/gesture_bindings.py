@@ -0,0 +1,301 @@
+"""
+Gesture Bindings Module
+Maps recognized gestures, and sequences of them, to application actions
+through profiles loaded from config.ini.
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+
+# Display names of the gestures GestureRecognizer reports
+GESTURE_LABELS = {
+    'palm_open': 'Palm Open',
+    'swipe_right': 'Swipe Right',
+    'swipe_left': 'Swipe Left',
+    'volume_up': 'Index Up',
+    'volume_down': '3 Fingers',
+    'peace_sign': 'Peace Sign',
+    'pinch_volume_up': 'Pinch High',
+    'pinch_volume_down': 'Pinch Low',
+    'fist': 'Fist',
+    'tap': 'Tap',
+}
+
+# Separates the steps of a sequence binding, e.g. "fist > swipe_right"
+SEQUENCE_SEPARATOR = '>'
+
+# Prefix of actions that press a key, e.g. "key:right"
+KEY_ACTION_PREFIX = 'key:'
+
+# Used when config.ini has no [Profile: media] section
+DEFAULT_PROFILES = {
+    'media': {
+        'palm_open': 'play_pause',
+        'swipe_right': 'next_track',
+        'swipe_left': 'previous_track',
+        'volume_up': 'volume_up',
+        'volume_down': 'volume_down',
+        'pinch_volume_up': 'volume_fine_up',
+        'pinch_volume_down': 'volume_fine_down',
+        'peace_sign': 'mute',
+    },
+}
+
+
+def gesture_label(pattern):
+    """Display name of a binding pattern ('fist > swipe_right' -> 'Fist > Swipe Right')."""
+    return f" {SEQUENCE_SEPARATOR} ".join(GESTURE_LABELS.get(step, step.replace('_', ' ').title())
+                                          for step in pattern)
+
+
+class Binding:
+    """
+    A gesture pattern resolved to its action.
+    """
+    
+    def __init__(self, pattern, action_name, label, callback):
+        """
+        Initialize the Binding.
+        
+        Args:
+            pattern: Tuple of gesture names performed in order
+            action_name: Action name from the profile
+            label: Display name of the action
+            callback: Callable running the action
+        """
+        self.pattern = pattern
+        self.action_name = action_name
+        self.label = label
+        self.callback = callback
+
+
+class BindingProfile:
+    """
+    One profile compiled into a prefix tree of dictionaries.
+    
+    Each node maps the next gesture to a child node, so dispatching a gesture
+    is a single dictionary lookup from the current node. Every action is
+    resolved to its callable here, once, instead of on every gesture.
+    """
+    
+    def __init__(self, name, bindings, actions, key_action=None):
+        """
+        Compile a profile.
+        
+        Args:
+            name: Profile name
+            bindings: Dictionary of pattern string -> action name, in display order
+            actions: Dictionary of action name -> (label, callback)
+            key_action: Callable key -> (label, callback) for 'key:<name>' actions
+        """
+        self.name = name
+        self.root = {}
+        self.bindings = []
+        
+        for pattern_text, action_name in bindings.items():
+            pattern = tuple(step.strip() for step in pattern_text.split(SEQUENCE_SEPARATOR)
+                            if step.strip())
+            action_name = action_name.strip()
+            if action_name.startswith(KEY_ACTION_PREFIX) and key_action is not None:
+                label, callback = key_action(action_name[len(KEY_ACTION_PREFIX):].strip())
+            elif action_name in actions:
+                label, callback = actions[action_name]
+            else:
+                print(f"Bindings: unknown action '{action_name}' in profile '{name}'")
+                continue
+            if not pattern:
+                continue
+            
+            binding = Binding(pattern, action_name, label, callback)
+            self.bindings.append(binding)
+            node = self.root
+            for step in pattern[:-1]:
+                node = node.setdefault(step, BindingNode()).children
+            node.setdefault(pattern[-1], BindingNode()).binding = binding
+    
+    def rows(self):
+        """(gesture label, action label) pairs for the controls panel."""
+        return [(gesture_label(binding.pattern), binding.label) for binding in self.bindings]
+
+
+class BindingNode:
+    """A node of the profile's prefix tree."""
+    
+    __slots__ = ('binding', 'children')
+    
+    def __init__(self):
+        self.binding = None
+        self.children = {}
+
+
+class BindingEngine:
+    """
+    Dispatches gestures through the active profile.
+    
+    A gesture that starts a longer sequence is held until the next step
+    arrives or sequence_timeout passes; if the prefix has an action of its own
+    it runs when the sequence is abandoned.
+    """
+    
+    def __init__(self, actions, profiles, profile_names=None, sequence_timeout=1.5,
+                 key_action=None, on_match=None):
+        """
+        Compile every profile and activate the first.
+        
+        Args:
+            actions: Dictionary of action name -> (label, callback)
+            profiles: Dictionary of profile name -> {pattern: action name}
+            profile_names: Profiles to use, in switching order (None = all)
+            sequence_timeout: Seconds allowed between the steps of a sequence
+            key_action: Callable key -> (label, callback) for 'key:<name>' actions
+            on_match: Callable receiving each Binding that fired
+        """
+        self.sequence_timeout = sequence_timeout
+        self.on_match = on_match
+        
+        names = [name for name in (profile_names or profiles) if name in profiles]
+        if not names:
+            names = list(DEFAULT_PROFILES)
+            profiles = DEFAULT_PROFILES
+        self.profiles = [BindingProfile(name, profiles[name], actions, key_action) for name in names]
+        self.active_index = 0
+        
+        # Sequence in progress: current tree node and the gestures that led to it
+        self.node = None
+        self.pending = ()
+        self.deadline = 0.0
+        
+        # Rendered controls panels, one per profile and width
+        self.panel_cache = {}
+    
+    @property
+    def profile(self):
+        """Active BindingProfile."""
+        return self.profiles[self.active_index]
+    
+    def switch_profile(self, name=None):
+        """
+        Activate a profile by name, or the next one.
+        
+        Args:
+            name: Profile name (None = cycle to the next profile)
+        
+        Returns:
+            The active BindingProfile
+        """
+        if name is None:
+            self.active_index = (self.active_index + 1) % len(self.profiles)
+        else:
+            for index, profile in enumerate(self.profiles):
+                if profile.name == name:
+                    self.active_index = index
+                    break
+        self.reset()
+        return self.profile
+    
+    def reset(self):
+        """Abandon any sequence in progress without running its action."""
+        self.node = None
+        self.pending = ()
+    
+    def dispatch(self, gesture, now=None):
+        """
+        Handle a recognized gesture.
+        
+        Args:
+            gesture: Gesture name
+            now: Current time (defaults to time.time())
+        
+        Returns:
+            Boolean indicating if the gesture was bound (fired or started a sequence)
+        """
+        now = time.time() if now is None else now
+        self.poll(now)
+        
+        child = self.node.children.get(gesture) if self.node is not None else None
+        if child is None:
+            # Not a continuation: finish the abandoned prefix, then start over
+            self.finish_pending()
+            child = self.profile.root.get(gesture)
+            if child is None:
+                return False
+            self.pending = ()
+        
+        self.pending += (gesture,)
+        if child.children:
+            self.node = child
+            self.deadline = now + self.sequence_timeout
+        else:
+            self.reset()
+            self.fire(child.binding)
+        return True
+    
+    def poll(self, now=None):
+        """
+        Run the action of a prefix whose sequence timed out; call once per frame.
+        
+        Args:
+            now: Current time (defaults to time.time())
+        """
+        now = time.time() if now is None else now
+        if self.node is not None and now >= self.deadline:
+            self.finish_pending()
+    
+    def finish_pending(self):
+        """End a sequence in progress, running the prefix's own action if it has one."""
+        node = self.node
+        self.reset()
+        if node is not None and node.binding is not None:
+            self.fire(node.binding)
+    
+    def fire(self, binding):
+        """Run a binding's action and report it."""
+        binding.callback()
+        if self.on_match is not None:
+            self.on_match(binding)
+    
+    def panel(self, width, title="GESTURE CONTROLS", extra_rows=()):
+        """
+        Get the controls panel of the active profile, rendered once and cached.
+        
+        Args:
+            width: Panel width in pixels
+            title: Panel title
+            extra_rows: (gesture label, action label) rows that are not bindings
+        
+        Returns:
+            Tuple (layer, mask): BGR text layer and the mask of its pixels
+        """
+        key = (self.active_index, width, title, tuple(extra_rows))
+        cached = self.panel_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        rows = self.profile.rows() + list(extra_rows)
+        height = 40 + len(rows) * 35
+        layer = np.zeros((height, width, 3), np.uint8)
+        cv2.putText(layer, f"{title} - {self.profile.name.upper()}", (20, 30),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 220, 255), 2)
+        
+        y_offset = 65
+        for gesture, action in rows:
+            # Shrink long sequence names to fit before the arrow
+            scale = 0.55
+            text_width = cv2.getTextSize(gesture, cv2.FONT_HERSHEY_SIMPLEX, scale, 1)[0][0]
+            if text_width > 170:
+                scale *= 170 / text_width
+            cv2.putText(layer, gesture, (20, y_offset),
+                        cv2.FONT_HERSHEY_SIMPLEX, scale, (220, 220, 220), 1)
+            cv2.putText(layer, "->", (200, y_offset),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 220, 255), 1)
+            cv2.putText(layer, action, (235, y_offset),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.55, (100, 255, 100), 2)
+            y_offset += 35
+        
+        mask = cv2.cvtColor(layer, cv2.COLOR_BGR2GRAY)
+        cv2.threshold(mask, 0, 255, cv2.THRESH_BINARY, dst=mask)
+        self.panel_cache[key] = (layer, mask)
+        return layer, mask
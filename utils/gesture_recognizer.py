@@ -1,28 +1,79 @@
 """
 Gesture Recognizer Module
 Detects and recognizes hand gestures for controlling applications.
+
+Landmarks are taken in Mediapipe's normalized form and measured in a
+hand-relative space: positions are scaled to isotropic frame-height units and
+distances are divided by the palm size (wrist to middle finger MCP). The
+thresholds are therefore dimensionless and do not depend on the camera
+resolution or how far the user stands from it.
 """
 
 import math
 import time
 
+from utils.tap_detector import TapDetector
+
 
 class GestureRecognizer:
     """
     Recognizes various hand gestures for application control.
     """
     
-    def __init__(self, cooldown_time=1.0):
+    def __init__(self, cooldown_time=1.0, aspect=16 / 9, gestures=None, clock=None):
         """
         Initialize the GestureRecognizer.
         
         Args:
             cooldown_time: Time in seconds between gesture detections to avoid spam
+            aspect: Frame width divided by height, to make normalized x and y comparable
+            gestures: GestureConfig with the thresholds (defaults if None)
+            clock: Function returning the current time in seconds (None = wall clock),
+                so recorded or synthetic streams can replay at any speed
         """
         self.cooldown_time = cooldown_time
+        self.aspect = aspect
+        self.clock = clock
         self.last_gesture_time = {}
         self.previous_hand_position = None
-        self.swipe_threshold = 150  # Pixels needed for a swipe
+        
+        # Thresholds in palm sizes, and vertical zones as fractions of the frame height
+        self.swipe_threshold = 1.1
+        self.pinch_threshold = 0.3
+        self.top_zone = 1 / 3
+        self.bottom_zone = 2 / 3
+        self.tap_detector = TapDetector(aspect=aspect)
+        if gestures is not None:
+            self.configure(gestures)
+        
+        # Per-gesture cooldowns overriding cooldown_time, from a calibration profile
+        self.gesture_cooldowns = {}
+    
+    def configure(self, gestures):
+        """
+        Apply [Gestures] settings.
+        
+        Args:
+            gestures: GestureConfig
+        """
+        self.swipe_threshold = gestures.swipe_threshold
+        self.pinch_threshold = gestures.pinch_threshold
+        self.top_zone = gestures.top_zone
+        self.bottom_zone = gestures.bottom_zone
+        self.tap_detector.configure(gestures)
+    
+    def to_hand_space(self, landmarks, index):
+        """
+        Position of one landmark in isotropic frame-height units.
+        
+        Args:
+            landmarks: Normalized (21, 3) landmarks of one hand
+            index: Landmark ID
+        
+        Returns:
+            Tuple (x, y)
+        """
+        return (float(landmarks[index][0]) * self.aspect, float(landmarks[index][1]))
         
     def can_trigger_gesture(self, gesture_name):
         """
@@ -34,49 +85,51 @@ class GestureRecognizer:
         Returns:
             Boolean indicating if gesture can be triggered
         """
-        current_time = time.time()
-        if gesture_name not in self.last_gesture_time:
-            self.last_gesture_time[gesture_name] = 0
+        current_time = self.clock() if self.clock is not None else time.time()
+        last_time = self.last_gesture_time.get(gesture_name)
         
-        if current_time - self.last_gesture_time[gesture_name] >= self.cooldown_time:
+        cooldown = self.gesture_cooldowns.get(gesture_name, self.cooldown_time)
+        if last_time is None or current_time - last_time >= cooldown:
             self.last_gesture_time[gesture_name] = current_time
             return True
         return False
     
-    def get_hand_center(self, landmark_list):
+    def get_hand_center(self, landmarks):
         """
         Calculate the center point of the hand.
         
         Args:
-            landmark_list: List of hand landmarks
+            landmarks: Normalized (21, 3) landmarks of one hand
             
         Returns:
-            Tuple (x, y) of hand center or None
+            Tuple (x, y) of hand center in hand space, or None
         """
-        if len(landmark_list) == 0:
+        if len(landmarks) == 0:
             return None
         
         # Use wrist (landmark 0) as reference point
-        return (landmark_list[0][1], landmark_list[0][2])
+        return self.to_hand_space(landmarks, 0)
     
-    def detect_swipe(self, landmark_list):
+    def detect_swipe(self, landmarks):
         """
         Detect left or right swipe gestures.
         
         Args:
-            landmark_list: List of hand landmarks
+            landmarks: Normalized (21, 3) landmarks of one hand
             
         Returns:
             'swipe_left', 'swipe_right', or None
         """
-        current_position = self.get_hand_center(landmark_list)
+        current_position = self.get_hand_center(landmarks)
+        hand_size = self.get_hand_size(landmarks)
         
-        if current_position is None:
+        if current_position is None or hand_size is None:
             self.previous_hand_position = None
             return None
         
         if self.previous_hand_position is not None:
-            dx = current_position[0] - self.previous_hand_position[0]
+            # Horizontal movement since the last frame, in palm sizes
+            dx = (current_position[0] - self.previous_hand_position[0]) / hand_size
             
             # Swipe right
             if dx > self.swipe_threshold:
@@ -93,6 +146,20 @@ class GestureRecognizer:
         self.previous_hand_position = current_position
         return None
     
+    def detect_tap(self, landmarks):
+        """
+        Detect a push of the index finger towards the camera.
+        
+        Call on every frame with a hand so the depth history stays continuous.
+        
+        Args:
+            landmarks: Normalized (21, 3) landmarks of one hand
+            
+        Returns:
+            Boolean
+        """
+        return self.tap_detector.update(landmarks, self.clock() if self.clock is not None else None)
+    
     def detect_palm_open(self, fingers):
         """
         Detect if palm is fully open (all fingers extended).
@@ -169,73 +236,100 @@ class GestureRecognizer:
         return (fingers[1] == 1 and fingers[2] == 1 and fingers[3] == 1 and 
                 fingers[0] == 0 and fingers[4] == 0)
     
-    def detect_pinch(self, landmark_list):
+    def detect_pinch(self, landmarks):
         """
         Detect pinch gesture (thumb and index finger close together).
         
         Args:
-            landmark_list: List of hand landmarks
+            landmarks: Normalized (21, 3) landmarks of one hand
             
         Returns:
             Boolean
         """
-        if len(landmark_list) == 0:
-            return False
+        ratio = self.get_pinch_ratio(landmarks)
+        
+        # Pinch detected if the tips are closer than a fraction of the palm size
+        return ratio is not None and ratio < self.pinch_threshold
+    
+    def get_hand_size(self, landmarks):
+        """
+        Get the size of the hand as the wrist to middle finger MCP distance.
         
-        # Get thumb tip (4) and index finger tip (8)
-        thumb_tip = None
-        index_tip = None
+        Args:
+            landmarks: Normalized (21, 3) landmarks of one hand
+            
+        Returns:
+            Hand size in frame-height units, or None if not available
+        """
+        if len(landmarks) < 10:
+            return None
         
-        for landmark in landmark_list:
-            if landmark[0] == 4:
-                thumb_tip = (landmark[1], landmark[2])
-            elif landmark[0] == 8:
-                index_tip = (landmark[1], landmark[2])
+        # Wrist (0) to middle finger MCP (9) barely changes with finger pose
+        size = math.dist(self.to_hand_space(landmarks, 9), self.to_hand_space(landmarks, 0))
+        return size if size > 0 else None
+    
+    def get_pinch_ratio(self, landmarks):
+        """
+        Get the thumb-index pinch distance normalized by hand size.
+        
+        Args:
+            landmarks: Normalized (21, 3) landmarks of one hand
+            
+        Returns:
+            Pinch distance in hand-size units, or None if not available
+        """
+        hand_size = self.get_hand_size(landmarks)
+        if hand_size is None:
+            return None
         
-        if thumb_tip and index_tip:
-            # Calculate distance
-            distance = math.sqrt(
-                (thumb_tip[0] - index_tip[0])**2 + 
-                (thumb_tip[1] - index_tip[1])**2
-            )
-            # Pinch detected if distance is small
-            return distance < 40
+        # Thumb tip (4) and index finger tip (8)
+        distance = math.dist(self.to_hand_space(landmarks, 4), self.to_hand_space(landmarks, 8))
+        return distance / hand_size
+    
+    def detect_analog_pose(self, fingers):
+        """
+        Detect the continuous-control pose (thumb and index up, others down).
         
-        return False
+        Args:
+            fingers: List of finger states
+            
+        Returns:
+            Boolean
+        """
+        return (len(fingers) == 5 and fingers[0] == 1 and fingers[1] == 1 and 
+                fingers[2] == 0 and fingers[3] == 0 and fingers[4] == 0)
     
-    def get_vertical_hand_position(self, landmark_list, img_height):
+    def get_vertical_hand_position(self, landmarks):
         """
         Get the vertical position of the hand (for volume control).
         
         Args:
-            landmark_list: List of hand landmarks
-            img_height: Height of the image
+            landmarks: Normalized (21, 3) landmarks of one hand
             
         Returns:
             'top', 'middle', or 'bottom'
         """
-        if len(landmark_list) == 0:
+        if len(landmarks) == 0:
             return 'middle'
         
-        # Use wrist position
-        wrist_y = landmark_list[0][2]
+        # Use wrist position, as a fraction of the frame height
+        wrist_y = landmarks[0][1]
         
-        # Divide screen into 3 zones
-        if wrist_y < img_height / 3:
+        # Divide the frame into 3 zones
+        if wrist_y < self.top_zone:
             return 'top'
-        elif wrist_y > 2 * img_height / 3:
+        elif wrist_y > self.bottom_zone:
             return 'bottom'
         else:
             return 'middle'
     
-    def recognize_gesture(self, fingers, landmark_list, img_height):
+    def recognize_gesture(self, fingers, landmarks):
         """
         Recognize the current gesture from finger states and landmarks.
         
         Args:
             fingers: List of finger states
-            landmark_list: List of hand landmarks
-            img_height: Height of the image
+            landmarks: Normalized (21, 3) landmarks of one hand
             
         Returns:
             Gesture name string or None
@@ -243,11 +337,19 @@ class GestureRecognizer:
         if len(fingers) == 0:
             return None
         
+        # Feed the tap detector before any early return, or a swipe frame
+        # would leave a gap in its depth history
+        tap = self.detect_tap(landmarks)
+        
         # Check for swipe first
-        swipe = self.detect_swipe(landmark_list)
+        swipe = self.detect_swipe(landmarks)
         if swipe:
             return swipe
         
+        # Tap - index finger pushed towards the camera
+        if tap and fingers[1] == 1 and self.can_trigger_gesture('tap'):
+            return 'tap'
+        
         # Palm open - Play/Pause
         if self.detect_palm_open(fingers):
             if self.can_trigger_gesture('palm_open'):
@@ -268,16 +370,14 @@ class GestureRecognizer:
             if self.can_trigger_gesture('volume_down'):
                 return 'volume_down'
         
-        # Fist - (removed, now using 3 fingers for volume down)
-        # elif self.detect_fist(fingers):
-        #     position = self.get_vertical_hand_position(landmark_list, img_height)
-        #     if position == 'bottom':
-        #         if self.can_trigger_gesture('volume_down'):
-        #             return 'volume_down'
+        # Fist - first step of gesture sequences (e.g. fist then swipe)
+        elif self.detect_fist(fingers):
+            if self.can_trigger_gesture('fist'):
+                return 'fist'
         
         # Pinch - Fine volume control
-        elif self.detect_pinch(landmark_list):
-            position = self.get_vertical_hand_position(landmark_list, img_height)
+        elif self.detect_pinch(landmarks):
+            position = self.get_vertical_hand_position(landmarks)
             if position == 'top' and self.can_trigger_gesture('pinch_up'):
                 return 'pinch_volume_up'
             elif position == 'bottom' and self.can_trigger_gesture('pinch_down'):
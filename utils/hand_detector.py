@@ -3,17 +3,57 @@ Hand Detector Module
 Uses Mediapipe to detect and track hand landmarks in real-time.
 """
 
+import threading
+import time
+
 import cv2
-import mediapipe as mp
 import numpy as np
 
+from utils.frame_buffers import FramePool
+from utils.startup_profiler import startup_profiler
+from utils.detector_backends import create_backend, set_cpu_threads
+from utils.landmark_renderer import LandmarkRenderer
+
+
+# Longest a model load and warm-up may take before waiting callers give up
+READY_TIMEOUT = 60.0
+
+# Backend tried when the configured one cannot load: the tasks backends need a
+# model bundle, and newer Mediapipe builds no longer ship the legacy solution
+FALLBACK_BACKENDS = {'solution': 'tasks_video', 'tasks_video': 'solution', 'tasks_live': 'solution'}
+
+
+def finger_extensions(landmarks, aspect):
+    """
+    Measure how far each finger is stretched out, independent of hand rotation.
+    
+    Fingers are measured from tip to wrist and the thumb from its tip to the
+    pinky knuckle, all divided by the palm size (wrist to middle finger MCP).
+    
+    Args:
+        landmarks: Normalized (21, 3) landmarks of one hand
+        aspect: Frame width divided by height
+    
+    Returns:
+        List of 5 extensions [Thumb, Index, Middle, Ring, Pinky], or None for a degenerate hand
+    """
+    points = landmarks[:, :2] * (aspect, 1.0)
+    palm = float(np.hypot(*(points[9] - points[0])))
+    if palm <= 0:
+        return None
+    extensions = [float(np.hypot(*(points[4] - points[17]))) / palm]
+    for tip in (8, 12, 16, 20):
+        extensions.append(float(np.hypot(*(points[tip] - points[0]))) / palm)
+    return extensions
+
 
 class HandDetector:
     """
     Hand detection class that uses Mediapipe to detect hands and their landmarks.
     """
     
-    def __init__(self, mode=False, max_hands=1, detection_confidence=0.7, tracking_confidence=0.7):
+    def __init__(self, mode=False, max_hands=1, detection_confidence=0.7, tracking_confidence=0.7,
+                 background_init=False, backend='solution', model_path='', num_threads=0):
         """
         Initialize the HandDetector with Mediapipe settings.
         
@@ -22,25 +62,157 @@ class HandDetector:
             max_hands: Maximum number of hands to detect
             detection_confidence: Minimum confidence for hand detection
             tracking_confidence: Minimum confidence for hand tracking
+            background_init: Build the Mediapipe graph on a background thread;
+                find_hands reports no hands until it is ready
+            backend: Inference backend: 'solution', 'tasks_video', 'tasks_live' or
+                'synthetic' (a scripted hand for load tests)
+            model_path: Hand landmarker model bundle for the Tasks backends, absolute or
+                relative to the project root
+            num_threads: OpenCV threads for the preprocessing around inference (0 = default);
+                Mediapipe's own inference threads are not capped
         """
         self.mode = mode
         self.max_hands = max_hands
         self.detection_confidence = detection_confidence
         self.tracking_confidence = tracking_confidence
+        self.backend_name = backend
+        self.model_path = model_path
+        self.num_threads = num_threads
+        self.backend = None
+        self.init_state()
         
-        # Initialize Mediapipe hands
-        self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            static_image_mode=self.mode,
-            max_num_hands=self.max_hands,
-            min_detection_confidence=self.detection_confidence,
-            min_tracking_confidence=self.tracking_confidence
-        )
-        self.mp_draw = mp.solutions.drawing_utils
+        # Mediapipe graph, built now or on a background thread
+        self.ready = threading.Event()
+        if background_init:
+            threading.Thread(target=self.build_graph_in_background, daemon=True).start()
+        else:
+            self.build_graph()
+    
+    def init_state(self):
+        """
+        Set up the landmark state and per-frame settings.
         
+        Shared with detectors that take their landmarks from elsewhere (see
+        RemoteHandDetector), so they never miss an attribute of this class.
+        """
         # Finger tip IDs for landmark detection
         self.tip_ids = [4, 8, 12, 16, 20]  # Thumb, Index, Middle, Ring, Pinky
         
+        # Normalized (x, y, z) landmarks of each detected hand, shape (21, 3)
+        self.hand_landmarks = []
+        self.landmark_list = []
+        self.frame_aspect = 16 / 9
+        
+        # Per-user extension thresholds from a calibration profile (None = pose geometry)
+        self.finger_thresholds = None
+        
+        # Skeleton drawing for find_hands(draw=True)
+        self.renderer = LandmarkRenderer()
+        
+        # Performance settings: inference resolution, frames skipped between inferences
+        # and landmark smoothing (0 = raw landmarks)
+        self.inference_size = None
+        self.frame_skip = 0
+        self.smoothing = 0.0
+        self.frames_since_inference = 0
+        self.results = None  # Latest backend output, None before the first inference
+        self.buffers = FramePool()
+        
+        # Optional PresenceGate that skips inference while nothing moves
+        self.presence_gate = None
+        
+        # Why the backend could not be loaded (None = loaded, or still loading)
+        self.load_error = None
+    
+    def build_graph(self):
+        """
+        Create the inference backend, load its model and run a warm-up inference.
+        """
+        set_cpu_threads(self.num_threads)
+        backend = create_backend(self.backend_name, self.model_path, self.max_hands,
+                                 self.detection_confidence, self.tracking_confidence,
+                                 static_image_mode=self.mode)
+        
+        # Mediapipe is imported inside load(), so clients of a remote detector never load it
+        try:
+            with startup_profiler.stage(f'{backend.name} model + warm-up'):
+                backend.load()
+        except (FileNotFoundError, ImportError, RuntimeError) as e:
+            fallback = FALLBACK_BACKENDS.get(backend.name)
+            if fallback is None:
+                raise
+            # One unavailable backend should not leave the app without hand tracking
+            print(f"Hand detector: {backend.name} backend unavailable ({e}); trying {fallback}")
+            failed = backend.name
+            backend = create_backend(fallback, self.model_path, self.max_hands,
+                                     self.detection_confidence, self.tracking_confidence,
+                                     static_image_mode=self.mode)
+            try:
+                with startup_profiler.stage(f'{fallback} model + warm-up'):
+                    backend.load()
+            except (FileNotFoundError, ImportError, RuntimeError) as fallback_error:
+                raise RuntimeError(f"{failed}: {e}; {fallback}: {fallback_error}") from fallback_error
+        self.backend = backend
+        
+        startup_profiler.mark('hand model ready')
+        self.ready.set()
+    
+    def build_graph_in_background(self):
+        """
+        Run build_graph on a background thread.
+        
+        A failure is kept in load_error and ready is still set, so callers
+        waiting for the graph find out instead of tracking nothing forever.
+        """
+        try:
+            self.build_graph()
+        except Exception as e:
+            self.load_error = e
+            print(f"Hand detector: hand tracking unavailable, the {self.backend_name} "
+                  f"backend failed to load: {e}")
+            self.ready.set()
+    
+    def wait_until_ready(self, timeout=None):
+        """
+        Block until the graph is built or has failed to build.
+        
+        Args:
+            timeout: Seconds to wait (None = no limit)
+        
+        Returns:
+            Boolean indicating if hand tracking is available
+        """
+        return self.ready.wait(timeout) and self.load_error is None
+    
+    def draw_status(self, img, x, y):
+        """
+        Draw a warning while hand tracking is unavailable.
+        
+        Args:
+            img: Frame to draw on
+            x, y: Position of the warning
+        """
+        if self.load_error is None:
+            return
+        message = (str(self.load_error) or type(self.load_error).__name__).splitlines()[0]
+        cv2.putText(img, "NO HAND TRACKING - the detector failed to load (see console)",
+                    (x, y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
+        cv2.putText(img, message[:90], (x, y + 25), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 1)
+    
+    def configure(self, inference_size=None, frame_skip=0, smoothing=0.0):
+        """
+        Apply performance settings without rebuilding the Mediapipe graph.
+        
+        Args:
+            inference_size: (width, height) to run inference at, or None for full frames
+            frame_skip: Number of frames to reuse a result for between inferences
+            smoothing: Weight of the previous landmarks in an exponential moving
+                average (0 = raw landmarks, closer to 1 = steadier but laggier)
+        """
+        self.inference_size = inference_size
+        self.frame_skip = max(0, frame_skip)
+        self.smoothing = min(max(smoothing, 0.0), 0.95)
+    
     def find_hands(self, img, draw=True):
         """
         Find hands in the image and optionally draw landmarks.
@@ -52,21 +224,60 @@ class HandDetector:
         Returns:
             Image with or without drawn landmarks
         """
-        # Convert BGR to RGB for Mediapipe
-        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        self.results = self.hands.process(img_rgb)
+        if not self.ready.is_set() or self.load_error is not None:
+            # Graph still warming up in the background, or it failed to load
+            # (load_error says why; apps show it)
+            self.hand_landmarks = []
+            return img
+        
+        # Reuse the previous result on skipped frames, and while the scene is empty
+        if (self.results is None or self.frames_since_inference >= self.frame_skip) and (
+                self.presence_gate is None or self.results is None
+                or self.presence_gate.should_infer(img, bool(self.hand_landmarks))):
+            self.frames_since_inference = 0
+            
+            # Landmarks are normalized, so inference can run on a smaller copy
+            small = img
+            if self.inference_size is not None and img.shape[1] > self.inference_size[0]:
+                width, height = self.inference_size
+                small = cv2.resize(img, self.inference_size, interpolation=cv2.INTER_AREA,
+                                   dst=self.buffers.get('inference', (height, width, 3)))
+            
+            # Convert BGR to RGB for Mediapipe
+            img_rgb = cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=self.buffers.like('rgb', small))
+            results = self.backend.process(img_rgb, int(time.perf_counter() * 1000))
+            
+            # An asynchronous backend has nothing to report until its first result
+            if results is not None:
+                self.results = results
+                self.hand_landmarks = self.smooth_landmarks(results)
+            elif self.results is None:
+                return img
+        else:
+            self.frames_since_inference += 1
         
         # Draw hand landmarks if detected
-        if self.results.multi_hand_landmarks and draw:
-            for hand_landmarks in self.results.multi_hand_landmarks:
-                self.mp_draw.draw_landmarks(
-                    img, 
-                    hand_landmarks, 
-                    self.mp_hands.HAND_CONNECTIONS
-                )
+        if draw:
+            self.renderer.draw(img, self.hand_landmarks)
         
         return img
     
+    def smooth_landmarks(self, hands):
+        """
+        Blend new landmarks with the previous ones to steady low-resolution results.
+        
+        Args:
+            hands: List of (21, 3) arrays from the latest inference
+            
+        Returns:
+            List of smoothed arrays
+        """
+        if self.smoothing <= 0 or len(hands) != len(self.hand_landmarks):
+            return hands
+        weight = self.smoothing
+        return [previous * weight + current * (1 - weight)
+                for previous, current in zip(self.hand_landmarks, hands)]
+    
     def find_position(self, img, hand_no=0, draw=True):
         """
         Find the position of hand landmarks.
@@ -77,23 +288,25 @@ class HandDetector:
             draw: Whether to draw circles on landmarks
             
         Returns:
-            List of landmark positions [id, x, y]
+            List of landmark positions [id, x, y, z]; z is the depth relative
+            to the wrist in the same pixel scale as x (smaller = closer)
         """
         self.landmark_list = []
         
-        if self.results.multi_hand_landmarks:
-            if hand_no < len(self.results.multi_hand_landmarks):
-                hand = self.results.multi_hand_landmarks[hand_no]
+        if hand_no < len(self.hand_landmarks):
+            hand = self.hand_landmarks[hand_no]
+            
+            # Get image dimensions
+            h, w, c = img.shape
+            self.frame_aspect = w / h
+            for id, landmark in enumerate(hand):
+                # Convert normalized coordinates to pixel coordinates
+                cx, cy = int(landmark[0] * w), int(landmark[1] * h)
+                cz = int(landmark[2] * w)
+                self.landmark_list.append([id, cx, cy, cz])
                 
-                for id, landmark in enumerate(hand.landmark):
-                    # Get image dimensions
-                    h, w, c = img.shape
-                    # Convert normalized coordinates to pixel coordinates
-                    cx, cy = int(landmark.x * w), int(landmark.y * h)
-                    self.landmark_list.append([id, cx, cy])
-                    
-                    if draw:
-                        cv2.circle(img, (cx, cy), 7, (255, 0, 255), cv2.FILLED)
+                if draw:
+                    cv2.circle(img, (cx, cy), 7, (255, 0, 255), cv2.FILLED)
         
         return self.landmark_list
     
@@ -106,16 +319,26 @@ class HandDetector:
         """
         fingers = []
         
-        if len(self.landmark_list) != 0:
+        # Compared in normalized coordinates, so pixel rounding cannot flip a finger
+        if len(self.landmark_list) != 0 and self.hand_landmarks:
+            hand = self.hand_landmarks[0]
+            
+            # Calibrated: a finger is up when stretched past the user's own threshold
+            if self.finger_thresholds is not None:
+                extensions = finger_extensions(hand, self.frame_aspect)
+                if extensions is not None:
+                    return [int(extension > threshold)
+                            for extension, threshold in zip(extensions, self.finger_thresholds)]
+            
             # Thumb (special case - check horizontal position)
-            if self.landmark_list[self.tip_ids[0]][1] > self.landmark_list[self.tip_ids[0] - 1][1]:
+            if hand[self.tip_ids[0]][0] > hand[self.tip_ids[0] - 1][0]:
                 fingers.append(1)
             else:
                 fingers.append(0)
             
             # Four fingers (check vertical position)
             for id in range(1, 5):
-                if self.landmark_list[self.tip_ids[id]][2] < self.landmark_list[self.tip_ids[id] - 2][2]:
+                if hand[self.tip_ids[id]][1] < hand[self.tip_ids[id] - 2][1]:
                     fingers.append(1)
                 else:
                     fingers.append(0)
@@ -0,0 +1,137 @@
+"""
+Instrumentation Module
+Lightweight per-stage latency measurement for the frame loops.
+"""
+
+import time
+
+import cv2
+
+
+class StageTimer:
+    """
+    Measures how long each stage of a frame takes, smoothed over recent frames.
+    
+    Call begin() at the top of the loop, lap('stage') after each stage and
+    end() at the bottom. When disabled every call returns immediately.
+    """
+    
+    def __init__(self, enabled=True, smoothing=0.9, visible=True):
+        """
+        Initialize the StageTimer.
+        
+        Args:
+            enabled: Whether to record timings
+            smoothing: Exponential smoothing factor for the averages
+            visible: Whether draw() shows the timings on screen
+        """
+        self.enabled = enabled
+        self.visible = visible
+        self.smoothing = smoothing
+        self.averages = {}
+        self.notes = {}
+        self.frame_time = 0.0
+        self.frame_start = 0.0
+        self.last_lap = 0.0
+        self.last_frame_start = 0.0
+    
+    def begin(self):
+        """Mark the start of a frame."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self.last_frame_start:
+            self.record('frame', now - self.last_frame_start)
+            self.frame_time = self.averages['frame']
+        self.last_frame_start = now
+        self.frame_start = now
+        self.last_lap = now
+    
+    def lap(self, name):
+        """
+        Mark the end of a stage.
+        
+        Args:
+            name: Stage name
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.record(name, now - self.last_lap)
+        self.last_lap = now
+    
+    def end(self):
+        """Mark the end of the work done in a frame."""
+        if not self.enabled:
+            return
+        self.record('total', time.perf_counter() - self.frame_start)
+    
+    def record(self, name, duration):
+        """
+        Fold a measurement into the running average.
+        
+        Args:
+            name: Stage name
+            duration: Duration in seconds
+        """
+        average = self.averages.get(name)
+        if average is None:
+            self.averages[name] = duration
+        else:
+            self.averages[name] = average * self.smoothing + duration * (1 - self.smoothing)
+    
+    def note(self, name, text):
+        """
+        Show a value other than a timing alongside the stages (e.g. a percentage).
+        
+        Args:
+            name: Label
+            text: Formatted value
+        """
+        if self.enabled:
+            self.notes[name] = text
+    
+    def get_ms(self, name):
+        """Average duration of a stage in milliseconds (0 if unknown)."""
+        return self.averages.get(name, 0.0) * 1000
+    
+    def get_work_ms(self, exclude=('capture',)):
+        """
+        Average time spent working in a frame, leaving out stages that only wait.
+        
+        Args:
+            exclude: Stage names to subtract from the total (e.g. waiting for the camera)
+        
+        Returns:
+            Duration in milliseconds
+        """
+        return max(0.0, self.get_ms('total') - sum(self.get_ms(name) for name in exclude))
+    
+    def get_fps(self):
+        """Frame rate derived from the average frame period."""
+        return 1.0 / self.frame_time if self.frame_time > 0 else 0.0
+    
+    def summary(self):
+        """
+        Format the stage timings for display.
+        
+        Returns:
+            List of strings, one per stage
+        """
+        return [f"{name}: {duration * 1000:.1f} ms"
+                for name, duration in self.averages.items() if name != 'frame'] + [
+                f"{name}: {text}" for name, text in self.notes.items()]
+    
+    def draw(self, img, x, y):
+        """
+        Draw the stage timings onto a frame.
+        
+        Args:
+            img: Image to draw on
+            x, y: Top-left position of the text block
+        """
+        if not (self.enabled and self.visible):
+            return
+        for line in self.summary():
+            cv2.putText(img, line, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 220, 255), 1)
+            y += 20
@@ -0,0 +1,103 @@
+"""
+Landmark Renderer Module
+Draws hand skeletons straight from the (21, 3) landmark arrays with a couple
+of batched OpenCV calls per frame.
+"""
+
+import cv2
+import numpy as np
+
+
+# Detail levels, from nothing to the full skeleton with joints
+DETAIL_LEVELS = ('off', 'tips', 'skeleton', 'full')
+
+# Pairs of landmark IDs forming the hand skeleton (same topology as Mediapipe)
+HAND_CONNECTIONS = (
+    (0, 1), (1, 2), (2, 3), (3, 4),          # Thumb
+    (0, 5), (5, 6), (6, 7), (7, 8),          # Index
+    (5, 9), (9, 10), (10, 11), (11, 12),     # Middle
+    (9, 13), (13, 14), (14, 15), (15, 16),   # Ring
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20)  # Pinky and palm
+)
+
+# The same connections as six open chains: thumb, palm outline, then the fingers
+HAND_CHAINS = (
+    (0, 1, 2, 3, 4),
+    (0, 5, 9, 13, 17, 0),
+    (5, 6, 7, 8),
+    (9, 10, 11, 12),
+    (13, 14, 15, 16),
+    (17, 18, 19, 20),
+)
+
+# Precomputed gather indices: one fancy-index per hand, then a view per chain
+CHAIN_INDEX = np.concatenate(HAND_CHAINS)
+CHAIN_SLICES = tuple(slice(int(end) - len(chain), int(end)) for chain, end in
+                     zip(HAND_CHAINS, np.cumsum([len(chain) for chain in HAND_CHAINS])))
+
+TIP_IDS = np.array([4, 8, 12, 16, 20])
+JOINT_IDS = np.arange(21)
+
+
+class LandmarkRenderer:
+    """
+    Batched hand skeleton renderer.
+    
+    All bones of all hands go to one cv2.polylines call, drawn as the six
+    chains of HAND_CHAINS. Joints go to a second call as zero-length
+    segments, which OpenCV draws as filled dots as wide as the line, so no
+    call is made per bone or per joint.
+    """
+    
+    def __init__(self, detail='full', line_color=(224, 224, 224), joint_color=(0, 0, 255),
+                 line_thickness=2, joint_radius=4):
+        """
+        Initialize the LandmarkRenderer.
+        
+        Args:
+            detail: One of DETAIL_LEVELS
+            line_color: Bone color (BGR)
+            joint_color: Joint color (BGR)
+            line_thickness: Bone thickness in pixels
+            joint_radius: Joint radius in pixels
+        """
+        self.detail = detail
+        self.line_color = line_color
+        self.joint_color = joint_color
+        self.line_thickness = line_thickness
+        self.joint_radius = joint_radius
+    
+    def draw(self, img, hands):
+        """
+        Draw the hands at the current detail level.
+        
+        Args:
+            img: Image to draw on (BGR format, modified in place)
+            hands: List of normalized (21, 3) landmark arrays
+        
+        Returns:
+            The image
+        """
+        if self.detail == 'off' or not hands:
+            return img
+        
+        h, w = img.shape[:2]
+        scale = np.array([w, h], np.float32)
+        bones = []
+        joints = []
+        for landmarks in hands:
+            points = (landmarks[:, :2] * scale).astype(np.int32)
+            if self.detail in ('skeleton', 'full'):
+                chained = points[CHAIN_INDEX]
+                bones.extend(chained[chain] for chain in CHAIN_SLICES)
+            if self.detail in ('tips', 'full'):
+                ids = TIP_IDS if self.detail == 'tips' else JOINT_IDS
+                joints.append(points[ids])
+        
+        if bones:
+            cv2.polylines(img, bones, False, self.line_color, self.line_thickness)
+        if joints:
+            # Each joint becomes a (point, point) segment
+            dots = np.repeat(np.concatenate(joints)[:, None, :], 2, axis=1)
+            cv2.polylines(img, dots, False, self.joint_color, self.joint_radius * 2)
+        return img
@@ -0,0 +1,152 @@
+"""
+Presence Gate Module
+Skips hand inference while nothing moves in front of the camera.
+"""
+
+import time
+
+import cv2
+
+from utils.frame_buffers import FramePool
+
+
+class PresenceGate:
+    """
+    Decides per frame whether the hand model needs to run.
+    
+    A background subtractor on a small grayscale copy of the frame detects
+    motion for a fraction of a millisecond. Inference runs while there is
+    motion, while a hand was seen recently, and on a periodic full check that
+    catches a hand held perfectly still. Everything else is gated.
+    """
+    
+    def __init__(self, width=160, motion_threshold=0.002, full_check_interval=1.0,
+                 hold_time=2.0):
+        """
+        Initialize the PresenceGate.
+        
+        Args:
+            width: Width of the motion analysis image (height keeps the aspect ratio)
+            motion_threshold: Fraction of changed pixels that counts as motion
+            full_check_interval: Seconds between inferences while nothing moves
+            hold_time: Seconds inference keeps running after a hand was last seen
+        """
+        self.width = width
+        self.motion_threshold = motion_threshold
+        self.full_check_interval = full_check_interval
+        self.hold_time = hold_time
+        
+        self.subtractor = cv2.createBackgroundSubtractorMOG2(history=200, varThreshold=25,
+                                                             detectShadows=False)
+        self.buffers = FramePool()
+        self.last_hand_time = 0.0
+        self.last_inference_time = 0.0
+        
+        # Statistics
+        self.frames = 0
+        self.gated = 0
+        self.recent_gated = 0.0
+        self.motion = 0.0
+    
+    def configure(self, presence):
+        """
+        Apply reloaded [Presence Gate] settings.
+        
+        Args:
+            presence: PresenceConfig
+        """
+        if presence.width != self.width:
+            self.width = presence.width
+            self.subtractor = cv2.createBackgroundSubtractorMOG2(history=200, varThreshold=25,
+                                                                 detectShadows=False)
+        self.motion_threshold = presence.motion_threshold
+        self.full_check_interval = presence.full_check_interval
+        self.hold_time = presence.hold_time
+    
+    def measure_motion(self, img):
+        """
+        Update the background model and measure how much of the frame changed.
+        
+        Args:
+            img: BGR frame
+        
+        Returns:
+            Fraction of pixels in the foreground
+        """
+        h, w = img.shape[:2]
+        size = (self.width, max(1, self.width * h // w))
+        # Point sampling is ~20x cheaper than area averaging; the subtractor
+        # learns the extra per-pixel noise as part of the background
+        small = cv2.resize(img, size, interpolation=cv2.INTER_LINEAR,
+                           dst=self.buffers.get('small', (size[1], size[0], 3)))
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY,
+                            dst=self.buffers.get('gray', (size[1], size[0])))
+        foreground = self.subtractor.apply(gray, fgmask=self.buffers.get('foreground', gray.shape))
+        return cv2.countNonZero(foreground) / foreground.size
+    
+    def should_infer(self, img, hand_present, now=None):
+        """
+        Decide whether to run the hand model on this frame.
+        
+        Args:
+            img: BGR frame
+            hand_present: Whether the previous inference found a hand
+            now: Current time (defaults to time.perf_counter())
+        
+        Returns:
+            Boolean
+        """
+        now = time.perf_counter() if now is None else now
+        self.frames += 1
+        
+        # The background model keeps learning even while a hand is tracked
+        self.motion = self.measure_motion(img)
+        if hand_present:
+            self.last_hand_time = now
+        
+        infer = (hand_present
+                 or now - self.last_hand_time < self.hold_time
+                 or self.motion >= self.motion_threshold
+                 or now - self.last_inference_time >= self.full_check_interval)
+        if infer:
+            self.last_inference_time = now
+        else:
+            self.gated += 1
+        self.recent_gated = self.recent_gated * 0.98 + (0.0 if infer else 0.02)
+        return infer
+    
+    @property
+    def gated_percent(self):
+        """Percentage of frames gated since the last reset_stats()."""
+        return 100.0 * self.gated / self.frames if self.frames else 0.0
+    
+    @property
+    def recent_gated_percent(self):
+        """Percentage of recent frames gated (moving average over ~50 frames)."""
+        return 100.0 * self.recent_gated
+    
+    def reset_stats(self):
+        """Start counting gated frames afresh."""
+        self.frames = 0
+        self.gated = 0
+
+
+def apply_presence_config(detector, presence):
+    """
+    Give a detector the gate described by the [Presence Gate] section.
+    
+    An existing gate is reconfigured in place so it keeps its background model.
+    
+    Args:
+        detector: HandDetector running inference locally
+        presence: PresenceConfig
+    """
+    if not presence.enabled:
+        detector.presence_gate = None
+    elif detector.presence_gate is not None:
+        detector.presence_gate.configure(presence)
+    else:
+        detector.presence_gate = PresenceGate(width=presence.width,
+                                              motion_threshold=presence.motion_threshold,
+                                              full_check_interval=presence.full_check_interval,
+                                              hold_time=presence.hold_time)
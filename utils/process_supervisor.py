@@ -0,0 +1,346 @@
+"""
+Process Supervisor Module
+Keeps track of the processes started by the launcher: one instance per app
+and per camera, CPU/memory telemetry, and restarts after a crash.
+"""
+
+import csv
+import os
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+
+
+# Columns of the telemetry log
+LOG_COLUMNS = ('time', 'app', 'pid', 'cpu_percent', 'rss_mb', 'threads', 'event')
+
+
+@dataclass
+class ProcessStats:
+    """One telemetry sample of a supervised process."""
+    cpu_percent: float = 0.0
+    rss_mb: float = 0.0
+    threads: int = 0
+
+
+class SupervisedProcess:
+    """
+    An app started by the supervisor, across its restarts.
+    
+    state is one of 'running', 'restarting' (crashed, waiting for its
+    backoff), 'failed' (crashed too often), 'exited' (closed by the user)
+    or 'stopped' (stopped by the supervisor).
+    """
+    
+    def __init__(self, name, args, camera=None):
+        """
+        Initialize the SupervisedProcess.
+        
+        Args:
+            name: App name, unique among supervised processes
+            args: Command line to start the app with
+            camera: Camera index the app opens itself, or None if it opens none
+        """
+        self.name = name
+        self.args = args
+        self.camera = camera
+        self.popen = None
+        self.process = None
+        self.state = 'stopped'
+        self.started = 0.0
+        self.restarts = 0
+        self.restart_at = 0.0
+        self.exit_code = None
+        self.stats = ProcessStats()
+        self.peak_rss_mb = 0.0
+    
+    @property
+    def pid(self):
+        """Process ID of the current instance, or None."""
+        return self.popen.pid if self.popen is not None else None
+    
+    @property
+    def active(self):
+        """True while the app is running or about to be restarted."""
+        return self.state in ('running', 'restarting')
+
+
+class ProcessSupervisor:
+    """
+    Starts apps, samples their resource use and restarts them when they crash.
+    
+    A daemon thread polls the children every sample_interval seconds, so
+    neither psutil nor the restarts ever run on the Tk mainloop; the UI reads
+    the latest samples with status(). An app that exits with code 0 was closed
+    by the user and stays closed. Any other exit is a crash: the app is
+    started again after restart_backoff seconds, doubling with each crash up
+    to max_backoff, and given up on after max_restarts crashes in a row. An
+    app that ran for stable_time seconds starts counting crashes afresh.
+    """
+    
+    def __init__(self, sample_interval=1.0, max_restarts=3, restart_backoff=2.0,
+                 max_backoff=30.0, stable_time=60.0, log_path=None, cwd=None):
+        """
+        Initialize the ProcessSupervisor.
+        
+        Args:
+            sample_interval: Seconds between telemetry samples and exit checks
+            max_restarts: Crashes in a row after which an app is not restarted
+            restart_backoff: Delay before the first restart, in seconds
+            max_backoff: Longest delay between restarts, in seconds
+            stable_time: Uptime after which the crash count is reset, in seconds
+            log_path: CSV file the telemetry is appended to (None = no log)
+            cwd: Working directory for the apps
+        """
+        self.sample_interval = sample_interval
+        self.max_restarts = max_restarts
+        self.restart_backoff = restart_backoff
+        self.max_backoff = max_backoff
+        self.stable_time = stable_time
+        self.log_path = log_path
+        self.cwd = cwd
+        
+        self.apps = {}
+        self.lock = threading.Lock()
+        self.log_lock = threading.Lock()
+        self.log_file = None
+        self.log_writer = None
+        
+        self.running = False
+        self.wake = threading.Event()
+        self.thread = None
+        
+        # psutil only feeds the telemetry; tracking and restarts work without it
+        try:
+            import psutil
+            self.psutil = psutil
+        except ImportError:
+            print("Warning: psutil is not installed, process telemetry is disabled")
+            self.psutil = None
+    
+    def camera_owner(self, camera, exclude=None):
+        """
+        Find the active app holding a camera.
+        
+        Args:
+            camera: Camera index, or None
+            exclude: App name to ignore
+        
+        Returns:
+            SupervisedProcess, or None
+        """
+        if camera is None:
+            return None
+        for app in self.apps.values():
+            if app.name != exclude and app.active and app.camera == camera:
+                return app
+        return None
+    
+    def launch(self, name, args, camera=None):
+        """
+        Start an app unless it, or another app on the same camera, is running.
+        
+        Args:
+            name: App name
+            args: Command line to start the app with
+            camera: Camera index the app opens itself, or None
+        
+        Returns:
+            Boolean indicating if the app was started
+        """
+        with self.lock:
+            app = self.apps.get(name)
+            if app is not None and app.active:
+                print(f"⚠️ {name} is already running (PID {app.pid})")
+                return False
+            owner = self.camera_owner(camera, exclude=name)
+            if owner is not None:
+                print(f"⚠️ Camera {camera} is in use by {owner.name} (PID {owner.pid})")
+                return False
+            
+            app = SupervisedProcess(name, args, camera)
+            try:
+                self.spawn(app)
+            except OSError as e:
+                print(f"❌ Error starting {name}: {e}")
+                return False
+            self.apps[name] = app
+        
+        self.start()
+        return True
+    
+    def spawn(self, app):
+        """Start (or restart) an app's process."""
+        app.popen = subprocess.Popen(app.args, cwd=self.cwd)
+        app.state = 'running'
+        app.started = time.monotonic()
+        app.exit_code = None
+        app.stats = ProcessStats()
+        app.process = None
+        if self.psutil is not None:
+            try:
+                app.process = self.psutil.Process(app.popen.pid)
+                app.process.cpu_percent(None)  # The first reading only sets the baseline
+            except self.psutil.Error:
+                app.process = None
+        self.log(app, 'started' if app.restarts == 0 else f'restarted ({app.restarts})')
+    
+    def stop(self, name, timeout=3.0):
+        """
+        Stop an app and keep it from being restarted.
+        
+        Args:
+            name: App name
+            timeout: Seconds to wait for it to exit before killing it
+        """
+        with self.lock:
+            app = self.apps.get(name)
+            if app is None or not app.active:
+                return
+            app.state = 'stopped'
+            popen = app.popen
+        if popen is not None and popen.poll() is None:
+            popen.terminate()
+            try:
+                popen.wait(timeout)
+            except subprocess.TimeoutExpired:
+                popen.kill()
+        self.log(app, 'stopped')
+    
+    def status(self, name):
+        """
+        Latest state of an app, for display.
+        
+        Args:
+            name: App name
+        
+        Returns:
+            Tuple (state, ProcessStats, seconds until restart), or None if never started
+        """
+        with self.lock:
+            app = self.apps.get(name)
+            if app is None:
+                return None
+            wait = max(0.0, app.restart_at - time.monotonic()) if app.state == 'restarting' else 0.0
+            return app.state, app.stats, wait
+    
+    def start(self):
+        """Start the monitor thread."""
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+    
+    def run(self):
+        """Monitor loop."""
+        while self.running:
+            self.poll()
+            self.wake.wait(self.sample_interval)
+            self.wake.clear()
+    
+    def poll(self):
+        """Sample running apps, notice exits and perform due restarts."""
+        now = time.monotonic()
+        with self.lock:
+            apps = list(self.apps.values())
+        
+        for app in apps:
+            if app.state == 'running':
+                code = app.popen.poll()
+                if code is None:
+                    self.sample(app)
+                else:
+                    self.handle_exit(app, code, now)
+            elif app.state == 'restarting' and now >= app.restart_at:
+                with self.lock:
+                    if app.state != 'restarting':
+                        continue
+                    # Another app may have taken the camera in the meantime
+                    owner = self.camera_owner(app.camera, exclude=app.name)
+                    if owner is not None:
+                        app.state = 'failed'
+                        self.log(app, f'camera taken by {owner.name}')
+                        continue
+                    try:
+                        self.spawn(app)
+                    except OSError as e:
+                        app.state = 'failed'
+                        self.log(app, f'restart failed: {e}')
+    
+    def sample(self, app):
+        """Take one telemetry sample of a running app."""
+        if app.process is None:
+            return
+        try:
+            with app.process.oneshot():
+                stats = ProcessStats(
+                    cpu_percent=app.process.cpu_percent(None),
+                    rss_mb=app.process.memory_info().rss / (1024 * 1024),
+                    threads=app.process.num_threads()
+                )
+        except self.psutil.Error:
+            return
+        app.stats = stats
+        app.peak_rss_mb = max(app.peak_rss_mb, stats.rss_mb)
+        self.log(app)
+    
+    def handle_exit(self, app, code, now):
+        """Decide what happens after an app's process ended."""
+        with self.lock:
+            if app.state != 'running':
+                return
+            app.exit_code = code
+            if code == 0:
+                app.state = 'exited'
+                self.log(app, 'exited')
+                return
+            
+            if now - app.started >= self.stable_time:
+                app.restarts = 0
+            if app.restarts >= self.max_restarts:
+                app.state = 'failed'
+                print(f"❌ {app.name} crashed {app.restarts + 1} times in a row (exit code {code}), "
+                      f"not restarting")
+                self.log(app, f'crashed ({code}), giving up')
+                return
+            
+            delay = min(self.restart_backoff * 2 ** app.restarts, self.max_backoff)
+            app.restarts += 1
+            app.restart_at = now + delay
+            app.state = 'restarting'
+            print(f"⚠️ {app.name} crashed (exit code {code}), restarting in {delay:.0f}s")
+            self.log(app, f'crashed ({code})')
+    
+    def log(self, app, event=''):
+        """Append a telemetry row for an app (event empty for plain samples)."""
+        if self.log_path is None:
+            return
+        stats = app.stats
+        with self.log_lock:
+            if self.log_file is None:
+                directory = os.path.dirname(self.log_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                new_file = not os.path.exists(self.log_path)
+                self.log_file = open(self.log_path, 'a', encoding='utf-8', newline='')
+                self.log_writer = csv.writer(self.log_file)
+                if new_file:
+                    self.log_writer.writerow(LOG_COLUMNS)
+            self.log_writer.writerow([time.strftime('%Y-%m-%dT%H:%M:%S'), app.name, app.pid,
+                                      f"{stats.cpu_percent:.1f}", f"{stats.rss_mb:.1f}",
+                                      stats.threads, event])
+            self.log_file.flush()
+    
+    def close(self):
+        """Stop monitoring; apps that are still running are left running."""
+        self.running = False
+        self.wake.set()
+        if self.thread is not None:
+            self.thread.join(timeout=2.0)
+            self.thread = None
+        with self.log_lock:
+            if self.log_file is not None:
+                self.log_file.close()
+                self.log_file = None
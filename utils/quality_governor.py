@@ -0,0 +1,193 @@
+"""
+Quality Governor Module
+Trades detection and rendering quality for frame rate to hold a target FPS.
+"""
+
+import time
+from dataclasses import dataclass, replace
+
+
+@dataclass
+class QualityLevel:
+    """Settings applied at one step of the quality ladder."""
+    inference_size: tuple = None
+    frame_skip: int = 0
+    smoothing: float = 0.0
+    draw_landmarks: bool = True
+    ui_effects: bool = True
+    
+    def describe(self):
+        """Short human-readable summary for log messages."""
+        size = 'full' if self.inference_size is None else f"{self.inference_size[0]}x{self.inference_size[1]}"
+        return (f"inference {size}, skip {self.frame_skip}, smoothing {self.smoothing:.2f}, "
+                f"landmarks {'on' if self.draw_landmarks else 'off'}, "
+                f"effects {'on' if self.ui_effects else 'off'}")
+
+
+class QualityGovernor:
+    """
+    Steps through a ladder of quality levels based on measured frame work time.
+    
+    Level 0 is the configured quality. Each further level gives up something:
+    first UI effects, then landmark drawing, then inference resolution (with
+    stronger smoothing to hide the extra jitter), then frame skipping.
+    Degrading and recovering use separate load thresholds, a hold period and a
+    cooldown so the settings do not oscillate.
+    """
+    
+    def __init__(self, detector, performance, governor, frame_size, tune_detector=True):
+        """
+        Initialize the QualityGovernor and apply the base level.
+        
+        Args:
+            detector: HandDetector whose performance settings are adjusted
+            performance: PerformanceConfig with the base settings and target FPS
+            governor: GovernorConfig with the bounds and thresholds
+            frame_size: (width, height) of the frames given to the detector
+            tune_detector: Whether the detector runs in this process (False for
+                the shared service, where only drawing is adjusted)
+        """
+        self.detector = detector
+        self.frame_size = frame_size
+        self.tune_detector = tune_detector
+        self.level = 0
+        self.over_frames = 0
+        self.under_frames = 0
+        self.last_change = time.perf_counter()
+        self.last_recover = None
+        self.reconfigure(performance, governor)
+    
+    @property
+    def current(self):
+        """QualityLevel currently applied."""
+        return self.levels[self.level]
+    
+    @property
+    def draw_landmarks(self):
+        """Whether the app should draw hand landmarks this frame."""
+        return self.current.draw_landmarks
+    
+    @property
+    def ui_effects(self):
+        """Whether the app should render translucent UI effects this frame."""
+        return self.current.ui_effects
+    
+    def reconfigure(self, performance, governor):
+        """
+        Rebuild the ladder from new settings, keeping the current level if possible.
+        
+        Args:
+            performance: PerformanceConfig
+            governor: GovernorConfig
+        """
+        self.config = governor
+        self.target_fps = performance.target_fps
+        self.recover_hold = governor.hold_frames * 3
+        self.levels = self.build_levels(performance, governor)
+        self.level = min(self.level, len(self.levels) - 1)
+        self.apply()
+    
+    def build_levels(self, performance, governor):
+        """
+        Build the quality ladder within the configured bounds.
+        
+        Args:
+            performance: PerformanceConfig with the base settings
+            governor: GovernorConfig with the bounds
+        
+        Returns:
+            List of QualityLevel, best first
+        """
+        base = QualityLevel(performance.inference_size, performance.frame_skip)
+        if not governor.enabled or performance.target_fps <= 0:
+            return [base]
+        
+        levels = [base, replace(base, ui_effects=False)]
+        levels.append(replace(levels[-1], draw_landmarks=False))
+        if not self.tune_detector:
+            return levels
+        
+        # Inference resolution in 3/4 steps down to the minimum width
+        base_width, base_height = base.inference_size or self.frame_size
+        sizes = []
+        width = base_width * 0.75
+        while width >= governor.min_inference_width:
+            rounded = int(width) // 16 * 16
+            sizes.append((rounded, round(rounded * base_height / base_width)))
+            width *= 0.75
+        skips = list(range(base.frame_skip + 1, governor.max_frame_skip + 1))
+        
+        # Smoothing rises with every detector step to offset the coarser landmarks
+        steps = len(sizes) + len(skips)
+        for index, size in enumerate(sizes, 1):
+            smoothing = governor.max_smoothing * index / steps
+            levels.append(replace(levels[-1], inference_size=size, smoothing=smoothing))
+        for index, skip in enumerate(skips, len(sizes) + 1):
+            smoothing = governor.max_smoothing * index / steps
+            levels.append(replace(levels[-1], frame_skip=skip, smoothing=smoothing))
+        return levels
+    
+    def apply(self):
+        """Push the current level's detector settings."""
+        if self.tune_detector:
+            level = self.current
+            self.detector.configure(level.inference_size, level.frame_skip, level.smoothing)
+    
+    def update(self, timer):
+        """
+        Check the latest timings and change level if the load demands it.
+        
+        Args:
+            timer: StageTimer measuring the frame loop
+        
+        Returns:
+            True if the level changed
+        """
+        if len(self.levels) == 1 or not timer.enabled:
+            return False
+        
+        budget_ms = 1000.0 / self.target_fps
+        work_ms = timer.get_work_ms()
+        load = work_ms / budget_ms
+        
+        # Count consecutive frames beyond each threshold; the band in between resets both
+        self.over_frames = self.over_frames + 1 if load > self.config.degrade_load else 0
+        self.under_frames = self.under_frames + 1 if load < self.config.recover_load else 0
+        
+        now = time.perf_counter()
+        if now - self.last_change < self.config.cooldown:
+            return False
+        
+        if self.over_frames >= self.config.hold_frames and self.level < len(self.levels) - 1:
+            # Going back down soon after a recovery means the better level cannot be
+            # held: wait longer before trying it again
+            if self.last_recover is not None and now - self.last_recover < self.config.cooldown * 5:
+                self.recover_hold = min(self.recover_hold * 2, self.config.hold_frames * 48)
+                print(f"Quality governor: recovery was premature, now waiting "
+                      f"{self.recover_hold} frames before recovering")
+            self.change_level(self.level + 1, 'degraded', work_ms, budget_ms)
+            return True
+        
+        if self.under_frames >= self.recover_hold and self.level > 0:
+            self.change_level(self.level - 1, 'recovered', work_ms, budget_ms)
+            self.last_recover = now
+            return True
+        return False
+    
+    def change_level(self, level, action, work_ms, budget_ms):
+        """
+        Switch to another level and log the decision.
+        
+        Args:
+            level: New level index
+            action: Word describing the change for the log
+            work_ms: Measured frame work time
+            budget_ms: Frame budget for the target FPS
+        """
+        self.level = level
+        self.over_frames = 0
+        self.under_frames = 0
+        self.last_change = time.perf_counter()
+        self.apply()
+        print(f"Quality governor: {action} to level {level}/{len(self.levels) - 1} "
+              f"({self.current.describe()}) - work {work_ms:.1f} ms of {budget_ms:.1f} ms budget")
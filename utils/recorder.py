@@ -0,0 +1,426 @@
+"""
+Recorder Module
+Records sessions to video on a background encoder thread, or as a stroke log.
+
+A stroke log (.strokes or .jsonl) can be rendered to video afterwards:
+
+    python -m utils.recorder recordings/air_canvas_20250101_120000.strokes
+"""
+
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+if __package__ in (None, ''):
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.canvas_tools import StrokeOp, apply_op
+from utils.stroke_codec import StrokeLogWriter, is_stroke_file, read_stroke_file
+
+
+class SessionRecorder:
+    """
+    Writes rendered frames to a video file without blocking the render loop.
+    
+    The render thread only resizes each sampled frame into a free slot of a
+    fixed pool and queues the slot; a dedicated thread does the encoding
+    (VideoWriter releases the GIL while it works). When every slot is busy the
+    frame is dropped and counted instead of stalling the app.
+    """
+    
+    def __init__(self, path, frame_size, fps=15.0, scale=0.5, playback_fps=None,
+                 queue_size=8, codec='mp4v'):
+        """
+        Open the video file and start the encoder thread.
+        
+        Args:
+            path: Output video path
+            frame_size: (width, height) of the rendered frames
+            fps: Frames sampled per second of session time
+            scale: Output resolution relative to the rendered frames
+            playback_fps: Frame rate written to the file; above fps gives a timelapse
+            queue_size: Frames that may wait for the encoder before new ones are dropped
+            codec: FourCC of the video codec
+        """
+        self.path = path
+        self.fps = fps
+        self.playback_fps = playback_fps or fps
+        self.size = (max(2, int(frame_size[0] * scale)) // 2 * 2,
+                     max(2, int(frame_size[1] * scale)) // 2 * 2)
+        
+        self.writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*codec),
+                                      self.playback_fps, self.size)
+        if not self.writer.isOpened():
+            raise IOError(f"Could not open video writer for {path}")
+        
+        # Preallocated frame slots cycle between the free list and the queue
+        self.slots = [np.empty((self.size[1], self.size[0], 3), np.uint8) for _ in range(queue_size)]
+        self.free_slots = queue.SimpleQueue()
+        for index in range(queue_size):
+            self.free_slots.put(index)
+        self.pending = queue.Queue()
+        
+        # Statistics
+        self.start_time = time.perf_counter()
+        self.next_sample = self.start_time
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.lag = 0.0
+        self.encode_time = 0.0
+        
+        self.thread = threading.Thread(target=self.encode_loop, daemon=True)
+        self.thread.start()
+    
+    def submit(self, img, timestamp=None):
+        """
+        Offer a rendered frame; it is kept only when the next sample is due.
+        
+        Args:
+            img: Rendered BGR frame
+            timestamp: Frame time (defaults to time.perf_counter())
+        
+        Returns:
+            True if the frame was queued for encoding
+        """
+        now = time.perf_counter() if timestamp is None else timestamp
+        if now < self.next_sample:
+            return False
+        self.next_sample = max(self.next_sample + 1.0 / self.fps, now)
+        
+        try:
+            index = self.free_slots.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            return False
+        
+        cv2.resize(img, self.size, dst=self.slots[index], interpolation=cv2.INTER_AREA)
+        self.pending.put((index, time.perf_counter()))
+        self.submitted += 1
+        return True
+    
+    def encode_loop(self):
+        """Encode queued frames until stop() sends the end marker."""
+        while True:
+            item = self.pending.get()
+            if item is None:
+                break
+            index, queued_at = item
+            start = time.perf_counter()
+            self.writer.write(self.slots[index])
+            done = time.perf_counter()
+            self.free_slots.put(index)
+            
+            # Smoothed time from submission to encoded, and encode time alone
+            self.lag = self.lag * 0.9 + (done - queued_at) * 0.1 if self.written else done - queued_at
+            self.encode_time = (self.encode_time * 0.9 + (done - start) * 0.1
+                                if self.written else done - start)
+            self.written += 1
+    
+    def stats(self):
+        """
+        Current recording statistics.
+        
+        Returns:
+            Dictionary with counts, queue depth and lag in milliseconds
+        """
+        return {
+            'duration': time.perf_counter() - self.start_time,
+            'submitted': self.submitted,
+            'written': self.written,
+            'dropped': self.dropped,
+            'queued': self.pending.qsize(),
+            'lag_ms': self.lag * 1000,
+            'encode_ms': self.encode_time * 1000,
+        }
+    
+    def draw_stats(self, img, x, y):
+        """
+        Draw a recording indicator with encoder statistics.
+        
+        Args:
+            img: Frame to draw on (after it was submitted)
+            x, y: Position of the indicator
+        """
+        stats = self.stats()
+        cv2.circle(img, (x + 8, y - 5), 7, (0, 0, 255), -1)
+        cv2.putText(img, f"REC {int(stats['duration'] // 60):02d}:{int(stats['duration'] % 60):02d}",
+                    (x + 22, y), cv2.FONT_HERSHEY_SIMPLEX, 0.55, (0, 0, 255), 2)
+        cv2.putText(img, f"lag {stats['lag_ms']:.0f} ms | queue {stats['queued']} | "
+                         f"dropped {stats['dropped']}",
+                    (x, y + 22), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (200, 200, 200), 1)
+    
+    def stop(self):
+        """
+        Flush the queue, close the file and print a summary.
+        
+        Returns:
+            Final statistics dictionary
+        """
+        self.pending.put(None)
+        self.thread.join()
+        self.writer.release()
+        stats = self.stats()
+        print(f"Recording saved to: {self.path} ({stats['written']} frames, "
+              f"{stats['dropped']} dropped, {stats['lag_ms']:.0f} ms encoder lag)")
+        return stats
+
+
+class StrokeRecorder:
+    """
+    Records the canvas as a log of drawing operations instead of video.
+    
+    Each committed StrokeOp is written with its session time, either to a
+    compact stroke file (see utils.stroke_codec) or as one JSON line. The
+    canvas at the start is saved next to the log so replays begin from it,
+    and so is the canvas after every 'snapshot' operation (a keyframe, named
+    after the operation's index in the log).
+    """
+    
+    def __init__(self, path, tools, stroke_format='binary', tolerance=0.25):
+        """
+        Start recording a ToolEngine.
+        
+        Args:
+            path: Output .strokes or .jsonl path
+            tools: ToolEngine whose operations are recorded
+            stroke_format: 'binary' for a stroke file, 'jsonl' for JSON lines
+            tolerance: Simplification tolerance of stroke files, in pixels
+        """
+        self.path = path
+        self.tools = tools
+        self.start_time = time.perf_counter()
+        self.count = 0
+        
+        stem = os.path.splitext(path)[0]
+        base_image = stem + '_start.png'
+        cv2.imwrite(base_image, tools.canvas)
+        cv2.imwrite(stem + '_start_mask.png', tools.mask)
+        self.keyframe_image = stem + '_keyframe{}.png'
+        
+        header = {'type': 'header', 'width': tools.width, 'height': tools.height,
+                  'start_image': os.path.basename(base_image),
+                  'keyframe_image': os.path.basename(self.keyframe_image),
+                  'started': datetime.now().isoformat(timespec='seconds')}
+        self.writer = None
+        self.file = None
+        if stroke_format == 'binary':
+            self.writer = StrokeLogWriter(path, header, tolerance)
+        else:
+            self.file = open(path, 'w', encoding='utf-8')
+            self.file.write(json.dumps(header) + '\n')
+        tools.listeners.append(self.record)
+    
+    def submit(self, img, timestamp=None):
+        """Frames are not needed: the log is written as operations are committed."""
+        return False
+    
+    def record(self, op):
+        """
+        Append one operation to the log.
+        
+        Args:
+            op: Committed StrokeOp
+        """
+        elapsed = time.perf_counter() - self.start_time
+        if op.kind == 'snapshot':
+            # The operation carries no pixels; keep them for the replay
+            image = self.keyframe_image.format(self.count)
+            cv2.imwrite(image, self.tools.canvas)
+            cv2.imwrite(os.path.splitext(image)[0] + '_mask.png', self.tools.mask)
+        if self.writer is not None:
+            self.writer.write(op, elapsed)
+        else:
+            entry = {'type': 'op', 't': round(elapsed, 4)}
+            entry.update(op.to_dict())
+            self.file.write(json.dumps(entry) + '\n')
+        self.count += 1
+    
+    def stats(self):
+        """Recording statistics."""
+        return {'duration': time.perf_counter() - self.start_time, 'ops': self.count}
+    
+    def draw_stats(self, img, x, y):
+        """
+        Draw a recording indicator.
+        
+        Args:
+            img: Frame to draw on
+            x, y: Position of the indicator
+        """
+        duration = time.perf_counter() - self.start_time
+        cv2.circle(img, (x + 8, y - 5), 7, (0, 0, 255), -1)
+        cv2.putText(img, f"REC strokes {int(duration // 60):02d}:{int(duration % 60):02d} | "
+                         f"{self.count} ops",
+                    (x + 22, y), cv2.FONT_HERSHEY_SIMPLEX, 0.55, (0, 0, 255), 2)
+    
+    def stop(self):
+        """
+        Stop recording and close the log.
+        
+        Returns:
+            Final statistics dictionary
+        """
+        self.tools.listeners.remove(self.record)
+        stats = self.stats()
+        if self.writer is not None:
+            self.writer.close()
+            print(f"Stroke log saved to: {self.path} ({stats['ops']} operations, "
+                  f"{self.writer.points_out}/{self.writer.points_in} points kept, "
+                  f"{self.writer.bytes_written / 1024:.1f} kB)")
+        else:
+            self.file.close()
+            print(f"Stroke log saved to: {self.path} ({stats['ops']} operations)")
+        return stats
+
+
+def start_recording(recording, frame_size, prefix, tools=None):
+    """
+    Start a recorder as configured in the [Recording] section.
+    
+    Args:
+        recording: RecordingConfig
+        frame_size: (width, height) of the rendered frames
+        prefix: File name prefix (e.g. 'air_canvas')
+        tools: ToolEngine for stroke recording (None if the app has no canvas)
+    
+    Returns:
+        SessionRecorder or StrokeRecorder
+    """
+    save_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            recording.directory)
+    os.makedirs(save_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    
+    if recording.mode == 'strokes' and tools is not None:
+        extension = 'strokes' if recording.stroke_format == 'binary' else 'jsonl'
+        return StrokeRecorder(os.path.join(save_dir, f"{prefix}_{timestamp}.{extension}"), tools,
+                              recording.stroke_format, recording.stroke_tolerance)
+    
+    path = os.path.join(save_dir, f"{prefix}_{timestamp}.{recording.container}")
+    return SessionRecorder(path, frame_size, fps=recording.fps, scale=recording.scale,
+                           playback_fps=recording.playback_fps or None,
+                           queue_size=recording.queue_size, codec=recording.codec)
+
+
+def load_stroke_log(log_path):
+    """
+    Read a stroke log in either format.
+    
+    Args:
+        log_path: Path to a .strokes or .jsonl stroke log
+    
+    Returns:
+        Tuple (header, times, ops): header dictionary, session times in seconds, list of StrokeOp
+    """
+    if is_stroke_file(log_path):
+        header, times, ops = read_stroke_file(log_path)
+        return header, times.tolist(), ops
+    
+    with open(log_path, encoding='utf-8') as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    ops = [entry for entry in entries[1:] if entry.get('type') == 'op']
+    return entries[0], [entry['t'] for entry in ops], [StrokeOp.from_dict(entry) for entry in ops]
+
+
+def load_canvas_image(path, canvas, mask):
+    """
+    Load a canvas image saved by StrokeRecorder, and its mask, in place.
+    
+    Args:
+        path: Canvas image path (the mask is next to it with a '_mask' suffix)
+        canvas: Canvas to overwrite
+        mask: Stroke mask to overwrite
+    
+    Returns:
+        Boolean indicating if the image was found
+    """
+    if not os.path.isfile(path):
+        return False
+    canvas[:] = cv2.imread(path)
+    mask_path = os.path.splitext(path)[0] + '_mask.png'
+    if os.path.isfile(mask_path):
+        mask[:] = cv2.imread(mask_path, cv2.IMREAD_GRAYSCALE)
+    return True
+
+
+def render_stroke_log(log_path, video_path, fps=30.0, speed=1.0, background=(30, 30, 35)):
+    """
+    Render a stroke log to video, replaying the operations in session time.
+    
+    Args:
+        log_path: Path to the .strokes or .jsonl stroke log
+        video_path: Output video path
+        fps: Output frame rate
+        speed: Playback speed factor (e.g. 4.0 for a 4x timelapse)
+        background: BGR color behind the ink
+    
+    Returns:
+        Number of frames written
+    """
+    header, times, ops = load_stroke_log(log_path)
+    width, height = header['width'], header['height']
+    
+    # Start from the canvas as it was when recording began
+    canvas = np.zeros((height, width, 3), np.uint8)
+    mask = np.zeros((height, width), np.uint8)
+    directory = os.path.dirname(log_path)
+    load_canvas_image(os.path.join(directory, header.get('start_image', '')), canvas, mask)
+    
+    writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+    frame = np.empty_like(canvas)
+    inverse_alpha = np.empty_like(canvas)
+    end_time = times[-1] if times else 0.0
+    
+    frames = 0
+    index = 0
+    frame_time = 0.0
+    while True:
+        while index < len(ops) and times[index] <= frame_time:
+            if ops[index].kind == 'snapshot' and header.get('keyframe_image'):
+                load_canvas_image(os.path.join(directory, header['keyframe_image'].format(index)),
+                                  canvas, mask)
+            apply_op(canvas, mask, ops[index])
+            index += 1
+        
+        # Premultiplied canvas over the background
+        frame[:] = background
+        cv2.cvtColor(mask, cv2.COLOR_GRAY2BGR, dst=inverse_alpha)
+        cv2.bitwise_not(inverse_alpha, dst=inverse_alpha)
+        cv2.multiply(frame, inverse_alpha, dst=frame, scale=1 / 255)
+        cv2.add(frame, canvas, dst=frame)
+        writer.write(frame)
+        frames += 1
+        
+        if frame_time > end_time:
+            break
+        frame_time += speed / fps
+    writer.release()
+    return frames
+
+
+def main():
+    """
+    Render a stroke log to video from the command line.
+    """
+    parser = argparse.ArgumentParser(description="Render an Air Canvas stroke log to video")
+    parser.add_argument('log', help="Stroke log (.strokes or .jsonl)")
+    parser.add_argument('--output', help="Output video (defaults to the log name with .mp4)")
+    parser.add_argument('--fps', type=float, default=30.0, help="Output frame rate")
+    parser.add_argument('--speed', type=float, default=1.0, help="Playback speed factor")
+    args = parser.parse_args()
+    
+    output = args.output or os.path.splitext(args.log)[0] + '.mp4'
+    frames = render_stroke_log(args.log, output, fps=args.fps, speed=args.speed)
+    print(f"Rendered {frames} frames to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""
+Sampling Profiler Module
+Statistical profiler for the frame loop that can be switched on in a running
+app. Stacks are written in the collapsed format that flamegraph.pl,
+speedscope and inferno read:
+
+    run (air_canvas.py:437);find_hands (hand_detector.py:88) 412
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+import cv2
+
+
+# Slowest sampling rate the overhead guard backs off to, in seconds
+MAX_INTERVAL = 0.1
+
+
+class SamplingProfiler:
+    """
+    Samples one thread's Python stack at a fixed rate from a daemon thread.
+    
+    Nothing is traced: every interval the sampler grabs the target thread's
+    current frame with sys._current_frames() and counts its stack, keyed by
+    (code, line) pairs, so the profiled loop only pays for the moments the
+    sampler holds the GIL. The sampler's CPU time is measured, and whenever
+    it goes above max_overhead of the wall time the interval is doubled (up
+    to MAX_INTERVAL), which keeps the profiler safe to run in production.
+    """
+    
+    def __init__(self, interval=0.01, max_overhead=0.02, directory='profiles', prefix='profile',
+                 thread_id=None, max_depth=64):
+        """
+        Initialize a stopped SamplingProfiler.
+        
+        Args:
+            interval: Seconds between samples
+            max_overhead: Largest fraction of one core the sampler may use
+            directory: Directory the collapsed stacks are written to (relative to the repo)
+            prefix: File name prefix (e.g. 'air_canvas')
+            thread_id: Thread to sample (None = the main thread)
+            max_depth: Deepest stack recorded, counted from the innermost frame
+        """
+        self.interval = interval
+        self.max_overhead = max_overhead
+        self.directory = directory
+        self.prefix = prefix
+        self.thread_id = thread_id
+        self.max_depth = max_depth
+        
+        self.running = False
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.labels = {}
+        self.reset()
+    
+    def reset(self):
+        """Forget the samples of the previous run."""
+        self.counts = Counter()
+        self.samples = 0
+        self.current_interval = self.interval
+        self.started = 0.0
+        self.elapsed = 0.0
+        self.cpu_time = 0.0
+        self.longest_sample = 0.0
+    
+    def start(self):
+        """Start sampling."""
+        if self.running:
+            return
+        self.reset()
+        self.target = self.thread_id or threading.main_thread().ident
+        self.stop_event.clear()
+        self.running = True
+        self.started = time.perf_counter()
+        self.thread = threading.Thread(target=self.run, name='sampling-profiler', daemon=True)
+        self.thread.start()
+        print(f"Sampling profiler started ({1 / self.interval:.0f} Hz)")
+    
+    def stop(self):
+        """
+        Stop sampling, write the collapsed stacks and print the summary.
+        
+        Returns:
+            Path of the collapsed stack file, or None if the profiler was not running
+        """
+        if not self.running:
+            return None
+        self.running = False
+        self.stop_event.set()
+        self.thread.join()
+        self.thread = None
+        self.elapsed = time.perf_counter() - self.started
+        path = self.write_collapsed()
+        self.report()
+        return path
+    
+    def toggle(self):
+        """
+        Start or stop sampling.
+        
+        Returns:
+            True if the profiler is now running
+        """
+        if self.running:
+            self.stop()
+        else:
+            self.start()
+        return self.running
+    
+    def run(self):
+        """Sampler loop."""
+        cpu_start = time.thread_time()
+        check_at = time.perf_counter() + 1.0
+        while not self.stop_event.wait(self.current_interval):
+            start = time.perf_counter()
+            self.sample()
+            now = time.perf_counter()
+            self.longest_sample = max(self.longest_sample, now - start)
+            self.cpu_time = time.thread_time() - cpu_start
+            
+            # Back off once a second if sampling costs more than allowed
+            if now >= check_at:
+                check_at = now + 1.0
+                if self.overhead() > self.max_overhead and self.current_interval < MAX_INTERVAL:
+                    self.current_interval = min(self.current_interval * 2, MAX_INTERVAL)
+                    print(f"Sampling profiler: overhead {self.overhead():.1%}, "
+                          f"slowing down to {1 / self.current_interval:.0f} Hz")
+    
+    def sample(self):
+        """Count the target thread's current stack."""
+        frame = sys._current_frames().get(self.target)
+        if frame is None:
+            return
+        stack = []
+        while frame is not None and len(stack) < self.max_depth:
+            stack.append((frame.f_code, frame.f_lineno))
+            frame = frame.f_back
+        self.counts[tuple(stack)] += 1
+        self.samples += 1
+    
+    def overhead(self):
+        """Sampler CPU time as a fraction of the time profiled so far."""
+        elapsed = time.perf_counter() - self.started if self.running else self.elapsed
+        return self.cpu_time / elapsed if elapsed > 0 else 0.0
+    
+    def label(self, code, line):
+        """Flame graph frame name of a code object at a line."""
+        key = (code, line)
+        label = self.labels.get(key)
+        if label is None:
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{line})"
+            self.labels[key] = label
+        return label
+    
+    def collapsed(self):
+        """
+        Samples in the collapsed stack format, outermost frame first.
+        
+        Returns:
+            List of 'frame;frame;frame count' lines, most frequent first
+        """
+        return [';'.join(self.label(code, line) for code, line in reversed(stack)) + f" {count}"
+                for stack, count in self.counts.most_common()]
+    
+    def write_collapsed(self):
+        """
+        Write the collapsed stacks to a new file in the profile directory.
+        
+        Returns:
+            File path, or None if there were no samples
+        """
+        if not self.samples:
+            return None
+        directory = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                 self.directory)
+        os.makedirs(directory, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(directory, f"{self.prefix}_{timestamp}.collapsed")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(self.collapsed()) + '\n')
+        return path
+    
+    def summary(self):
+        """
+        Sample counts per function and per source line.
+        
+        Returns:
+            Tuple (self_counts, total_counts, line_counts): Counters keyed by
+            code object (innermost frame only / anywhere on the stack) and by
+            innermost (code, line)
+        """
+        self_counts = Counter()
+        total_counts = Counter()
+        line_counts = Counter()
+        for stack, count in self.counts.items():
+            self_counts[stack[0][0]] += count
+            line_counts[stack[0]] += count
+            for code in {code for code, _ in stack}:
+                total_counts[code] += count
+        return self_counts, total_counts, line_counts
+    
+    def report(self, top=15):
+        """
+        Print the top functions and lines of the last run.
+        
+        Args:
+            top: Number of functions and lines to list
+        """
+        print("=" * 60)
+        print("SAMPLING PROFILE")
+        print("=" * 60)
+        rate = self.samples / self.elapsed if self.elapsed > 0 else 0.0
+        print(f"  {self.samples} samples in {self.elapsed:.1f} s ({rate:.0f} Hz), sampler CPU "
+              f"{self.overhead():.2%} of one core, longest sample {self.longest_sample * 1e6:.0f} us")
+        if not self.samples:
+            print("=" * 60)
+            return
+        
+        self_counts, total_counts, line_counts = self.summary()
+        print(f"\nFunctions by total time:{'self':>22}{'total':>9}")
+        for code, count in total_counts.most_common(top):
+            name = self.label(code, code.co_firstlineno)
+            print(f"  {name:<42.42} {self_counts[code] / self.samples:6.1%} {count / self.samples:8.1%}")
+        
+        print("\nHot lines (innermost frame):")
+        for (code, line), count in line_counts.most_common(top):
+            print(f"  {self.label(code, line):<42.42} {count / self.samples:6.1%}")
+        print("=" * 60)
+    
+    def draw(self, img, x, y):
+        """
+        Draw a profiling indicator while sampling.
+        
+        Args:
+            img: Frame to draw on
+            x, y: Position of the indicator
+        """
+        if not self.running:
+            return
+        duration = time.perf_counter() - self.started
+        cv2.circle(img, (x + 8, y - 5), 7, (0, 165, 255), -1)
+        cv2.putText(img, f"PROFILING {int(duration // 60):02d}:{int(duration % 60):02d} | "
+                         f"{self.samples} samples | overhead {self.overhead():.1%}",
+                    (x + 22, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 165, 255), 2)
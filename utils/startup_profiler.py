@@ -0,0 +1,168 @@
+"""
+Startup Profiler Module
+Measures import and initialization time during application startup.
+
+Enable it before the heavy imports of an entry point:
+
+    from utils.startup_profiler import startup_profiler
+    if '--profile-startup' in sys.argv:
+        startup_profiler.enable()
+"""
+
+import builtins
+import importlib.util
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+def lazy_import(name):
+    """
+    Import a module lazily: it is only loaded on first attribute access.
+
+    Args:
+        name: Fully qualified module name
+
+    Returns:
+        Module object (possibly not loaded yet)
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named '{name}'")
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+class StartupProfiler:
+    """
+    Records per-module import times and named initialization stages.
+    """
+
+    def __init__(self):
+        """Initialize a disabled profiler."""
+        self.enabled = False
+        self.start_time = time.perf_counter()
+        self.process_offset = 0.0
+        self.imports = []
+        self.stages = []
+        self.marks = []
+        self.local = threading.local()
+        self.original_import = None
+        self.reported = False
+
+    def enable(self):
+        """Start recording imports and stages."""
+        if self.enabled:
+            return
+        self.enabled = True
+
+        # Account for interpreter startup before this module was imported
+        try:
+            import psutil
+            created = psutil.Process().create_time()
+            self.process_offset = max(0.0, time.time() - created - self.elapsed())
+        except Exception:
+            self.process_offset = 0.0
+
+        self.original_import = builtins.__import__
+        builtins.__import__ = self.timed_import
+
+    def disable(self):
+        """Stop recording imports."""
+        if self.original_import is not None:
+            builtins.__import__ = self.original_import
+            self.original_import = None
+        self.enabled = False
+
+    def elapsed(self):
+        """Seconds since the profiler was created."""
+        return time.perf_counter() - self.start_time
+
+    def timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        """Replacement for builtins.__import__ that times first-time imports."""
+        if level != 0 or name in sys.modules:
+            return self.original_import(name, globals, locals, fromlist, level)
+
+        # Depth is tracked per thread so background imports are attributed correctly
+        depth = getattr(self.local, 'depth', 0)
+        self.local.depth = depth + 1
+        start = time.perf_counter()
+        try:
+            return self.original_import(name, globals, locals, fromlist, level)
+        finally:
+            self.local.depth = depth
+            self.imports.append((name, depth, time.perf_counter() - start))
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Time an initialization stage.
+
+        Args:
+            name: Stage name shown in the report
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, time.perf_counter() - start))
+
+    def mark(self, name):
+        """
+        Record a point in time, measured from process start.
+
+        Args:
+            name: Event name (e.g. 'first frame shown')
+        """
+        if self.enabled:
+            self.marks.append((name, self.process_offset + self.elapsed()))
+
+    def report(self, top=15):
+        """
+        Print the startup report once.
+
+        Args:
+            top: Number of slowest top-level imports to list
+        """
+        if not self.enabled or self.reported:
+            return
+        self.reported = True
+
+        print("=" * 60)
+        print("STARTUP PROFILE")
+        print("=" * 60)
+        if self.process_offset:
+            print(f"  Interpreter startup          {self.process_offset * 1000:8.1f} ms")
+
+        top_level = [entry for entry in self.imports if entry[1] == 0]
+        top_level.sort(key=lambda entry: entry[2], reverse=True)
+        print("\nImports (inclusive):")
+        for name, _, duration in top_level[:top]:
+            print(f"  {name:<28} {duration * 1000:8.1f} ms")
+        total = sum(duration for _, _, duration in top_level)
+        print(f"  {'total':<28} {total * 1000:8.1f} ms")
+
+        if self.stages:
+            print("\nInitialization:")
+            for name, duration in self.stages:
+                print(f"  {name:<28} {duration * 1000:8.1f} ms")
+
+        if self.marks:
+            print("\nMilestones (since process start):")
+            for name, at in self.marks:
+                print(f"  {name:<28} {at * 1000:8.1f} ms")
+        print("=" * 60)
+
+
+# Shared instance used by all entry points
+startup_profiler = StartupProfiler()
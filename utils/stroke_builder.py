@@ -0,0 +1,141 @@
+"""
+Stroke Builder Module
+Turns sparse fingertip samples into smooth, variable-width freehand strokes.
+"""
+
+import math
+import time
+
+
+class StrokeBuilder:
+    """
+    Builds a freehand stroke from one fingertip position per frame.
+    
+    Positions are lightly smoothed, then joined with quadratic Bezier curves
+    through the midpoints of consecutive samples (each sample is the control
+    point of its curve), so corners stay round even when the finger moves far
+    between frames. The stroke thins as the finger speeds up, like ink.
+    """
+    
+    def __init__(self, smoothing=0.3, min_width_scale=0.5, slow_speed=300.0, fast_speed=2500.0,
+                 spacing=3.0):
+        """
+        Initialize the StrokeBuilder.
+        
+        Args:
+            smoothing: Weight of the previous position when smoothing samples (0 = raw)
+            min_width_scale: Width factor at or above fast_speed (1.0 = constant width)
+            slow_speed: Speed in pixels per second below which the full width is used
+            fast_speed: Speed in pixels per second at which the width is smallest
+            spacing: Distance in pixels between points sampled along the curves
+        """
+        self.smoothing = smoothing
+        self.min_width_scale = min_width_scale
+        self.slow_speed = slow_speed
+        self.fast_speed = fast_speed
+        self.spacing = spacing
+        self.reset()
+    
+    def reset(self):
+        """Forget the current stroke."""
+        self.control = None
+        self.curve_start = None
+        self.last_width = None
+        self.last_time = None
+    
+    def width_for_speed(self, width, speed):
+        """
+        Scale a width down with the drawing speed.
+        
+        Args:
+            width: Nominal width
+            speed: Fingertip speed in pixels per second
+        
+        Returns:
+            Width as a float
+        """
+        t = (speed - self.slow_speed) / (self.fast_speed - self.slow_speed)
+        t = min(max(t, 0.0), 1.0)
+        return width * (1.0 - (1.0 - self.min_width_scale) * t)
+    
+    def add_point(self, point, width, timestamp=None, dynamic_width=True):
+        """
+        Extend the stroke to a new fingertip position.
+        
+        Args:
+            point: (x, y) fingertip position
+            width: Nominal stroke width
+            timestamp: Time of the sample (defaults to time.perf_counter())
+            dynamic_width: False to keep the nominal width regardless of speed
+        
+        Returns:
+            Tuple (points, widths) of the new piece to rasterize; points are
+            float (x, y) pairs and widths one float per point
+        """
+        timestamp = time.perf_counter() if timestamp is None else timestamp
+        x, y = float(point[0]), float(point[1])
+        
+        if self.control is None:
+            # First sample: a dot, which also anchors the first curve
+            self.control = self.curve_start = (x, y)
+            self.last_width = float(width)
+            self.last_time = timestamp
+            return ((x, y), (x, y)), (self.last_width, self.last_width)
+        
+        # Light smoothing of the incoming sample
+        cx, cy = self.control
+        x = cx * self.smoothing + x * (1 - self.smoothing)
+        y = cy * self.smoothing + y * (1 - self.smoothing)
+        
+        # Width from speed, eased so it does not jump between frames
+        dt = timestamp - self.last_time
+        speed = math.hypot(x - cx, y - cy) / dt if dt > 0 else 0.0
+        target_width = self.width_for_speed(width, speed) if dynamic_width else float(width)
+        new_width = self.last_width * 0.5 + target_width * 0.5
+        self.last_time = timestamp
+        
+        # Curve from the previous midpoint to the new one, bending through the control point
+        mid = ((cx + x) / 2, (cy + y) / 2)
+        piece = self.sample_curve(self.curve_start, self.control, mid, self.last_width, new_width)
+        self.curve_start = mid
+        self.control = (x, y)
+        self.last_width = new_width
+        return piece
+    
+    def finish(self):
+        """
+        End the stroke at the last sample.
+        
+        Returns:
+            Tuple (points, widths) of the closing piece, or None if there is none
+        """
+        if self.control is None:
+            return None
+        piece = None
+        if self.curve_start != self.control:
+            piece = (self.curve_start, self.control), (self.last_width, self.last_width)
+        self.reset()
+        return piece
+    
+    def sample_curve(self, start, control, end, start_width, end_width):
+        """
+        Sample a quadratic Bezier curve at roughly even spacing.
+        
+        Args:
+            start, control, end: Curve points
+            start_width, end_width: Widths at either end, interpolated between
+        
+        Returns:
+            Tuple (points, widths)
+        """
+        # The control polygon is never shorter than the curve
+        length = math.dist(start, control) + math.dist(control, end)
+        steps = max(1, math.ceil(length / self.spacing))
+        points, widths = [], []
+        for i in range(steps + 1):
+            t = i / steps
+            u = 1 - t
+            points.append((u * u * start[0] + 2 * u * t * control[0] + t * t * end[0],
+                           u * u * start[1] + 2 * u * t * control[1] + t * t * end[1]))
+            widths.append(start_width + (end_width - start_width) * t)
+        return tuple(points), tuple(widths)
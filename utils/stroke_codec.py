@@ -0,0 +1,464 @@
+"""
+Stroke Codec Module
+Compact storage for Air Canvas stroke operations: polylines are simplified
+as they are committed, then packed as delta + varint coded columns.
+
+A stroke file is a short header followed by self-contained blocks:
+
+    header    magic b'GMST', version, JSON header length, JSON header
+              (canvas size, start image, start date)
+    block     magic b'SB', operation count, byte length of each column, then
+              the columns:
+        kinds    one byte per operation: kind, erase flag, new style flag
+        times    milliseconds since the previous operation (varint)
+        counts   points per operation (varint)
+        styles   blue, green, red, thickness for each operation flagged as a new style
+        points   x, y in quarter pixels as zigzag varint deltas, chained
+                 through every operation of the block
+        widths   polyline widths in 1/256 pixel as zigzag varint deltas, chained
+                 through every polyline of the block
+
+Every column decodes with a handful of vectorized NumPy calls, so a block is
+read without a Python loop per point. Convert a JSON stroke log with:
+
+    python -m utils.stroke_codec recordings/air_canvas_20250101_120000.jsonl
+"""
+
+import argparse
+import json
+import os
+import struct
+import sys
+
+import numpy as np
+
+if __package__ in (None, ''):
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.canvas_tools import OP_KINDS, SHIFT, StrokeOp
+
+
+FILE_MAGIC = b'GMST'
+FILE_VERSION = 1
+FILE_HEADER = struct.Struct('<4sBI')
+
+# Block magic, operation count, then the byte lengths of the times, counts,
+# styles, points and widths columns (the kinds column is one byte per operation)
+BLOCK_MAGIC = b'SB'
+BLOCK_HEADER = struct.Struct('<2sH5I')
+
+# Flags next to the kind index in the kinds column
+ERASE_FLAG = 0x08
+STYLE_FLAG = 0x10
+KIND_MASK = 0x07
+
+# Points are stored at the precision draw_op rasterizes at. Widths are stored
+# much finer: a polyline segment is drawn round((w1 + w2) / 2) wide, and a
+# coarse step flips that rounding; widths change slowly, so it costs little
+POINT_SCALE = 1 << SHIFT
+WIDTH_SCALE = 256
+
+# Varints of up to five 7-bit groups (values below 2 ** 35)
+VARINT_GROUPS = 5
+VARINT_SHIFTS = np.arange(VARINT_GROUPS, dtype=np.uint64) * np.uint64(7)
+VARINT_LIMITS = np.array([1 << (7 * i) for i in range(1, VARINT_GROUPS)], np.uint64)
+
+
+def zigzag(values):
+    """Map signed integers to unsigned ones, small magnitudes to small values."""
+    values = np.asarray(values, np.int64)
+    return ((values << 1) ^ (values >> 63)).astype(np.uint64)
+
+
+def unzigzag(values):
+    """Inverse of zigzag()."""
+    values = np.asarray(values, np.uint64)
+    return (values >> np.uint64(1)).astype(np.int64) ^ -(values & np.uint64(1)).astype(np.int64)
+
+
+def encode_varints(values):
+    """
+    Encode non-negative integers as LEB128 varints.
+    
+    Args:
+        values: Array-like of integers below 2 ** 35
+    
+    Returns:
+        Bytes
+    """
+    values = np.asarray(values, np.uint64).ravel()
+    if len(values) == 0:
+        return b''
+    if values.max() >> np.uint64(7 * VARINT_GROUPS):
+        raise ValueError("Value too large for a stroke varint")
+    lengths = 1 + (values[:, None] >= VARINT_LIMITS).sum(axis=1)
+    groups = ((values[:, None] >> VARINT_SHIFTS) & np.uint64(0x7F)).astype(np.uint8)
+    position = np.arange(VARINT_GROUPS)
+    groups[position < lengths[:, None] - 1] |= 0x80
+    return groups[position < lengths[:, None]].tobytes()
+
+
+def decode_varints(data):
+    """
+    Decode a run of LEB128 varints.
+    
+    Args:
+        data: Bytes from encode_varints()
+    
+    Returns:
+        int64 array
+    
+    Raises:
+        ValueError: If the data ends in the middle of a varint
+    """
+    raw = np.frombuffer(data, np.uint8)
+    if len(raw) == 0:
+        return np.zeros(0, np.int64)
+    if raw[-1] & 0x80:
+        raise ValueError("Truncated varint")
+    ends = np.flatnonzero(raw < 0x80)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    position = np.arange(len(raw)) - np.repeat(starts, ends - starts + 1)
+    parts = (raw & 0x7F).astype(np.int64) << (7 * position)
+    return np.add.reduceat(parts, starts)
+
+
+def simplify_polyline(points, widths, tolerance):
+    """
+    Ramer-Douglas-Peucker simplification that also respects the width.
+    
+    A point may go when the stroke edge moves by at most tolerance without
+    it: its distance from the chord plus half its width's deviation from the
+    width interpolated along the chord.
+    
+    Args:
+        points: (N, 2) array of points
+        widths: N widths
+        tolerance: Largest edge displacement in pixels (0 = keep every point)
+    
+    Returns:
+        Sorted index array of the points to keep
+    """
+    count = len(points)
+    if count <= 2 or tolerance <= 0:
+        return np.arange(count)
+    
+    keep = np.zeros(count, bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, count - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        start, chord = points[first], points[last] - points[first]
+        offsets = points[first + 1:last] - start
+        length_sq = chord @ chord
+        if length_sq > 0:
+            t = np.clip(offsets @ chord / length_sq, 0.0, 1.0)
+            distance = np.abs(offsets[:, 0] * chord[1] - offsets[:, 1] * chord[0]) / np.sqrt(length_sq)
+        else:
+            t = np.zeros(len(offsets))
+            distance = np.hypot(offsets[:, 0], offsets[:, 1])
+        expected = widths[first] + (widths[last] - widths[first]) * t
+        error = distance + np.abs(widths[first + 1:last] - expected) / 2
+        worst = int(np.argmax(error))
+        if error[worst] > tolerance:
+            split = first + 1 + worst
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+    return np.flatnonzero(keep)
+
+
+def simplify_op(op, tolerance):
+    """
+    Drop the nearly collinear points of a polyline operation.
+    
+    Args:
+        op: StrokeOp
+        tolerance: Largest edge displacement in pixels
+    
+    Returns:
+        The same StrokeOp, or a simplified copy
+    """
+    if op.kind != 'polyline' or len(op.points) <= 2 or tolerance <= 0:
+        return op
+    points = np.asarray(op.points, np.float64)
+    widths = np.asarray(op.widths, np.float64)
+    keep = simplify_polyline(points, widths, tolerance)
+    if len(keep) == len(points):
+        return op
+    return StrokeOp('polyline', tuple(map(tuple, points[keep].tolist())), op.color,
+                    op.thickness, op.erase, tuple(widths[keep].tolist()))
+
+
+def encode_block(ops, times):
+    """
+    Pack operations into one self-contained block.
+    
+    Args:
+        ops: List of StrokeOp (at most 65535)
+        times: Session time of each operation, in seconds
+    
+    Returns:
+        Block bytes
+    """
+    kinds = np.empty(len(ops), np.uint8)
+    counts = np.empty(len(ops), np.int64)
+    styles = []
+    points = []
+    widths = []
+    style = None
+    for i, op in enumerate(ops):
+        kinds[i] = OP_KINDS.index(op.kind) | (ERASE_FLAG if op.erase else 0)
+        op_style = (*(min(255, max(0, int(c))) for c in op.color), min(255, int(op.thickness)))
+        if op_style != style:
+            kinds[i] |= STYLE_FLAG
+            styles.append(op_style)
+            style = op_style
+        counts[i] = len(op.points)
+        points.extend(op.points)
+        if op.kind == 'polyline':
+            widths.extend(op.widths)
+    
+    milliseconds = np.round(np.asarray(times, np.float64) * 1000).astype(np.int64)
+    time_column = encode_varints(np.diff(milliseconds, prepend=0).clip(0))
+    count_column = encode_varints(counts)
+    style_column = np.array(styles, np.uint8).tobytes()
+    quantized = np.round(np.asarray(points, np.float64).reshape(-1, 2) * POINT_SCALE).astype(np.int64)
+    point_column = encode_varints(zigzag(np.diff(quantized, axis=0, prepend=0).ravel()))
+    quantized = np.round(np.asarray(widths, np.float64) * WIDTH_SCALE).astype(np.int64)
+    width_column = encode_varints(zigzag(np.diff(quantized, prepend=0)))
+    
+    header = BLOCK_HEADER.pack(BLOCK_MAGIC, len(ops), len(time_column), len(count_column),
+                               len(style_column), len(point_column), len(width_column))
+    return b''.join((header, kinds.tobytes(), time_column, count_column, style_column,
+                     point_column, width_column))
+
+
+def decode_block(data, offset=0):
+    """
+    Unpack one block.
+    
+    Args:
+        data: Bytes holding the block
+        offset: Position of the block in data
+    
+    Returns:
+        Tuple (times, ops, end): seconds array, list of StrokeOp, offset after the block
+    
+    Raises:
+        ValueError: If the data is not a complete block
+    """
+    if len(data) - offset < BLOCK_HEADER.size:
+        raise ValueError("Truncated stroke block")
+    magic, count, *lengths = BLOCK_HEADER.unpack_from(data, offset)
+    if magic != BLOCK_MAGIC:
+        raise ValueError("Not a stroke block")
+    offset += BLOCK_HEADER.size
+    end = offset + count + sum(lengths)
+    if end > len(data):
+        raise ValueError("Truncated stroke block")
+    
+    kinds = np.frombuffer(data, np.uint8, count, offset)
+    columns = []
+    offset += count
+    for length in lengths:
+        columns.append(data[offset:offset + length])
+        offset += length
+    time_column, count_column, style_column, point_column, width_column = columns
+    
+    times = np.cumsum(decode_varints(time_column)) / 1000
+    counts = decode_varints(count_column)
+    styles = np.frombuffer(style_column, np.uint8).reshape(-1, 4).tolist()
+    style_index = np.cumsum((kinds & STYLE_FLAG) > 0) - 1
+    points = np.cumsum(unzigzag(decode_varints(point_column)).reshape(-1, 2), axis=0) / POINT_SCALE
+    widths = np.cumsum(unzigzag(decode_varints(width_column))) / WIDTH_SCALE
+    
+    # Where each operation's points and widths start
+    kind_index = kinds & KIND_MASK
+    point_ends = np.cumsum(counts).tolist()
+    width_ends = np.cumsum(np.where(kind_index == OP_KINDS.index('polyline'), counts, 0)).tolist()
+    points = points.tolist()
+    widths = widths.tolist()
+    
+    ops = []
+    point_start = width_start = 0
+    for i in range(count):
+        kind = OP_KINDS[kind_index[i]]
+        b, g, r, thickness = styles[style_index[i]]
+        op_widths = ()
+        if kind == 'polyline':
+            op_widths = tuple(widths[width_start:width_ends[i]])
+            width_start = width_ends[i]
+        ops.append(StrokeOp(kind, tuple(map(tuple, points[point_start:point_ends[i]])),
+                            (b, g, r), thickness, bool(kinds[i] & ERASE_FLAG), op_widths))
+        point_start = point_ends[i]
+    return times, ops, end
+
+
+class StrokeLogWriter:
+    """
+    Writes a stroke file as operations are committed.
+    
+    Polylines are simplified on arrival and kept until a block is full
+    (block_ops operations or block_seconds of session time), which is then
+    encoded and written in one go. At most one block is lost in a crash.
+    """
+    
+    def __init__(self, path, header, tolerance=0.25, block_ops=512, block_seconds=2.0):
+        """
+        Create the file and write its header.
+        
+        Args:
+            path: Output path
+            header: JSON-serializable header dictionary (canvas size, start image...)
+            tolerance: Simplification tolerance in pixels (0 = keep every point)
+            block_ops: Operations per block
+            block_seconds: Session time after which a block is written anyway
+        """
+        self.path = path
+        self.tolerance = tolerance
+        self.block_ops = min(block_ops, 65535)
+        self.block_seconds = block_seconds
+        
+        self.ops = []
+        self.times = []
+        self.block_start = 0.0
+        self.last_time = 0.0
+        
+        # Statistics
+        self.count = 0
+        self.points_in = 0
+        self.points_out = 0
+        self.bytes_written = 0
+        
+        self.file = open(path, 'wb')
+        text = json.dumps(header).encode('utf-8')
+        self.write_bytes(FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION, len(text)) + text)
+    
+    def write_bytes(self, data):
+        """Append raw bytes to the file."""
+        self.file.write(data)
+        self.bytes_written += len(data)
+    
+    def write(self, op, timestamp):
+        """
+        Add one operation.
+        
+        Args:
+            op: Committed StrokeOp
+            timestamp: Session time in seconds (non-decreasing)
+        """
+        simplified = simplify_op(op, self.tolerance)
+        self.points_in += len(op.points)
+        self.points_out += len(simplified.points)
+        if not self.ops:
+            self.block_start = timestamp
+        self.ops.append(simplified)
+        self.times.append(max(timestamp, self.last_time))
+        self.last_time = self.times[-1]
+        self.count += 1
+        if len(self.ops) >= self.block_ops or timestamp - self.block_start >= self.block_seconds:
+            self.flush()
+    
+    def flush(self):
+        """Encode and write the pending operations."""
+        if self.ops:
+            self.write_bytes(encode_block(self.ops, self.times))
+            self.ops = []
+            self.times = []
+        self.file.flush()
+    
+    def close(self):
+        """Write the last block and close the file."""
+        self.flush()
+        self.file.close()
+
+
+def is_stroke_file(path):
+    """True if the file starts with the stroke file magic."""
+    with open(path, 'rb') as f:
+        return f.read(len(FILE_MAGIC)) == FILE_MAGIC
+
+
+def read_stroke_file(path):
+    """
+    Read a whole stroke file.
+    
+    A block cut short (e.g. by a crash while recording) ends the session
+    without an error.
+    
+    Args:
+        path: Stroke file path
+    
+    Returns:
+        Tuple (header, times, ops): header dictionary, seconds array, list of StrokeOp
+    
+    Raises:
+        ValueError: If the file is not a stroke file
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < FILE_HEADER.size:
+        raise ValueError(f"Not a stroke file: {path}")
+    magic, version, length = FILE_HEADER.unpack_from(data)
+    if magic != FILE_MAGIC or version != FILE_VERSION:
+        raise ValueError(f"Not a stroke file (or an unsupported version): {path}")
+    offset = FILE_HEADER.size + length
+    header = json.loads(data[FILE_HEADER.size:offset].decode('utf-8'))
+    
+    times = []
+    ops = []
+    while offset < len(data):
+        try:
+            block_times, block_ops, offset = decode_block(data, offset)
+        except ValueError:
+            break
+        times.append(block_times)
+        ops.extend(block_ops)
+    return header, (np.concatenate(times) if times else np.zeros(0)), ops
+
+
+def convert_stroke_log(log_path, output_path, tolerance=0.25):
+    """
+    Compress a JSON stroke log into a stroke file.
+    
+    Args:
+        log_path: Path to the .jsonl stroke log
+        output_path: Output stroke file path
+        tolerance: Simplification tolerance in pixels
+    
+    Returns:
+        The closed StrokeLogWriter, for its statistics
+    """
+    with open(log_path, encoding='utf-8') as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    writer = StrokeLogWriter(output_path, entries[0], tolerance)
+    for entry in entries[1:]:
+        if entry.get('type') == 'op':
+            writer.write(StrokeOp.from_dict(entry), entry['t'])
+    writer.close()
+    return writer
+
+
+def main():
+    """
+    Convert a JSON stroke log from the command line.
+    """
+    parser = argparse.ArgumentParser(description="Compress an Air Canvas stroke log")
+    parser.add_argument('log', help="Stroke log (.jsonl)")
+    parser.add_argument('--output', help="Output file (defaults to the log name with .strokes)")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="Simplification tolerance in pixels (0 = keep every point)")
+    args = parser.parse_args()
+    
+    output = args.output or os.path.splitext(args.log)[0] + '.strokes'
+    writer = convert_stroke_log(args.log, output, args.tolerance)
+    size = os.path.getsize(args.log)
+    print(f"{writer.count} operations, {writer.points_out}/{writer.points_in} points kept: "
+          f"{size / 1024:.1f} kB -> {writer.bytes_written / 1024:.1f} kB "
+          f"({size / max(1, writer.bytes_written):.1f}x) in {output}")
+
+
+if __name__ == "__main__":
+    main()
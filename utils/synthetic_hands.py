@@ -0,0 +1,453 @@
+"""
+Synthetic Hands Module
+Generates plausible 21-point hand landmark streams from a script of poses and
+movements, with known ground-truth gestures, for load and stress tests.
+
+Landmarks come out in Mediapipe's normalized form, so they can be fed to
+anything that consumes HandDetector output (or played by the 'synthetic'
+detector backend):
+
+    hands = SyntheticHands(noise=0.002, dropout_rate=0.02)
+    batch = hands.generate([hold('palm_open'), swipe('right'), hold('fist')])
+    for index in range(len(batch)):
+        detector.hand_landmarks = batch.hands(index)
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+# Curl of each finger [Thumb, Index, Middle, Ring, Pinky] per pose (0 = extended, 1 = curled)
+POSES = {
+    'palm_open': (0.0, 0.0, 0.0, 0.0, 0.0),
+    'fist': (1.0, 1.0, 1.0, 1.0, 1.0),
+    'peace_sign': (1.0, 0.0, 0.0, 1.0, 1.0),
+    'index_up': (1.0, 0.0, 1.0, 1.0, 1.0),
+    'three_fingers': (1.0, 0.0, 0.0, 0.0, 1.0),
+    'thumbs_up': (0.0, 1.0, 1.0, 1.0, 1.0),
+    'analog': (0.0, 0.0, 1.0, 1.0, 1.0),
+    'pinch': (0.3, 0.5, 0.0, 0.0, 0.0),
+}
+
+# What GestureRecognizer.recognize_gesture reports for a held pose
+POSE_GESTURES = {
+    'palm_open': 'palm_open',
+    'fist': 'fist',
+    'peace_sign': 'peace_sign',
+    'index_up': 'volume_up',
+    'three_fingers': 'volume_down',
+}
+
+# Hand geometry in palm units (wrist to middle finger MCP = 1), for a right
+# hand seen palm-on with the thumb towards +x; y points down the image and
+# z towards the camera is negative, as in Mediapipe
+THUMB_BASE = np.array([0.2, -0.15, 0.0])
+THUMB_ANGLES = (1.0, 0.9, 0.8)       # Extended direction of each thumb bone, from straight up
+THUMB_BENDS = (0.5, 1.0, 0.9)        # Extra rotation across the palm per joint at full curl
+THUMB_LENGTHS = (0.35, 0.32, 0.27)
+FINGER_BASES = np.array([[0.3, -0.95, 0.0], [0.0, -1.0, 0.0], [-0.27, -0.93, 0.0], [-0.5, -0.82, 0.0]])
+FINGER_SPREADS = (0.12, 0.0, -0.12, -0.26)
+FINGER_LENGTHS = ((0.45, 0.27, 0.22), (0.5, 0.31, 0.24), (0.46, 0.29, 0.23), (0.36, 0.22, 0.2))
+FINGER_FLEXION = (1.2, 1.7, 1.1)     # MCP, PIP and DIP flexion at full curl, in radians
+
+# Fraction of the way the thumb's MCP, IP and tip move onto the index tip in a pinch
+PINCH_PULL = (0.25, 0.6, 0.92)
+
+ANCHORS = {'wrist': 0, 'index_tip': 8}
+
+
+@dataclass
+class HandMotion:
+    """
+    One step of a hand script.
+    
+    The anchor landmark travels from wherever it is through the path's
+    points during the first travel seconds (the whole step when 0), while
+    the fingers blend into the pose. gesture is the ground truth: what the
+    recognizer should report during the step, or None.
+    """
+    pose: str = 'palm_open'
+    duration: float = 1.0
+    path: tuple = ()
+    travel: float = 0.0
+    anchor: str = 'wrist'
+    easing: str = 'smooth'
+    gesture: str = None
+
+
+@dataclass
+class HandBatch:
+    """
+    Generated frames of one hand.
+    
+    landmarks and clean are (N, 21, 3) float32 arrays, with and without
+    noise; present is False on dropped frames. segments holds one
+    (first frame, end frame, HandMotion) tuple per script step, the
+    motion's gesture being the ground truth for those frames.
+    """
+    landmarks: np.ndarray
+    clean: np.ndarray
+    present: np.ndarray
+    segments: list
+    fps: float
+    
+    def __len__(self):
+        """Number of frames."""
+        return len(self.landmarks)
+    
+    def hands(self, index):
+        """Frame index as a HandDetector hand list (empty on a dropout)."""
+        return [self.landmarks[index]] if self.present[index] else []
+    
+    def timestamps(self):
+        """Frame times in seconds."""
+        return np.arange(len(self.landmarks)) / self.fps
+
+
+def hold(pose, duration=1.0, at=None, travel=0.8):
+    """
+    Hold a pose, moving the wrist to a point first.
+    
+    Args:
+        pose: Key of POSES
+        duration: Seconds
+        at: Normalized (x, y) of the wrist, or None to stay put
+        travel: Seconds taken to get there (too quick a move reads as a swipe)
+    
+    Returns:
+        HandMotion
+    """
+    return HandMotion(pose, duration, (tuple(at),) if at is not None else (),
+                      min(travel, duration), gesture=POSE_GESTURES.get(pose))
+
+
+def swipe(direction, start=(0.3, 0.6), distance=0.45, duration=0.25, pose='palm_open'):
+    """
+    Swipe horizontally with a minimum-jerk speed profile.
+    
+    Hold the hand at start beforehand, or part of the swipe is spent getting there.
+    
+    Args:
+        direction: 'left' or 'right'
+        start: Normalized (x, y) of the wrist where the swipe begins
+        distance: Horizontal travel as a fraction of the frame width
+        duration: Seconds
+        pose: Pose held while swiping
+    
+    Returns:
+        HandMotion
+    """
+    sign = 1 if direction == 'right' else -1
+    end = (start[0] + sign * distance, start[1])
+    return HandMotion(pose, duration, (tuple(start), end), gesture=f'swipe_{direction}')
+
+
+def pinch(zone='top', duration=1.0, x=0.5, top_zone=1 / 3, bottom_zone=2 / 3):
+    """
+    Pinch thumb and index together with the wrist in one of the volume zones.
+    
+    Args:
+        zone: 'top', 'middle' or 'bottom'
+        duration: Seconds
+        x: Normalized wrist x
+        top_zone: Upper zone boundary of the recognizer, as a fraction of the height
+        bottom_zone: Lower zone boundary of the recognizer
+    
+    Returns:
+        HandMotion
+    """
+    y = {'top': top_zone - 0.04, 'middle': (top_zone + bottom_zone) / 2,
+         'bottom': bottom_zone + 0.1}[zone]
+    motion = hold('pinch', duration, (x, y))
+    motion.gesture = {'top': 'pinch_volume_up', 'bottom': 'pinch_volume_down'}.get(zone)
+    return motion
+
+
+def draw(points, duration, pose='index_up'):
+    """
+    Trace a path with the index fingertip at constant speed.
+    
+    Args:
+        points: Normalized (x, y) points of the path
+        duration: Seconds
+        pose: Pose held while drawing
+    
+    Returns:
+        HandMotion
+    """
+    return HandMotion(pose, duration, tuple(map(tuple, points)), anchor='index_tip',
+                      easing='linear', gesture=POSE_GESTURES.get(pose))
+
+
+def circle_path(center, radius, aspect=16 / 9, count=48, turns=1.0):
+    """
+    Points of a circle that looks round on screen.
+    
+    Args:
+        center: Normalized (x, y) center
+        radius: Radius as a fraction of the frame height
+        aspect: Frame width divided by height
+        count: Points per turn
+        turns: Number of turns
+    
+    Returns:
+        (M, 2) array of normalized points
+    """
+    angles = np.linspace(0, 2 * np.pi * turns, int(count * turns) + 1)
+    return np.stack([center[0] + radius * np.cos(angles) / aspect,
+                     center[1] + radius * np.sin(angles)], axis=1)
+
+
+def demo_script(aspect=16 / 9):
+    """A tour of every pose, swipe and pinch zone, ending with a drawn circle."""
+    return [
+        hold('palm_open', 1.5, (0.5, 0.6)),
+        hold('fist', 1.2),
+        hold('peace_sign', 1.2),
+        hold('index_up', 1.2),
+        hold('three_fingers', 1.2),
+        hold('thumbs_up', 1.0),
+        hold('palm_open', 1.0, (0.3, 0.6)),
+        swipe('right', (0.3, 0.6)),
+        hold('palm_open', 1.0),
+        swipe('left', (0.75, 0.6)),
+        pinch('top', 1.2),
+        pinch('bottom', 1.2),
+        hold('index_up', 1.0, (0.55, 0.7)),
+        draw(circle_path((0.5, 0.45), 0.15, aspect), 3.0),
+        hold('analog', 1.2, (0.5, 0.6)),
+    ]
+
+
+def random_script(count, rng=None, aspect=16 / 9):
+    """
+    A random mix of held poses, swipes, pinches and drawn circles.
+    
+    Args:
+        count: Number of steps
+        rng: numpy Generator (None = unseeded)
+        aspect: Frame width divided by height
+    
+    Returns:
+        List of HandMotion
+    """
+    rng = np.random.default_rng(rng)
+    script = []
+    while len(script) < count:
+        kind = rng.choice(('hold', 'swipe', 'pinch', 'draw'), p=(0.6, 0.15, 0.1, 0.15))
+        if kind == 'hold':
+            pose = str(rng.choice(list(POSES)[:-1]))
+            script.append(hold(pose, rng.uniform(1.0, 2.0),
+                               (rng.uniform(0.3, 0.7), rng.uniform(0.5, 0.7))))
+        elif kind == 'swipe':
+            direction = str(rng.choice(('left', 'right')))
+            start = (0.25 if direction == 'right' else 0.75, rng.uniform(0.5, 0.7))
+            script.append(hold('palm_open', 1.0, start))
+            script.append(swipe(direction, start, duration=rng.uniform(0.2, 0.3)))
+        elif kind == 'pinch':
+            script.append(pinch(str(rng.choice(('top', 'bottom'))), rng.uniform(1.2, 1.8),
+                                rng.uniform(0.35, 0.65)))
+        else:
+            center = (rng.uniform(0.35, 0.65), rng.uniform(0.35, 0.55))
+            radius = rng.uniform(0.08, 0.18)
+            path = circle_path(center, radius, aspect)
+            script.append(hold('index_up', 1.0, (center[0] + radius / aspect, center[1] + 0.3)))
+            script.append(draw(path, rng.uniform(1.5, 3.0)))
+    return script[:count]
+
+
+def pose_landmarks(curls, pinch=None):
+    """
+    Forward kinematics of the hand for many frames at once.
+    
+    Args:
+        curls: (N, 5) finger curls [Thumb, Index, Middle, Ring, Pinky]
+        pinch: (N,) amount the thumb is pulled onto the index tip (None = 0)
+    
+    Returns:
+        (N, 21, 3) landmarks in palm units, wrist at the origin
+    """
+    curls = np.asarray(curls, np.float64)
+    count = len(curls)
+    out = np.zeros((count, 21, 3))
+    
+    # Thumb: bones rotate across the palm, in the image plane
+    position = np.broadcast_to(THUMB_BASE, (count, 3)).copy()
+    out[:, 1] = position
+    bend = np.zeros(count)
+    for joint in range(3):
+        bend = bend + curls[:, 0] * THUMB_BENDS[joint]
+        angle = THUMB_ANGLES[joint] - bend
+        direction = np.stack([np.sin(angle), -np.cos(angle), -0.3 * np.sin(bend)], axis=1)
+        position = position + direction * THUMB_LENGTHS[joint]
+        out[:, 2 + joint] = position
+    
+    # Fingers: each joint flexes the finger towards the camera and down over the palm
+    for finger in range(4):
+        base = 5 + 4 * finger
+        spread = FINGER_SPREADS[finger]
+        position = np.broadcast_to(FINGER_BASES[finger], (count, 3)).copy()
+        out[:, base] = position
+        flexion = np.zeros(count)
+        for joint in range(3):
+            flexion = flexion + curls[:, finger + 1] * FINGER_FLEXION[joint]
+            direction = np.stack([np.sin(spread) * np.cos(flexion), -np.cos(spread) * np.cos(flexion),
+                                  -np.sin(flexion)], axis=1)
+            position = position + direction * FINGER_LENGTHS[finger][joint]
+            out[:, base + 1 + joint] = position
+    
+    if pinch is not None:
+        pinch = np.asarray(pinch, np.float64)[:, None]
+        gap = out[:, 8] - out[:, 4]
+        for landmark, pull in zip((2, 3, 4), PINCH_PULL):
+            out[:, landmark] += gap * pull * pinch
+    return out
+
+
+def smoothstep(t):
+    """Minimum-jerk easing of t in [0, 1]."""
+    t = np.clip(t, 0.0, 1.0)
+    return t * t * t * (10 - 15 * t + 6 * t * t)
+
+
+def follow_path(points, progress, aspect):
+    """
+    Positions a fraction of the way along a polyline, measured on screen.
+    
+    Args:
+        points: (M, 2) normalized points
+        progress: (N,) fractions of the path length
+        aspect: Frame width divided by height
+    
+    Returns:
+        (N, 2) normalized positions
+    """
+    steps = np.diff(points, axis=0) * (aspect, 1.0)
+    lengths = np.concatenate(([0.0], np.cumsum(np.hypot(steps[:, 0], steps[:, 1]))))
+    if lengths[-1] <= 0:
+        return np.repeat(points[:1], len(progress), axis=0)
+    distance = progress * lengths[-1]
+    return np.stack([np.interp(distance, lengths, points[:, 0]),
+                     np.interp(distance, lengths, points[:, 1])], axis=1)
+
+
+class SyntheticHands:
+    """
+    Turns hand scripts into landmark batches.
+    
+    Each script step is generated with vectorized forward kinematics over
+    all its frames: the finger curls blend from the previous pose with a
+    minimum-jerk profile over transition seconds, the hand rolls slightly
+    at random, and the anchor landmark follows the step's path. Gaussian
+    noise and bursts of dropped frames are added over the whole batch.
+    """
+    
+    def __init__(self, aspect=16 / 9, scale=0.12, noise=0.002, dropout_rate=0.0,
+                 dropout_length=5.0, roll_jitter=0.08, transition=0.12, seed=None):
+        """
+        Initialize the SyntheticHands.
+        
+        Args:
+            aspect: Frame width divided by height
+            scale: Palm size as a fraction of the frame height
+            noise: Standard deviation of the landmark jitter, in normalized units
+            dropout_rate: Fraction of frames without a hand
+            dropout_length: Mean length of a dropout burst, in frames
+            roll_jitter: Standard deviation of the hand's in-plane rotation, in radians
+            transition: Seconds taken to change pose
+            seed: Random seed (None = unseeded)
+        """
+        self.aspect = aspect
+        self.scale = scale
+        self.noise = noise
+        self.dropout_rate = dropout_rate
+        self.dropout_length = max(1.0, dropout_length)
+        self.roll_jitter = roll_jitter
+        self.transition = transition
+        self.rng = np.random.default_rng(seed)
+    
+    def generate(self, script, fps=30.0):
+        """
+        Generate the frames of a script.
+        
+        Args:
+            script: List of HandMotion
+            fps: Frames per second
+        
+        Returns:
+            HandBatch
+        """
+        counts = [max(1, int(round(motion.duration * fps))) for motion in script]
+        clean = np.empty((sum(counts), 21, 3), np.float32)
+        units = np.array([self.scale / self.aspect, self.scale, self.scale / self.aspect])
+        segments = []
+        
+        curls = np.array(POSES[script[0].pose], np.float64)
+        pinch = float(script[0].pose == 'pinch')
+        roll = 0.0
+        last = None
+        start = 0
+        for motion, count in zip(script, counts):
+            t = np.arange(count) / fps
+            blend = smoothstep(t / self.transition)[:, None] if self.transition > 0 else np.ones((count, 1))
+            target_curls = np.array(POSES[motion.pose], np.float64)
+            target_pinch = float(motion.pose == 'pinch')
+            target_roll = self.rng.normal(0.0, self.roll_jitter)
+            frame_curls = curls + (target_curls - curls) * blend
+            frame_pinch = pinch + (target_pinch - pinch) * blend[:, 0]
+            frame_roll = (roll + (target_roll - roll) * blend)
+            
+            # Pose in palm units, rolled and scaled to normalized offsets from the wrist
+            local = pose_landmarks(frame_curls, frame_pinch)
+            cos, sin = np.cos(frame_roll), np.sin(frame_roll)
+            x, y = local[:, :, 0].copy(), local[:, :, 1].copy()
+            local[:, :, 0] = x * cos - y * sin
+            local[:, :, 1] = x * sin + y * cos
+            local *= units
+            
+            # The anchor picks up where the previous step left it
+            anchor = ANCHORS[motion.anchor]
+            if last is not None:
+                origin = last[anchor, :2]
+            elif motion.path:
+                origin = motion.path[0]
+            else:
+                origin = (0.5, 0.6)
+            travel = motion.travel or motion.duration
+            progress = np.clip(t / travel, 0.0, 1.0) if travel > 0 else np.ones(count)
+            if motion.easing == 'smooth':
+                progress = smoothstep(progress)
+            points = np.array([origin, *motion.path], np.float64)
+            wrist = follow_path(points, progress, self.aspect) - local[:, anchor, :2]
+            local[:, :, :2] += wrist[:, None, :]
+            
+            clean[start:start + count] = local
+            segments.append((start, start + count, motion))
+            curls, pinch, roll = frame_curls[-1], frame_pinch[-1], frame_roll[-1, 0]
+            last = local[-1]
+            start += count
+        
+        landmarks = clean
+        if self.noise > 0:
+            landmarks = clean + self.rng.normal(0.0, self.noise, clean.shape).astype(np.float32)
+        return HandBatch(landmarks, clean, self.dropouts(len(clean)), segments, fps)
+    
+    def dropouts(self, count):
+        """
+        Frames with a hand, with bursts of geometric length missing.
+        
+        Args:
+            count: Number of frames
+        
+        Returns:
+            (count,) boolean array, False where the hand is lost
+        """
+        if self.dropout_rate <= 0:
+            return np.ones(count, bool)
+        starts = np.flatnonzero(self.rng.random(count) < self.dropout_rate / self.dropout_length)
+        lengths = self.rng.geometric(1.0 / self.dropout_length, len(starts))
+        edges = np.zeros(count + 1, np.int64)
+        np.add.at(edges, starts, 1)
+        np.add.at(edges, np.minimum(starts + lengths, count), -1)
+        return np.cumsum(edges[:-1]) == 0
@@ -0,0 +1,141 @@
+"""
+Tap Detector Module
+Detects a quick push of the index finger towards the camera from the depth
+(z) of Mediapipe's landmarks.
+"""
+
+import time
+
+import numpy as np
+
+
+class TapDetector:
+    """
+    Fires once per push of the index fingertip towards the camera.
+    
+    The fingertip's depth relative to the wrist, in palm sizes, is kept in a
+    fixed-size ring buffer. Each frame replaces one entry and fits the depth
+    velocity over the whole window with one vectorized least-squares slope,
+    so the cost per frame does not grow with the session. A tap needs both a
+    fast approach and enough travel within the window; the detector then
+    waits for the finger to stop pushing before it can fire again.
+    """
+    
+    def __init__(self, window=6, push_speed=2.0, min_travel=0.2, release_speed=0.5,
+                 cooldown=0.3, max_gap=0.25, aspect=16 / 9):
+        """
+        Initialize the TapDetector.
+        
+        Args:
+            window: Frames in the ring buffer the velocity is fitted over
+            push_speed: Approach speed that counts as a push, in palm sizes per second
+            min_travel: Depth the fingertip must cover within the window, in palm sizes
+            release_speed: Approach speed below which the detector re-arms
+            cooldown: Minimum seconds between taps
+            max_gap: Seconds without a hand after which the buffer starts over
+            aspect: Frame width divided by height
+        """
+        self.push_speed = push_speed
+        self.min_travel = min_travel
+        self.release_speed = release_speed
+        self.cooldown = cooldown
+        self.max_gap = max_gap
+        self.aspect = aspect
+        
+        self.depths = np.zeros(window)
+        self.times = np.zeros(window)
+        self.index = 0
+        self.count = 0
+        self.armed = True
+        self.last_tap_time = 0.0
+        
+        # Latest fitted approach speed (palm sizes per second, positive towards the camera)
+        self.speed = 0.0
+    
+    def configure(self, gestures):
+        """
+        Apply [Gestures] tap settings.
+        
+        Args:
+            gestures: GestureConfig
+        """
+        self.push_speed = gestures.tap_speed
+        self.min_travel = gestures.tap_travel
+    
+    def reset(self):
+        """Forget the buffered depths, e.g. when the hand is lost."""
+        self.index = 0
+        self.count = 0
+        self.armed = True
+        self.speed = 0.0
+    
+    def relative_depth(self, landmarks):
+        """
+        Depth of the index fingertip in front of the wrist, in palm sizes.
+        
+        Mediapipe's z is relative to the wrist and scaled like x (frame-width
+        units); it is converted to frame-height units like x and y before
+        dividing by the palm size.
+        
+        Args:
+            landmarks: Normalized (21, 3) landmarks of one hand
+        
+        Returns:
+            Relative depth (smaller = closer to the camera), or None for a degenerate hand
+        """
+        palm = np.hypot((landmarks[9][0] - landmarks[0][0]) * self.aspect,
+                        landmarks[9][1] - landmarks[0][1])
+        if palm <= 0:
+            return None
+        return float(landmarks[8][2] - landmarks[0][2]) * self.aspect / palm
+    
+    def update(self, landmarks, now=None):
+        """
+        Add one frame and check for a tap.
+        
+        Args:
+            landmarks: Normalized (21, 3) landmarks of one hand, or None when no hand is seen
+            now: Current time (defaults to time.perf_counter())
+        
+        Returns:
+            Boolean indicating if a tap was detected on this frame
+        """
+        if landmarks is None or len(landmarks) == 0:
+            self.reset()
+            return False
+        depth = self.relative_depth(landmarks)
+        if depth is None:
+            return False
+        now = time.perf_counter() if now is None else now
+        
+        # Frames from before the hand was lost would blur the velocity
+        size = len(self.depths)
+        if self.count and now - self.times[(self.index - 1) % size] > self.max_gap:
+            self.reset()
+        self.depths[self.index] = depth
+        self.times[self.index] = now
+        self.index = (self.index + 1) % size
+        self.count = min(self.count + 1, size)
+        if self.count < size:
+            return False
+        
+        # Least-squares slope of depth over time across the window
+        t = self.times - self.times.mean()
+        spread = np.dot(t, t)
+        if spread <= 0:
+            return False
+        self.speed = -float(np.dot(t, self.depths - self.depths.mean())) / spread
+        
+        if not self.armed:
+            if self.speed < self.release_speed:
+                self.armed = True
+            return False
+        
+        # Travel from the farthest point in the window to the current depth
+        travel = float(self.depths.max()) - depth
+        if (self.speed >= self.push_speed and travel >= self.min_travel
+                and now - self.last_tap_time >= self.cooldown):
+            self.armed = False
+            self.last_tap_time = now
+            return True
+        return False
@@ -0,0 +1,217 @@
+"""
+Widgets Module
+Header buttons rendered and hit-tested from a single layout.
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+
+class Button:
+    """
+    A rectangular header button.
+    """
+    
+    def __init__(self, name, rect, label, on_activate, color=None, style='color', active=False):
+        """
+        Initialize the Button.
+        
+        Args:
+            name: Unique button name
+            rect: (x1, y1, x2, y2) in header coordinates, inclusive
+            label: Text drawn on the button
+            on_activate: Callable run when the button is activated
+            color: Fill color for 'color' buttons (BGR)
+            style: 'color' for a filled swatch, 'action' for a neutral button
+            active: Whether the button is drawn highlighted (e.g. the current tool)
+        """
+        self.name = name
+        self.rect = rect
+        self.label = label
+        self.on_activate = on_activate
+        self.color = color
+        self.style = style
+        self.active = active
+    
+    def draw(self, header):
+        """
+        Render the button onto the header image.
+        
+        Args:
+            header: Header image (BGR)
+        """
+        x1, y1, x2, y2 = self.rect
+        if self.style == 'color':
+            # Glass-morphism effect for color buttons
+            roi = header[y1:y2 + 1, x1:x2 + 1]
+            solid = np.empty_like(roi)
+            solid[:] = self.color
+            cv2.addWeighted(solid, 0.85, roi, 0.15, 0, dst=roi)
+            
+            # Modern border with glow
+            border_color = tuple([min(255, c + 80) for c in self.color])
+            cv2.rectangle(header, (x1, y1), (x2, y2), border_color, 3)
+            
+            # Dark text on light colors
+            b, g, r = self.color
+            luminance = 0.114 * b + 0.587 * g + 0.299 * r
+            text_color = (50, 50, 50) if luminance > 160 else (255, 255, 255)
+            cv2.putText(header, self.label, (x1 + 40, y1 + 33),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, text_color, 2)
+        else:
+            # Gradient background for action buttons
+            height = y2 - y1
+            for i in range(height):
+                color_val = int(40 + i / height * 20)
+                header[y1 + i, x1:x2 + 1] = (color_val, color_val, color_val)
+            
+            border_color = (0, 220, 255) if self.active else (200, 200, 200)
+            cv2.rectangle(header, (x1, y1), (x2, y2), border_color, 3)
+            
+            # Shrink the label to fit narrow buttons and center it
+            scale = 0.7
+            text_size = cv2.getTextSize(self.label, cv2.FONT_HERSHEY_DUPLEX, scale, 2)[0]
+            if text_size[0] > x2 - x1 - 12:
+                scale *= (x2 - x1 - 12) / text_size[0]
+                text_size = cv2.getTextSize(self.label, cv2.FONT_HERSHEY_DUPLEX, scale, 2)[0]
+            text_x = x1 + (x2 - x1 - text_size[0]) // 2
+            text_y = y1 + (y2 - y1 + text_size[1]) // 2
+            cv2.putText(header, self.label, (text_x, text_y),
+                       cv2.FONT_HERSHEY_DUPLEX, scale, (255, 255, 255), 2)
+
+
+class WidgetLayer:
+    """
+    A set of buttons with a precomputed label map for constant-time hit tests.
+    
+    Each header pixel stores the index of the button covering it (0 = none), so
+    finding the button under the pointer is one array lookup however many
+    buttons there are. In dwell mode buttons fire once when the pointer has
+    stayed on them for the dwell time, and again only after the pointer has
+    left and come back. In tap mode they fire on every tap made over them.
+    """
+    
+    def __init__(self, width, height, dwell_time=0.2, activation='dwell'):
+        """
+        Initialize the WidgetLayer.
+        
+        Args:
+            width: Width of the region covered by the layer
+            height: Height of the region covered by the layer
+            dwell_time: Seconds the pointer must rest on a button to activate it
+            activation: 'dwell' or 'tap'
+        """
+        self.width = width
+        self.height = height
+        self.dwell_time = dwell_time
+        self.activation = activation
+        self.buttons = []
+        self.label_map = np.zeros((height, width), np.uint8)
+        
+        # Hover state for dwell/edge activation
+        self.hover_label = 0
+        self.hover_start = 0.0
+        self.fired = False
+    
+    def add(self, button):
+        """
+        Add a button and mark its pixels in the label map.
+        
+        Args:
+            button: Button instance
+        
+        Returns:
+            The button
+        """
+        if len(self.buttons) >= 255:
+            raise ValueError("WidgetLayer supports at most 255 buttons")
+        self.buttons.append(button)
+        x1, y1, x2, y2 = button.rect
+        self.label_map[max(0, y1):y2 + 1, max(0, x1):x2 + 1] = len(self.buttons)
+        return button
+    
+    def render(self, background):
+        """
+        Draw every button onto a background image.
+        
+        Args:
+            background: Image the layer covers (modified in place)
+        
+        Returns:
+            The background image
+        """
+        for button in self.buttons:
+            button.draw(background)
+        return background
+    
+    def hit_test(self, x, y):
+        """
+        Find the button at a point.
+        
+        Args:
+            x, y: Point coordinates
+        
+        Returns:
+            Button or None
+        """
+        label = self.label_at(x, y)
+        return self.buttons[label - 1] if label else None
+    
+    def label_at(self, x, y):
+        """Label map value at a point (0 outside the layer or between buttons)."""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.label_map[y, x]
+        return 0
+    
+    def update(self, x=None, y=None, now=None, tap=False):
+        """
+        Track the pointer and activate the button under it when due.
+        
+        Args:
+            x, y: Pointer position, or None when there is no pointer
+            now: Current time (defaults to time.time())
+            tap: Whether the pointer tapped on this frame (tap mode)
+        
+        Returns:
+            The activated Button, or None
+        """
+        label = 0 if x is None else self.label_at(x, y)
+        now = time.time() if now is None else now
+        
+        # Entering a new button (or leaving all of them) re-arms activation
+        if label != self.hover_label:
+            self.hover_label = label
+            self.hover_start = now
+            self.fired = False
+        
+        if self.activation == 'tap':
+            due = label and tap
+        else:
+            due = label and not self.fired and now - self.hover_start >= self.dwell_time
+        if due:
+            self.fired = True
+            button = self.buttons[label - 1]
+            button.on_activate()
+            return button
+        return None
+    
+    def draw_feedback(self, img, now=None):
+        """
+        Draw the dwell progress, or the tap target, under the hovered button.
+        
+        Args:
+            img: Frame the layer is overlaid on
+            now: Current time (defaults to time.time())
+        """
+        if self.activation == 'tap' and self.hover_label:
+            x1, _, x2, y2 = self.buttons[self.hover_label - 1].rect
+            cv2.line(img, (x1, y2 + 6), (x2, y2 + 6), (0, 220, 255), 2)
+            return
+        if not self.hover_label or self.fired or self.dwell_time <= 0:
+            return
+        now = time.time() if now is None else now
+        progress = min(1.0, (now - self.hover_start) / self.dwell_time)
+        x1, _, x2, y2 = self.buttons[self.hover_label - 1].rect
+        cv2.line(img, (x1, y2 + 6), (x1 + int((x2 - x1) * progress), y2 + 6), (0, 220, 255), 4)